@@ -38,9 +38,11 @@ The following function can be used to create a connection using the
 
 The transport implementation is documented below:
 
-.. autoclass:: STARTTLSTransport(loop, rawsock, protocol, ssl_context_factory, [waiter=None], [use_starttls=False], [post_handshake_callback=None], [peer_hostname=None], [server_hostname=None])
+.. autoclass:: STARTTLSTransport(loop, rawsock, protocol, ssl_context_factory, [waiter=None], [use_starttls=False], [post_handshake_callback=None], [peer_hostname=None], [server_hostname=None], [session=None])
    :members:
 
+.. autoclass:: ReadStatistics
+
 """
 
 import asyncio
@@ -55,6 +57,29 @@ from . import errors
 
 logger = logging.getLogger(__name__)
 
+try:
+    # pyOpenSSL does not expose SSL_session_reused; its private bindings are
+    # only used to report session resumption, see _session_reused
+    from OpenSSL._util import lib as _openssl_lib
+except ImportError:  # pragma: no cover
+    _openssl_lib = None
+
+
+def _session_reused(tls_conn):
+    """
+    Return true if the handshake of the :class:`OpenSSL.SSL.Connection`
+    `tls_conn` resumed a session.
+
+    This relies on internals of pyOpenSSL; if they are not available,
+    :data:`False` is returned.
+    """
+    try:
+        return bool(_openssl_lib.SSL_session_reused(tls_conn._ssl))
+    except Exception:
+        logger.debug("cannot determine whether the TLS session was reused",
+                     exc_info=True)
+        return False
+
 
 class _State(Enum):
     RAW_OPEN               = 0x0000
@@ -89,6 +114,75 @@ class _State(Enum):
         return (self.value & 0x3) == 0
 
 
+class ReadStatistics:
+    """
+    Statistics about the data received by a :class:`STARTTLSTransport`.
+
+    .. attribute:: feeds
+
+       Number of calls to :meth:`~asyncio.Protocol.data_received`.
+
+    .. attribute:: reads
+
+       Number of reads which returned data. With TLS, each read returns at
+       most one TLS record.
+
+    .. attribute:: bytes
+
+       Total number of bytes passed to the protocol.
+
+    .. attribute:: max_feed_size
+
+       Largest number of bytes passed to the protocol at once.
+
+    .. autoattribute:: bytes_per_feed
+
+    .. autoattribute:: reads_per_feed
+    """
+
+    __slots__ = ("feeds", "reads", "bytes", "max_feed_size")
+
+    def __init__(self):
+        super().__init__()
+        self.feeds = 0
+        self.reads = 0
+        self.bytes = 0
+        self.max_feed_size = 0
+
+    @property
+    def bytes_per_feed(self):
+        """
+        Average number of bytes passed to the protocol at once.
+        """
+        if not self.feeds:
+            return 0.
+        return self.bytes / self.feeds
+
+    @property
+    def reads_per_feed(self):
+        """
+        Average number of reads combined into one call to the protocol.
+        """
+        if not self.feeds:
+            return 0.
+        return self.reads / self.feeds
+
+    def _record_feed(self, nreads, nbytes):
+        self.feeds += 1
+        self.reads += nreads
+        self.bytes += nbytes
+        self.max_feed_size = max(self.max_feed_size, nbytes)
+
+    def __repr__(self):
+        return "<{}.{} feeds={} reads={} bytes={}>".format(
+            type(self).__module__,
+            type(self).__qualname__,
+            self.feeds,
+            self.reads,
+            self.bytes,
+        )
+
+
 class STARTTLSTransport(asyncio.Transport):
     """
     Create a new :class:`asyncio.Transport` which supports TLS and the deferred
@@ -149,16 +243,47 @@ class STARTTLSTransport(asyncio.Transport):
     e.g. using DANE. The coroutine must not return a value. If it encounters an
     error, an appropriate exception should be raised, which will propagate out
     of :meth:`starttls` and/or passed to the `waiter` future.
+
+    `session` may be an :class:`OpenSSL.SSL.Session` obtained from a previous
+    connection (see :meth:`OpenSSL.SSL.Connection.get_session`). It is offered
+    to the server for resumption in the TLS handshake. Whether the server
+    accepted it is available as the ``session_reused`` extra info after the
+    handshake.
+
+    The transport implements the write flow control of :mod:`asyncio`: when
+    the amount of buffered data exceeds the high-water mark, the
+    :meth:`~asyncio.BaseProtocol.pause_writing` method of the protocol is
+    called and :meth:`~asyncio.BaseProtocol.resume_writing` is called when it
+    drops to the low-water mark again (see :meth:`set_write_buffer_limits`).
+
+    With TLS, a single read returns at most one TLS record. To avoid feeding
+    the protocol with many small pieces of data, the transport keeps reading
+    all records which are available when the socket becomes readable and
+    passes them to the protocol at once, up to :attr:`read_budget` bytes.
+
+    .. attribute:: read_budget
+
+       Maximum number of bytes to read and pass to the protocol per readiness
+       event of the socket. Defaults to :attr:`MAX_SIZE`.
+
+    .. attribute:: read_statistics
+
+       :class:`ReadStatistics` for the data received by the transport.
     """
 
     MAX_SIZE = 256 * 1024
 
+    #: Maximum number of bytes passed to a single send call. Pending data is
+    #: sent in chunks of at most this size, without copying the buffer.
+    MAX_WRITE_SIZE = 256 * 1024
+
     def __init__(self, loop, rawsock, protocol, ssl_context_factory,
                  waiter=None,
                  use_starttls=False,
                  post_handshake_callback=None,
                  peer_hostname=None,
-                 server_hostname=None):
+                 server_hostname=None,
+                 session=None):
         if not use_starttls and not ssl_context_factory:
             raise ValueError("Cannot have STARTTLS disabled (i.e. immediate "
                              "TLS connection) and without SSL context.")
@@ -185,7 +310,8 @@ class STARTTLSTransport(asyncio.Transport):
             ssl_object=None,
             peername=self._rawsock.getpeername(),
             peer_hostname=peer_hostname,
-            server_hostname=server_hostname
+            server_hostname=server_hostname,
+            session_reused=False,
         )
 
         # this is a list set of tasks which will also be cancelled if the
@@ -195,10 +321,17 @@ class STARTTLSTransport(asyncio.Transport):
         self._paused = False
         self._closing = False
 
+        self._protocol_paused = False
+        self._set_write_buffer_limits()
+
+        self.read_budget = self.MAX_SIZE
+        self.read_statistics = ReadStatistics()
+
         self._tls_conn = None
         self._tls_read_wants_write = False
         self._tls_write_wants_read = False
         self._tls_post_handshake_callback = post_handshake_callback
+        self._tls_session = session
 
         self._state = None
         if not use_starttls:
@@ -262,6 +395,10 @@ class STARTTLSTransport(asyncio.Transport):
         if self._buffer:
             self._buffer.clear()
 
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_exception(
+                exc or ConnectionError("_force_close() called"),
+            )
         self._loop.remove_reader(self._raw_fd)
         self._loop.remove_writer(self._raw_fd)
         self._loop.call_soon(self._call_connection_lost_and_clean_up, exc)
@@ -288,6 +425,63 @@ class STARTTLSTransport(asyncio.Transport):
             self._protocol = None
             self._loop = None
 
+    def _set_write_buffer_limits(self, high=None, low=None):
+        if high is None:
+            if low is None:
+                high = 64 * 1024
+            else:
+                high = 4 * low
+        if low is None:
+            low = high // 4
+        if not high >= low >= 0:
+            raise ValueError(
+                "high ({!r}) must be >= low ({!r}) must be >= 0".format(
+                    high, low
+                )
+            )
+        self._high_water = high
+        self._low_water = low
+
+    def _maybe_pause_protocol(self):
+        if self.get_write_buffer_size() <= self._high_water:
+            return
+        if not self._protocol_paused:
+            self._trace_logger.debug("pausing protocol (buffer size %d)",
+                                     self.get_write_buffer_size())
+            self._protocol_paused = True
+            try:
+                self._protocol.pause_writing()
+            except Exception as exc:
+                self._loop.call_exception_handler({
+                    "message": "protocol.pause_writing() failed",
+                    "exception": exc,
+                    "transport": self,
+                    "protocol": self._protocol,
+                })
+
+    def _maybe_resume_protocol(self):
+        if (self._protocol_paused and
+                self.get_write_buffer_size() <= self._low_water):
+            self._trace_logger.debug("resuming protocol (buffer size %d)",
+                                     self.get_write_buffer_size())
+            self._protocol_paused = False
+            try:
+                self._protocol.resume_writing()
+            except Exception as exc:
+                self._loop.call_exception_handler({
+                    "message": "protocol.resume_writing() failed",
+                    "exception": exc,
+                    "transport": self,
+                    "protocol": self._protocol,
+                })
+
+    def _send_buffered(self):
+        # send a chunk of the buffer without copying it; the views must be
+        # released before the buffer can be resized
+        with memoryview(self._buffer) as view:
+            with view[:self.MAX_WRITE_SIZE] as chunk:
+                return self._sock.send(chunk)
+
     def _initiate_raw(self):
         if self._state is not None:
             self._invalid_transition(via="_initiate_raw", to=_State.RAW_OPEN)
@@ -312,6 +506,8 @@ class STARTTLSTransport(asyncio.Transport):
             self._sock)
         self._tls_conn.set_connect_state()
         self._tls_conn.set_app_data(self)
+        if self._tls_session is not None:
+            self._tls_conn.set_session(self._tls_session)
         try:
             self._tls_conn.set_tlsext_host_name(
                 self._extra["server_hostname"].encode("IDNA"))
@@ -359,7 +555,8 @@ class STARTTLSTransport(asyncio.Transport):
 
         self._trace_logger.debug("handshake complete")
         self._extra.update(
-            peercert=self._tls_conn.get_peer_certificate()
+            peercert=self._tls_conn.get_peer_certificate(),
+            session_reused=_session_reused(self._tls_conn),
         )
 
         if self._tls_post_handshake_callback:
@@ -375,6 +572,9 @@ class STARTTLSTransport(asyncio.Transport):
         self._chained_pending.discard(task)
         try:
             task.result()
+        except asyncio.CancelledError:
+            # cancelled because the transport was closed
+            pass
         except BaseException as err:
             self._tls_post_handshake(err)
         else:
@@ -455,27 +655,98 @@ class STARTTLSTransport(asyncio.Transport):
             return
 
         try:
-            data = self._sock.recv(self.MAX_SIZE)
+            data = self._sock.recv(min(self.MAX_SIZE, self.read_budget))
         except (BlockingIOError, InterruptedError, OpenSSL.SSL.WantReadError):
             pass
         except OpenSSL.SSL.WantWriteError:
-            assert self._state.tls_started
-            self._tls_read_wants_write = True
-            self._trace_logger.debug("_read_ready: swap reader for writer")
-            self._loop.remove_reader(self._raw_fd)
-            self._loop.add_writer(self._raw_fd, self._write_ready)
+            self._tls_read_wants_write_swap()
         except Exception as err:
-            self._fatal_error(err, "Fatal read error on STARTTLS transport")
+            if not self._ignore_during_shutdown(err):
+                self._fatal_error(err,
+                                  "Fatal read error on STARTTLS transport")
             return
         else:
             if data:
-                self._protocol.data_received(data)
+                if self._state.tls_started:
+                    self._read_more_records(data)
+                else:
+                    self.read_statistics._record_feed(1, len(data))
+                    self._protocol.data_received(data)
             else:
-                keep_open = False
-                try:
-                    keep_open = bool(self._protocol.eof_received())
-                finally:
-                    self._eof_received(keep_open)
+                self._read_eof()
+
+    def _ignore_during_shutdown(self, exc):
+        # the peer may drop the connection while the TLS shutdown is in
+        # progress, which is not an error
+        if (isinstance(exc, OpenSSL.SSL.SysCallError) and
+                self._state in (_State.TLS_SHUT_DOWN,
+                                _State.TLS_SHUTTING_DOWN,
+                                _State.CLOSED)):
+            self._trace_logger.debug(
+                "ignoring syscall exception during shutdown: %s",
+                exc,
+            )
+            return True
+        return False
+
+    def _read_eof(self):
+        keep_open = False
+        try:
+            keep_open = bool(self._protocol.eof_received())
+        finally:
+            self._eof_received(keep_open)
+
+    def _tls_read_wants_write_swap(self):
+        assert self._state.tls_started
+        self._tls_read_wants_write = True
+        self._trace_logger.debug("_read_ready: swap reader for writer")
+        self._loop.remove_reader(self._raw_fd)
+        self._loop.add_writer(self._raw_fd, self._write_ready)
+
+    def _read_more_records(self, data):
+        # a TLS read returns at most one record; read the records which are
+        # available right now and pass them to the protocol at once
+        chunks = [data]
+        nbytes = len(data)
+        eof = False
+        error = None
+        while nbytes < self.read_budget:
+            # use the decrypted data buffered by OpenSSL first, this does not
+            # need a system call
+            size = self._tls_conn.pending() or self.MAX_SIZE
+            try:
+                data = self._sock.recv(min(size, self.read_budget - nbytes))
+            except (BlockingIOError, InterruptedError,
+                    OpenSSL.SSL.WantReadError):
+                break
+            except OpenSSL.SSL.WantWriteError:
+                self._tls_read_wants_write_swap()
+                break
+            except Exception as err:
+                error = err
+                break
+            if not data:
+                eof = True
+                break
+            chunks.append(data)
+            nbytes += len(data)
+
+        self.read_statistics._record_feed(len(chunks), nbytes)
+        if len(chunks) == 1:
+            self._protocol.data_received(chunks[0])
+        else:
+            self._protocol.data_received(b"".join(chunks))
+
+        if self._state == _State.CLOSED:
+            # closed by the protocol
+            return
+
+        if error is not None:
+            if not self._ignore_during_shutdown(error):
+                self._fatal_error(error,
+                                  "Fatal read error on STARTTLS transport")
+        elif eof:
+            self._read_eof()
 
     def _write_ready(self):
         if self._tls_read_wants_write:
@@ -487,9 +758,10 @@ class STARTTLSTransport(asyncio.Transport):
                                          " data")
                 self._loop.add_reader(self._raw_fd, self._read_ready)
 
-        if self._buffer:
+        # do not send data during the handshake
+        if self._buffer and self._state != _State.TLS_HANDSHAKING:
             try:
-                nsent = self._sock.send(bytes(self._buffer))
+                nsent = self._send_buffered()
             except (BlockingIOError, InterruptedError,
                     OpenSSL.SSL.WantWriteError):
                 nsent = 0
@@ -502,13 +774,15 @@ class STARTTLSTransport(asyncio.Transport):
                 self._loop.remove_writer(self._raw_fd)
                 self._loop.add_reader(self._raw_fd, self._read_ready)
             except Exception as err:
-                self._fatal_error(err,
-                                  "Fatal write error on STARTTLS "
-                                  "transport")
+                if not self._ignore_during_shutdown(err):
+                    self._fatal_error(err,
+                                      "Fatal write error on STARTTLS "
+                                      "transport")
                 return
 
             if nsent:
                 del self._buffer[:nsent]
+                self._maybe_resume_protocol()
 
         if not self._buffer:
             if not self._tls_read_wants_write:
@@ -537,7 +811,8 @@ class STARTTLSTransport(asyncio.Transport):
                                                "ignored as shut down is"
                                                " improper")
                 self._fatal_error(ConnectionError("Underlying transport "
-                                                  "closed"))
+                                                  "closed"),
+                                  "unexpected eof_received")
         else:
             if keep_open:
                 self._state = _State.RAW_EOF_RECEIVED
@@ -555,7 +830,7 @@ class STARTTLSTransport(asyncio.Transport):
             self._invalid_state("abort() called")
             return
 
-        self._force_close()
+        self._force_close(None)
 
     def can_write_eof(self):
         """
@@ -614,20 +889,24 @@ class STARTTLSTransport(asyncio.Transport):
           constructor.
         * ``server_hostname``: The `server_hostname` value passed to the
           constructor.
+        * ``session_reused``: true if the TLS handshake resumed the `session`
+          passed to the constructor or :meth:`starttls`.
 
         """
         return self._extra.get(name, default)
 
     @asyncio.coroutine
     def starttls(self, ssl_context=None,
-                 post_handshake_callback=None):
+                 post_handshake_callback=None,
+                 session=None):
         """
         Start a TLS stream on top of the socket. This is an invalid operation
         if the stream is not in RAW_OPEN state.
 
         If `ssl_context` is set, it overrides the `ssl_context` passed to the
         constructor. If `post_handshake_callback` is set, it overrides the
-        `post_handshake_callback` passed to the constructor.
+        `post_handshake_callback` passed to the constructor. If `session` is
+        set, it overrides the `session` passed to the constructor.
         """
         if self._state != _State.RAW_OPEN or self._closing:
             raise self._invalid_state("starttls() called")
@@ -643,6 +922,9 @@ class STARTTLSTransport(asyncio.Transport):
         if post_handshake_callback is not None:
             self._tls_post_handshake_callback = post_handshake_callback
 
+        if session is not None:
+            self._tls_session = session
+
         self._waiter = asyncio.Future()
         self._waiter.add_done_callback(self._waiter_done)
         self._initiate_tls()
@@ -661,7 +943,9 @@ class STARTTLSTransport(asyncio.Transport):
             raise TypeError('data argument must be byte-ish (%r)',
                             type(data))
 
-        if not self._state.is_writable or self._closing:
+        if (self._state is None or
+                not self._state.is_writable or
+                self._closing):
             raise self._invalid_state("write() called")
 
         if not data:
@@ -671,6 +955,38 @@ class STARTTLSTransport(asyncio.Transport):
             self._loop.add_writer(self._raw_fd, self._write_ready)
 
         self._buffer.extend(data)
+        self._maybe_pause_protocol()
+
+    def get_write_buffer_size(self):
+        """
+        Return the number of bytes which are buffered for sending.
+        """
+        return len(self._buffer)
+
+    def get_write_buffer_limits(self):
+        """
+        Return the low- and high-water marks of the write buffer as tuple
+        ``(low, high)``.
+        """
+        return self._low_water, self._high_water
+
+    def set_write_buffer_limits(self, high=None, low=None):
+        """
+        Set the high- and low-water marks for write flow control.
+
+        If the amount of buffered data exceeds `high`, the
+        :meth:`~asyncio.BaseProtocol.pause_writing` method of the protocol is
+        called. Once the buffer has drained to `low` or less,
+        :meth:`~asyncio.BaseProtocol.resume_writing` is called.
+
+        If only `high` is given, `low` defaults to a quarter of `high`; if only
+        `low` is given, `high` defaults to four times `low`. The defaults are
+        64 KiB and 16 KiB.
+
+        :raises ValueError: unless ``high >= low >= 0``
+        """
+        self._set_write_buffer_limits(high=high, low=low)
+        self._maybe_pause_protocol()
 
     def write_eof(self):
         """
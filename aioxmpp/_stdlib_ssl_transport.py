@@ -0,0 +1,210 @@
+########################################################################
+# File name: _stdlib_ssl_transport.py
+# This file is part of: aioxmpp
+#
+# LICENSE
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+########################################################################
+"""
+:mod:`_stdlib_ssl_transport` --- Direct TLS on top of the :mod:`asyncio` TLS
+############################################################################
+
+This module provides the transport used with
+:attr:`aioxmpp.security_layer.TLSBackend.STDLIB`. Instead of driving an
+:class:`OpenSSL.SSL.Connection` from Python like
+:class:`aioxmpp._ssl_transport.STARTTLSTransport`, the TLS records are handled
+by the :mod:`asyncio` SSL implementation using :class:`ssl.SSLContext`
+objects.
+
+Only direct TLS (as used by :class:`aioxmpp.connector.XMPPOverTLSConnector`)
+is supported: upgrading an existing connection would require
+:meth:`asyncio.AbstractEventLoop.start_tls`, which is not available on the
+Python versions supported by aioxmpp.
+
+.. autofunction:: create_tls_connection
+
+.. autoclass:: StdlibTLSTransport
+
+.. versionadded:: 0.9
+"""
+
+import asyncio
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class _ProtocolProxy(asyncio.Protocol):
+    """
+    Forward the callbacks of the underlying transport to `protocol`.
+
+    This is needed so that the application protocol sees the
+    :class:`StdlibTLSTransport` instead of the transport it wraps, and so
+    that ``connection_made`` can be held back until the certificate has been
+    verified.
+    """
+
+    def __init__(self, protocol):
+        super().__init__()
+        self._protocol = protocol
+        self._connected = False
+
+    def _deliver_connection_made(self, transport):
+        self._connected = True
+        self._protocol.connection_made(transport)
+
+    def connection_made(self, transport):
+        # data must not reach the protocol before connection_made has been
+        # delivered to it
+        transport.pause_reading()
+
+    def data_received(self, data):
+        self._protocol.data_received(data)
+
+    def eof_received(self):
+        return self._protocol.eof_received()
+
+    def connection_lost(self, exc):
+        if self._connected:
+            self._protocol.connection_lost(exc)
+
+    def pause_writing(self):
+        self._protocol.pause_writing()
+
+    def resume_writing(self):
+        self._protocol.resume_writing()
+
+
+class StdlibTLSTransport(asyncio.Transport):
+    """
+    Wrap an :mod:`asyncio` TLS transport.
+
+    :param transport: The transport to wrap.
+    :param server_hostname: The host name used for SNI and certificate
+        checks.
+
+    All transport methods are forwarded to the wrapped transport. In addition
+    to the extra info provided by the wrapped transport, ``server_hostname``
+    is available through :meth:`get_extra_info`.
+
+    The transport does not provide ``can_starttls``, so that
+    :meth:`aioxmpp.protocol.XMLStream.can_starttls` is false.
+    """
+
+    def __init__(self, transport, *, server_hostname=None):
+        super().__init__({"server_hostname": server_hostname})
+        self._transport = transport
+
+    def get_extra_info(self, name, default=None):
+        try:
+            return self._extra[name]
+        except KeyError:
+            return self._transport.get_extra_info(name, default)
+
+    def write(self, data):
+        self._transport.write(data)
+
+    def writelines(self, list_of_data):
+        self._transport.writelines(list_of_data)
+
+    def write_eof(self):
+        self._transport.write_eof()
+
+    def can_write_eof(self):
+        return self._transport.can_write_eof()
+
+    def close(self):
+        self._transport.close()
+
+    def abort(self):
+        self._transport.abort()
+
+    def is_closing(self):
+        return self._transport.is_closing()
+
+    def pause_reading(self):
+        self._transport.pause_reading()
+
+    def resume_reading(self):
+        self._transport.resume_reading()
+
+    def get_write_buffer_size(self):
+        return self._transport.get_write_buffer_size()
+
+    def get_write_buffer_limits(self):
+        return self._transport.get_write_buffer_limits()
+
+    def set_write_buffer_limits(self, high=None, low=None):
+        self._transport.set_write_buffer_limits(high=high, low=low)
+
+
+@asyncio.coroutine
+def create_tls_connection(
+        loop,
+        protocol_factory,
+        host,
+        port,
+        *,
+        server_hostname,
+        ssl_context,
+        post_handshake_callback=None):
+    """
+    Connect to `host` at `port` using TLS and return a pair
+    ``(transport, protocol)``, where `transport` is a
+    :class:`StdlibTLSTransport`.
+
+    TLS is established using the :class:`ssl.SSLContext` `ssl_context`.
+    `server_hostname` is used for SNI and the host name check of the
+    certificate.
+
+    If `post_handshake_callback` is not :data:`None`, it must be a coroutine
+    function. It is called with the transport after the handshake has
+    completed and before the protocol is connected to the transport; if it
+    raises, the connection is aborted and the exception is re-raised.
+    """
+
+    if ssl_context is None:
+        raise ValueError("ssl_context must not be None")
+
+    protocol = protocol_factory()
+    proxy = _ProtocolProxy(protocol)
+
+    raw_transport, _ = yield from loop.create_connection(
+        lambda: proxy,
+        host=host,
+        port=port,
+        ssl=ssl_context,
+        server_hostname=server_hostname,
+    )
+
+    transport = StdlibTLSTransport(
+        raw_transport,
+        server_hostname=server_hostname,
+    )
+
+    if post_handshake_callback is not None:
+        try:
+            yield from post_handshake_callback(transport)
+        except:
+            raw_transport.abort()
+            raise
+
+    proxy._deliver_connection_made(transport)
+    transport.resume_reading()
+
+    return transport, protocol
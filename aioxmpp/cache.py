@@ -0,0 +1,392 @@
+########################################################################
+# File name: cache.py
+# This file is part of: aioxmpp
+#
+# LICENSE
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+########################################################################
+"""
+:mod:`~aioxmpp.cache` -- Utilities for implementing caches
+##########################################################
+
+.. versionadded:: 0.9
+
+.. autoclass:: LRUDict
+
+.. autoclass:: ExpiringLRUDict
+
+.. autoclass:: CacheInfo
+
+.. autoclass:: ExpiringCacheInfo
+"""
+import collections
+import time
+
+
+class CacheInfo(collections.namedtuple(
+        "CacheInfo", ["hits", "misses", "maxsize", "currsize"])):
+    """
+    Statistics of a cache, as returned by :meth:`LRUDict.cache_info`. The
+    fields are the same as for the :func:`functools.lru_cache` statistics.
+
+    .. attribute:: hits
+
+       The number of lookups which found an entry.
+
+    .. attribute:: misses
+
+       The number of lookups which did not find an entry.
+
+    .. attribute:: maxsize
+
+       The maximum number of entries in the cache.
+
+    .. attribute:: currsize
+
+       The current number of entries in the cache.
+    """
+
+
+class LRUDict:
+    """
+    Size-restricted dictionary with Least Recently Used expiry policy.
+
+    The :class:`LRUDict` supports a subset of dictionary operations:
+
+    - ``key in dict``
+    - ``dict[key]`` (marks the entry as most recently used)
+    - ``dict[key] = value`` (marks the entry as most recently used)
+    - ``del dict[key]``
+    - ``len(dict)``
+
+    The entries of the dictionary are expired when more than :attr:`maxsize`
+    entries are stored, starting with the least recently used entry.
+
+    .. autoattribute:: maxsize
+
+    .. automethod:: lookup
+
+    .. automethod:: clear
+
+    .. automethod:: cache_info
+    """
+
+    def __init__(self, maxsize=1):
+        super().__init__()
+        self._data = collections.OrderedDict()
+        self._maxsize = 1
+        self.maxsize = maxsize
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def maxsize(self):
+        """
+        Maximum number of entries in the dictionary.
+
+        Setting this to a value lower than the current number of entries
+        expires the least recently used entries immediately. A value of zero
+        disables the dictionary, so that nothing is stored in it.
+        """
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, value):
+        if value < 0:
+            raise ValueError("maxsize must be non-negative")
+        self._maxsize = value
+        self._purge()
+
+    def _purge(self):
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+
+    def lookup(self, key, default=None):
+        """
+        Return the value for `key` or `default` if there is no such entry.
+
+        In contrast to the item access, the result of the lookup is counted in
+        the statistics (see :meth:`cache_info`).
+        """
+        try:
+            value = self._data[key]
+        except KeyError:
+            self._misses += 1
+            return default
+        self._hits += 1
+        self._data.move_to_end(key)
+        return value
+
+    def clear(self):
+        """
+        Remove all entries and reset the statistics.
+        """
+        self._data.clear()
+        self._hits = 0
+        self._misses = 0
+
+    def cache_info(self):
+        """
+        Return the statistics of the dictionary as :class:`CacheInfo`.
+        """
+        return CacheInfo(self._hits, self._misses,
+                         self._maxsize, len(self._data))
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __getitem__(self, key):
+        value = self._data[key]
+        self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if self._maxsize == 0:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        self._purge()
+
+    def __delitem__(self, key):
+        del self._data[key]
+
+
+class ExpiringCacheInfo(collections.namedtuple(
+        "ExpiringCacheInfo",
+        ["hits", "misses", "evictions", "expirations",
+         "maxsize", "currsize"])):
+    """
+    Statistics of a cache, as returned by :meth:`ExpiringLRUDict.cache_info`.
+    In addition to the fields of :class:`CacheInfo`, the following fields are
+    available:
+
+    .. attribute:: evictions
+
+       The number of entries which were removed to make room for other
+       entries.
+
+    .. attribute:: expirations
+
+       The number of entries which were removed because their time to live
+       had passed.
+    """
+
+
+class ExpiringLRUDict:
+    """
+    Size-restricted dictionary with Least Recently Used expiry policy and
+    per-entry time to live.
+
+    :param maxsize: Maximum number of entries.
+    :type maxsize: :class:`int`
+    :param clock: Function returning the current time in seconds.
+
+    The :class:`ExpiringLRUDict` supports the same operations as
+    :class:`LRUDict`. In addition, entries can be given a time to live with
+    :meth:`set` or :meth:`set_ttl`; entries whose time to live has passed
+    behave as if they had been deleted. Entries stored with item assignment
+    do not expire.
+
+    Expired entries are removed lazily, when they are accessed or when they
+    are the least recently used entry and room is needed for another entry.
+    :meth:`purge_expired` removes all expired entries at once.
+
+    .. autoattribute:: maxsize
+
+    .. automethod:: set
+
+    .. automethod:: set_ttl
+
+    .. automethod:: lookup
+
+    .. automethod:: items
+
+    .. automethod:: purge_expired
+
+    .. automethod:: clear
+
+    .. automethod:: cache_info
+    """
+
+    def __init__(self, maxsize=1, *, clock=time.monotonic):
+        super().__init__()
+        # key -> (value, deadline or None)
+        self._data = collections.OrderedDict()
+        self._clock = clock
+        self._maxsize = 1
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self.maxsize = maxsize
+
+    @property
+    def maxsize(self):
+        """
+        Maximum number of entries in the dictionary.
+
+        Setting this to a value lower than the current number of entries
+        evicts the least recently used entries immediately. A value of zero
+        disables the dictionary, so that nothing is stored in it.
+        """
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, value):
+        if value < 0:
+            raise ValueError("maxsize must be non-negative")
+        self._maxsize = value
+        self._purge()
+
+    def _purge(self):
+        if len(self._data) <= self._maxsize:
+            return
+        now = self._clock()
+        while len(self._data) > self._maxsize:
+            _, (_, deadline) = self._data.popitem(last=False)
+            if deadline is not None and deadline <= now:
+                self._expirations += 1
+            else:
+                self._evictions += 1
+
+    def _get(self, key):
+        value, deadline = self._data[key]
+        if deadline is not None and deadline <= self._clock():
+            del self._data[key]
+            self._expirations += 1
+            raise KeyError(key)
+        return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Store `value` for `key` and mark the entry as most recently used.
+
+        :param ttl: Time to live of the entry in seconds or :data:`None` if
+            the entry should not expire.
+        :type ttl: :class:`float` or :data:`None`
+        """
+        if self._maxsize == 0:
+            return
+        deadline = None if ttl is None else self._clock() + ttl
+        self._data[key] = value, deadline
+        self._data.move_to_end(key)
+        self._purge()
+
+    def set_ttl(self, key, ttl):
+        """
+        Change the time to live of the entry for `key`.
+
+        :param ttl: Time to live of the entry in seconds, counted from now, or
+            :data:`None` if the entry should not expire.
+        :type ttl: :class:`float` or :data:`None`
+        :raises KeyError: if there is no entry for `key`
+
+        This does not change the position of the entry in the LRU order.
+        """
+        value = self._get(key)
+        deadline = None if ttl is None else self._clock() + ttl
+        self._data[key] = value, deadline
+
+    def lookup(self, key, default=None):
+        """
+        Return the value for `key` or `default` if there is no such entry or
+        the entry has expired.
+
+        In contrast to the item access, the result of the lookup is counted in
+        the statistics (see :meth:`cache_info`).
+        """
+        try:
+            value = self._get(key)
+        except KeyError:
+            self._misses += 1
+            return default
+        self._hits += 1
+        self._data.move_to_end(key)
+        return value
+
+    def items(self):
+        """
+        Return a list of the `(key, value)` pairs of the entries which have
+        not expired, from least to most recently used.
+
+        This does not change the order of the entries.
+        """
+        now = self._clock()
+        return [
+            (key, value)
+            for key, (value, deadline) in self._data.items()
+            if deadline is None or deadline > now
+        ]
+
+    def purge_expired(self):
+        """
+        Remove all expired entries.
+        """
+        now = self._clock()
+        expired = [
+            key
+            for key, (_, deadline) in self._data.items()
+            if deadline is not None and deadline <= now
+        ]
+        for key in expired:
+            del self._data[key]
+        self._expirations += len(expired)
+
+    def clear(self):
+        """
+        Remove all entries and reset the statistics.
+        """
+        self._data.clear()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def cache_info(self):
+        """
+        Return the statistics of the dictionary as :class:`ExpiringCacheInfo`.
+
+        The current size includes expired entries which have not been removed
+        yet.
+        """
+        return ExpiringCacheInfo(self._hits, self._misses,
+                                 self._evictions, self._expirations,
+                                 self._maxsize, len(self._data))
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        try:
+            self._get(key)
+        except KeyError:
+            return False
+        return True
+
+    def __getitem__(self, key):
+        value = self._get(key)
+        self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __delitem__(self, key):
+        del self._data[key]
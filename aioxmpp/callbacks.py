@@ -89,14 +89,29 @@ Filters
 
 .. autoclass:: Filter
 
+Instrumentation
+===============
+
+.. autofunction:: enable_instrumentation
+
+.. autofunction:: disable_instrumentation
+
+.. autofunction:: get_instrumentation
+
+.. autoclass:: Instrumentation
+
+.. autoclass:: CallStatistics
+
 """
 
 import abc
 import asyncio
+import bisect
 import collections
 import contextlib
 import functools
 import logging
+import time
 import types
 import weakref
 
@@ -183,8 +198,9 @@ class FutureListener:
 
 
 class TagDispatcher:
-    def __init__(self):
+    def __init__(self, *, name=None):
         self._listeners = {}
+        self.name = name
 
     def add_callback(self, tag, fn):
         return self.add_listener(tag, TagListener(fn))
@@ -216,9 +232,24 @@ class TagDispatcher:
         if not cb.is_valid():
             del self._listeners[tag]
             self._listeners[tag]
-        if cb.data(data):
+        if _instrumentation is not None:
+            done = self._unicast_instrumented(_instrumentation, cb, data)
+        else:
+            done = cb.data(data)
+        if done:
             del self._listeners[tag]
 
+    def _unicast_instrumented(self, instrumentation, cb, data):
+        name = self.name or type(self).__qualname__
+        t0 = time.perf_counter()
+        try:
+            return cb.data(data)
+        finally:
+            duration = time.perf_counter() - t0
+            instrumentation.record(name, None, duration)
+            instrumentation.record(name, instrumentation._label(cb),
+                                   duration)
+
     def unicast_error(self, tag, exc):
         cb = self._listeners[tag]
         if not cb.is_valid():
@@ -245,6 +276,7 @@ class AbstractAdHocSignal:
         super().__init__()
         self._connections = collections.OrderedDict()
         self.logger = logger
+        self.name = None
 
     def _connect(self, wrapper):
         token = object()
@@ -284,6 +316,17 @@ class AdHocSignal(AbstractAdHocSignal):
        This attribute must not be :data:`None`, and it is initialised to the
        default logger on creation of the :class:`AdHocSignal`.
 
+    .. attribute:: name
+
+       The name under which the signal is recorded by an
+       :class:`Instrumentation`.
+
+       Signals obtained from a :class:`Signal` descriptor are named after the
+       class and attribute the descriptor is defined at. Otherwise, this is
+       initialised to :data:`None`.
+
+       .. versionadded:: 0.9
+
     The different ways callables can be connected to an ad-hoc signal are shown
     below:
 
@@ -412,6 +455,7 @@ class AdHocSignal(AbstractAdHocSignal):
                 f.set_exception(arg)
             else:
                 f.set_result(arg)
+        future_wrapper.__wrapped__ = f
         return future_wrapper
 
     @classmethod
@@ -432,6 +476,7 @@ class AdHocSignal(AbstractAdHocSignal):
                 )
                 return True
 
+            wrapper.__wrapped__ = f
             return wrapper
 
         return spawn
@@ -516,6 +561,9 @@ class AdHocSignal(AbstractAdHocSignal):
         Instead of calling :meth:`fire` explicitly, the ad-hoc signal object
         itself can be called, too.
         """
+        if _instrumentation is not None:
+            return self._fire_instrumented(_instrumentation, args, kwargs)
+
         for token, wrapper in list(self._connections.items()):
             try:
                 keep = wrapper(args, kwargs)
@@ -525,6 +573,23 @@ class AdHocSignal(AbstractAdHocSignal):
             if not keep:
                 del self._connections[token]
 
+    def _fire_instrumented(self, instrumentation, args, kwargs):
+        name = self.name or type(self).__qualname__
+        clock = time.perf_counter
+        t_start = clock()
+        for token, wrapper in list(self._connections.items()):
+            t0 = clock()
+            try:
+                keep = wrapper(args, kwargs)
+            except Exception:
+                self.logger.exception("listener attached to signal raised")
+                keep = False
+            instrumentation.record(name, instrumentation._label(wrapper),
+                                   clock() - t0)
+            if not keep:
+                del self._connections[token]
+        instrumentation.record(name, None, clock() - t_start)
+
     def future(self):
         """
         Return a :class:`asyncio.Future` which has been :meth:`connect`\ -ed
@@ -597,11 +662,34 @@ class SyncAdHocSignal(AbstractAdHocSignal):
         Instead of calling :meth:`fire` explicitly, the ad-hoc signal object
         itself can be called, too.
         """
+        if _instrumentation is not None:
+            yield from self._fire_instrumented(_instrumentation, args, kwargs)
+            return
+
         for token, coro in list(self._connections.items()):
             keep = yield from coro(*args, **kwargs)
             if not keep:
                 del self._connections[token]
 
+    @asyncio.coroutine
+    def _fire_instrumented(self, instrumentation, args, kwargs):
+        name = self.name or type(self).__qualname__
+        clock = time.perf_counter
+        t_start = clock()
+        try:
+            for token, coro in list(self._connections.items()):
+                t0 = clock()
+                try:
+                    keep = yield from coro(*args, **kwargs)
+                finally:
+                    instrumentation.record(name,
+                                           instrumentation._label(coro),
+                                           clock() - t0)
+                if not keep:
+                    del self._connections[token]
+        finally:
+            instrumentation.record(name, None, clock() - t_start)
+
     __call__ = fire
 
 
@@ -630,18 +718,35 @@ class AbstractSignal(metaclass=abc.ABCMeta):
         super().__init__()
         self.__doc__ = doc
         self._instances = weakref.WeakKeyDictionary()
+        self._name = None
 
     @abc.abstractclassmethod
     def make_adhoc_signal(cls):
         pass
 
+    def __set_name__(self, owner, name):
+        self._name = "{}.{}.{}".format(owner.__module__,
+                                       owner.__qualname__,
+                                       name)
+
+    def _find_name(self, owner):
+        # __set_name__ is only called on Python 3.6+
+        for cls in owner.__mro__:
+            for name, value in vars(cls).items():
+                if value is self:
+                    self.__set_name__(cls, name)
+                    return
+
     def __get__(self, instance, owner):
         if instance is None:
             return self
         try:
             return self._instances[instance]
         except KeyError:
+            if self._name is None:
+                self._find_name(owner)
             new = self.make_adhoc_signal()
+            new.name = self._name
             self._instances[instance] = new
             return new
 
@@ -699,6 +804,316 @@ class SyncSignal(AbstractSignal):
         return SyncAdHocSignal()
 
 
+class CallStatistics:
+    """
+    Number of calls and time spent in a callable.
+
+    :param sample_size: Number of recent call durations to keep for
+                        :meth:`percentile`.
+    :type sample_size: :class:`int`
+
+    .. attribute:: calls
+
+       The number of recorded calls.
+
+    .. attribute:: total_time
+
+       The total time spent in the recorded calls, in seconds.
+
+    .. attribute:: max_time
+
+       The duration of the longest recorded call, in seconds.
+
+    .. automethod:: record
+
+    .. automethod:: percentile
+
+    .. automethod:: snapshot
+
+    .. versionadded:: 0.9
+    """
+
+    __slots__ = ("calls", "total_time", "max_time", "_samples")
+
+    def __init__(self, sample_size=0):
+        super().__init__()
+        self.calls = 0
+        self.total_time = 0.
+        self.max_time = 0.
+        if sample_size > 0:
+            self._samples = collections.deque(maxlen=sample_size)
+        else:
+            self._samples = None
+
+    def record(self, duration):
+        """
+        Record a call which took `duration` seconds.
+        """
+        self.calls += 1
+        self.total_time += duration
+        if duration > self.max_time:
+            self.max_time = duration
+        if self._samples is not None:
+            self._samples.append(duration)
+
+    def percentile(self, p):
+        """
+        Return the `p`-th percentile of the recently recorded call durations.
+
+        :param p: The percentile to return, between 0 and 100.
+        :raises ValueError: if `p` is out of range
+        :return: The duration in seconds or :data:`None` if no samples are
+            available.
+
+        Only the last `sample_size` calls are taken into account (see the
+        constructor). If `sample_size` is zero, :data:`None` is returned.
+        """
+        if not 0 <= p <= 100:
+            raise ValueError("percentile out of range: {!r}".format(p))
+        if not self._samples:
+            return None
+        samples = sorted(self._samples)
+        # nearest-rank method
+        rank = max(0, -(-len(samples) * p // 100) - 1)
+        return samples[int(rank)]
+
+    def snapshot(self, percentiles=(50, 90, 99)):
+        """
+        Return the statistics as :class:`dict`.
+
+        :param percentiles: The percentiles to include.
+        :return: A dictionary with the keys ``"calls"``, ``"total_time"``,
+            ``"max_time"``, ``"mean_time"`` and ``"percentiles"``.
+
+        ``"percentiles"`` maps each of the `percentiles` to the result of
+        :meth:`percentile`.
+        """
+        return {
+            "calls": self.calls,
+            "total_time": self.total_time,
+            "max_time": self.max_time,
+            "mean_time": (self.total_time / self.calls
+                          if self.calls else 0.),
+            "percentiles": {
+                p: self.percentile(p)
+                for p in percentiles
+            },
+        }
+
+    def __repr__(self):
+        return "<{}.{} calls={} total_time={:.6f} max_time={:.6f}>".format(
+            type(self).__module__,
+            type(self).__qualname__,
+            self.calls,
+            self.total_time,
+            self.max_time,
+        )
+
+
+def _unwrap_connection(wrapper):
+    if isinstance(wrapper, functools.partial):
+        func = wrapper.func
+        if (func is AdHocSignal._strong_wrapper or
+                func is AdHocSignal._async_wrapper):
+            return wrapper.args[0]
+        if func is AdHocSignal._weakref_wrapper:
+            return wrapper.args[0]()
+    elif isinstance(wrapper, TagListener):
+        return wrapper._ondata
+    elif isinstance(wrapper, FutureListener):
+        return wrapper.fut
+    return getattr(wrapper, "__wrapped__", wrapper)
+
+
+def _callable_label(f):
+    if isinstance(f, functools.partial):
+        return _callable_label(f.func)
+    if isinstance(f, types.MethodType):
+        f = f.__func__
+    try:
+        qualname = f.__qualname__
+    except AttributeError:
+        # callable object
+        f = type(f)
+        qualname = f.__qualname__
+    module = getattr(f, "__module__", None)
+    if module is None:
+        return qualname
+    return "{}.{}".format(module, qualname)
+
+
+class Instrumentation:
+    """
+    Record the number of calls and the latency of callbacks.
+
+    :param sample_size: Number of recent call durations to keep per callable
+                        and per emitter for percentile calculation.
+    :type sample_size: :class:`int`
+
+    While an :class:`Instrumentation` is installed with
+    :func:`enable_instrumentation`, the following calls are timed:
+
+    * the emission of :class:`AdHocSignal` and :class:`SyncAdHocSignal`
+      instances and the calls to each connected callable,
+    * :meth:`Filter.filter` and the calls to each filter function,
+    * :meth:`TagDispatcher.unicast` and the calls to the listener.
+
+    The statistics are aggregated by the name of the emitter (the signal,
+    filter or dispatcher, see :attr:`AdHocSignal.name`, :attr:`Filter.name`
+    and :attr:`TagDispatcher.name`) and by the name of the emitter and the
+    qualified name of the callable. All instances with the same name share
+    their statistics; emitters without a name are recorded under the name of
+    their class.
+
+    For :class:`SyncAdHocSignal`, the wall clock time spent in the coroutines
+    is recorded, including the time they spent suspended. Callables connected
+    using :attr:`AdHocSignal.ASYNC_WITH_LOOP` or
+    :attr:`AdHocSignal.SPAWN_WITH_LOOP` are only timed while being scheduled.
+
+    .. automethod:: record
+
+    .. automethod:: snapshot
+
+    .. automethod:: reset
+
+    .. versionadded:: 0.9
+    """
+
+    def __init__(self, *, sample_size=1024):
+        super().__init__()
+        self.sample_size = sample_size
+        self._emitters = {}
+        self._callables = {}
+        # labels of the wrappers connected to signals; wrappers are unique
+        # per connection, so this does not keep anything alive
+        self._labels = weakref.WeakKeyDictionary()
+
+    def _label(self, wrapper):
+        try:
+            return self._labels[wrapper]
+        except KeyError:
+            pass
+        except TypeError:
+            # not weak-referenceable
+            return _callable_label(wrapper)
+        f = _unwrap_connection(wrapper)
+        if f is None:
+            # dead weak reference, the connection is about to be removed
+            return "<dead weakref>"
+        label = _callable_label(f)
+        self._labels[wrapper] = label
+        return label
+
+    def _stats(self, d, key):
+        try:
+            return d[key]
+        except KeyError:
+            stats = CallStatistics(self.sample_size)
+            d[key] = stats
+            return stats
+
+    def record(self, emitter, callable_, duration):
+        """
+        Record a call.
+
+        :param emitter: Name of the emitter.
+        :type emitter: :class:`str`
+        :param callable_: Name of the callable or :data:`None` to record the
+            emission as a whole.
+        :type callable_: :class:`str` or :data:`None`
+        :param duration: Duration of the call in seconds.
+        :type duration: :class:`float`
+        """
+        if callable_ is None:
+            self._stats(self._emitters, emitter).record(duration)
+        else:
+            self._stats(self._callables, (emitter, callable_)).record(
+                duration
+            )
+
+    def snapshot(self, percentiles=(50, 90, 99)):
+        """
+        Return a snapshot of the statistics.
+
+        :param percentiles: The percentiles to include.
+        :return: A dictionary with the keys ``"emitters"`` and
+            ``"callables"``.
+
+        ``"emitters"`` maps the names of the emitters to the result of
+        :meth:`CallStatistics.snapshot`. ``"callables"`` maps the names of the
+        emitters to dictionaries which map the names of the callables to the
+        result of :meth:`CallStatistics.snapshot`.
+
+        The returned dictionaries are not modified by further calls.
+        """
+        callables = {}
+        for (emitter, callable_), stats in self._callables.items():
+            callables.setdefault(emitter, {})[callable_] = \
+                stats.snapshot(percentiles)
+
+        return {
+            "emitters": {
+                emitter: stats.snapshot(percentiles)
+                for emitter, stats in self._emitters.items()
+            },
+            "callables": callables,
+        }
+
+    def reset(self):
+        """
+        Discard all statistics.
+        """
+        self._emitters.clear()
+        self._callables.clear()
+
+
+_instrumentation = None
+
+
+def enable_instrumentation(instrumentation=None):
+    """
+    Install an :class:`Instrumentation` for all signals, filters and tag
+    dispatchers.
+
+    :param instrumentation: The instrumentation to install.
+    :type instrumentation: :class:`Instrumentation` or :data:`None`
+    :return: The installed instrumentation.
+    :rtype: :class:`Instrumentation`
+
+    If `instrumentation` is :data:`None`, a new :class:`Instrumentation` is
+    created. Any previously installed instrumentation is replaced.
+
+    .. versionadded:: 0.9
+    """
+    global _instrumentation
+    if instrumentation is None:
+        instrumentation = Instrumentation()
+    _instrumentation = instrumentation
+    return instrumentation
+
+
+def disable_instrumentation():
+    """
+    Uninstall the current :class:`Instrumentation`, if any.
+
+    When no instrumentation is installed, the cost of the instrumentation is
+    a single global variable lookup per emission.
+
+    .. versionadded:: 0.9
+    """
+    global _instrumentation
+    _instrumentation = None
+
+
+def get_instrumentation():
+    """
+    Return the currently installed :class:`Instrumentation` or :data:`None`.
+
+    .. versionadded:: 0.9
+    """
+    return _instrumentation
+
+
 class Filter:
     """
     A filter chain for arbitrary data.
@@ -727,6 +1142,28 @@ class Filter:
     .. automethod:: unregister
 
     .. automethod:: context_register(func[, order])
+
+    .. attribute:: name
+
+       The name under which the filter chain is recorded by an
+       :class:`Instrumentation`. Defaults to the `name` argument of the
+       constructor.
+
+       .. versionadded:: 0.9
+
+    Measuring the time spent in the filter functions:
+
+    .. automethod:: enable_timing
+
+    .. automethod:: disable_timing
+
+    .. autoattribute:: timings
+
+    .. versionchanged:: 0.9
+
+       The chain is kept as a flat tuple of functions which is only rebuilt
+       when functions are registered or unregistered; filtering through an
+       empty chain returns immediately.
     """
 
     class Token:
@@ -736,9 +1173,18 @@ class Filter:
                 type(self).__qualname__,
                 id(self))
 
-    def __init__(self):
+    def __init__(self, *, name=None):
         super().__init__()
+        self.name = name
         self._filter_order = []
+        # sorting keys of _filter_order, for bisection
+        self._filter_keys = []
+        # flat tuple of the functions in _filter_order, used by filter()
+        self._filter_funcs = ()
+        self._timings = None
+
+    def _compile(self):
+        self._filter_funcs = tuple(func for _, _, func in self._filter_order)
 
     def register(self, func, order):
         """
@@ -768,8 +1214,12 @@ class Filter:
         The returned token can be used to :meth:`unregister` a filter.
         """
         token = self.Token()
-        self._filter_order.append((order, token, func))
-        self._filter_order.sort(key=lambda x: x[0])
+        # insert after all entries with the same order to keep them in the
+        # order of addition
+        i = bisect.bisect_right(self._filter_keys, order)
+        self._filter_keys.insert(i, order)
+        self._filter_order.insert(i, (order, token, func))
+        self._compile()
         return token
 
     def filter(self, obj, *args, **kwargs):
@@ -787,12 +1237,52 @@ class Filter:
         Returns the object returned by the last function in the filter chain or
         :data:`None` if any function returned :data:`None`.
         """
-        for _, _, func in self._filter_order:
+        funcs = self._filter_funcs
+        if not funcs:
+            return obj
+
+        if self._timings is not None or _instrumentation is not None:
+            return self._filter_timed(funcs, obj, args, kwargs)
+
+        for func in funcs:
             obj = func(obj, *args, **kwargs)
             if obj is None:
                 return None
         return obj
 
+    def _filter_timed(self, funcs, obj, args, kwargs):
+        timings = self._timings
+        instrumentation = _instrumentation
+        name = self.name or type(self).__qualname__
+        clock = time.perf_counter
+        t_start = clock()
+        try:
+            for func in funcs:
+                t0 = clock()
+                try:
+                    obj = func(obj, *args, **kwargs)
+                finally:
+                    duration = clock() - t0
+                    if timings is not None:
+                        try:
+                            stats = timings[func]
+                        except KeyError:
+                            stats = CallStatistics()
+                            timings[func] = stats
+                        stats.record(duration)
+                    if instrumentation is not None:
+                        instrumentation.record(
+                            name,
+                            instrumentation._label(func),
+                            duration,
+                        )
+                if obj is None:
+                    return None
+            return obj
+        finally:
+            if instrumentation is not None:
+                instrumentation.record(name, None, clock() - t_start)
+
     def unregister(self, token_to_remove):
         """
         Unregister a filter function.
@@ -809,6 +1299,45 @@ class Filter:
             raise ValueError("unregistered token: {!r}".format(
                 token_to_remove))
         del self._filter_order[i]
+        del self._filter_keys[i]
+        self._compile()
+
+    def enable_timing(self):
+        """
+        Start recording the number of calls and the time spent in each of the
+        filter functions.
+
+        The statistics are available in :attr:`timings`. If timing is already
+        enabled, this has no effect.
+
+        .. versionadded:: 0.9
+        """
+        if self._timings is None:
+            self._timings = {}
+
+    def disable_timing(self):
+        """
+        Stop recording the time spent in the filter functions and discard the
+        statistics.
+
+        .. versionadded:: 0.9
+        """
+        self._timings = None
+
+    @property
+    def timings(self):
+        """
+        A dictionary mapping the filter functions to their
+        :class:`CallStatistics` or :data:`None` if timing is not enabled
+        (see :meth:`enable_timing`).
+
+        Functions are added to the dictionary when they are first called
+        after timing has been enabled; unregistering a function does not
+        remove its statistics.
+
+        .. versionadded:: 0.9
+        """
+        return self._timings
 
     @contextlib.contextmanager
     def context_register(self, func, *args):
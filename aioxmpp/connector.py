@@ -45,6 +45,16 @@ Specific connectors
 
 .. autoclass:: XMPPOverTLSConnector
 
+With the default :attr:`~.security_layer.TLSBackend.PYOPENSSL` backend, both
+connectors use the TLS transport bundled with aioxmpp
+(:class:`aioxmpp._ssl_transport.STARTTLSTransport`), even if :mod:`aioopenssl`
+is installed: unlike the transport of :mod:`aioopenssl`, it supports write
+flow control (which :meth:`aioxmpp.stream.StanzaStream.drain` relies on) and
+TLS session resumption.
+
+.. versionchanged:: 0.9
+
+   The connectors always use the bundled TLS transport.
 """
 
 import abc
@@ -53,11 +63,23 @@ import asyncio
 import aioxmpp.errors as errors
 import aioxmpp.nonza as nonza
 import aioxmpp.protocol as protocol
-import aioxmpp.ssl_transport as ssl_transport
+import aioxmpp.security_layer as security_layer
+import aioxmpp._ssl_transport as ssl_transport
+import aioxmpp._stdlib_ssl_transport as stdlib_ssl_transport
 
 from aioxmpp.utils import namespaces
 
 
+def _uses_stdlib_tls(metadata):
+    return metadata.tls_backend == security_layer.TLSBackend.STDLIB
+
+
+def _session_cache(metadata):
+    if _uses_stdlib_tls(metadata):
+        return None
+    return metadata.tls_session_cache
+
+
 class BaseConnector(metaclass=abc.ABCMeta):
     """
     This is the base class for connectors. It defines the public interface of
@@ -154,8 +176,32 @@ class STARTTLSConnector(BaseConnector):
         :attr:`~.security_layer.SecurityLayer.ssl_context_factory` and
         :attr:`~.security_layer.SecurityLayer.certificate_verifier_factory` are
         used to configure the TLS connection.
+
+        STARTTLS is not supported with the
+        :attr:`~.security_layer.TLSBackend.STDLIB` backend:
+        :class:`~.errors.TLSUnavailable` is raised without connecting if
+        :attr:`~.security_layer.SecurityLayer.tls_backend` selects it.
+
+        If :attr:`~.security_layer.SecurityLayer.tls_session_cache` is set,
+        the session cached for `host`, `port`, `domain` and the
+        :meth:`~.security_layer.CertificateVerifier.session_resumption_policy`
+        of the certificate verifier is offered in the TLS handshake and the
+        new session is stored in the cache once the stream features have been
+        received.
+
+        .. versionchanged:: 0.9
+
+           Support for
+           :attr:`~.security_layer.SecurityLayer.tls_session_cache`.
         """
 
+        if _uses_stdlib_tls(metadata):
+            raise errors.TLSUnavailable(
+                "STARTTLS is not supported with the stdlib TLS backend"
+            )
+
+        session_cache = _session_cache(metadata)
+
         features_future = asyncio.Future(loop=loop)
 
         stream = protocol.XMLStream(
@@ -235,16 +281,35 @@ class STARTTLSConnector(BaseConnector):
         ssl_context = metadata.ssl_context_factory()
         verifier.setup_context(ssl_context, transport)
 
-        yield from stream.starttls(
-            ssl_context=ssl_context,
-            post_handshake_callback=verifier.post_handshake,
-        )
+        starttls_kwargs = {}
+        if not verifier.supports_session_resumption:
+            session_cache = None
+        elif session_cache is not None:
+            session_key = (host, port, domain,
+                           verifier.session_resumption_policy(metadata))
+            session = session_cache.lookup(*session_key)
+            if session is not None:
+                starttls_kwargs["session"] = session
+
+        try:
+            yield from stream.starttls(
+                ssl_context=ssl_context,
+                post_handshake_callback=verifier.post_handshake,
+                **starttls_kwargs
+            )
+        except:
+            if session_cache is not None:
+                session_cache.discard(*session_key)
+            raise
 
         features_future = yield from protocol.reset_stream_and_get_features(
             stream,
             timeout=negotiation_timeout,
         )
 
+        if session_cache is not None:
+            session_cache.record_handshake(*session_key, transport)
+
         return transport, stream, features_future
 
 
@@ -283,8 +348,19 @@ class XMPPOverTLSConnector(BaseConnector):
         :attr:`~.security_layer.SecurityLayer.ssl_context_factory` and
         :attr:`~.security_layer.SecurityLayer.certificate_verifier_factory` are
         used to configure the TLS connection.
-        """
 
+        If :attr:`~.security_layer.SecurityLayer.tls_backend` is
+        :attr:`~.security_layer.TLSBackend.STDLIB`, the :mod:`asyncio` TLS
+        implementation is used.
+
+        :attr:`~.security_layer.SecurityLayer.tls_session_cache` is used as
+        described for :meth:`STARTTLSConnector.connect`.
+
+        .. versionchanged:: 0.9
+
+           Support for :attr:`~.security_layer.TLSBackend.STDLIB` and
+           :attr:`~.security_layer.SecurityLayer.tls_session_cache`.
+        """
 
         features_future = asyncio.Future(loop=loop)
 
@@ -307,20 +383,52 @@ class XMPPOverTLSConnector(BaseConnector):
             verifier.setup_context(ssl_context, transport)
             return ssl_context
 
+        session_cache = _session_cache(metadata)
+        transport_kwargs = {}
+        if not verifier.supports_session_resumption:
+            session_cache = None
+        elif session_cache is not None:
+            session_key = (host, port, domain,
+                           verifier.session_resumption_policy(metadata))
+            transport_kwargs["session"] = session_cache.lookup(*session_key)
+
         try:
-            transport, _ = yield from ssl_transport.create_starttls_connection(
-                loop,
-                lambda: stream,
-                host=host,
-                port=port,
-                peer_hostname=host,
-                server_hostname=domain,
-                post_handshake_callback=verifier.post_handshake,
-                ssl_context_factory=context_factory,
-                use_starttls=False,
-            )
+            if _uses_stdlib_tls(metadata):
+                ssl_context = metadata.ssl_context_factory()
+                verifier.setup_stdlib_context(ssl_context)
+                transport, _ = yield from \
+                    stdlib_ssl_transport.create_tls_connection(
+                        loop,
+                        lambda: stream,
+                        host=host,
+                        port=port,
+                        server_hostname=domain,
+                        ssl_context=ssl_context,
+                        post_handshake_callback=verifier.post_handshake,
+                    )
+            else:
+                transport, _ = yield from \
+                    ssl_transport.create_starttls_connection(
+                        loop,
+                        lambda: stream,
+                        host=host,
+                        port=port,
+                        peer_hostname=host,
+                        server_hostname=domain,
+                        post_handshake_callback=verifier.post_handshake,
+                        ssl_context_factory=context_factory,
+                        use_starttls=False,
+                        **transport_kwargs
+                    )
         except:
+            if session_cache is not None:
+                session_cache.discard(*session_key)
             stream.abort()
             raise
 
-        return transport, stream, (yield from features_future)
+        features = yield from features_future
+
+        if session_cache is not None:
+            session_cache.record_handshake(*session_key, transport)
+
+        return transport, stream, features
@@ -24,12 +24,30 @@ import collections
 
 
 class AsyncDeque:
-    def __init__(self, *, loop=None):
+    """
+    A double-ended queue with support for waiting for items.
+
+    :param wakeup: An event which is set whenever an item is put into the
+        queue.
+    :type wakeup: :class:`asyncio.Event`
+
+    `wakeup` allows a single consumer to wait for items on several queues
+    without having to wait on each of them separately. The consumer clears
+    the event, checks the queues and waits for the event if they are all
+    empty.
+
+    .. versionchanged:: 0.9
+
+       The `wakeup` argument was added.
+    """
+
+    def __init__(self, *, loop=None, wakeup=None):
         super().__init__()
         self._loop = loop
         self._data = collections.deque()
         self._non_empty = asyncio.Event(loop=self._loop)
         self._non_empty.clear()
+        self._wakeup = wakeup
 
     def __len__(self):
         return len(self._data)
@@ -43,10 +61,14 @@ class AsyncDeque:
     def put_nowait(self, obj):
         self._data.append(obj)
         self._non_empty.set()
+        if self._wakeup is not None:
+            self._wakeup.set()
 
     def putleft_nowait(self, obj):
         self._data.appendleft(obj)
         self._non_empty.set()
+        if self._wakeup is not None:
+            self._wakeup.set()
 
     def get_nowait(self):
         try:
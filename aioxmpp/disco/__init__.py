@@ -78,6 +78,11 @@ Entity information
 
 .. autoclass:: register_feature
 
+Caching
+-------
+
+.. autoclass:: SharedCache
+
 .. module:: aioxmpp.disco.xso
 
 .. currentmodule:: aioxmpp.disco.xso
@@ -114,4 +119,4 @@ Item queries
 
 from . import xso  # NOQA
 from .service import (DiscoClient, DiscoServer, Node, StaticNode,  # NOQA
-                      mount_as_node, register_feature)
+                      mount_as_node, register_feature, SharedCache)
@@ -24,6 +24,7 @@ import contextlib
 import functools
 import itertools
 
+import aioxmpp.cache
 import aioxmpp.callbacks
 import aioxmpp.errors as errors
 import aioxmpp.service as service
@@ -413,6 +414,159 @@ class DiscoServer(service.Service, Node):
         del self._node_mounts[mountpoint]
 
 
+def _is_server_jid(jid, node):
+    return jid.localpart is None and jid.resource is None
+
+
+class _SharedCacheView:
+    """
+    View on one of the stores of a :class:`SharedCache` for a single account,
+    implementing the interface of :class:`aioxmpp.cache.ExpiringLRUDict`.
+    """
+
+    def __init__(self, store, account, is_shared):
+        super().__init__()
+        self._store = store
+        self._account = account
+        self._own_server = account.replace(localpart=None, resource=None)
+        self._is_shared = is_shared
+
+    def _key(self, key):
+        jid, node = key
+        # the own server answers differently to its users (e.g. admins)
+        if jid != self._own_server and self._is_shared(jid, node):
+            return None, jid, node
+        return self._account, jid, node
+
+    @property
+    def maxsize(self):
+        return self._store.maxsize
+
+    @maxsize.setter
+    def maxsize(self, value):
+        self._store.maxsize = value
+
+    def set(self, key, value, ttl=None):
+        self._store.set(self._key(key), value, ttl)
+
+    def set_ttl(self, key, ttl):
+        self._store.set_ttl(self._key(key), ttl)
+
+    def lookup(self, key, default=None):
+        return self._store.lookup(self._key(key), default)
+
+    def items(self):
+        # only the entries private to the account; shared entries are not
+        # owned by any single account
+        return [
+            ((jid, node), value)
+            for (account, jid, node), value in self._store.items()
+            if account is not None and account == self._account
+        ]
+
+    def purge_expired(self):
+        self._store.purge_expired()
+
+    def clear(self):
+        for key, _ in self.items():
+            del self[key]
+
+    def cache_info(self):
+        return self._store.cache_info()
+
+    def __len__(self):
+        return len(self.items())
+
+    def __contains__(self, key):
+        return self._key(key) in self._store
+
+    def __getitem__(self, key):
+        return self._store[self._key(key)]
+
+    def __setitem__(self, key, value):
+        self._store[self._key(key)] = value
+
+    def __delitem__(self, key):
+        del self._store[self._key(key)]
+
+
+class SharedCache:
+    """
+    Cache for the results of :class:`DiscoClient` instances which can be shared
+    among multiple clients in the same process.
+
+    :param maxsize: The maximum number of entries in each of the info and
+        items stores.
+    :type maxsize: :class:`int`
+    :param is_shared: Function deciding whether results may be shared among
+        accounts.
+
+    Use :meth:`DiscoClient.use_shared_cache` to make a :class:`DiscoClient`
+    use the cache.
+
+    The information an entity returns may depend on who is asking. Thus, the
+    results are keyed by the bare JID of the account which sent the query, in
+    addition to the target JID and node, unless `is_shared` returns true for
+    the target JID and node. `is_shared` is called with the JID and the node
+    (which may be :data:`None`). The default is to share results for JIDs
+    without localpart and resource, that is, servers and components. Results
+    for the server of the account itself are never shared, as servers answer
+    queries from their own users (and in particular from their
+    administrators) differently.
+
+    Queries for shared results are aliased across all clients using the
+    cache: if a query is already in progress, other clients wait for its
+    result instead of sending their own query. If the client which sent the
+    query disconnects, its query is cancelled and waiting clients send their
+    own query.
+
+    The time to live of entries is controlled by the :class:`DiscoClient`
+    which stores them.
+
+    .. attribute:: info_store
+                   items_store
+
+       The :class:`aioxmpp.cache.ExpiringLRUDict` instances holding the
+       results of info and items queries, respectively. The keys are
+       ``(account, jid, node)`` tuples, where `account` is :data:`None` for
+       shared results.
+
+    .. automethod:: info_view
+
+    .. automethod:: items_view
+
+    .. versionadded:: 0.9
+    """
+
+    def __init__(self, maxsize=65536, *, is_shared=_is_server_jid):
+        super().__init__()
+        self.info_store = aioxmpp.cache.ExpiringLRUDict(maxsize)
+        self.items_store = aioxmpp.cache.ExpiringLRUDict(maxsize)
+        self._is_shared = is_shared
+
+    def info_view(self, account):
+        """
+        Return a view on the info store for the given `account`.
+
+        :param account: The bare JID of the account.
+        :type account: :class:`aioxmpp.JID`
+
+        The view implements the interface of
+        :class:`aioxmpp.cache.ExpiringLRUDict` with ``(jid, node)`` keys, as
+        required by :attr:`DiscoClient.info_cache`. Iterating and clearing the
+        view only covers the entries private to the `account`.
+        """
+        return _SharedCacheView(self.info_store, account, self._is_shared)
+
+    def items_view(self, account):
+        """
+        Return a view on the items store for the given `account`.
+
+        See :meth:`info_view` for details.
+        """
+        return _SharedCacheView(self.items_store, account, self._is_shared)
+
+
 class DiscoClient(service.Service):
     """
     Provide cache-backed Service Discovery (:xep:`30`) queries.
@@ -441,6 +595,36 @@ class DiscoClient(service.Service):
 
     .. automethod:: set_info_future
 
+    The size and lifetime of the cache entries can be configured:
+
+    .. autoattribute:: cache_size
+
+    .. autoattribute:: cache_ttl
+
+    .. autoattribute:: error_cache_ttl
+
+    .. attribute:: info_cache
+                   items_cache
+
+       The caches used by :meth:`query_info` and :meth:`query_items`,
+       initially :class:`aioxmpp.cache.ExpiringLRUDict` instances.
+
+       The caches map ``(jid, node)`` tuples to :class:`asyncio.Future`
+       instances. Pending requests are stored without time to live and have
+       their time to live set when they complete. Use
+       :meth:`~aioxmpp.cache.ExpiringLRUDict.cache_info` to obtain the hit,
+       miss and eviction counters.
+
+       The caches can be replaced with any object implementing the
+       :class:`~aioxmpp.cache.ExpiringLRUDict` interface. Replacing a cache
+       does not carry over its entries.
+
+       .. versionadded:: 0.9
+
+    To share the cache with other clients in the same process:
+
+    .. automethod:: use_shared_cache
+
     Usage example, assuming that you have a :class:`.node.Client` `client`::
 
       import aioxmpp.disco as disco
@@ -464,23 +648,141 @@ class DiscoClient(service.Service):
     def __init__(self, client, **kwargs):
         super().__init__(client, **kwargs)
 
-        self._info_pending = {}
-        self._items_pending = {}
+        self._cache_size = 4096
+        self._cache_ttl = None
+        self._error_cache_ttl = None
+
+        self.info_cache = aioxmpp.cache.ExpiringLRUDict(self._cache_size)
+        self.items_cache = aioxmpp.cache.ExpiringLRUDict(self._cache_size)
+        # requests sent by this client, cancelled when the stream is
+        # destroyed even if they are in a shared cache
+        self._requests = set()
 
         self.client.on_stream_destroyed.connect(
             self._clear_cache
         )
 
+    @property
+    def cache_size(self):
+        """
+        The maximum number of entries in each of :attr:`info_cache` and
+        :attr:`items_cache`.
+
+        When the limit is exceeded, the least recently used entries are
+        evicted. Pending requests which are evicted are not cancelled, but
+        new queries for the same target are not aliased to them anymore.
+
+        .. versionadded:: 0.9
+        """
+        return self._cache_size
+
+    @cache_size.setter
+    def cache_size(self, value):
+        self.info_cache.maxsize = value
+        self.items_cache.maxsize = value
+        self._cache_size = value
+
+    @property
+    def cache_ttl(self):
+        """
+        The time for which successful results are cached, as
+        :class:`datetime.timedelta`, or :data:`None` if they are cached until
+        the stream is destroyed or they are evicted (the default).
+
+        Changing the value only affects requests which complete afterwards.
+
+        .. versionadded:: 0.9
+        """
+        return self._cache_ttl
+
+    @cache_ttl.setter
+    def cache_ttl(self, value):
+        self._cache_ttl = value
+
+    @property
+    def error_cache_ttl(self):
+        """
+        The time for which :class:`aioxmpp.errors.XMPPError` responses are
+        cached, as :class:`datetime.timedelta`, or :data:`None` if they are
+        not cached (the default).
+
+        Other exceptions, such as timeouts or connection errors, are never
+        cached.
+
+        Changing the value only affects requests which complete afterwards.
+
+        .. versionadded:: 0.9
+        """
+        return self._error_cache_ttl
+
+    @error_cache_ttl.setter
+    def error_cache_ttl(self, value):
+        self._error_cache_ttl = value
+
+    def use_shared_cache(self, shared_cache):
+        """
+        Use a :class:`SharedCache` for :attr:`info_cache` and
+        :attr:`items_cache`.
+
+        :param shared_cache: The cache to use.
+        :type shared_cache: :class:`SharedCache`
+
+        The results are keyed by the bare :attr:`~.Client.local_jid` of the
+        client, unless they are shared (see :class:`SharedCache`). Setting
+        :attr:`cache_size` changes the size of the shared cache.
+
+        .. versionadded:: 0.9
+        """
+        account = self.client.local_jid.bare()
+        self.info_cache = shared_cache.info_view(account)
+        self.items_cache = shared_cache.items_view(account)
+
     def _clear_cache(self):
-        for fut in self._info_pending.values():
-            if not fut.done():
-                fut.cancel()
-        self._info_pending.clear()
+        for request in list(self._requests):
+            request.cancel()
+
+        # delete the entries one by one to keep the statistics
+        for cache in (self.info_cache, self.items_cache):
+            for key, fut in cache.items():
+                if not fut.done():
+                    fut.cancel()
+                del cache[key]
+
+    @staticmethod
+    def _seconds(ttl):
+        if ttl is None:
+            return None
+        return ttl.total_seconds()
+
+    def _handle_request_done(self, cache, key, request):
+        self._requests.discard(request)
+        try:
+            pending = cache[key]
+        except KeyError:
+            return
+        if pending is not request:
+            return
+
+        if request.cancelled():
+            del cache[key]
+            return
 
-        for fut in self._items_pending.values():
-            if not fut.done():
-                fut.cancel()
-        self._items_pending.clear()
+        exc = request.exception()
+        if exc is None:
+            cache.set_ttl(key, self._seconds(self._cache_ttl))
+        elif (isinstance(exc, errors.XMPPError) and
+                self._error_cache_ttl is not None):
+            cache.set_ttl(key, self._seconds(self._error_cache_ttl))
+        else:
+            del cache[key]
+
+    def _handle_future_set(self, key, fut):
+        try:
+            pending = self.info_cache[key]
+        except KeyError:
+            return
+        if pending is fut:
+            self.info_cache.set_ttl(key, self._seconds(self._cache_ttl))
 
     def _handle_info_received(self, jid, node, task):
         try:
@@ -510,7 +812,9 @@ class DiscoClient(service.Service):
 
         The requests are cached. This means that only one request is ever fired
         for a given target (identified by the `jid` and the `node`). The
-        request is re-used for all subsequent requests to that identity.
+        request is re-used for all subsequent requests to that identity, until
+        it expires or is evicted from the cache (see :attr:`cache_ttl` and
+        :attr:`cache_size`).
 
         If `require_fresh` is set to true, the above does not hold and a fresh
         request is always created. The new request is the request which will be
@@ -534,19 +838,27 @@ class DiscoClient(service.Service):
         target re-raise that exception. The result is not cached though. If a
         new query is sent at a later point for the same target, a new query is
         actually sent, independent of the value chosen for `require_fresh`.
+        Error responses from the peer are cached if :attr:`error_cache_ttl` is
+        set.
+
+        .. versionchanged:: 0.9
+
+           Cache entries expire and are evicted according to
+           :attr:`cache_ttl` and :attr:`cache_size`. Error responses can be
+           cached with :attr:`error_cache_ttl`.
         """
         key = jid, node
 
         if not require_fresh:
-            try:
-                request = self._info_pending[key]
-            except KeyError:
-                pass
-            else:
+            request = self.info_cache.lookup(key)
+            if request is not None:
+                # the request may belong to another account (see
+                # use_shared_cache), our cancellation must not propagate
                 try:
-                    return (yield from request)
+                    return (yield from asyncio.shield(request))
                 except asyncio.CancelledError:
-                    pass
+                    if not request.cancelled():
+                        raise
 
         request = asyncio.async(
             self.send_and_decode_info_query(jid, node)
@@ -558,8 +870,16 @@ class DiscoClient(service.Service):
                 node
             )
         )
+        request.add_done_callback(
+            functools.partial(
+                self._handle_request_done,
+                self.info_cache,
+                key,
+            )
+        )
 
-        self._info_pending[key] = request
+        self.info_cache[key] = request
+        self._requests.add(request)
         try:
             if timeout is not None:
                 try:
@@ -572,13 +892,7 @@ class DiscoClient(service.Service):
                 result = yield from request
         except:
             if request.done():
-                try:
-                    pending = self._info_pending[key]
-                except KeyError:
-                    pass
-                else:
-                    if pending is request:
-                        del self._info_pending[key]
+                self._handle_request_done(self.info_cache, key, request)
             raise
 
         return result
@@ -596,15 +910,13 @@ class DiscoClient(service.Service):
         key = jid, node
 
         if not require_fresh:
-            try:
-                request = self._items_pending[key]
-            except KeyError:
-                pass
-            else:
+            request = self.items_cache.lookup(key)
+            if request is not None:
                 try:
-                    return (yield from request)
+                    return (yield from asyncio.shield(request))
                 except asyncio.CancelledError:
-                    pass
+                    if not request.cancelled():
+                        raise
 
         request_iq = stanza.IQ(to=jid, type_=structs.IQType.GET)
         request_iq.payload = disco_xso.ItemsQuery(node=node)
@@ -612,8 +924,16 @@ class DiscoClient(service.Service):
         request = asyncio.async(
             self.client.stream.send(request_iq)
         )
+        request.add_done_callback(
+            functools.partial(
+                self._handle_request_done,
+                self.items_cache,
+                key,
+            )
+        )
 
-        self._items_pending[key] = request
+        self.items_cache[key] = request
+        self._requests.add(request)
         try:
             if timeout is not None:
                 try:
@@ -626,13 +946,7 @@ class DiscoClient(service.Service):
                 result = yield from request
         except:
             if request.done():
-                try:
-                    pending = self._items_pending[key]
-                except KeyError:
-                    pass
-                else:
-                    if pending is request:
-                        del self._items_pending[key]
+                self._handle_request_done(self.items_cache, key, request)
             raise
 
         return result
@@ -671,11 +985,19 @@ class DiscoClient(service.Service):
 
            If a future is set to exception state, it will still remain and make
            all queries for that target fail with that exception, until a query
-           uses `require_fresh`.
+           uses `require_fresh` or the entry expires.
 
         .. versionadded:: 0.5
+
+        .. versionchanged:: 0.9
+
+           The entry expires :attr:`cache_ttl` after the future is done.
         """
-        self._info_pending[jid, node] = fut
+        key = jid, node
+        self.info_cache[key] = fut
+        fut.add_done_callback(
+            functools.partial(self._handle_future_set, key)
+        )
 
 
 class mount_as_node(service.Descriptor):
@@ -90,6 +90,12 @@ class SimpleStanzaDispatcher(metaclass=abc.ABCMeta):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self._map = {}
+        # dispatch indexes, derived from _map: from_ -> type_ -> cb for
+        # exact JID matches, bare from_ -> type_ -> cb for wildcarded
+        # resources and type_ -> cb for the callbacks without from_
+        self._by_jid = {}
+        self._by_bare_jid = {}
+        self._by_type = {}
 
     @abc.abstractproperty
     def local_jid(self):
@@ -116,24 +122,54 @@ class SimpleStanzaDispatcher(metaclass=abc.ABCMeta):
         from_ = stanza.from_
         if from_ is None:
             from_ = self.local_jid
-
-        keys = [
-            (stanza.type_, from_, False),
-            (stanza.type_, from_.bare(), True),
-            (None, from_, False),
-            (None, from_.bare(), True),
-            (stanza.type_, None, False),
-            (None, from_, False),
-            (None, None, False),
-        ]
-
-        for key in keys:
-            try:
-                cb = self._map[key]
-            except KeyError:
-                continue
-            cb(stanza)
+        type_ = stanza.type_
+
+        # the lookup order is the one documented in register_callback
+        cb = None
+        by_jid = self._by_jid.get(from_)
+        if self._by_bare_jid:
+            by_bare_jid = self._by_bare_jid.get(from_.bare())
+        else:
+            by_bare_jid = None
+
+        if by_jid is not None:
+            cb = by_jid.get(type_)
+        if cb is None and by_bare_jid is not None:
+            cb = by_bare_jid.get(type_)
+        if cb is None and by_jid is not None:
+            cb = by_jid.get(None)
+        if cb is None and by_bare_jid is not None:
+            cb = by_bare_jid.get(None)
+        if cb is None:
+            cb = self._by_type.get(type_)
+            if cb is None:
+                cb = self._by_type.get(None)
+                if cb is None:
+                    return
+
+        cb(stanza)
+
+    def _index_for(self, from_, wildcard_resource):
+        if from_ is None:
+            return self._by_type
+        if wildcard_resource:
+            index = self._by_bare_jid
+        else:
+            index = self._by_jid
+        return index.setdefault(from_, {})
+
+    def _unindex(self, type_, from_, wildcard_resource):
+        if from_ is None:
+            del self._by_type[type_]
             return
+        if wildcard_resource:
+            index = self._by_bare_jid
+        else:
+            index = self._by_jid
+        by_type = index[from_]
+        del by_type[type_]
+        if not by_type:
+            del index[from_]
 
     def register_callback(self, type_, from_, cb, *,
                           wildcard_resource=True):
@@ -208,7 +244,8 @@ class SimpleStanzaDispatcher(metaclass=abc.ABCMeta):
                 "only one listener allowed per matcher"
             )
 
-        self._map[type_, from_, wildcard_resource] = cb
+        self._map[key] = cb
+        self._index_for(from_, wildcard_resource)[type_] = cb
 
     def unregister_callback(self, type_, from_, *,
                             wildcard_resource=True):
@@ -231,6 +268,7 @@ class SimpleStanzaDispatcher(metaclass=abc.ABCMeta):
             wildcard_resource = False
 
         self._map.pop((type_, from_, wildcard_resource))
+        self._unindex(type_, from_, wildcard_resource)
 
     @contextlib.contextmanager
     def handler_context(self, type_, from_, cb, *, wildcard_resource=True):
@@ -48,6 +48,8 @@ Service
 
 .. autoclass:: Cache
 
+.. autoclass:: SQLiteDatabase
+
 .. currentmodule:: aioxmpp.entitycaps.xso
 
 :mod:`.entitycaps.xso` --- Presence payload
@@ -68,5 +70,6 @@ not loaded, the :class:`Caps` instance is available at
 """
 
 from .service import EntityCapsService, Cache  # NOQA
+from .database import SQLiteDatabase  # NOQA
 from . import xso  # NOQA
 Service = EntityCapsService
@@ -0,0 +1,198 @@
+########################################################################
+# File name: database.py
+# This file is part of: aioxmpp
+#
+# LICENSE
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+########################################################################
+import io
+import logging
+import pathlib
+import sqlite3
+import threading
+import urllib.parse
+
+import aioxmpp.disco as disco
+import aioxmpp.xml
+import aioxmpp.xso
+
+
+logger = logging.getLogger("aioxmpp.entitycaps")
+
+
+def serialise_events(captured_events):
+    """
+    Serialise the `captured_events` of an XSO into a standalone XML document
+    and return it as :class:`bytes`.
+    """
+    buf = io.BytesIO()
+    generator = aioxmpp.xml.XMPPXMLGenerator(
+        buf,
+        short_empty_elements=True)
+    generator.startDocument()
+    aioxmpp.xso.events_to_sax(captured_events, generator)
+    generator.endDocument()
+    return buf.getvalue()
+
+
+class SQLiteDatabase:
+    """
+    Entity capabilities database stored in a single SQLite file.
+
+    :param path: Path to the database file.
+    :type path: :class:`pathlib.Path` or :class:`str`
+    :param read_only: Open the database in read-only mode.
+    :type read_only: :class:`bool`
+
+    In contrast to the directory format used by
+    :meth:`Cache.set_user_db_path`, which stores one file per hash, all
+    entries are kept in a single table indexed by the hash function and the
+    node, so that a lookup is a single index search, independent of the
+    number of stored entries.
+
+    The database file is created if it does not exist, unless `read_only` is
+    true. The database can be used from multiple threads; the accesses are
+    serialised.
+
+    Use :meth:`Cache.set_system_db` or :meth:`Cache.set_user_db` to use the
+    database in a :class:`Cache`.
+
+    .. automethod:: lookup
+
+    .. automethod:: store
+
+    .. automethod:: import_directory
+
+    .. automethod:: close
+
+    .. versionadded:: 0.9
+    """
+
+    def __init__(self, path, *, read_only=False):
+        super().__init__()
+        path = str(path)
+        if read_only:
+            self._conn = sqlite3.connect(
+                "{}?mode=ro".format(pathlib.Path(path).absolute().as_uri()),
+                uri=True,
+                check_same_thread=False,
+            )
+        else:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            with self._conn:
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS entitycaps ("
+                    " hash TEXT NOT NULL,"
+                    " node TEXT NOT NULL,"
+                    " data BLOB NOT NULL,"
+                    " PRIMARY KEY (hash, node)"
+                    ") WITHOUT ROWID"
+                )
+        self._lock = threading.Lock()
+
+    def close(self):
+        """
+        Close the database.
+        """
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self):
+        with self._lock:
+            count, = self._conn.execute(
+                "SELECT COUNT(*) FROM entitycaps"
+            ).fetchone()
+        return count
+
+    def lookup(self, hash_, node):
+        """
+        Return the :class:`~.disco.xso.InfoQuery` stored for the hash
+        function `hash_` and the `node` URL.
+
+        :raises KeyError: if there is no such entry
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM entitycaps WHERE hash = ? AND node = ?",
+                (hash_, node),
+            ).fetchone()
+        if row is None:
+            raise KeyError(node)
+        return aioxmpp.xml.read_single_xso(io.BytesIO(row[0]),
+                                           disco.xso.InfoQuery)
+
+    def store(self, hash_, node, captured_events):
+        """
+        Store an entry for the hash function `hash_` and the `node` URL,
+        replacing any existing entry.
+
+        :param captured_events: The captured events of the
+            :class:`~.disco.xso.InfoQuery`.
+
+        This method blocks and should be called from an executor when used
+        from within the event loop.
+        """
+        data = serialise_events(captured_events)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entitycaps (hash, node, data) "
+                "VALUES (?, ?, ?)",
+                (hash_, node, data),
+            )
+
+    def import_directory(self, path):
+        """
+        Import all entries from a directory in the format used by
+        :meth:`Cache.set_user_db_path`.
+
+        :param path: The directory to import.
+        :type path: :class:`pathlib.Path`
+        :return: The number of imported entries.
+        :rtype: :class:`int`
+
+        Existing entries for the same hash and node are replaced. Files whose
+        names do not match the format are skipped. The entries are imported in
+        a single transaction.
+
+        This method blocks and should be called from an executor when used
+        from within the event loop.
+        """
+        count = 0
+
+        def rows():
+            nonlocal count
+            for entry in pathlib.Path(str(path)).iterdir():
+                if entry.suffix != ".xml":
+                    continue
+                hash_, sep, quoted = entry.stem.partition("_")
+                if not sep or not hash_ or not quoted:
+                    logger.debug("skipping %s: not an entity caps entry",
+                                 entry)
+                    continue
+                with entry.open("rb") as f:
+                    data = f.read()
+                count += 1
+                yield hash_, urllib.parse.unquote(quoted), data
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entitycaps (hash, node, data) "
+                "VALUES (?, ?, ?)",
+                rows(),
+            )
+
+        return count
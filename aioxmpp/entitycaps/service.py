@@ -21,16 +21,17 @@
 ########################################################################
 import asyncio
 import base64
-import copy
 import functools
 import hashlib
 import logging
 import os
+import sys
 import tempfile
 import urllib.parse
 
 from xml.sax.saxutils import escape
 
+import aioxmpp.cache
 import aioxmpp.callbacks
 import aioxmpp.disco as disco
 import aioxmpp.service
@@ -137,6 +138,58 @@ def hash_query(query, algo):
     return base64.b64encode(hashimpl.digest()).decode("ascii")
 
 
+class _CompactEntry:
+    """
+    Compact in-memory representation of an entity capabilities entry.
+
+    The features are kept as a sorted tuple and the identities as tuples of
+    ``(category, type_, lang, name)``. All strings are interned, so that
+    entries which share most of their features (which is the common case for
+    clients of the same software) share the string objects. Forms are kept
+    as-is, since they are rare in entity capabilities.
+
+    The :class:`~.disco.xso.InfoQuery` is materialised by
+    :meth:`to_info_query`; each call returns a new object.
+    """
+
+    __slots__ = ("features", "identities", "exts")
+
+    def __init__(self, features, identities, exts):
+        self.features = features
+        self.identities = identities
+        self.exts = exts
+
+    @classmethod
+    def from_info_query(cls, info):
+        return cls(
+            tuple(sorted(sys.intern(feature) for feature in info.features)),
+            tuple(
+                (sys.intern(identity.category),
+                 sys.intern(identity.type_),
+                 identity.lang,
+                 (sys.intern(identity.name)
+                  if identity.name is not None else None))
+                for identity in info.identities
+            ),
+            tuple(info.exts),
+        )
+
+    def to_info_query(self, node):
+        result = disco.xso.InfoQuery(
+            identities=(
+                disco.xso.Identity(category=category,
+                                   type_=type_,
+                                   lang=lang,
+                                   name=name)
+                for category, type_, lang, name in self.identities
+            ),
+            features=self.features,
+            node=node,
+        )
+        result.exts.extend(self.exts)
+        return result
+
+
 class Cache:
     """
     This provides a two-level cache for entity capabilities information. The
@@ -158,6 +211,14 @@ class Cache:
 
     .. automethod:: set_user_db_path
 
+    .. automethod:: set_system_db
+
+    .. automethod:: set_user_db
+
+    .. autoattribute:: memory_cache_size
+
+    .. autoattribute:: negative_cache_size
+
     Queries (API intended for :class:`Service`):
 
     .. automethod:: create_query_future
@@ -169,9 +230,59 @@ class Cache:
 
     def __init__(self):
         self._lookup_cache = {}
-        self._memory_overlay = {}
+        # compact entries added by services or loaded from the databases
+        self._memory_overlay = aioxmpp.cache.LRUDict(4096)
         self._system_db_path = None
         self._user_db_path = None
+        self._system_db = None
+        self._user_db = None
+        # pending database lookups running in the executor
+        self._db_lookups = {}
+        # (hash, node) pairs which are known not to be in the databases
+        self._negative_cache = aioxmpp.cache.LRUDict(1024)
+
+    @property
+    def memory_cache_size(self):
+        """
+        The maximum number of entries which are kept in memory.
+
+        Entries added with :meth:`add_cache_entry` and entries found in the
+        databases by :meth:`lookup` are kept in memory in a compact form, so
+        that they need not be read from disk again. When the limit is
+        exceeded, the least recently used entries are dropped; entries which
+        have been written to the user database can still be found there.
+
+        .. versionadded:: 0.9
+        """
+        return self._memory_overlay.maxsize
+
+    @memory_cache_size.setter
+    def memory_cache_size(self, value):
+        self._memory_overlay.maxsize = value
+
+    @property
+    def negative_cache_size(self):
+        """
+        The number of database misses which are remembered, so that the
+        databases are not searched again for the same hash and node.
+
+        The remembered misses are forgotten when a database is changed with
+        one of the methods above or when an entry is added with
+        :meth:`add_cache_entry`.
+
+        .. versionadded:: 0.9
+        """
+        return self._negative_cache.maxsize
+
+    @negative_cache_size.setter
+    def negative_cache_size(self, value):
+        self._negative_cache.maxsize = value
+
+    def _has_databases(self):
+        return (self._system_db_path is not None or
+                self._user_db_path is not None or
+                self._system_db is not None or
+                self._user_db is not None)
 
     def _erase_future(self, for_hash, for_node, fut):
         try:
@@ -184,19 +295,58 @@ class Cache:
 
     def set_system_db_path(self, path):
         self._system_db_path = path
+        self._negative_cache.clear()
 
     def set_user_db_path(self, path):
         self._user_db_path = path
+        self._negative_cache.clear()
+
+    def set_system_db(self, db):
+        """
+        Use the database `db` as trusted database, in addition to the
+        directory set with :meth:`set_system_db_path`.
+
+        :param db: The database or :data:`None` to stop using a database.
+        :type db: :class:`SQLiteDatabase`
+
+        The database is only read from. The directory set with
+        :meth:`set_system_db_path` takes precedence over the database.
+
+        .. versionadded:: 0.9
+        """
+        self._system_db = db
+        self._negative_cache.clear()
+
+    def set_user_db(self, db):
+        """
+        Use the database `db` as user-level database, in addition to the
+        directory set with :meth:`set_user_db_path`.
+
+        :param db: The database or :data:`None` to stop using a database.
+        :type db: :class:`SQLiteDatabase`
+
+        New entries are written to the database in the default executor of
+        the event loop. The directory set with :meth:`set_user_db_path`
+        takes precedence over the database for lookups.
+
+        .. versionadded:: 0.9
+        """
+        self._user_db = db
+        self._negative_cache.clear()
 
     def lookup_in_database(self, hash_, node):
         try:
-            result = self._memory_overlay[hash_, node]
+            entry = self._memory_overlay[hash_, node]
         except KeyError:
             pass
         else:
             logger.debug("memory cache hit: %s %r", hash_, node)
-            return result
+            return entry.to_info_query(node)
+
+        return self._lookup_in_databases(hash_, node)
 
+    def _lookup_in_databases(self, hash_, node):
+        # called from the executor; must not touch the in-memory caches
         quoted = urllib.parse.quote(node, safe="")
         if self._system_db_path is not None:
             try:
@@ -210,6 +360,15 @@ class Cache:
                 with f:
                     return aioxmpp.xml.read_single_xso(f, disco.xso.InfoQuery)
 
+        if self._system_db is not None:
+            try:
+                result = self._system_db.lookup(hash_, node)
+            except KeyError:
+                pass
+            else:
+                logger.debug("system db hit: %s %r", hash_, node)
+                return result
+
         if self._user_db_path is not None:
             try:
                 f = (
@@ -222,8 +381,59 @@ class Cache:
                 with f:
                     return aioxmpp.xml.read_single_xso(f, disco.xso.InfoQuery)
 
+        if self._user_db is not None:
+            try:
+                result = self._user_db.lookup(hash_, node)
+            except KeyError:
+                pass
+            else:
+                logger.debug("user db hit: %s %r", hash_, node)
+                return result
+
         raise KeyError(node)
 
+    def _db_lookup_done(self, key, fut):
+        try:
+            existing = self._db_lookups[key]
+        except KeyError:
+            return
+        if existing is not fut:
+            return
+        del self._db_lookups[key]
+        if fut.cancelled():
+            return
+        exc = fut.exception()
+        if exc is None:
+            self._memory_overlay[key] = _CompactEntry.from_info_query(
+                fut.result()
+            )
+        elif isinstance(exc, KeyError):
+            self._negative_cache[key] = True
+
+    @asyncio.coroutine
+    def _lookup_in_database_async(self, hash_, node):
+        key = hash_, node
+        if key in self._negative_cache:
+            logger.debug("negative cache hit: %s %r", hash_, node)
+            raise KeyError(node)
+
+        try:
+            fut = self._db_lookups[key]
+        except KeyError:
+            fut = asyncio.get_event_loop().run_in_executor(
+                None,
+                self._lookup_in_databases,
+                hash_,
+                node,
+            )
+            fut.add_done_callback(
+                functools.partial(self._db_lookup_done, key)
+            )
+            self._db_lookups[key] = fut
+
+        # the lookup is shared with concurrent callers
+        return (yield from asyncio.shield(fut))
+
     @asyncio.coroutine
     def lookup(self, hash_, node):
         """
@@ -236,9 +446,30 @@ class Cache:
         are no pending futures, :class:`KeyError` is raised. If a future raises
         a :class:`ValueError`, it is ignored. If the future returns a value, it
         is used as the result.
+
+        .. versionchanged:: 0.9
+
+           If a database is configured, the databases are searched in the
+           default executor of the event loop, so that disk accesses do not
+           block the loop. Concurrent lookups for the same hash and node share
+           one search, hits are kept in memory (see :attr:`memory_cache_size`)
+           and misses are remembered (see :attr:`negative_cache_size`).
+           Entries kept in memory are returned without using the executor.
         """
         try:
-            result = self.lookup_in_database(hash_, node)
+            entry = self._memory_overlay[hash_, node]
+        except KeyError:
+            pass
+        else:
+            return entry.to_info_query(node)
+
+        try:
+            if self._has_databases():
+                result = yield from self._lookup_in_database_async(
+                    hash_, node
+                )
+            else:
+                result = self.lookup_in_database(hash_, node)
         except KeyError:
             pass
         else:
@@ -278,9 +509,13 @@ class Cache:
         actually map to `node` with the given `hash_` function, it is expected
         that the caller perfoms the validation.
         """
-        copied_entry = copy.copy(entry)
-        copied_entry.node = node
-        self._memory_overlay[hash_, node] = copied_entry
+        self._memory_overlay[hash_, node] = _CompactEntry.from_info_query(
+            entry
+        )
+        try:
+            del self._negative_cache[hash_, node]
+        except KeyError:
+            pass
         if self._user_db_path is not None:
             asyncio.async(asyncio.get_event_loop().run_in_executor(
                 None,
@@ -289,6 +524,13 @@ class Cache:
                 hash_,
                 node,
                 entry.captured_events))
+        if self._user_db is not None:
+            asyncio.async(asyncio.get_event_loop().run_in_executor(
+                None,
+                self._user_db.store,
+                hash_,
+                node,
+                entry.captured_events))
 
 
 class EntityCapsService(aioxmpp.service.Service):
@@ -311,7 +553,12 @@ class EntityCapsService(aioxmpp.service.Service):
     2. Users should use a process-wide :class:`Cache` instance and assign it to
        the :attr:`cache` of each :class:`.entitycaps.Service` they use. This
        improves performance by sharing (verified) hashes among :class:`Service`
-       instances.
+       instances. Queries for the same hash are only sent once, even if they
+       are issued by different :class:`Service` instances; if the query
+       fails, the other services send their own query.
+
+       Likewise, a process-wide :class:`aioxmpp.disco.SharedCache` can be
+       used with :meth:`.DiscoClient.use_shared_cache`.
 
        In addition, the hashes should be saved and restored on shutdown/start
        of the process. See the :class:`Cache` for details.
@@ -393,10 +640,18 @@ class EntityCapsService(aioxmpp.service.Service):
 
     @asyncio.coroutine
     def query_and_cache(self, jid, node, ver, hash_, fut):
-        data = yield from self.disco_client.query_info(
-            jid,
-            node=node+"#"+ver,
-            require_fresh=True)
+        try:
+            data = yield from self.disco_client.query_info(
+                jid,
+                node=node+"#"+ver,
+                require_fresh=True)
+        except Exception as exc:
+            # release the lookups waiting for this query (possibly from other
+            # services sharing the cache); they will send their own query
+            fut.set_exception(ValueError(
+                "query failed: {!r}".format(exc)
+            ))
+            raise
 
         try:
             expected = hash_query(data, hash_.replace("-", ""))
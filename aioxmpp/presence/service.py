@@ -20,6 +20,7 @@
 #
 ########################################################################
 import asyncio
+import itertools
 import numbers
 
 import aioxmpp.callbacks
@@ -55,6 +56,12 @@ class PresenceClient(aioxmpp.service.Service):
 
     .. automethod:: get_stanza
 
+    Bulk queries:
+
+    .. automethod:: get_available_peers
+
+    .. automethod:: get_show_counts
+
     On presence changes of peers, signals are emitted:
 
     .. signal:: on_bare_available(stanza)
@@ -119,6 +126,66 @@ class PresenceClient(aioxmpp.service.Service):
         super().__init__(client, **kwargs)
 
         self._presences = {}
+        # bare JID -> (PresenceState, stanza) of the most available resource;
+        # only contains bare JIDs with at least one available resource
+        self._most_available = {}
+        # PresenceShow -> number of bare JIDs whose most available resource
+        # has that show value
+        self._show_counts = {}
+        # bare JID -> resource -> sequence number of the last available
+        # presence received from that resource, to break ties between equal
+        # presence states
+        self._received_seq = {}
+        self._seq_counter = itertools.count()
+
+    def _set_most_available(self, bare, entry):
+        try:
+            old_state, _ = self._most_available[bare]
+        except KeyError:
+            pass
+        else:
+            count = self._show_counts[old_state.show] - 1
+            if count:
+                self._show_counts[old_state.show] = count
+            else:
+                del self._show_counts[old_state.show]
+
+        if entry is None:
+            self._most_available.pop(bare, None)
+            return
+
+        self._most_available[bare] = entry
+        state, _ = entry
+        self._show_counts[state.show] = \
+            self._show_counts.get(state.show, 0) + 1
+
+    def _update_most_available(self, bare, resources):
+        received_seq = self._received_seq.get(bare, {})
+        best = None
+        best_key = None
+        for resource, st in resources.items():
+            if resource is None:
+                continue
+            state = aioxmpp.structs.PresenceState.from_stanza(st)
+            key = state, received_seq[resource]
+            if best_key is None or key > best_key:
+                best = state, st
+                best_key = key
+        self._set_most_available(bare, best)
+
+    def _handle_available(self, bare, st, old_st):
+        state = aioxmpp.structs.PresenceState.from_stanza(st)
+        try:
+            best_state, best_st = self._most_available[bare]
+        except KeyError:
+            self._set_most_available(bare, (state, st))
+            return
+
+        if state >= best_state:
+            self._set_most_available(bare, (state, st))
+        elif best_st is old_st:
+            # the most available resource became less available
+            self._update_most_available(bare, self._presences[bare])
 
     def get_most_available_stanza(self, peer_jid):
         """
@@ -136,14 +203,19 @@ class PresenceClient(aioxmpp.service.Service):
 
         If there is no available resource for a given `peer_jid`, :data:`None`
         is returned.
+
+        .. versionchanged:: 0.9
+
+           The most available resource is tracked while presence is received,
+           so that this method does not need to inspect the resources. If
+           multiple resources have the same presence state, the one whose
+           presence was received last is returned.
         """
-        presences = sorted(
-            self.get_peer_resources(peer_jid).items(),
-            key=lambda item: aioxmpp.structs.PresenceState.from_stanza(item[1])
-        )
-        if not presences:
+        try:
+            _, st = self._most_available[peer_jid]
+        except KeyError:
             return None
-        return presences[-1][1]
+        return st
 
     def get_peer_resources(self, peer_jid):
         """
@@ -161,6 +233,39 @@ class PresenceClient(aioxmpp.service.Service):
         except KeyError:
             return {}
 
+    def get_available_peers(self):
+        """
+        Return the bare JIDs which have at least one available resource.
+
+        :rtype: set-like view of :class:`aioxmpp.JID`
+
+        The returned view is not a copy: it reflects the presence changes
+        received afterwards and must not be iterated while presence is being
+        processed. Use ``set(...)`` to obtain a snapshot.
+
+        .. versionadded:: 0.9
+        """
+        return self._most_available.keys()
+
+    def get_show_counts(self):
+        """
+        Return the number of available peers by presence show value.
+
+        :rtype: :class:`dict` mapping :class:`aioxmpp.PresenceShow` to
+            :class:`int`
+
+        Each bare JID with at least one available resource is counted once,
+        with the show value of its most available resource (see
+        :meth:`get_most_available_stanza`). Show values without peers are not
+        included.
+
+        The counters are maintained while presence is received; this method
+        only copies the (at most five) entries.
+
+        .. versionadded:: 0.9
+        """
+        return dict(self._show_counts)
+
     def get_stanza(self, peer_jid):
         """
         Return the last presence recieved for the given bare or full
@@ -202,7 +307,11 @@ class PresenceClient(aioxmpp.service.Service):
                 self.on_unavailable(st.from_, st)
                 if len(dest_dict) == 1:
                     self.on_bare_unavailable(st)
-                del dest_dict[resource]
+                old_st = dest_dict.pop(resource)
+                self._received_seq[bare].pop(resource, None)
+                _, best_st = self._most_available.get(bare, (None, None))
+                if best_st is old_st:
+                    self._update_most_available(bare, dest_dict)
         elif st.type_ == aioxmpp.structs.PresenceType.ERROR:
             try:
                 dest_dict = self._presences[bare]
@@ -214,13 +323,21 @@ class PresenceClient(aioxmpp.service.Service):
                                         st)
                 self.on_bare_unavailable(st)
             self._presences[bare] = {None: st}
+            self._received_seq.pop(bare, None)
+            self._set_most_available(bare, None)
         else:
             dest_dict = self._presences.setdefault(bare, {})
             dest_dict.pop(None, None)
             bare_became_available = not dest_dict
             resource_became_available = resource not in dest_dict
+            old_st = dest_dict.get(resource)
             dest_dict[resource] = st
 
+            if resource is not None:
+                self._received_seq.setdefault(bare, {})[resource] = \
+                    next(self._seq_counter)
+                self._handle_available(bare, st, old_st)
+
             if bare_became_available:
                 self.on_bare_available(st)
             if resource_became_available:
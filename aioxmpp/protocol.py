@@ -242,6 +242,29 @@ class XMLStream(asyncio.Protocol):
        will be able to deal with unhandled top level stanzas correctly at this
        point (by ignoring them).
 
+    .. signal:: on_writing_paused
+
+       Fires when the transport asks the stream to stop writing, because its
+       write buffer exceeds the high-water mark (see
+       :meth:`asyncio.BaseProtocol.pause_writing`).
+
+       XSOs can still be sent, but they will only increase the buffer; users
+       of the stream should hold back data until :meth:`on_writing_resumed`
+       fires.
+
+       .. versionadded:: 0.9
+
+    .. signal:: on_writing_resumed
+
+       Fires when the write buffer of the transport has drained below the
+       low-water mark after :meth:`on_writing_paused` fired.
+
+       .. versionadded:: 0.9
+
+    Flow control:
+
+    .. autoattribute:: writing_paused
+
     Timeouts:
 
     .. attribute:: shutdown_timeout
@@ -249,10 +272,28 @@ class XMLStream(asyncio.Protocol):
        The maximum time to wait for the peer ``</stream:stream>`` before
        forcing to close the transport and considering the stream closed.
 
+    Parsing:
+
+    .. attribute:: direct_expat
+
+       If true, the received data is parsed with a
+       :class:`~aioxmpp.xml.XMPPXMLExpatProcessor`, which binds the
+       :mod:`pyexpat` callbacks directly to the :attr:`stanza_parser`, instead
+       of going through :mod:`xml.sax` and :class:`~aioxmpp.xso.SAXDriver`.
+
+       The value is evaluated whenever the stream is (re-)started, i.e. on
+       :meth:`reset`. It can be set on the class to change the default for all
+       streams.
+
+       .. versionadded:: 0.9
+
     """
 
     on_closing = callbacks.Signal()
+    on_writing_paused = callbacks.Signal()
+    on_writing_resumed = callbacks.Signal()
     shutdown_timeout = 15
+    direct_expat = False
 
     def __init__(self, to,
                  features_future,
@@ -270,6 +311,7 @@ class XMLStream(asyncio.Protocol):
         self._smachine = statemachine.OrderedStateMachine(State.READY)
         self._transport_closing = False
         self._footer_timeout_future = None
+        self._writing_paused = False
 
         self._closing_future = asyncio.async(
             self._smachine.wait_for(
@@ -454,6 +496,7 @@ class XMLStream(asyncio.Protocol):
         self._transport = transport
         self._writer = None
         self._exception = None
+        self._writing_paused = False
         # we need to set the state before we call reset()
         self._smachine.state = State.STREAM_HEADER_SENT
         self.reset()
@@ -468,10 +511,25 @@ class XMLStream(asyncio.Protocol):
         self._kill_state()
         self._writer = None
         self._transport = None
+        self._writing_paused = False
         self._closing_future.cancel()
         if self._footer_timeout_future is not None:
             self._footer_timeout_future.cancel()
 
+    def pause_writing(self):
+        if self._writing_paused:
+            return
+        self._logger.debug("transport paused writing")
+        self._writing_paused = True
+        self.on_writing_paused()
+
+    def resume_writing(self):
+        if not self._writing_paused:
+            return
+        self._logger.debug("transport resumed writing")
+        self._writing_paused = False
+        self.on_writing_resumed()
+
     def data_received(self, blob):
         self._logger.debug("RECV %r", blob)
         try:
@@ -556,13 +614,19 @@ class XMLStream(asyncio.Protocol):
     def _reset_state(self):
         self._kill_state()
 
-        self._processor = xml.XMPPXMLProcessor()
+        if self.direct_expat:
+            self._processor = xml.XMPPXMLExpatProcessor()
+        else:
+            self._processor = xml.XMPPXMLProcessor()
         self._processor.stanza_parser = self.stanza_parser
         self._processor.on_stream_header = self._rx_stream_header
         self._processor.on_stream_footer = self._rx_stream_footer
         self._processor.on_exception = self._rx_exception
-        self._parser = xml.make_parser()
-        self._parser.setContentHandler(self._processor)
+        if self.direct_expat:
+            self._parser = self._processor
+        else:
+            self._parser = xml.make_parser()
+            self._parser.setContentHandler(self._processor)
 
         if self._logger.getEffectiveLevel() <= logging.DEBUG:
             dest = DebugWrapper(self._transport, self._logger)
@@ -633,6 +697,8 @@ class XMLStream(asyncio.Protocol):
         :raises OSError: if the stream got disconnected due to a another
                          permanent transport error
         :raises Exception: if serialisation of `obj` failed
+        :return: The number of bytes `obj` takes up in the stream.
+        :rtype: :class:`int`
 
         Calling :meth:`send_xso` while the stream is disconnected,
         disconnecting or still waiting for the remote to send a stream header
@@ -646,9 +712,13 @@ class XMLStream(asyncio.Protocol):
            *no* content is sent over the stream. The stream is still valid and
            usable afterwards.
 
+        .. versionchanged:: 0.9
+
+           The number of bytes sent is returned.
+
         """
         self._require_connection()
-        self._writer.send(obj)
+        return self._writer.send(obj)
 
     def can_starttls(self):
         """
@@ -660,13 +730,16 @@ class XMLStream(asyncio.Protocol):
                 self._transport.can_starttls())
 
     @asyncio.coroutine
-    def starttls(self, ssl_context, post_handshake_callback=None):
+    def starttls(self, ssl_context, post_handshake_callback=None,
+                 session=None):
         """
         Start TLS on the transport and wait for it to complete.
 
         The `ssl_context` and `post_handshake_callback` arguments are forwarded
         to the transports
-        :meth:`aioopenssl.STARTTLSTransport.starttls` coroutine method.
+        :meth:`aioopenssl.STARTTLSTransport.starttls` coroutine method. If
+        `session` is not :data:`None`, it is forwarded too; only the transport
+        bundled with aioxmpp supports it.
 
         If the transport does not support starttls, :class:`RuntimeError` is
         raised; support for starttls can be discovered by querying
@@ -676,13 +749,22 @@ class XMLStream(asyncio.Protocol):
         method may fail in interesting ways as the internal state is discarded
         when starttls succeeds, for security reasons. :meth:`reset` re-creates
         the internal structures.
+
+        .. versionchanged:: 0.9
+
+           The `session` argument was added.
         """
         self._require_connection()
         if not self.can_starttls():
             raise RuntimeError("starttls not available on transport")
 
-        yield from self._transport.starttls(ssl_context,
-                                            post_handshake_callback)
+        if session is not None:
+            yield from self._transport.starttls(ssl_context,
+                                                post_handshake_callback,
+                                                session=session)
+        else:
+            yield from self._transport.starttls(ssl_context,
+                                                post_handshake_callback)
         self._reset_state()
 
     def error_future(self):
@@ -706,6 +788,18 @@ class XMLStream(asyncio.Protocol):
         """
         return self._transport
 
+    @property
+    def writing_paused(self):
+        """
+        Whether the transport has asked the stream to stop writing (see
+        :meth:`on_writing_paused`).
+
+        This attribute cannot be set.
+
+        .. versionadded:: 0.9
+        """
+        return self._writing_paused
+
     @property
     def state(self):
         """
@@ -36,9 +36,13 @@ for example using :class:`aioxmpp.Client`.
 
 .. autoclass:: PinType
 
+.. autoclass:: TLSBackend
+
 .. autofunction:: tls_with_password_based_authentication(password_provider, [ssl_context_factory], [max_auth_attempts=3])
 
-.. autoclass:: SecurityLayer(ssl_context_factory, certificate_verifier_factory, tls_required, sasl_providers)
+.. autoclass:: SecurityLayer(ssl_context_factory, certificate_verifier_factory, tls_required, sasl_providers, [tls_backend], [tls_session_cache])
+
+.. autoclass:: TLSSessionCache
 
 .. autofunction:: negotiate_sasl
 
@@ -121,6 +125,7 @@ import enum
 import functools
 import logging
 import ssl
+import time
 
 import pyasn1
 import pyasn1.codec.der.decoder
@@ -131,7 +136,7 @@ import OpenSSL.SSL
 
 import aiosasl
 
-from . import errors, sasl, nonza, xso, protocol
+from . import cache, errors, sasl, nonza, xso, protocol
 from .utils import namespaces
 
 
@@ -246,9 +251,49 @@ class CertificateVerifier(metaclass=abc.ABCMeta):
     In addition to these two hooks into the TLS handshake, a third coroutine
     which is called before STARTTLS is intiiated is provided.
 
+    With :attr:`TLSBackend.STDLIB`, there is no verify callback.
+    :meth:`setup_stdlib_context` is called with the :class:`ssl.SSLContext`
+    instead of :meth:`setup_context`, and the :mod:`ssl` module performs the
+    verification. :meth:`pre_handshake` and :meth:`post_handshake` are called
+    as usual.
+
     This baseclass provides a bit of boilerplate.
+
+    .. automethod:: setup_stdlib_context
+
+    .. attribute:: supports_session_resumption
+
+       Whether connections verified by this verifier may be resumed using a
+       :class:`TLSSessionCache`. A resumed handshake does not transfer the
+       peer certificate, so :meth:`verify_callback` is not called; only
+       verifiers which accept that should set this to true. Defaults to
+       false.
+
+       .. versionadded:: 0.9
+
+    .. automethod:: session_resumption_policy
     """
 
+    supports_session_resumption = False
+
+    def session_resumption_policy(self, metadata):
+        """
+        Return a hashable object describing how this verifier decides whether
+        a peer is trusted on a connection using the :class:`SecurityLayer`
+        `metadata`.
+
+        A session stored in a :class:`TLSSessionCache` is only resumed by
+        connections with an equal policy, so that a session accepted under a
+        weaker policy cannot skip the verification of a stricter one. The
+        default implementation returns the type of the verifier and the
+        :attr:`~SecurityLayer.ssl_context_factory` (which configures the trust
+        store). Verifiers which support session resumption and have further
+        per-instance trust configuration must include it.
+
+        .. versionadded:: 0.9
+        """
+        return type(self), metadata.ssl_context_factory
+
     @asyncio.coroutine
     def pre_handshake(self, metadata, domain, host, port):
         pass
@@ -257,6 +302,23 @@ class CertificateVerifier(metaclass=abc.ABCMeta):
         self.transport = transport
         ctx.set_verify(OpenSSL.SSL.VERIFY_PEER, self.verify_callback)
 
+    def setup_stdlib_context(self, ctx):
+        """
+        Configure the :class:`ssl.SSLContext` `ctx` for use with
+        :attr:`TLSBackend.STDLIB`.
+
+        The default implementation raises :class:`NotImplementedError`, as a
+        verifier relying on :meth:`verify_callback` cannot work with the
+        :mod:`ssl` module.
+
+        .. versionadded:: 0.9
+        """
+        raise NotImplementedError(
+            "{} does not support the stdlib TLS backend".format(
+                type(self).__name__
+            )
+        )
+
     @abc.abstractmethod
     def verify_callback(self, conn, x509, errno, errdepth, returncode):
         return returncode
@@ -268,10 +330,16 @@ class CertificateVerifier(metaclass=abc.ABCMeta):
 
 
 class _NullVerifier(CertificateVerifier):
+    supports_session_resumption = True
+
     def setup_context(self, ctx, transport):
         self.transport = transport
         ctx.set_verify(OpenSSL.SSL.VERIFY_NONE, self.verify_callback)
 
+    def setup_stdlib_context(self, ctx):
+        ctx.check_hostname = False
+        ctx.verify_mode = ssl.CERT_NONE
+
     def verify_callback(self, *args):
         return True
 
@@ -287,8 +355,16 @@ class PKIXCertificateVerifier(CertificateVerifier):
 
     The :meth:`verify_callback` checks that the certificate subject matches the
     domain name of the JID of the connection.
+
+    With :attr:`TLSBackend.STDLIB`, the same checks are delegated to the
+    :mod:`ssl` module.
+
+    Sessions verified by this verifier may be resumed (see
+    :attr:`~CertificateVerifier.supports_session_resumption`).
     """
 
+    supports_session_resumption = True
+
     def verify_callback(self, ctx, x509, errno, errdepth, returncode):
         logger.info("verifying certificate (preverify=%s)", returncode)
 
@@ -312,6 +388,11 @@ class PKIXCertificateVerifier(CertificateVerifier):
         super().setup_context(ctx, transport)
         ctx.set_default_verify_paths()
 
+    def setup_stdlib_context(self, ctx):
+        ctx.verify_mode = ssl.CERT_REQUIRED
+        ctx.check_hostname = True
+        ctx.load_default_certs()
+
     @asyncio.coroutine
     def post_handshake(self, transport):
         pass
@@ -1056,6 +1137,43 @@ if not hasattr(aiosasl, "ANONYMOUS"):
     AnonymousSASLProvider = None  # NOQA
 
 
+class TLSBackend(enum.Enum):
+    """
+    Enumeration to select the TLS implementation used by the connectors.
+
+    .. attribute:: PYOPENSSL
+
+       TLS is implemented using :mod:`OpenSSL` (pyOpenSSL) and
+       :class:`aioxmpp._ssl_transport.STARTTLSTransport`. The
+       :attr:`~SecurityLayer.ssl_context_factory` must return
+       :class:`OpenSSL.SSL.Context` instances. This is the default.
+
+    .. attribute:: STDLIB
+
+       TLS is implemented by the :mod:`ssl` module and the :mod:`asyncio`
+       SSL implementation, which handles TLS records with considerably less
+       overhead. The :attr:`~SecurityLayer.ssl_context_factory` must return
+       :class:`ssl.SSLContext` instances.
+
+       The certificate verifier is configured using
+       :meth:`CertificateVerifier.setup_stdlib_context` instead of
+       :meth:`~CertificateVerifier.setup_context`. As the :mod:`ssl` module
+       has no per-certificate verify callback, only verifiers which implement
+       that method can be used; this excludes the pinning verifiers.
+
+       Only direct TLS (:class:`aioxmpp.connector.XMPPOverTLSConnector`) is
+       supported with this backend;
+       :class:`aioxmpp.connector.STARTTLSConnector` raises
+       :class:`aioxmpp.errors.TLSUnavailable`, so that the next connector is
+       tried.
+
+    .. versionadded:: 0.9
+    """
+
+    PYOPENSSL = 0
+    STDLIB = 1
+
+
 class SecurityLayer(collections.namedtuple(
         "SecurityLayer",
         [
@@ -1063,6 +1181,8 @@ class SecurityLayer(collections.namedtuple(
             "certificate_verifier_factory",
             "tls_required",
             "sasl_providers",
+            "tls_backend",
+            "tls_session_cache",
         ])):
     """
     A security layer defines the security properties used for an XML stream.
@@ -1083,7 +1203,9 @@ class SecurityLayer(collections.namedtuple(
     .. attribute:: ssl_context_factory
 
        This is a callable returning a :class:`OpenSSL.SSL.Context` instance
-       which is to be used for any SSL operations for the connection.
+       which is to be used for any SSL operations for the connection. If
+       :attr:`tls_backend` is :attr:`TLSBackend.STDLIB`, it must return a
+       :class:`ssl.SSLContext` instead.
 
        The :class:`OpenSSL.SSL.Context` instances should not be resued between
        connection attempts, as the certificate verifiers may set options which
@@ -1108,8 +1230,175 @@ class SecurityLayer(collections.namedtuple(
        A sequence of :class:`SASLProvider` instances. As SASL providers are
        stateless, it is not necessary to create new providers for each
        connection.
+
+    .. attribute:: tls_backend
+
+       The :class:`TLSBackend` to use for the connection. Defaults to
+       :attr:`TLSBackend.PYOPENSSL`.
+
+       .. versionadded:: 0.9
+
+    .. attribute:: tls_session_cache
+
+       A :class:`TLSSessionCache` used to resume TLS sessions when
+       reconnecting, or :data:`None` (the default) to always perform a full
+       handshake. The cache is only used with :attr:`TLSBackend.PYOPENSSL`.
+
+       .. versionadded:: 0.9
     """
 
+    def __new__(cls, ssl_context_factory, certificate_verifier_factory,
+                tls_required, sasl_providers,
+                tls_backend=TLSBackend.PYOPENSSL,
+                tls_session_cache=None):
+        return super().__new__(
+            cls,
+            ssl_context_factory,
+            certificate_verifier_factory,
+            tls_required,
+            sasl_providers,
+            tls_backend,
+            tls_session_cache,
+        )
+
+
+class TLSSessionCache:
+    """
+    Bounded cache of TLS sessions, to resume them when reconnecting.
+
+    :param maxsize: Maximum number of sessions to keep.
+    :type maxsize: :class:`int`
+    :param max_age: Time in seconds after which a session is not offered for
+        resumption anymore.
+    :type max_age: :class:`float`
+
+    Resuming a session skips the key exchange and the transfer and
+    verification of the certificate chain, which makes reconnecting
+    considerably cheaper for both sides.
+
+    Sessions are keyed by the host, port and domain of the connection and by
+    the trust policy (see
+    :meth:`~CertificateVerifier.session_resumption_policy`) of the
+    certificate verifier which accepted the connection. When the cache is set
+    as :attr:`SecurityLayer.tls_session_cache`, the connectors offer the
+    cached session in the TLS handshake and, once the stream has been
+    established, store the session for the next connection and count the
+    handshake in :attr:`resumed_handshakes` or :attr:`full_handshakes`.
+    Sessions are only stored after the certificate verifier has accepted the
+    connection, and only if the verifier
+    :attr:`~CertificateVerifier.supports_session_resumption`. Thus, a session
+    established without certificate verification (see `no_verify` of
+    :func:`make`) is never offered by a client which verifies certificates,
+    even if both share the cache.
+
+    Session resumption requires :attr:`TLSBackend.PYOPENSSL` and the
+    transport bundled with aioxmpp, which the connectors use (the transport
+    of :mod:`aioopenssl` cannot resume sessions).
+
+    A single cache can be shared by any number of clients.
+
+    .. autoattribute:: maxsize
+
+    .. attribute:: max_age
+
+       Maximum age of a session in seconds. Changing this affects only
+       sessions stored afterwards.
+
+    .. attribute:: resumed_handshakes
+
+       Number of handshakes which resumed a cached session.
+
+    .. attribute:: full_handshakes
+
+       Number of handshakes which did not resume a session, including those
+       for which a cached session was offered but not accepted by the
+       server.
+
+    .. automethod:: lookup
+
+    .. automethod:: record_handshake
+
+    .. automethod:: discard
+
+    .. automethod:: clear
+
+    .. versionadded:: 0.9
+    """
+
+    def __init__(self, maxsize=256, max_age=3600., *, clock=time.monotonic):
+        super().__init__()
+        self._sessions = cache.ExpiringLRUDict(maxsize, clock=clock)
+        self.max_age = max_age
+        self.resumed_handshakes = 0
+        self.full_handshakes = 0
+
+    @property
+    def maxsize(self):
+        """
+        Maximum number of sessions in the cache. Setting this to a lower
+        value than the current number of sessions discards the least
+        recently used sessions.
+        """
+        return self._sessions.maxsize
+
+    @maxsize.setter
+    def maxsize(self, value):
+        self._sessions.maxsize = value
+
+    def lookup(self, host, port, domain, policy):
+        """
+        Return the session for the connection to `domain` at `host` and
+        `port` verified under `policy`, or :data:`None` if there is no session
+        or it is older than :attr:`max_age`.
+        """
+        return self._sessions.lookup((host, port, domain, policy))
+
+    def record_handshake(self, host, port, domain, policy, transport):
+        """
+        Count the completed TLS handshake of `transport` and store its session
+        for the connection to `domain` at `host` and `port` verified under
+        `policy`.
+
+        This must only be called after the certificate of the peer has been
+        accepted. With TLS 1.3, the session becomes resumable only when the
+        session ticket has been received from the server, which happens after
+        the handshake; it is thus best to call this once data has been
+        received over the TLS connection.
+        """
+        if transport.get_extra_info("session_reused"):
+            self.resumed_handshakes += 1
+        else:
+            self.full_handshakes += 1
+
+        ssl_object = transport.get_extra_info("ssl_object")
+        session = ssl_object.get_session()
+        if session is None:
+            self.discard(host, port, domain, policy)
+            return
+        self._sessions.set((host, port, domain, policy), session,
+                           ttl=self.max_age)
+
+    def discard(self, host, port, domain, policy):
+        """
+        Remove the session for the connection to `domain` at `host` and
+        `port` verified under `policy`, if any.
+        """
+        try:
+            del self._sessions[host, port, domain, policy]
+        except KeyError:
+            pass
+
+    def clear(self):
+        """
+        Remove all sessions and reset the counters.
+        """
+        self._sessions.clear()
+        self.resumed_handshakes = 0
+        self.full_handshakes = 0
+
+    def __len__(self):
+        return len(self._sessions)
+
 
 def default_verify_callback(conn, x509, errno, errdepth, returncode):
     return errno == 0
@@ -1129,6 +1418,21 @@ def default_ssl_context():
     return ctx
 
 
+def default_stdlib_ssl_context():
+    """
+    Return a sensibly configured :class:`ssl.SSLContext` context for use with
+    :attr:`TLSBackend.STDLIB`.
+
+    The context is created using :func:`ssl.create_default_context`: SSLv2
+    and SSLv3 are disabled and the system trust store is loaded. Certificate
+    and host name checking are configured by the certificate verifier.
+
+    .. versionadded:: 0.9
+    """
+
+    return ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
+
+
 @asyncio.coroutine
 def negotiate_sasl(transport, xmlstream,
                    sasl_providers,
@@ -1295,7 +1599,9 @@ def make(
         pin_type=PinType.PUBLIC_KEY,
         post_handshake_deferred_failure=None,
         anonymous=False,
-        no_verify=False):
+        no_verify=False,
+        tls_backend=TLSBackend.PYOPENSSL,
+        tls_session_cache=None):
     """
     Construct a :class:`SecurityLayer`. Depending on the arguments passed,
     different features are enabled or disabled.
@@ -1324,9 +1630,15 @@ def make(
                       discouraged** outside controlled test environments. See
                       below for alternatives.
     :type no_verify: :class:`bool`
+    :param tls_backend: The TLS implementation to use.
+    :type tls_backend: :class:`TLSBackend`
+    :param tls_session_cache: Cache to resume TLS sessions from.
+    :type tls_session_cache: :class:`TLSSessionCache` or :data:`None`
     :raise RuntimeError: if `anonymous` is a :class:`str` and the version of
                          :mod:`aiosasl` in use does not provide
                          :class:`aiosasl.ANONYMOUS`
+    :raise ValueError: if `pin_store` is given together with
+                       :attr:`TLSBackend.STDLIB`
     :return: A new :class:`SecurityLayer` instance configured as per the
              arguments.
 
@@ -1388,14 +1700,37 @@ def make(
        the ANONYMOUS SASL mechanism in the XMPP context) into account before
        using `anonymous`.
 
+    `tls_backend` selects the TLS implementation, see :class:`TLSBackend`.
+    With :attr:`TLSBackend.STDLIB`, :func:`default_stdlib_ssl_context` is
+    used to create the contexts. Certificate pinning is not available with
+    that backend.
+
+    If `tls_session_cache` is not :data:`None`, it is used to resume TLS
+    sessions when reconnecting, see :class:`TLSSessionCache`. Pass the same
+    cache to all security layers which should share sessions.
+
     The versaility and simplicity of use of this function make (pun intended)
     it the preferred way to construct :class:`SecurityLayer` instances.
 
     .. versionadded:: 0.8
 
        Support for SASL ANONYMOUS was added.
+
+    .. versionadded:: 0.9
+
+       The `tls_backend` and `tls_session_cache` arguments.
     """
 
+    if tls_backend == TLSBackend.STDLIB:
+        if pin_store is not None:
+            raise ValueError(
+                "certificate pinning is not supported with the stdlib TLS "
+                "backend"
+            )
+        ssl_context_factory = default_stdlib_ssl_context
+    else:
+        ssl_context_factory = default_ssl_context
+
     if isinstance(password_provider, str):
         static_password = password_provider
 
@@ -1449,8 +1784,10 @@ def make(
         )
 
     return SecurityLayer(
-        default_ssl_context,
+        ssl_context_factory,
         certificate_verifier_factory,
         True,
         tuple(sasl_providers),
+        tls_backend=tls_backend,
+        tls_session_cache=tls_session_cache,
     )
@@ -60,6 +60,11 @@ internal queues.
 
 .. autoclass:: StanzaState
 
+Statistics
+==========
+
+.. autoclass:: IQRequestStatistics
+
 Filters
 =======
 
@@ -77,12 +82,13 @@ Exceptions
 """
 
 import asyncio
+import collections
 import contextlib
 import functools
 import logging
 import warnings
 
-from datetime import datetime, timedelta
+from datetime import timedelta
 from enum import Enum
 
 from . import (
@@ -94,12 +100,18 @@ from . import (
     callbacks,
     protocol,
     structs,
+    tasks,
 )
 
 from .plugins import xep0199
 from .utils import namespaces
 
 
+# prefix of the names under which the filters and the IQ response dispatcher
+# are recorded by a callbacks.Instrumentation
+_INSTRUMENTATION_PREFIX = __name__ + ".StanzaStream."
+
+
 class AppFilter(callbacks.Filter):
     """
     A specialized :class:`Filter` version. The only difference is in the
@@ -216,6 +228,81 @@ class StanzaErrorAwareListener:
         return self._forward_to.is_valid()
 
 
+class IQRequestStatistics:
+    """
+    Counters and timings of the IQ request handlers for one payload class, as
+    available via :attr:`StanzaStream.iq_request_statistics`.
+
+    All times are in seconds, as measured by the event loop clock.
+
+    .. attribute:: handled
+
+       Number of request handlers which have finished (including those which
+       raised or were cancelled).
+
+    .. attribute:: backlogged
+
+       Number of requests which had to wait in the backlog before their
+       handler could be started.
+
+    .. attribute:: rejected
+
+       Number of requests which were answered with an error because the
+       backlog was full.
+
+    .. attribute:: queue_wait_total
+
+       Sum of the times between the reception of the requests and the start
+       of their handlers.
+
+    .. attribute:: queue_wait_max
+
+       Longest of those times.
+
+    .. attribute:: handler_latency_total
+
+       Sum of the times between the start and the end of the handlers.
+
+    .. attribute:: handler_latency_max
+
+       Longest of those times.
+
+    .. versionadded:: 0.9
+    """
+
+    __slots__ = ("handled", "backlogged", "rejected",
+                 "queue_wait_total", "queue_wait_max",
+                 "handler_latency_total", "handler_latency_max")
+
+    def __init__(self):
+        super().__init__()
+        self.handled = 0
+        self.backlogged = 0
+        self.rejected = 0
+        self.queue_wait_total = 0.
+        self.queue_wait_max = 0.
+        self.handler_latency_total = 0.
+        self.handler_latency_max = 0.
+
+    def _record_queue_wait(self, duration):
+        self.queue_wait_total += duration
+        self.queue_wait_max = max(self.queue_wait_max, duration)
+
+    def _record_handler_latency(self, duration):
+        self.handled += 1
+        self.handler_latency_total += duration
+        self.handler_latency_max = max(self.handler_latency_max, duration)
+
+    def __repr__(self):
+        return "<{}.{} handled={} backlogged={} rejected={}>".format(
+            type(self).__module__,
+            type(self).__qualname__,
+            self.handled,
+            self.backlogged,
+            self.rejected,
+        )
+
+
 class StanzaToken:
     """
     A token to follow the processing of a `stanza`.
@@ -406,6 +493,17 @@ class StanzaStream:
        stanza gets send during that interval, the ping is fired. Otherwise, the
        ping is fired after the interval.
 
+    .. attribute:: incoming_batch_budget = 64
+
+       The maximum number of incoming stanzas and stream-level elements which
+       are processed in one go, without handing control back to the main loop
+       of the stream. Bursts of incoming traffic are processed in batches of
+       at most this size; in between batches, outgoing stanzas and pings are
+       handled and other tasks on the event loop get to run, so that they are
+       not starved by incoming traffic.
+
+       .. versionadded:: 0.9
+
     After a ping has been sent, the response must arrive in a time of
     :attr:`ping_interval` for the stream to be considered alive. If the
     response fails to arrive within that interval, the stream fails (see
@@ -425,12 +523,22 @@ class StanzaStream:
 
     .. automethod:: flush_incoming
 
+    .. autoattribute:: incoming_batch_sizes
+
     Sending stanzas:
 
     .. automethod:: send
 
     .. automethod:: enqueue
 
+    .. automethod:: drain
+
+    .. autoattribute:: writing_paused
+
+    .. autoattribute:: writing_paused_count
+
+    .. autoattribute:: writing_paused_time
+
     .. method:: enqueue_stanza
 
        Alias of :meth:`enqueue`.
@@ -601,6 +709,10 @@ class StanzaStream:
 
     .. autoattribute:: sm_unacked_list
 
+    .. autoattribute:: sm_unacked_count
+
+    .. autoattribute:: sm_unacked_bytes
+
     .. autoattribute:: sm_id
 
     .. autoattribute:: sm_max
@@ -609,6 +721,52 @@ class StanzaStream:
 
     .. autoattribute:: sm_resumable
 
+    Running IQ request handlers:
+
+    .. attribute:: iq_request_task_pool
+
+       Optional :class:`aioxmpp.tasks.TaskPool` in which the coroutines
+       registered with :meth:`register_iq_request_coro` are run. If this is
+       :data:`None` (the default), each request handler is started as a
+       separate task without any limits.
+
+       Each handler is spawned in the group :attr:`IQ_REQUEST_GROUP` and in
+       the group ``IQ_REQUEST_GROUP + (payload_class,)``, where
+       *payload_class* is the type of the request payload. Limits on those
+       groups (or on the pool as a whole) thus limit the number of request
+       handlers running concurrently (see
+       :meth:`set_iq_request_concurrency_limit`).
+
+       If the pool has no capacity for a handler (or other requests are
+       already waiting), the request is put into the backlog until the
+       handler can be spawned; the backlog is served in the order in which
+       the requests were received. If the backlog is full, the request is
+       answered with a ``resource-constraint`` error of type
+       :attr:`~.ErrorType.WAIT`.
+
+       .. versionadded:: 0.9
+
+    .. attribute:: iq_request_backlog_size
+
+       The maximum number of IQ requests which wait for capacity in the
+       :attr:`iq_request_task_pool`. Setting this to zero rejects all requests
+       for which the pool has no capacity right away. Defaults to 64.
+
+       .. versionadded:: 0.9
+
+    .. attribute:: IQ_REQUEST_GROUP
+
+       The group key of the :attr:`iq_request_task_pool` group in which all
+       IQ request handlers are run.
+
+       .. versionadded:: 0.9
+
+    .. automethod:: set_iq_request_concurrency_limit
+
+    .. autoattribute:: iq_request_backlog_length
+
+    .. autoattribute:: iq_request_statistics
+
     Miscellaneous:
 
     .. autoattribute:: local_jid
@@ -688,6 +846,8 @@ class StanzaStream:
 
     _ALLOW_ENUM_COERCION = True
 
+    IQ_REQUEST_GROUP = ("aioxmpp.stream", "iq_request")
+
     on_failure = callbacks.Signal()
     on_stream_destroyed = callbacks.Signal()
     on_stream_established = callbacks.Signal()
@@ -710,15 +870,28 @@ class StanzaStream:
 
         self._local_jid = local_jid
 
-        self._active_queue = custom_queue.AsyncDeque(loop=self._loop)
-        self._incoming_queue = custom_queue.AsyncDeque(loop=self._loop)
+        self._broker_wakeup = asyncio.Event(loop=self._loop)
+        self._active_queue = custom_queue.AsyncDeque(
+            loop=self._loop,
+            wakeup=self._broker_wakeup)
+        self._incoming_queue = custom_queue.AsyncDeque(
+            loop=self._loop,
+            wakeup=self._broker_wakeup)
 
-        self._iq_response_map = callbacks.TagDispatcher()
+        self._iq_response_map = callbacks.TagDispatcher(
+            name=_INSTRUMENTATION_PREFIX + "iq_response_map",
+        )
         self._iq_request_map = {}
 
         # list of running IQ request coroutines: used to cancel them when the
         # stream is destroyed
         self._iq_request_tasks = []
+        self.iq_request_task_pool = None
+        self.iq_request_backlog_size = 64
+        # tasks waiting for capacity in the iq_request_task_pool, in the
+        # order in which the requests were received (used as ordered set)
+        self._iq_request_backlog = collections.OrderedDict()
+        self._iq_request_statistics = {}
 
         self._ping_send_opportunistic = False
         self._next_ping_event_at = None
@@ -726,27 +899,53 @@ class StanzaStream:
 
         self._xmlstream_exception = None
 
+        # outbound flow control, see _xmlstream_writing_paused
+        self._writing_paused = False
+        self._writing_paused_since = None
+        self._writing_paused_count = 0
+        self._writing_paused_time = 0.
+        self._drain_waiters = []
+
         self._established = False
         self._closed = False
 
         self.ping_interval = timedelta(seconds=15)
         self.ping_opportunistic_interval = timedelta(seconds=15)
 
+        self.incoming_batch_budget = 64
+        self._incoming_batch_sizes = collections.Counter()
+
         self._sm_enabled = False
 
         self._broker_lock = asyncio.Lock(loop=loop)
 
-        self.app_inbound_presence_filter = AppFilter()
-        self.service_inbound_presence_filter = callbacks.Filter()
+        self.app_inbound_presence_filter = AppFilter(
+            name=_INSTRUMENTATION_PREFIX + "app_inbound_presence_filter",
+        )
+        self.service_inbound_presence_filter = callbacks.Filter(
+            name=_INSTRUMENTATION_PREFIX + "service_inbound_presence_filter",
+        )
 
-        self.app_inbound_message_filter = AppFilter()
-        self.service_inbound_message_filter = callbacks.Filter()
+        self.app_inbound_message_filter = AppFilter(
+            name=_INSTRUMENTATION_PREFIX + "app_inbound_message_filter",
+        )
+        self.service_inbound_message_filter = callbacks.Filter(
+            name=_INSTRUMENTATION_PREFIX + "service_inbound_message_filter",
+        )
 
-        self.app_outbound_presence_filter = AppFilter()
-        self.service_outbound_presence_filter = callbacks.Filter()
+        self.app_outbound_presence_filter = AppFilter(
+            name=_INSTRUMENTATION_PREFIX + "app_outbound_presence_filter",
+        )
+        self.service_outbound_presence_filter = callbacks.Filter(
+            name=_INSTRUMENTATION_PREFIX + "service_outbound_presence_filter",
+        )
 
-        self.app_outbound_message_filter = AppFilter()
-        self.service_outbound_message_filter = callbacks.Filter()
+        self.app_outbound_message_filter = AppFilter(
+            name=_INSTRUMENTATION_PREFIX + "app_outbound_message_filter",
+        )
+        self.service_outbound_message_filter = callbacks.Filter(
+            name=_INSTRUMENTATION_PREFIX + "service_outbound_message_filter",
+        )
 
     @property
     def local_jid(self):
@@ -765,6 +964,104 @@ class StanzaStream:
     def local_jid(self, value):
         self._local_jid = value
 
+    @property
+    def incoming_batch_sizes(self):
+        """
+        A :class:`collections.Counter` which maps the sizes of the batches in
+        which incoming stanzas have been processed to the number of batches of
+        that size.
+
+        The counter is never reset by the stream, but it may be cleared by the
+        user. See also :attr:`incoming_batch_budget`.
+
+        .. versionadded:: 0.9
+        """
+        return self._incoming_batch_sizes
+
+    @property
+    def iq_request_backlog_length(self):
+        """
+        The number of IQ requests currently waiting in the backlog for
+        capacity in the :attr:`iq_request_task_pool`.
+
+        .. versionadded:: 0.9
+        """
+        return len(self._iq_request_backlog)
+
+    @property
+    def iq_request_statistics(self):
+        """
+        A dictionary which maps the payload classes of the IQ requests for
+        which handlers have been started (or rejected) to their
+        :class:`IQRequestStatistics`.
+
+        The statistics are never reset by the stream, but the dictionary may
+        be cleared by the user.
+
+        .. versionadded:: 0.9
+        """
+        return self._iq_request_statistics
+
+    @property
+    def writing_paused(self):
+        """
+        Whether the outbound queue is currently held back, because the
+        transport of the XML stream is above its high-water mark.
+
+        .. versionadded:: 0.9
+        """
+        return self._writing_paused
+
+    @property
+    def writing_paused_count(self):
+        """
+        The number of times the outbound queue has been held back because of
+        the transport.
+
+        .. versionadded:: 0.9
+        """
+        return self._writing_paused_count
+
+    @property
+    def writing_paused_time(self):
+        """
+        The total time in seconds during which the outbound queue has been
+        held back because of the transport, including the current pause.
+
+        .. versionadded:: 0.9
+        """
+        result = self._writing_paused_time
+        if self._writing_paused:
+            result += self._loop.time() - self._writing_paused_since
+        return result
+
+    def set_iq_request_concurrency_limit(self, payload_cls, limit):
+        """
+        Limit the number of IQ request handlers running concurrently.
+
+        :param payload_cls: Payload class whose handlers to limit, or
+                            :data:`None` to limit the handlers for all payload
+                            classes together.
+        :param limit: Maximum number of concurrently running handlers or
+                      :data:`None` to remove the limit.
+        :type limit: non-negative :class:`int` or :data:`None`
+
+        The limits are set on the :attr:`iq_request_task_pool`, which is
+        created if it is :data:`None`. Requests exceeding the limits are put
+        into the backlog (see :attr:`iq_request_backlog_size`).
+
+        .. versionadded:: 0.9
+        """
+        if self.iq_request_task_pool is None:
+            self.iq_request_task_pool = tasks.TaskPool(
+                logger=self._logger.getChild("iq_request_task_pool")
+            )
+
+        group = self.IQ_REQUEST_GROUP
+        if payload_cls is not None:
+            group += (payload_cls,)
+        self.iq_request_task_pool.set_limit(group, limit)
+
     def _coerce_enum(self, value, enum_class):
         if not isinstance(value, enum_class):
             if self._ALLOW_ENUM_COERCION:
@@ -805,6 +1102,31 @@ class StanzaStream:
         self._xmlstream_exception = exc
         self.stop()
 
+    def _xmlstream_writing_paused(self):
+        if self._writing_paused:
+            return
+        self._logger.debug("transport is full, holding back outbound queue")
+        self._writing_paused = True
+        self._writing_paused_since = self._loop.time()
+        self._writing_paused_count += 1
+
+    def _xmlstream_writing_resumed(self):
+        if not self._writing_paused:
+            return
+        self._logger.debug("transport drained, resuming outbound queue")
+        self._writing_paused = False
+        self._writing_paused_time += (
+            self._loop.time() - self._writing_paused_since
+        )
+        self._writing_paused_since = None
+        self._broker_wakeup.set()
+
+    def _wake_drain_waiters(self):
+        for fut in self._drain_waiters:
+            if not fut.done():
+                fut.set_result(None)
+        self._drain_waiters.clear()
+
     def _destroy_stream_state(self, exc):
         """
         Destroy all state which does not make sense to keep after a disconnect
@@ -816,23 +1138,128 @@ class StanzaStream:
             # we don’t need to remove, that’s handled by their
             # add_done_callback
             task.cancel()
+        for waiter in self._iq_request_backlog:
+            waiter.cancel()
         while not self._active_queue.empty():
             token = self._active_queue.get_nowait()
             token._set_state(StanzaState.DISCONNECTED)
+        self._wake_drain_waiters()
 
         if self._established:
             self.on_stream_destroyed(exc)
             self._established = False
 
-    def _iq_request_coro_done(self, request, task):
+    def _get_iq_request_statistics(self, request):
+        payload_cls = type(request.payload)
+        try:
+            return self._iq_request_statistics[payload_cls]
+        except KeyError:
+            stats = IQRequestStatistics()
+            self._iq_request_statistics[payload_cls] = stats
+            return stats
+
+    def _spawn_iq_request_handler(self, coro, request):
+        """
+        Start the request handler `coro` for the IQ `request`, either as
+        separate task or in the :attr:`iq_request_task_pool`, putting the
+        request into the backlog or rejecting it if the pool has no capacity.
+        """
+        received_at = self._loop.time()
+        pool = self.iq_request_task_pool
+        if pool is None:
+            self._iq_request_started(
+                request, received_at,
+                asyncio.async(coro(request)),
+            )
+            return
+
+        groups = {
+            self.IQ_REQUEST_GROUP,
+            self.IQ_REQUEST_GROUP + (type(request.payload),),
+        }
+        # requests must not overtake the ones which are already waiting
+        if not self._iq_request_backlog and pool.has_capacity(groups):
+            self._iq_request_started(
+                request, received_at,
+                pool.spawn(groups, coro, request),
+            )
+            return
+
+        stats = self._get_iq_request_statistics(request)
+        if len(self._iq_request_backlog) >= self.iq_request_backlog_size:
+            self._logger.warning(
+                "rejecting IQ request, backlog is full: "
+                "from=%r, payload=%r",
+                request.from_,
+                request.payload,
+            )
+            stats.rejected += 1
+            response = request.make_reply(type_=structs.IQType.ERROR)
+            response.error = stanza.Error(
+                condition=(namespaces.stanzas, "resource-constraint"),
+                type_=structs.ErrorType.WAIT,
+            )
+            self.enqueue(response)
+            return
+
+        self._logger.debug("no capacity for IQ request handler or backlog "
+                           "not empty, putting request into backlog")
+        stats.backlogged += 1
+        waiter = asyncio.async(pool.wait_and_spawn(groups, coro, request))
+        waiter.add_done_callback(
+            functools.partial(
+                self._iq_request_backlog_done,
+                request,
+                received_at,
+            )
+        )
+        self._iq_request_backlog[waiter] = None
+
+    def _iq_request_backlog_done(self, request, received_at, waiter):
+        del self._iq_request_backlog[waiter]
+        if waiter.cancelled():
+            return
+        try:
+            task = waiter.result()
+        except Exception:
+            self._logger.exception("failed to start IQ request handler")
+            response = request.make_reply(type_=structs.IQType.ERROR)
+            response.error = stanza.Error(
+                condition=(namespaces.stanzas, "internal-server-error"),
+                type_=structs.ErrorType.CANCEL,
+            )
+            self.enqueue(response)
+            return
+        self._iq_request_started(request, received_at, task)
+
+    def _iq_request_started(self, request, received_at, task):
+        started_at = self._loop.time()
+        self._get_iq_request_statistics(request)._record_queue_wait(
+            started_at - received_at
+        )
+        task.add_done_callback(
+            functools.partial(
+                self._iq_request_coro_done,
+                request,
+                started_at,
+            )
+        )
+        self._iq_request_tasks.append(task)
+        self._logger.debug("started task to handle request: %r", task)
+
+    def _iq_request_coro_done(self, request, started_at, task):
         """
         Called when an IQ request handler coroutine returns. `request` holds
-        the IQ request which triggered the excecution of the coroutine and
+        the IQ request which triggered the excecution of the coroutine,
+        `started_at` the loop time at which the coroutine was started and
         `task` is the :class:`asyncio.Task` which tracks the running coroutine.
 
         Compose a response and send that response.
         """
         self._iq_request_tasks.remove(task)
+        self._get_iq_request_statistics(request)._record_handler_latency(
+            self._loop.time() - started_at
+        )
         try:
             payload = task.result()
         except errors.XMPPError as err:
@@ -899,13 +1326,7 @@ class StanzaStream:
                 self.enqueue(response)
                 return
 
-            task = asyncio.async(coro(stanza_obj))
-            task.add_done_callback(
-                functools.partial(
-                    self._iq_request_coro_done,
-                    stanza_obj))
-            self._iq_request_tasks.append(task)
-            self._logger.debug("started task to handle request: %r", task)
+            self._spawn_iq_request_handler(coro, stanza_obj)
 
     def _process_incoming_message(self, stanza_obj):
         """
@@ -1017,8 +1438,10 @@ class StanzaStream:
             if self._next_ping_event_type == PingEventType.TIMEOUT:
                 self._logger.debug("resetting ping timeout")
                 self._next_ping_event_type = PingEventType.SEND_OPPORTUNISTIC
-                self._next_ping_event_at = (datetime.utcnow() +
-                                            self.ping_interval)
+                self._next_ping_event_at = (
+                    self._loop.time() +
+                    self.ping_interval.total_seconds()
+                )
             return
         elif isinstance(stanza_obj, nonza.SMRequest):
             self._logger.debug("received SM request: %r", stanza_obj)
@@ -1053,6 +1476,26 @@ class StanzaStream:
         elif isinstance(stanza_obj, stanza.Presence):
             self._process_incoming_presence(stanza_obj)
 
+    def _process_incoming_batch(self, xmlstream, queue_entry):
+        """
+        Process the `queue_entry` with :meth:`_process_incoming` and also any
+        other entry which is currently in the incoming queue, but at most
+        :attr:`incoming_batch_budget` entries in total.
+        """
+
+        self._process_incoming(xmlstream, queue_entry)
+        nprocessed = 1
+        budget = self.incoming_batch_budget
+        while nprocessed < budget:
+            try:
+                queue_entry = self._incoming_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            self._process_incoming(xmlstream, queue_entry)
+            nprocessed += 1
+
+        self._incoming_batch_sizes[nprocessed] += 1
+
     def flush_incoming(self):
         """
         Flush all incoming queues to the respective processing methods. The
@@ -1111,7 +1554,7 @@ class StanzaStream:
                            stanza_obj)
 
         try:
-            xmlstream.send_xso(stanza_obj)
+            nbytes = xmlstream.send_xso(stanza_obj)
         except Exception as exc:
             self._logger.warning("failed to send stanza", exc_info=True)
             token._set_state(StanzaState.FAILED, exc)
@@ -1119,7 +1562,8 @@ class StanzaStream:
 
         if self._sm_enabled:
             token._set_state(StanzaState.SENT)
-            self._sm_unacked_list.append(token)
+            self._sm_unacked_queue.append((token, nbytes))
+            self._sm_unacked_bytes += nbytes
         else:
             token._set_state(StanzaState.SENT_WITHOUT_SM)
 
@@ -1132,8 +1576,8 @@ class StanzaStream:
         """
 
         self._send_stanza(xmlstream, token)
-        # try to send a bulk
-        while True:
+        # try to send a bulk, unless the transport asks us to stop
+        while not self._writing_paused:
             try:
                 token = self._active_queue.get_nowait()
             except asyncio.QueueEmpty:
@@ -1152,7 +1596,9 @@ class StanzaStream:
         if self._next_ping_event_type != PingEventType.TIMEOUT:
             return
         self._next_ping_event_type = PingEventType.SEND_OPPORTUNISTIC
-        self._next_ping_event_at = datetime.utcnow() + self.ping_interval
+        self._next_ping_event_at = (
+            self._loop.time() + self.ping_interval.total_seconds()
+        )
 
     def _send_ping(self, xmlstream):
         """
@@ -1187,7 +1633,9 @@ class StanzaStream:
 
         if self._next_ping_event_type != PingEventType.TIMEOUT:
             self._logger.debug("configuring ping timeout")
-            self._next_ping_event_at = datetime.utcnow() + self.ping_interval
+            self._next_ping_event_at = (
+                self._loop.time() + self.ping_interval.total_seconds()
+            )
             self._next_ping_event_type = PingEventType.TIMEOUT
 
     def _process_ping_event(self, xmlstream):
@@ -1196,7 +1644,8 @@ class StanzaStream:
         """
         if self._next_ping_event_type == PingEventType.SEND_OPPORTUNISTIC:
             self._logger.debug("ping: opportunistic interval started")
-            self._next_ping_event_at += self.ping_opportunistic_interval
+            self._next_ping_event_at += \
+                self.ping_opportunistic_interval.total_seconds()
             self._next_ping_event_type = PingEventType.SEND_NOW
             # ping send opportunistic is always true for sm
             if not self._sm_enabled:
@@ -1647,6 +2096,12 @@ class StanzaStream:
         self._xmlstream_failure_token = xmlstream.on_closing.connect(
             self._xmlstream_failed
         )
+        self._xmlstream_paused_token = xmlstream.on_writing_paused.connect(
+            self._xmlstream_writing_paused
+        )
+        self._xmlstream_resumed_token = xmlstream.on_writing_resumed.connect(
+            self._xmlstream_writing_resumed
+        )
 
         xmlstream.stanza_parser.add_class(stanza.IQ, receiver)
         xmlstream.stanza_parser.add_class(stanza.Message, receiver)
@@ -1676,6 +2131,14 @@ class StanzaStream:
         xmlstream.on_closing.disconnect(
             self._xmlstream_failure_token
         )
+        xmlstream.on_writing_paused.disconnect(
+            self._xmlstream_paused_token
+        )
+        xmlstream.on_writing_resumed.disconnect(
+            self._xmlstream_resumed_token
+        )
+        # the next stream starts with an empty transport
+        self._xmlstream_writing_resumed()
 
     def _start_commit(self, xmlstream):
         if not self._established:
@@ -1686,7 +2149,9 @@ class StanzaStream:
         self._task.add_done_callback(self._done_handler)
         self._logger.debug("broker task started as %r", self._task)
 
-        self._next_ping_event_at = datetime.utcnow() + self.ping_interval
+        self._next_ping_event_at = (
+            self._loop.time() + self.ping_interval.total_seconds()
+        )
         self._next_ping_event_type = PingEventType.SEND_OPPORTUNISTIC
         self._ping_send_opportunistic = self._sm_enabled
 
@@ -1793,57 +2258,61 @@ class StanzaStream:
     @asyncio.coroutine
     def _run(self, xmlstream):
         self._xmlstream = xmlstream
-        active_fut = asyncio.async(self._active_queue.get(),
-                                   loop=self._loop)
-        incoming_fut = asyncio.async(self._incoming_queue.get(),
-                                     loop=self._loop)
+        wakeup = self._broker_wakeup
+        ping_handle = None
+        ping_handle_at = None
 
         try:
             while True:
-                timeout = self._next_ping_event_at - datetime.utcnow()
-                if timeout.total_seconds() < 0:
-                    timeout = timedelta()
-
-                done, pending = yield from asyncio.wait(
-                    [
-                        active_fut,
-                        incoming_fut,
-                    ],
-                    return_when=asyncio.FIRST_COMPLETED,
-                    timeout=timeout.total_seconds())
+                # the wakeup event is set whenever something is put into one
+                # of the queues and by the timer handle for the next ping
+                # event; as no other coroutine can run between clearing the
+                # event and checking the conditions, no wakeup can be missed
+                wakeup.clear()
+                if ((not self._active_queue or self._writing_paused) and
+                        not self._incoming_queue and
+                        self._next_ping_event_at > self._loop.time()):
+                    if ping_handle_at != self._next_ping_event_at:
+                        if ping_handle is not None:
+                            ping_handle.cancel()
+                        ping_handle_at = self._next_ping_event_at
+                        ping_handle = self._loop.call_at(ping_handle_at,
+                                                         wakeup.set)
+                    yield from wakeup.wait()
+                else:
+                    # there is still work to do, but other tasks (such as
+                    # stanza handlers and senders) must get a chance to run
+                    # between batches
+                    yield from asyncio.sleep(0)
 
                 with (yield from self._broker_lock):
-                    if active_fut in done:
-                        self._process_outgoing(xmlstream, active_fut.result())
-                        active_fut = asyncio.async(
-                            self._active_queue.get(),
-                            loop=self._loop)
-
-                    if incoming_fut in done:
-                        self._process_incoming(xmlstream,
-                                               incoming_fut.result())
-                        incoming_fut = asyncio.async(
-                            self._incoming_queue.get(),
-                            loop=self._loop)
-
-                    timeout = self._next_ping_event_at - datetime.utcnow()
-                    if timeout.total_seconds() <= 0:
+                    if not self._writing_paused:
+                        try:
+                            token = self._active_queue.get_nowait()
+                        except asyncio.QueueEmpty:
+                            self._wake_drain_waiters()
+                        else:
+                            self._process_outgoing(xmlstream, token)
+                            if (not self._writing_paused and
+                                    not self._active_queue):
+                                self._wake_drain_waiters()
+
+                    try:
+                        queue_entry = self._incoming_queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        pass
+                    else:
+                        self._process_incoming_batch(xmlstream, queue_entry)
+
+                    if self._next_ping_event_at <= self._loop.time():
                         self._process_ping_event(xmlstream)
 
         finally:
-            # make sure we rescue any stanzas which possibly have already been
-            # caught by the calls to get()
-            self._logger.debug("task terminating, rescuing stanzas and "
-                               "clearing handlers")
-            if incoming_fut.done() and not incoming_fut.exception():
-                self._incoming_queue.putleft_nowait(incoming_fut.result())
-            else:
-                incoming_fut.cancel()
-
-            if active_fut.done() and not active_fut.exception():
-                self._active_queue.putleft_nowait(active_fut.result())
-            else:
-                active_fut.cancel()
+            # stanzas are only taken from the queues while they are being
+            # processed, so there is nothing to rescue here
+            self._logger.debug("task terminating, clearing handlers")
+            if ping_handle is not None:
+                ping_handle.cancel()
 
             # we also lock shutdown, because the main race is among the SM
             # variables
@@ -1913,6 +2382,42 @@ class StanzaStream:
 
     enqueue_stanza = enqueue
 
+    @asyncio.coroutine
+    def drain(self):
+        """
+        Wait until the outbound queue has been handed to the XML stream.
+
+        This returns as soon as the queue of stanzas waiting to be sent is
+        empty and the transport of the XML stream is not above its
+        high-water mark (see :attr:`writing_paused`). It also returns when the
+        stream state is destroyed, in which case the remaining stanzas have
+        been discarded.
+
+        Applications which send many stanzas with :meth:`enqueue` should call
+        this regularly, so that stanzas do not pile up in memory faster than
+        the peer accepts them:
+
+        .. code-block:: python
+
+           for i, msg in enumerate(messages):
+               stream.enqueue(msg)
+               if i % 100 == 99:
+                   yield from stream.drain()
+
+        This relies on the transport pausing the protocol when its write
+        buffer is full. The transports used by the connectors in
+        :mod:`aioxmpp.connector` do so; with a transport which never pauses
+        writing (such as the one of :mod:`aioopenssl`), this only waits until
+        the queue is empty.
+
+        .. versionadded:: 0.9
+        """
+        if not self._writing_paused and not self._active_queue:
+            return
+        fut = asyncio.Future(loop=self._loop)
+        self._drain_waiters.append(fut)
+        yield from fut
+
     @property
     def running(self):
         """
@@ -1977,7 +2482,8 @@ class StanzaStream:
 
             self._sm_outbound_base = 0
             self._sm_inbound_ctr = 0
-            self._sm_unacked_list = []
+            self._sm_unacked_queue = collections.deque()
+            self._sm_unacked_bytes = 0
             self._sm_enabled = True
             self._sm_id = response.id_
             self._sm_resumable = response.resume
@@ -2060,7 +2566,49 @@ class StanzaStream:
 
         if not self.sm_enabled:
             raise RuntimeError("Stream Management not enabled")
-        return self._sm_unacked_list[:]
+        return [token for token, _ in self._sm_unacked_queue]
+
+    @property
+    def sm_unacked_count(self):
+        """
+        The number of stanzas which have not yet been acked by the remote
+        party.
+
+        In contrast to ``len(sm_unacked_list)``, this is cheap to access and
+        thus suitable for monitoring.
+
+        .. note::
+
+           Accessing this attribute when :attr:`sm_enabled` is :data:`False`
+           raises :class:`RuntimeError`.
+
+        .. versionadded:: 0.9
+        """
+
+        if not self.sm_enabled:
+            raise RuntimeError("Stream Management not enabled")
+        return len(self._sm_unacked_queue)
+
+    @property
+    def sm_unacked_bytes(self):
+        """
+        The number of bytes the stanzas which have not yet been acked by the
+        remote party took up in the XML stream(s) they were sent over.
+
+        This is only accurate if the XML stream reports the number of bytes
+        sent (see :meth:`aioxmpp.protocol.XMLStream.send_xso`).
+
+        .. note::
+
+           Accessing this attribute when :attr:`sm_enabled` is :data:`False`
+           raises :class:`RuntimeError`.
+
+        .. versionadded:: 0.9
+        """
+
+        if not self.sm_enabled:
+            raise RuntimeError("Stream Management not enabled")
+        return self._sm_unacked_bytes
 
     @property
     def sm_max(self):
@@ -2138,9 +2686,10 @@ class StanzaStream:
         # remove any acked stanzas
         self.sm_ack(remote_ctr)
         # reinsert the remaining stanzas
-        for token in self._sm_unacked_list:
+        for token, _ in self._sm_unacked_queue:
             self._active_queue.putleft_nowait(token)
-        self._sm_unacked_list.clear()
+        self._sm_unacked_queue.clear()
+        self._sm_unacked_bytes = 0
 
     @asyncio.coroutine
     def resume_sm(self, xmlstream):
@@ -2213,9 +2762,10 @@ class StanzaStream:
         self._sm_enabled = False
         del self._sm_outbound_base
         del self._sm_inbound_ctr
-        for token in self._sm_unacked_list:
+        for token, _ in self._sm_unacked_queue:
             token._set_state(StanzaState.SENT_WITHOUT_SM)
-        del self._sm_unacked_list
+        del self._sm_unacked_queue
+        del self._sm_unacked_bytes
 
         self._destroy_stream_state(ConnectionError(
             "stream management disabled"
@@ -2255,9 +2805,10 @@ class StanzaStream:
 
         self._logger.debug("sm_ack(%d)", remote_ctr)
         to_drop = (remote_ctr - self._sm_outbound_base) & 0xffffffff
+        unacked = self._sm_unacked_queue
         self._logger.debug("sm_ack: to drop %d, unacked: %d",
-                           to_drop, len(self._sm_unacked_list))
-        if to_drop > len(self._sm_unacked_list):
+                           to_drop, len(unacked))
+        if to_drop > len(unacked):
             raise errors.StreamNegotiationFailure(
                 "acked more stanzas than have been sent "
                 "(outbound_base={}, remote_ctr={})".format(
@@ -2266,13 +2817,13 @@ class StanzaStream:
                 )
             )
 
-        acked = self._sm_unacked_list[:to_drop]
-        del self._sm_unacked_list[:to_drop]
         self._sm_outbound_base = remote_ctr
 
-        if acked:
-            self._logger.debug("%d stanzas acked by remote", len(acked))
-        for token in acked:
+        if to_drop:
+            self._logger.debug("%d stanzas acked by remote", to_drop)
+        for _ in range(to_drop):
+            token, nbytes = unacked.popleft()
+            self._sm_unacked_bytes -= nbytes
             token._set_state(StanzaState.ACKED)
 
     @asyncio.coroutine
@@ -2360,6 +2911,10 @@ class StanzaStream:
         `timeout` seconds, :class:`TimeoutError` (not
         :class:`asyncio.TimeoutError`!) is raised.
 
+        While the transport of the XML stream is above its high-water mark
+        (see :attr:`writing_paused`), stanzas are held back in the queue and
+        this method waits until the stanza could be handed to the XML stream.
+
         .. warning::
 
            Setting a timeout is recommended for IQ requests. If the IQ is sent
@@ -2370,6 +2925,10 @@ class StanzaStream:
            to be fixed at some point.
 
         .. versionadded:: 0.8
+
+        .. versionchanged:: 0.9
+
+           Stanzas are held back while the transport is paused.
         """
         stanza.autoset_id()
         self._logger.debug("sending %r and waiting for it to be sent",
@@ -31,17 +31,54 @@ This module implements the Nodeprep (`RFC 6122`_) and Resourceprep (`RFC 6122`_)
 
 .. autofunction:: nameprep
 
+The results of the profiles are cached in a process-wide cache, as the same
+few strings are prepared over and over again. Strings consisting only of ASCII
+characters which are left alone by the profiles (except for case folding) skip
+the cache and the table lookups altogether.
+
+On a cache miss, the profiles use mapping and classification tables which are
+filled on first use of each code point (and bounded in size), so that a string
+is checked in a single pass, instead of testing each character against each of
+the stringprep tables.
+
+.. autofunction:: set_cache_size
+
+.. autofunction:: cache_info
+
 .. _RFC 3454: https://tools.ietf.org/html/rfc3454
 .. _RFC 6122: https://tools.ietf.org/html/rfc6122
 
 """
 
+import re
 import stringprep
 import unicodedata
 
+from .cache import LRUDict
+
 _nodeprep_prohibited = frozenset("\"&'/:<>@")
 
 
+def _ascii_class(first, last, exclude=frozenset()):
+    return "[{}]*".format(re.escape("".join(
+        chr(c) for c in range(first, last + 1)
+        if chr(c) not in exclude
+    )))
+
+
+# strings matching these consist only of ASCII characters which are neither
+# mapped (except for case folding), nor prohibited by the respective profile
+_nodeprep_ascii_re = re.compile(_ascii_class(0x21, 0x7e, _nodeprep_prohibited))
+_resourceprep_ascii_re = re.compile(_ascii_class(0x20, 0x7e))
+_nameprep_ascii_re = re.compile(_ascii_class(0x20, 0x7e))
+
+DEFAULT_CACHE_SIZE = 4096
+
+_nodeprep_cache = LRUDict(DEFAULT_CACHE_SIZE)
+_resourceprep_cache = LRUDict(DEFAULT_CACHE_SIZE)
+_nameprep_cache = LRUDict(DEFAULT_CACHE_SIZE)
+
+
 def is_RandALCat(c):
     return unicodedata.bidirectional(c) in ("R", "AL")
 
@@ -131,17 +168,182 @@ def check_unassigned(chars, bad_tables):
                          "U+{:04x}".format(ord(violator)))
 
 
-def _nodeprep_do_mapping(chars):
-    i = 0
-    while i < len(chars):
-        c = chars[i]
+# table-driven implementation of the profiles: instead of checking each
+# character against each of the stringprep tables, the mappings and the
+# classification of each code point are computed once on first use and stored
+# in dictionaries; the profiles then need one str.translate call (mapping) and
+# one dictionary lookup per character (checks) after normalization.
+
+_CLS_PROHIBITED_NODEPREP = 0x01
+_CLS_PROHIBITED_RESOURCEPREP = 0x02
+_CLS_PROHIBITED_NAMEPREP = 0x04
+_CLS_UNASSIGNED = 0x08
+_CLS_RANDAL = 0x10
+_CLS_L = 0x20
+
+_NODEPREP_PROHIBITED_TABLES = (
+    stringprep.in_table_c11,
+    stringprep.in_table_c12,
+    stringprep.in_table_c21,
+    stringprep.in_table_c22,
+    stringprep.in_table_c3,
+    stringprep.in_table_c4,
+    stringprep.in_table_c5,
+    stringprep.in_table_c6,
+    stringprep.in_table_c7,
+    stringprep.in_table_c8,
+    stringprep.in_table_c9,
+    lambda x: x in _nodeprep_prohibited
+)
+
+_RESOURCEPREP_PROHIBITED_TABLES = (
+    stringprep.in_table_c12,
+    stringprep.in_table_c21,
+    stringprep.in_table_c22,
+    stringprep.in_table_c3,
+    stringprep.in_table_c4,
+    stringprep.in_table_c5,
+    stringprep.in_table_c6,
+    stringprep.in_table_c7,
+    stringprep.in_table_c8,
+    stringprep.in_table_c9,
+)
+
+_NAMEPREP_PROHIBITED_TABLES = (
+    stringprep.in_table_c12,
+    stringprep.in_table_c22,
+    stringprep.in_table_c3,
+    stringprep.in_table_c4,
+    stringprep.in_table_c5,
+    stringprep.in_table_c6,
+    stringprep.in_table_c7,
+    stringprep.in_table_c8,
+    stringprep.in_table_c9,
+)
+
+
+# the tables are filled from strings supplied by peers; to keep them from
+# growing towards the full code point range, they start over when full
+_TABLE_MAXSIZE = 4096
+
+
+class _LazyTable(dict):
+    def __missing__(self, key):
+        result = self._compute(key)
+        if len(self) >= _TABLE_MAXSIZE:
+            self.clear()
+        self[key] = result
+        return result
+
+
+class _CaseFoldingMap(_LazyTable):
+    # str.translate table for the B.1 and B.2 mappings of nodeprep and
+    # nameprep
+    def _compute(self, codepoint):
+        c = chr(codepoint)
         if stringprep.in_table_b1(c):
-            del chars[i]
-        else:
-            replacement = stringprep.map_table_b2(c)
-            if replacement != c:
-                chars[i:(i + 1)] = list(replacement)
-            i += len(replacement)
+            return None
+        result = stringprep.map_table_b2(c)
+        if result == c:
+            return codepoint
+        return result
+
+
+class _NoCaseFoldingMap(_LazyTable):
+    # str.translate table for the B.1 mapping of resourceprep
+    def _compute(self, codepoint):
+        if stringprep.in_table_b1(chr(codepoint)):
+            return None
+        return codepoint
+
+
+class _Classification(_LazyTable):
+    # maps characters to a bitmask of _CLS_* flags
+    def _compute(self, c):
+        result = 0
+        if any(in_table(c) for in_table in _NODEPREP_PROHIBITED_TABLES):
+            result |= _CLS_PROHIBITED_NODEPREP
+        if any(in_table(c) for in_table in _RESOURCEPREP_PROHIBITED_TABLES):
+            result |= _CLS_PROHIBITED_RESOURCEPREP
+        if any(in_table(c) for in_table in _NAMEPREP_PROHIBITED_TABLES):
+            result |= _CLS_PROHIBITED_NAMEPREP
+        if stringprep.in_table_a1(c):
+            result |= _CLS_UNASSIGNED
+        if is_RandALCat(c):
+            result |= _CLS_RANDAL
+        elif is_LCat(c):
+            result |= _CLS_L
+        return result
+
+
+_case_folding_map = _CaseFoldingMap()
+_no_case_folding_map = _NoCaseFoldingMap()
+_classification = _Classification()
+
+
+def _check_with_tables(string, prohibited_flag, allow_unassigned):
+    """
+    Check the normalized `string` against the prohibited output (as
+    selected by `prohibited_flag`), bidi and unassigned code point rules in a
+    single pass.
+
+    The errors are the same (and reported with the same precedence) as with
+    :func:`check_prohibited_output`, :func:`check_bidi` and
+    :func:`check_unassigned`.
+    """
+
+    classification = _classification
+    all_flags = 0
+    unassigned = None
+    for c in string:
+        flags = classification[c]
+        if flags & prohibited_flag:
+            raise ValueError("Input contains invalid unicode codepoint: "
+                             "U+{:04x}".format(ord(c)))
+        if flags & _CLS_UNASSIGNED and unassigned is None:
+            unassigned = c
+        all_flags |= flags
+
+    if all_flags & _CLS_RANDAL:
+        if all_flags & _CLS_L:
+            raise ValueError("L and R/AL characters must not occur in the same"
+                             " string")
+        if (not classification[string[0]] & _CLS_RANDAL or
+                not classification[string[-1]] & _CLS_RANDAL):
+            raise ValueError("R/AL string must start and end with R/AL "
+                             "character.")
+
+    if unassigned is not None and not allow_unassigned:
+        raise ValueError("Input contains unassigned code point: "
+                         "U+{:04x}".format(ord(unassigned)))
+
+
+def _nodeprep_tables(string, allow_unassigned):
+    string = unicodedata.normalize(
+        "NFKC",
+        string.translate(_case_folding_map)
+    )
+    _check_with_tables(string, _CLS_PROHIBITED_NODEPREP, allow_unassigned)
+    return string
+
+
+def _resourceprep_tables(string, allow_unassigned):
+    string = unicodedata.normalize(
+        "NFKC",
+        string.translate(_no_case_folding_map)
+    )
+    _check_with_tables(string, _CLS_PROHIBITED_RESOURCEPREP,
+                       allow_unassigned)
+    return string
+
+
+def _nameprep_tables(string, allow_unassigned):
+    string = unicodedata.normalize(
+        "NFKC",
+        string.translate(_case_folding_map)
+    )
+    _check_with_tables(string, _CLS_PROHIBITED_NAMEPREP, allow_unassigned)
+    return string
 
 
 def nodeprep(string, allow_unassigned=False):
@@ -151,46 +353,15 @@ def nodeprep(string, allow_unassigned=False):
     raised.
     """
 
-    chars = list(string)
-    _nodeprep_do_mapping(chars)
-    do_normalization(chars)
-    check_prohibited_output(
-        chars,
-        (
-            stringprep.in_table_c11,
-            stringprep.in_table_c12,
-            stringprep.in_table_c21,
-            stringprep.in_table_c22,
-            stringprep.in_table_c3,
-            stringprep.in_table_c4,
-            stringprep.in_table_c5,
-            stringprep.in_table_c6,
-            stringprep.in_table_c7,
-            stringprep.in_table_c8,
-            stringprep.in_table_c9,
-            lambda x: x in _nodeprep_prohibited
-        ))
-    check_bidi(chars)
-
-    if not allow_unassigned:
-        check_unassigned(
-            chars,
-            (
-                stringprep.in_table_a1,
-            )
-        )
-
-    return "".join(chars)
-
-
-def _resourceprep_do_mapping(chars):
-    i = 0
-    while i < len(chars):
-        c = chars[i]
-        if stringprep.in_table_b1(c):
-            del chars[i]
-            continue
-        i += 1
+    if _nodeprep_ascii_re.fullmatch(string):
+        return string.lower()
+
+    key = string, allow_unassigned
+    result = _nodeprep_cache.lookup(key)
+    if result is None:
+        result = _nodeprep_tables(string, allow_unassigned)
+        _nodeprep_cache[key] = result
+    return result
 
 
 def resourceprep(string, allow_unassigned=False):
@@ -200,34 +371,15 @@ def resourceprep(string, allow_unassigned=False):
     is raised.
     """
 
-    chars = list(string)
-    _resourceprep_do_mapping(chars)
-    do_normalization(chars)
-    check_prohibited_output(
-        chars,
-        (
-            stringprep.in_table_c12,
-            stringprep.in_table_c21,
-            stringprep.in_table_c22,
-            stringprep.in_table_c3,
-            stringprep.in_table_c4,
-            stringprep.in_table_c5,
-            stringprep.in_table_c6,
-            stringprep.in_table_c7,
-            stringprep.in_table_c8,
-            stringprep.in_table_c9,
-        ))
-    check_bidi(chars)
-
-    if not allow_unassigned:
-        check_unassigned(
-            chars,
-            (
-                stringprep.in_table_a1,
-            )
-        )
-
-    return "".join(chars)
+    if _resourceprep_ascii_re.fullmatch(string):
+        return string
+
+    key = string, allow_unassigned
+    result = _resourceprep_cache.lookup(key)
+    if result is None:
+        result = _resourceprep_tables(string, allow_unassigned)
+        _resourceprep_cache[key] = result
+    return result
 
 
 def nameprep(string, allow_unassigned=False):
@@ -237,30 +389,46 @@ def nameprep(string, allow_unassigned=False):
     raised.
     """
 
-    chars = list(string)
-    _nodeprep_do_mapping(chars)
-    do_normalization(chars)
-    check_prohibited_output(
-        chars,
-        (
-            stringprep.in_table_c12,
-            stringprep.in_table_c22,
-            stringprep.in_table_c3,
-            stringprep.in_table_c4,
-            stringprep.in_table_c5,
-            stringprep.in_table_c6,
-            stringprep.in_table_c7,
-            stringprep.in_table_c8,
-            stringprep.in_table_c9,
-        ))
-    check_bidi(chars)
-
-    if not allow_unassigned:
-        check_unassigned(
-            chars,
-            (
-                stringprep.in_table_a1,
-            )
-        )
-
-    return "".join(chars)
+    if _nameprep_ascii_re.fullmatch(string):
+        return string.lower()
+
+    key = string, allow_unassigned
+    result = _nameprep_cache.lookup(key)
+    if result is None:
+        result = _nameprep_tables(string, allow_unassigned)
+        _nameprep_cache[key] = result
+    return result
+
+
+def set_cache_size(maxsize):
+    """
+    Set the maximum number of entries in each of the caches of the stringprep
+    profiles.
+
+    :param maxsize: Maximum number of entries per profile.
+    :type maxsize: non-negative :class:`int`
+
+    A `maxsize` of zero disables the caches.
+
+    .. versionadded:: 0.9
+    """
+    _nodeprep_cache.maxsize = maxsize
+    _resourceprep_cache.maxsize = maxsize
+    _nameprep_cache.maxsize = maxsize
+
+
+def cache_info():
+    """
+    Return the statistics of the caches of the stringprep profiles.
+
+    :return: A dictionary mapping the profile names (``"nodeprep"``,
+        ``"resourceprep"`` and ``"nameprep"``) to
+        :class:`~aioxmpp.cache.CacheInfo` instances.
+
+    .. versionadded:: 0.9
+    """
+    return {
+        "nodeprep": _nodeprep_cache.cache_info(),
+        "resourceprep": _resourceprep_cache.cache_info(),
+        "nameprep": _nameprep_cache.cache_info(),
+    }
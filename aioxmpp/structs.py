@@ -76,9 +76,13 @@ import enum
 import functools
 import warnings
 
+from .cache import LRUDict
 from .stringprep import nodeprep, resourceprep, nameprep
 
 
+_jid_cache = LRUDict(4096)
+
+
 _USE_COMPAT_ENUM = True
 
 
@@ -605,6 +609,12 @@ class JID(collections.namedtuple("JID", ["localpart", "domain", "resource"])):
 
     .. automethod:: fromstr
 
+    .. automethod:: from_prepared
+
+    .. automethod:: set_cache_size
+
+    .. automethod:: cache_info
+
     Information about a JID:
 
     .. attribute:: localpart
@@ -629,9 +639,33 @@ class JID(collections.namedtuple("JID", ["localpart", "domain", "resource"])):
     .. automethod:: bare
 
     .. automethod:: replace(*, [localpart], [domain], [resource])
+
+    .. versionchanged:: 0.9
+
+       The string form and the bare form of a JID are computed only once per
+       object.
     """
 
-    __slots__ = []
+    # no __slots__: the instance dictionary holds the memoised string and bare
+    # forms; it is only written to directly, as __setattr__ is blocked
+
+    def __setattr__(self, name, value):
+        raise AttributeError(
+            "{!r} object attribute {!r} is read-only".format(
+                type(self).__name__, name
+            )
+        )
+
+    def __delattr__(self, name):
+        raise AttributeError(
+            "{!r} object attribute {!r} is read-only".format(
+                type(self).__name__, name
+            )
+        )
+
+    def __getstate__(self):
+        # the memoised values are recomputed on demand
+        return None
 
     def __new__(cls, localpart, domain, resource, *, strict=True):
         if localpart:
@@ -719,21 +753,72 @@ class JID(collections.namedtuple("JID", ["localpart", "domain", "resource"])):
                             " {!r}".format(
                                 next(iter(kwargs))))
 
+        if new_kwargs == {"resource": None}:
+            return self.bare()
+
         return super()._replace(**new_kwargs)
 
+    @classmethod
+    def from_prepared(cls, localpart, domain, resource):
+        """
+        Construct a :class:`JID` from parts which have already been prepared.
+
+        :param localpart: The localpart or :data:`None`.
+        :param domain: The domain.
+        :param resource: The resource or :data:`None`.
+
+        In contrast to the constructor, the parts are neither passed through
+        stringprep nor checked for their length. This is intended for deriving
+        JIDs from the parts of other :class:`JID` objects (which are prepared
+        already) in hot paths.
+
+        .. warning::
+
+           Passing parts which have not been prepared results in
+           :class:`JID` objects which do not compare equal to the same JIDs
+           created by other means. Do not use this with data received from
+           the outside.
+
+        .. versionadded:: 0.9
+        """
+        return tuple.__new__(cls, (localpart, domain, resource))
+
     def __str__(self):
+        memo = self.__dict__
+        try:
+            return memo["_str"]
+        except KeyError:
+            pass
+
         result = self.domain
         if self.localpart:
             result = self.localpart + "@" + result
         if self.resource:
             result += "/" + self.resource
+        memo["_str"] = result
         return result
 
     def bare(self):
         """
         Return the bare version of this JID as new :class:`JID` object.
+
+        .. versionchanged:: 0.9
+
+           If the JID is already bare, it is returned unchanged. Otherwise,
+           the same bare :class:`JID` object is returned on each call.
         """
-        return self.replace(resource=None)
+        if self.resource is None:
+            return self
+
+        memo = self.__dict__
+        try:
+            return memo["_bare"]
+        except KeyError:
+            pass
+
+        result = self.from_prepared(self.localpart, self.domain, None)
+        memo["_bare"] = result
+        return result
 
     @property
     def is_bare(self):
@@ -756,7 +841,26 @@ class JID(collections.namedtuple("JID", ["localpart", "domain", "resource"])):
         """
         Obtain a :class:`JID` object by parsing a JID from the given string
         `s`.
+
+        .. versionchanged:: 0.9
+
+           The results are cached in a process-wide cache (see
+           :meth:`set_cache_size`). As :class:`JID` objects are immutable,
+           this is transparent, except that the same string may yield the
+           identical object on subsequent calls.
         """
+        if cls is JID:
+            key = s, strict
+            result = _jid_cache.lookup(key)
+            if result is None:
+                result = cls._fromstr(s, strict)
+                _jid_cache[key] = result
+            return result
+
+        return cls._fromstr(s, strict)
+
+    @classmethod
+    def _fromstr(cls, s, strict):
         localpart, sep, domain = s.partition("@")
         if not sep:
             domain = localpart
@@ -767,6 +871,33 @@ class JID(collections.namedtuple("JID", ["localpart", "domain", "resource"])):
             resource = None
         return cls(localpart, domain, resource, strict=strict)
 
+    @staticmethod
+    def set_cache_size(maxsize):
+        """
+        Set the maximum number of entries in the cache used by
+        :meth:`fromstr`.
+
+        :param maxsize: Maximum number of cached JIDs.
+        :type maxsize: non-negative :class:`int`
+
+        A `maxsize` of zero disables the cache. The caches of the stringprep
+        profiles are configured separately, see
+        :func:`aioxmpp.stringprep.set_cache_size`.
+
+        .. versionadded:: 0.9
+        """
+        _jid_cache.maxsize = maxsize
+
+    @staticmethod
+    def cache_info():
+        """
+        Return the statistics of the cache used by :meth:`fromstr` as
+        :class:`aioxmpp.cache.CacheInfo`.
+
+        .. versionadded:: 0.9
+        """
+        return _jid_cache.cache_info()
+
 
 @functools.total_ordering
 class PresenceShow(CompatibilityMixin, enum.Enum):
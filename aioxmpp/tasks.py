@@ -26,6 +26,9 @@
 .. autoclass:: TaskPool
 """
 import asyncio
+import functools
+import heapq
+import itertools
 import logging
 
 
@@ -35,6 +38,8 @@ class TaskPool:
 
     :param max_tasks: Maximum number of total coroutines running in the pool.
     :type max_tasks: positive :class:`int` or :data:`None`
+    :param default_limit: Limit for groups for which no limit has been set.
+    :type default_limit: positive :class:`int` or :data:`None`
     :param logger: Logger to use for diagnostics, defaults to a module-wide
                    logger
 
@@ -47,6 +52,10 @@ class TaskPool:
     coroutine is running in that group, it is the limit on the total number of
     coroutines running in the pool.
 
+    `default_limit` is used as limit for all groups except ``()`` for which no
+    limit has been set explicitly with :meth:`set_limit`. It can be changed at
+    any time through the :attr:`default_limit` attribute.
+
     When a coroutine exits (either normally or by an exception or
     cancellation), it is removed from the pool and the counters for running
     coroutines are adapted accordingly.
@@ -61,19 +70,41 @@ class TaskPool:
 
     .. automethod:: clear_limit
 
+    .. attribute:: default_limit
+
+       The limit applying to groups without an explicit limit (see above).
+
     Starting and adding coroutines:
 
     .. automethod:: spawn(group, coro_fun, *args, **kwargs)
 
+    .. automethod:: wait_and_spawn(group, coro_fun, *args, **kwargs)
+
     .. automethod:: add
+
+    .. automethod:: has_capacity
+
+    Stopping coroutines:
+
+    .. automethod:: cancel_group
+
+    .. versionchanged:: 0.9
+
+       The pool is now actually implemented; :meth:`wait_and_spawn`,
+       :meth:`has_capacity` and :meth:`cancel_group` were added.
     """
 
     def __init__(self, *, max_tasks=None, default_limit=None, logger=None):
         super().__init__()
         if logger is None:
             logger = logging.getLogger(__name__)
+        self._logger = logger
         self._group_limits = {}
         self._group_tasks = {}
+        # waiters of wait_and_spawn, filed under the group which is full for
+        # them, as heaps ordered by the time they started waiting
+        self._capacity_waiters = {}
+        self._waiter_seq = itertools.count()
         self.default_limit = default_limit
         self.set_limit((), max_tasks)
 
@@ -101,10 +132,14 @@ class TaskPool:
         :meth:`clear_limit` was called for `group`.
         """
         if new_limit is None:
-            self._group_limits.pop(group, None)
+            self.clear_limit(group)
             return
 
+        if new_limit < 0:
+            raise ValueError("limit must be non-negative")
+
         self._group_limits[group] = new_limit
+        self._wake_capacity_waiters({group})
 
     def clear_limit(self, group):
         """
@@ -116,7 +151,8 @@ class TaskPool:
         The limit on the number of tasks in `group` is removed. If the `group`
         currently has no limit, this method has no effect.
         """
-        self._group_limits.pop(group, None)
+        if self._group_limits.pop(group, None) is not None:
+            self._wake_capacity_waiters({group})
 
     def get_limit(self, group):
         """
@@ -142,7 +178,98 @@ class TaskPool:
         :return: Number of currently running tasks
         :rtype: :class:`int`
         """
-        return 0
+        return len(self._group_tasks.get(group, ()))
+
+    def _effective_limit(self, group):
+        try:
+            return self._group_limits[group]
+        except KeyError:
+            if group == ():
+                return None
+            return self.default_limit
+
+    def _full_group(self, groups):
+        for group in groups:
+            limit = self._effective_limit(group)
+            if limit is not None and self.get_task_count(group) >= limit:
+                return group
+        return None
+
+    def has_capacity(self, groups):
+        """
+        Check whether a coroutine could currently be added to the given
+        groups.
+
+        :param groups: The groups the coroutine would belong to.
+        :type groups: :class:`set` of group keys
+        :rtype: :class:`bool`
+        """
+        return self._full_group(set(groups) | {()}) is None
+
+    def _require_capacity(self, groups):
+        group = self._full_group(groups)
+        if group is not None:
+            raise RuntimeError(
+                "maximum number of tasks in group {!r} exhausted".format(
+                    group
+                )
+            )
+
+    def _register(self, groups, task):
+        for group in groups:
+            self._group_tasks.setdefault(group, set()).add(task)
+        task.add_done_callback(functools.partial(self._task_done, groups))
+
+    def _task_done(self, groups, task):
+        for group in groups:
+            tasks = self._group_tasks[group]
+            tasks.discard(task)
+            if not tasks:
+                del self._group_tasks[group]
+        self._wake_capacity_waiters(groups)
+
+    def _file_waiter(self, group, entry):
+        heapq.heappush(self._capacity_waiters.setdefault(group, []), entry)
+
+    def _wake_capacity_waiters(self, groups):
+        # start the coroutines of the waiters filed under `groups` (which may
+        # have gained capacity) in the order in which they started waiting,
+        # as long as their groups have capacity; the tasks are started right
+        # away, so that nobody else can take the slot in between
+        waiters = self._capacity_waiters
+        candidates = [group for group in groups if group in waiters]
+        while candidates:
+            group = min(candidates, key=lambda group: waiters[group][0][0])
+            queue = waiters[group]
+            entry = queue[0]
+            _, waiter_groups, fut, coro_fun = entry
+            full_group = None
+            if not fut.done():
+                full_group = self._full_group(waiter_groups)
+                if full_group == group:
+                    # everyone in this queue is blocked by the same group
+                    candidates.remove(group)
+                    continue
+
+            heapq.heappop(queue)
+            if not queue:
+                del waiters[group]
+                candidates.remove(group)
+
+            if fut.done():
+                # the waiter has been cancelled
+                continue
+
+            if full_group is not None:
+                self._file_waiter(full_group, entry)
+                continue
+
+            try:
+                task = self.spawn(waiter_groups, coro_fun)
+            except Exception as exc:
+                fut.set_exception(exc)
+            else:
+                fut.set_result(task)
 
     def add(self, groups, coro):
         """
@@ -161,6 +288,11 @@ class TaskPool:
         coroutine is not accepted into the pool and :class:`RuntimeError` is
         raised.
         """
+        groups = set(groups) | {()}
+        self._require_capacity(groups)
+        task = asyncio.async(coro)
+        self._register(groups, task)
+        return task
 
     def spawn(self, __groups, __coro_fun, *args, **kwargs):
         """
@@ -196,7 +328,86 @@ class TaskPool:
         """
         # ensure the implicit group is included
         __groups = set(__groups) | {()}
+        self._require_capacity(__groups)
+        task = asyncio.async(__coro_fun(*args, **kwargs))
+        self._register(__groups, task)
+        return task
+
+    @asyncio.coroutine
+    def wait_and_spawn(self, __groups, __coro_fun, *args, **kwargs):
+        """
+        Wait until there is capacity in the pool and start a new coroutine.
+
+        :param groups: The groups the coroutine belongs to.
+        :type groups: :class:`set` of group keys
+        :param coro_fun: Coroutine function to run
+        :param args: Positional arguments to pass to `coro_fun`
+        :param kwargs: Keyword arguments to pass to `coro_fun`
+        :rtype: :class:`asyncio.Task`
+        :return: The task in which the coroutine runs.
 
+        This works like :meth:`spawn`, except that instead of raising
+        :class:`RuntimeError`, it waits until all of the groups (and the pool
+        as a whole) have a free slot. This allows to apply backpressure to a
+        producer of coroutines.
 
+        Slots which become free (because a coroutine in the pool exits or a
+        limit is raised) are handed to the waiting callers in the order in
+        which they started waiting; the coroutine of a waiting caller is
+        started as soon as all of its groups have a free slot. A waiter which
+        is blocked by a full group does not hold back waiters in other groups.
+        If there is capacity when :meth:`wait_and_spawn` is called, the
+        coroutine is started right away, like with :meth:`spawn`.
 
-        return asyncio.async(__coro_fun(*args, **kwargs))
+        If the waiting caller is cancelled after its coroutine has been
+        started, the task is cancelled, too.
+
+        .. note::
+
+           The first two arguments can only be passed positionally, not as
+           keywords. This is to prevent conflicts with keyword arguments to
+           `coro_fun`.
+
+        """
+        groups = set(__groups) | {()}
+        full_group = self._full_group(groups)
+        if full_group is None:
+            return self.spawn(groups, __coro_fun, *args, **kwargs)
+
+        fut = asyncio.Future()
+        self._file_waiter(
+            full_group,
+            (
+                next(self._waiter_seq),
+                groups,
+                fut,
+                functools.partial(__coro_fun, *args, **kwargs),
+            )
+        )
+        try:
+            return (yield from fut)
+        except asyncio.CancelledError:
+            if (fut.done() and not fut.cancelled() and
+                    fut.exception() is None):
+                # the coroutine was started on our behalf, but nobody will
+                # ever see the task
+                fut.result().cancel()
+            raise
+
+    def cancel_group(self, group):
+        """
+        Cancel all coroutines running in the given `group`.
+
+        :param group: Group key of the group to cancel.
+        :type group: hashable
+        :return: The number of tasks which have been cancelled.
+        :rtype: :class:`int`
+
+        The tasks are removed from the pool once they have actually
+        terminated. Cancelling the group ``()`` cancels all coroutines in the
+        pool.
+        """
+        tasks = list(self._group_tasks.get(group, ()))
+        for task in tasks:
+            task.cancel()
+        return len(tasks)
@@ -32,6 +32,8 @@ import unittest.mock
 
 from datetime import timedelta
 
+import OpenSSL.crypto
+
 import aioxmpp.callbacks as callbacks
 import aioxmpp.xso as xso
 import aioxmpp.nonza as nonza
@@ -55,6 +57,38 @@ def make_protocol_mock():
     ])
 
 
+def make_self_signed_certificate(common_name="localhost"):
+    """
+    Generate a key and a self-signed certificate for `common_name`.
+
+    Return a tuple ``(cert_pem, key_pem)`` of :class:`bytes`, suitable to
+    write to files for :meth:`ssl.SSLContext.load_cert_chain`.
+    """
+    key = OpenSSL.crypto.PKey()
+    key.generate_key(OpenSSL.crypto.TYPE_RSA, 2048)
+
+    cert = OpenSSL.crypto.X509()
+    cert.set_version(2)
+    cert.get_subject().CN = common_name
+    cert.set_serial_number(1)
+    cert.gmtime_adj_notBefore(0)
+    cert.gmtime_adj_notAfter(86400)
+    cert.set_issuer(cert.get_subject())
+    cert.add_extensions([
+        OpenSSL.crypto.X509Extension(
+            b"subjectAltName", False,
+            "DNS:{}".format(common_name).encode("ascii"),
+        ),
+    ])
+    cert.set_pubkey(key)
+    cert.sign(key, "sha256")
+
+    return (
+        OpenSSL.crypto.dump_certificate(OpenSSL.crypto.FILETYPE_PEM, cert),
+        OpenSSL.crypto.dump_privatekey(OpenSSL.crypto.FILETYPE_PEM, key),
+    )
+
+
 def run_coroutine(coroutine, timeout=DEFAULT_TIMEOUT, loop=None):
     if not loop:
         loop = asyncio.get_event_loop()
@@ -596,6 +630,8 @@ class XMLStreamMock(InteractivityMock):
                                    response)
 
     on_closing = callbacks.Signal()
+    on_writing_paused = callbacks.Signal()
+    on_writing_resumed = callbacks.Signal()
 
     def __init__(self, tester, *, loop=None):
         super().__init__(tester, loop=loop)
@@ -735,6 +771,8 @@ class XMLStreamMock(InteractivityMock):
         if self._exception:
             raise self._exception
         self._queue.put_nowait(("send", obj))
+        # the mock does not serialise anything
+        return 0
 
     def reset(self):
         if self._exception:
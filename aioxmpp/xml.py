@@ -43,6 +43,8 @@ instances, the following classes and functions can be used:
 
 .. autoclass:: XMPPXMLProcessor
 
+.. autoclass:: XMPPXMLExpatProcessor
+
 .. autoclass:: XMPPLexicalHandler
 
 .. autofunction:: make_parser
@@ -66,6 +68,7 @@ import ctypes.util
 import contextlib
 import io
 
+import xml.parsers.expat as pyexpat
 import xml.sax
 import xml.sax.saxutils
 
@@ -91,6 +94,70 @@ def xmlValidateNameValue_buf(b):
     return bool(libxml2.xmlValidateNameValue(b))
 
 
+#: Maximum number of entries in each of the caches used by
+#: :class:`XMPPXMLGenerator`. The caches are cleared when they grow beyond this
+#: size.
+GENERATOR_CACHE_SIZE = 4096
+
+# localnames which have been validated with xmlValidateNameValue
+_valid_localnames = set()
+
+# maps element tags to (b"<localname", b" xmlns='uri'")
+_default_ns_start_tags = {}
+
+# maps attribute tags without namespace or in the xml namespace to their
+# qualified name
+_plain_attr_qnames = {}
+
+
+def _validate_localname(localname):
+    if localname in _valid_localnames:
+        return
+    if ":" in localname or not xmlValidateNameValue_str(localname):
+        raise ValueError("invalid name: {!r}".format(localname))
+    if len(_valid_localnames) >= GENERATOR_CACHE_SIZE:
+        _valid_localnames.clear()
+    _valid_localnames.add(localname)
+
+
+def _get_default_ns_start_tag(name):
+    try:
+        return _default_ns_start_tags[name]
+    except KeyError:
+        pass
+    _validate_localname(name[1])
+    result = (
+        b"<" + name[1].encode("utf-8"),
+        b" xmlns=" + xml.sax.saxutils.quoteattr(name[0]).encode("utf-8"),
+    )
+    if len(_default_ns_start_tags) >= GENERATOR_CACHE_SIZE:
+        _default_ns_start_tags.clear()
+    _default_ns_start_tags[name] = result
+    return result
+
+
+def _get_plain_attr_qname(name):
+    if not isinstance(name, tuple):
+        raise ValueError("names must be tuples")
+    try:
+        return _plain_attr_qnames[name]
+    except KeyError:
+        pass
+    _validate_localname(name[1])
+    if name[0] == namespaces.xml:
+        qname = "xml:" + name[1]
+    elif not name[0]:
+        qname = name[1]
+    else:
+        return None
+    if qname == "xmlns":
+        raise ValueError("xmlns not allowed as attribute name")
+    if len(_plain_attr_qnames) >= GENERATOR_CACHE_SIZE:
+        _plain_attr_qnames.clear()
+    _plain_attr_qnames[name] = qname
+    return qname
+
+
 def is_valid_cdata_str(s):
     for c in s:
         o = ord(c)
@@ -130,6 +197,18 @@ class XMPPXMLGenerator:
     default is not to do this, for performance. During testing, however, it is
     useful to have a consistent oder on the attributes.
 
+    If `use_tag_cache` is true (the default), elements which declare their own
+    namespace as default namespace (via ``startPrefixMapping(None, uri)``
+    directly before :meth:`startElementNS`) and which only carry attributes
+    without namespace or in the ``xml`` namespace are written using
+    pre-rendered, cached start tags and namespace declarations. This is the
+    case for most XSOs, as it is the default for :attr:`.xso.XSO.DECLARE_NS`.
+    The generated output is the same as without the cache.
+
+    .. versionchanged:: 0.9
+
+       The `use_tag_cache` argument was added.
+
     Implementation of the SAX content handler interface (see
     :class:`xml.sax.handler.ContentHandler`):
 
@@ -175,7 +254,8 @@ class XMPPXMLGenerator:
     """
     def __init__(self, out,
                  short_empty_elements=True,
-                 sorted_attributes=False):
+                 sorted_attributes=False,
+                 use_tag_cache=True):
         self._write = out.write
         if hasattr(out, "flush"):
             self._flush = out.flush
@@ -184,6 +264,7 @@ class XMPPXMLGenerator:
 
         self._short_empty_elements = short_empty_elements
         self._sorted_attributes = sorted_attributes
+        self._use_tag_cache = use_tag_cache
 
         # NOTE: when adding state, make sure to handle it in buffer() and to
         # add tests that buffer() handles it correctly
@@ -214,8 +295,7 @@ class XMPPXMLGenerator:
         if not isinstance(name, tuple):
             raise ValueError("names must be tuples")
 
-        if ":" in name[1] or not xmlValidateNameValue_str(name[1]):
-            raise ValueError("invalid name: {!r}".format(name[1]))
+        _validate_localname(name[1])
 
         if name[0]:
             if name[0] == "http://www.w3.org/XML/1998/namespace":
@@ -272,6 +352,12 @@ class XMPPXMLGenerator:
                 if new_uri == uri:
                     del cleared_new_prefixes[prefix]
 
+        # drop namespaces whose prefix is re-bound by the new declarations,
+        # otherwise they would be assumed to be still in scope
+        for uri, prefix in list(self._curr_ns_map.items()):
+            if prefix in new_prefixes and new_prefixes[prefix] != uri:
+                del self._curr_ns_map[uri]
+
         self._curr_ns_map.update(new_decls)
         self._ns_decls_floating_in = {}
         self._ns_prefixes_floating_in = {}
@@ -347,6 +433,15 @@ class XMPPXMLGenerator:
         Attribute values are of course automatically escaped.
         """
         self._finish_pending_start_element()
+
+        if     (self._use_tag_cache and
+                isinstance(name, tuple) and
+                name[0] and
+                len(self._ns_prefixes_floating_in) == 1 and
+                self._ns_prefixes_floating_in.get(None) == name[0] and
+                self._start_element_default_ns(name, attributes)):
+            return
+
         old_counter = self._ns_counter
 
         qname = self._qname(name)
@@ -397,6 +492,60 @@ class XMPPXMLGenerator:
         else:
             self._write(b">")
 
+    def _start_element_default_ns(self, name, attributes):
+        # fast path of startElementNS for elements which declare their own
+        # namespace as default namespace; returns false if the slow path has
+        # to be used because of namespaced attributes.
+        #
+        # this must produce the same output and state as the slow path
+        if self._ns_prefixes_floating_out:
+            raise RuntimeError("namespace prefix has not been closed")
+
+        if attributes:
+            attrib = []
+            for attrname, value in attributes.items():
+                attrqname = _get_plain_attr_qname(attrname)
+                if attrqname is None:
+                    return False
+                attrib.append((attrqname, value))
+            if self._sorted_attributes:
+                attrib.sort()
+        else:
+            attrib = ()
+
+        start_tag, ns_decl = _get_default_ns_start_tag(name)
+
+        uri = name[0]
+        curr_ns_map = self._curr_ns_map
+        self._ns_map_stack.append(
+            (curr_ns_map.copy(), {None}, self._ns_counter)
+        )
+        declare = uri not in curr_ns_map or curr_ns_map[uri] is not None
+        if declare:
+            for other_uri, prefix in list(curr_ns_map.items()):
+                if prefix is None:
+                    del curr_ns_map[other_uri]
+        curr_ns_map[uri] = None
+        self._ns_decls_floating_in = {}
+        self._ns_prefixes_floating_in = {}
+
+        parts = [start_tag]
+        if declare:
+            parts.append(ns_decl)
+        for attrqname, value in attrib:
+            parts.append(b" ")
+            parts.append(attrqname.encode("utf-8"))
+            parts.append(b"=")
+            parts.append(xml.sax.saxutils.quoteattr(value).encode("utf-8"))
+
+        if self._short_empty_elements:
+            self._pending_start_element = name
+        else:
+            parts.append(b">")
+
+        self._write(b"".join(parts))
+        return True
+
     def endElementNS(self, name, qname):
         """
         End a previously started element. `name` must be a ``(namespace_uri,
@@ -537,7 +686,9 @@ class XMPPXMLGenerator:
                              nestedly.
 
         If the context manager is left without exception, the buffered output
-        is sent to the actual sink. Otherwise, it is discarded.
+        is sent to the actual sink. Otherwise, it is discarded. The buffer (a
+        :class:`io.BytesIO`) is returned by the context manager; it can be used
+        to find out how many bytes have been written to it.
 
         In addition to the output being buffered, buffer also captures the
         entire state of the XML generator and restores it to the previous state
@@ -572,7 +723,7 @@ class XMPPXMLGenerator:
         self._flush = None
         try:
             with self._save_state():
-                yield
+                yield self._buf
             old_write(self._buf.getbuffer())
             if old_flush:
                 old_flush()
@@ -687,14 +838,22 @@ class XMLStreamWriter:
         re-raised; the :meth:`send` method thus provides strong exception
         safety.
 
+        Return the number of bytes the serialised `xso` takes up in the
+        stream.
+
         .. warning::
 
            The behaviour of :meth:`send` after :meth:`abort` or :meth:`close`
            and before :meth:`start` is undefined.
 
+        .. versionchanged:: 0.9
+
+           The number of bytes is returned.
+
         """
-        with self._writer.buffer():
+        with self._writer.buffer() as buf:
             xso.unparse_to_sax(self._writer)
+        return buf.tell()
 
     def abort(self):
         """
@@ -953,6 +1112,199 @@ class XMPPXMLProcessor:
             raise RuntimeError("invalid state: {}".format(self._state))
 
 
+class _ExpatLocator:
+    # minimal locator for SAXParseException
+    def __init__(self, parser):
+        self._parser = parser
+
+    def getColumnNumber(self):
+        return self._parser.ErrorColumnNumber
+
+    def getLineNumber(self):
+        return self._parser.ErrorLineNumber
+
+    def getPublicId(self):
+        return None
+
+    def getSystemId(self):
+        return None
+
+
+class XMPPXMLExpatProcessor(XMPPXMLProcessor):
+    """
+    A variant of :class:`XMPPXMLProcessor` which drives a :mod:`pyexpat`
+    parser directly, instead of being used as content handler of a
+    :mod:`xml.sax` parser.
+
+    The :mod:`pyexpat` callbacks feed the events into the
+    :attr:`~XMPPXMLProcessor.stanza_parser` without going through
+    :mod:`xml.sax` and a :class:`~.xso.SAXDriver`. The semantics (including
+    the :class:`ProcessorState` transitions, the exception handling and the
+    callback attributes) are the same as for :class:`XMPPXMLProcessor`. The
+    restrictions of :class:`XMPPLexicalHandler` are enforced, too.
+
+    Instead of passing the data to a parser, it is passed to :meth:`feed`
+    directly.
+
+    Errors reported by expat are raised as :class:`xml.sax.SAXParseException`,
+    like :mod:`xml.sax` would.
+
+    .. automethod:: feed
+
+    .. automethod:: close
+
+    .. versionadded:: 0.9
+    """
+
+    #: Maximum number of entries in the cache for splitting names into tags.
+    NAME_CACHE_SIZE = 1024
+
+    _END_EVENT = ("end",)
+
+    def __init__(self):
+        super().__init__()
+        self._parser = None
+        self._dest = None
+        self._name_cache = {}
+
+    def _make_parser(self):
+        parser = pyexpat.ParserCreate(namespace_separator=" ")
+        parser.buffer_text = True
+        parser.SetParamEntityParsing(pyexpat.XML_PARAM_ENTITY_PARSING_NEVER)
+        parser.StartElementHandler = self._expat_start_element
+        parser.EndElementHandler = self._expat_end_element
+        parser.CharacterDataHandler = self._expat_characters
+        parser.ProcessingInstructionHandler = self.processingInstruction
+        parser.CommentHandler = XMPPLexicalHandler.comment
+        parser.StartDoctypeDeclHandler = self._expat_start_doctype
+        return parser
+
+    def _split_name(self, name):
+        try:
+            return self._name_cache[name]
+        except KeyError:
+            pass
+        uri, sep, localname = name.rpartition(" ")
+        tag = (uri if sep else None, localname)
+        if len(self._name_cache) >= self.NAME_CACHE_SIZE:
+            self._name_cache.clear()
+        self._name_cache[name] = tag
+        return tag
+
+    def _send(self, ev):
+        dest = self._dest
+        if dest is None:
+            dest = self._stanza_parser()
+            dest.send(None)
+            self._dest = dest
+        try:
+            dest.send(ev)
+        except StopIteration:
+            self._dest = None
+        except:
+            self._dest = None
+            raise
+
+    def _expat_start_doctype(self, name, system_id, public_id,
+                             has_internal_subset):
+        XMPPLexicalHandler.startDTD(name, public_id, system_id)
+
+    def _expat_start_element(self, name, attributes):
+        split_name = self._split_name
+        tag = split_name(name)
+        attributes = {
+            split_name(key): value
+            for key, value in attributes.items()
+        }
+
+        if self._state == ProcessorState.STREAM_HEADER_PROCESSED:
+            try:
+                self._send(("start", tag[0], tag[1], attributes))
+            except Exception as exc:
+                self._stored_exception = exc
+                self._state = ProcessorState.EXCEPTION_BACKOFF
+            self._depth += 1
+            return
+
+        self.startElementNS(tag, None, attributes)
+
+    def _expat_end_element(self, name):
+        if     (self._state == ProcessorState.STREAM_HEADER_PROCESSED and
+                self._depth > 1):
+            self._depth -= 1
+            try:
+                self._send(self._END_EVENT)
+            except Exception as exc:
+                self._stored_exception = exc
+                self._state = ProcessorState.EXCEPTION_BACKOFF
+                if self._depth == 1:
+                    self._end_element_exception_handling()
+            return
+
+        self.endElementNS(self._split_name(name), None)
+
+    def _expat_characters(self, data):
+        if self._state == ProcessorState.STREAM_HEADER_PROCESSED:
+            self._send(("text", data))
+            return
+        self.characters(data)
+
+    def startDocument(self):
+        super().startDocument()
+        # the SAXDriver created by the base class is not used
+        self._driver = None
+        self._dest = None
+
+    def endDocument(self):
+        super().endDocument()
+        if self._dest is not None:
+            self._dest.close()
+            self._dest = None
+
+    def feed(self, data):
+        """
+        Feed the bytes `data` into the parser.
+
+        The first call to :meth:`feed` after construction or :meth:`close`
+        starts a new document.
+        """
+        if self._parser is None:
+            self.startDocument()
+            self._parser = self._make_parser()
+
+        try:
+            self._parser.Parse(data, False)
+        except pyexpat.ExpatError as exc:
+            raise xml.sax.SAXParseException(
+                pyexpat.ErrorString(exc.code),
+                exc,
+                _ExpatLocator(self._parser),
+            )
+
+    def close(self):
+        """
+        Finish parsing the current document.
+
+        This raises :class:`xml.sax.SAXParseException` if the document is not
+        well-formed (e.g. if the stream footer has not been received yet) and
+        :class:`RuntimeError` if the stream footer has not been processed.
+        """
+        if self._parser is None:
+            return
+
+        parser = self._parser
+        self._parser = None
+        try:
+            parser.Parse(b"", True)
+        except pyexpat.ExpatError as exc:
+            raise xml.sax.SAXParseException(
+                pyexpat.ErrorString(exc.code),
+                exc,
+                _ExpatLocator(parser),
+            )
+        self.endDocument()
+
+
 class XMPPLexicalHandler:
     """
     A `lexical handler
@@ -1402,6 +1402,64 @@ def _mark_attributes_incomplete(attrs, obj):
         attr.mark_incomplete(obj)
 
 
+class _ParsePlan:
+    """
+    Precompiled per-class information used by
+    :meth:`XMLStreamClass.parse_events`.
+
+    The plan resolves the descriptors of an :class:`XMLStreamClass` once, so
+    that parsing an element does not need to copy :attr:`ATTR_MAP` or resolve
+    the bound descriptors for each element. For :class:`Child` and
+    :class:`ChildList` descriptors, the target class is resolved up-front so
+    that the child can be parsed without going through
+    :meth:`Child.from_events`.
+
+    Plans are created lazily on first use and are dropped whenever the
+    bookkeeping attributes of the class change.
+    """
+
+    __slots__ = (
+        "attr_map",
+        "attr_items",
+        "lang_prop",
+        "text_prop",
+        "collector_prop",
+        "child_map",
+    )
+
+    CHILD_SET = 1
+    CHILD_APPEND = 2
+
+    def __init__(self, cls):
+        super().__init__()
+        self.attr_map = dict(cls.ATTR_MAP)
+        self.attr_items = tuple(cls.ATTR_MAP.items())
+        self.lang_prop = cls.ATTR_MAP.get((namespaces.xml, "lang"))
+
+        if cls.TEXT_PROPERTY is not None:
+            self.text_prop = cls.TEXT_PROPERTY.xq_descriptor
+        else:
+            self.text_prop = None
+
+        if cls.COLLECTOR_PROPERTY is not None:
+            self.collector_prop = cls.COLLECTOR_PROPERTY.xq_descriptor
+        else:
+            self.collector_prop = None
+
+        child_map = {}
+        for key, prop in cls.CHILD_MAP.items():
+            # only exact types: subclasses may override from_events
+            if type(prop) is Child:
+                child_map[key] = (prop, prop.get_tag_map()[key],
+                                  self.CHILD_SET)
+            elif type(prop) is ChildList:
+                child_map[key] = (prop, prop.get_tag_map()[key],
+                                  self.CHILD_APPEND)
+            else:
+                child_map[key] = (prop, None, None)
+        self.child_map = child_map
+
+
 class XMLStreamClass(xso_query.Class, abc.ABCMeta):
     """
     This metaclass is used to implement the fancy features of :class:`.XSO`
@@ -1711,6 +1769,7 @@ class XMLStreamClass(xso_query.Class, abc.ABCMeta):
             super().__setattr__("COLLECTOR_PROPERTY", value)
 
         super().__setattr__(name, value)
+        cls._invalidate_parse_plan()
 
     def __delattr__(cls, name):
         try:
@@ -1722,10 +1781,22 @@ class XMLStreamClass(xso_query.Class, abc.ABCMeta):
                 raise AttributeError("cannot unbind XSO descriptors")
 
         super().__delattr__(name)
+        cls._invalidate_parse_plan()
 
     def __prepare__(name, bases, **kwargs):
         return collections.OrderedDict()
 
+    def _get_parse_plan(cls):
+        # look only at the class itself; plans must not be inherited
+        plan = cls.__dict__.get("_XSO_PARSE_PLAN")
+        if plan is None:
+            plan = _ParsePlan(cls)
+            type.__setattr__(cls, "_XSO_PARSE_PLAN", plan)
+        return plan
+
+    def _invalidate_parse_plan(cls):
+        type.__setattr__(cls, "_XSO_PARSE_PLAN", None)
+
     def parse_events(cls, ev_args, parent_ctx):
         """
         Create an instance of this class, using the events sent into this
@@ -1743,14 +1814,22 @@ class XMLStreamClass(xso_query.Class, abc.ABCMeta):
            not called. See the documentation of :meth:`.xso.XSO` for details.
 
         This method is suspendable.
+
+        .. versionchanged:: 0.9
+
+           The descriptors of the class are resolved once into a parse plan
+           which is re-used for all elements parsed with this class.
         """
+        plan = cls._get_parse_plan()
+
         with parent_ctx as ctx:
             obj = cls.__new__(cls)
             attrs = ev_args[2]
-            attr_map = cls.ATTR_MAP.copy()
+            attr_map = plan.attr_map
+            nhandled = 0
             for key, value in attrs.items():
                 try:
-                    prop = attr_map.pop(key)
+                    prop = attr_map[key]
                 except KeyError:
                     if cls.UNKNOWN_ATTR_POLICY == UnknownAttrPolicy.DROP:
                         continue
@@ -1760,11 +1839,22 @@ class XMLStreamClass(xso_query.Class, abc.ABCMeta):
                                 key,
                                 tag_to_str((ev_args[0], ev_args[1]))
                             )) from None
+                nhandled += 1
                 try:
                     prop.from_value(obj, value)
                 except:
                     prop.mark_incomplete(obj)
-                    _mark_attributes_incomplete(attr_map.values(), obj)
+                    seen = set()
+                    for seen_key in attrs:
+                        seen.add(seen_key)
+                        if seen_key == key:
+                            break
+                    _mark_attributes_incomplete(
+                        (other_prop
+                         for other_key, other_prop in plan.attr_items
+                         if other_key not in seen),
+                        obj
+                    )
                     logger.debug("while parsing XSO", exc_info=True)
                     # true means suppress
                     if not obj.xso_error_handler(
@@ -1773,34 +1863,35 @@ class XMLStreamClass(xso_query.Class, abc.ABCMeta):
                             sys.exc_info()):
                         raise
 
-            for key, prop in attr_map.items():
-                try:
-                    prop.handle_missing(obj, ctx)
-                except:
-                    logger.debug("while parsing XSO", exc_info=True)
-                    # true means suppress
-                    if not obj.xso_error_handler(
-                            prop,
-                            None,
-                            sys.exc_info()):
-                        raise
+            if nhandled < len(plan.attr_items):
+                for key, prop in plan.attr_items:
+                    if key in attrs:
+                        continue
+                    try:
+                        prop.handle_missing(obj, ctx)
+                    except:
+                        logger.debug("while parsing XSO", exc_info=True)
+                        # true means suppress
+                        if not obj.xso_error_handler(
+                                prop,
+                                None,
+                                sys.exc_info()):
+                            raise
 
-            try:
-                prop = cls.ATTR_MAP[namespaces.xml, "lang"]
-            except KeyError:
-                pass
-            else:
-                lang = prop.__get__(obj, cls)
+            if plan.lang_prop is not None:
+                lang = plan.lang_prop.__get__(obj, cls)
                 if lang is not None:
                     ctx.lang = lang
 
+            text_prop = plan.text_prop
+            child_map = plan.child_map
             collected_text = []
             while True:
                 ev_type, *ev_args = yield
                 if ev_type == "end":
                     break
                 elif ev_type == "text":
-                    if not cls.TEXT_PROPERTY:
+                    if text_prop is None:
                         if ev_args[0].strip():
                             # true means suppress
                             if not obj.xso_error_handler(
@@ -1812,21 +1903,58 @@ class XMLStreamClass(xso_query.Class, abc.ABCMeta):
                         collected_text.append(ev_args[0])
                 elif ev_type == "start":
                     try:
-                        handler = cls.CHILD_MAP[ev_args[0], ev_args[1]]
+                        handler, child_cls, mode = child_map[
+                            ev_args[0], ev_args[1]
+                        ]
                     except KeyError:
-                        if cls.COLLECTOR_PROPERTY:
-                            handler = cls.COLLECTOR_PROPERTY.xq_descriptor
+                        if plan.collector_prop is not None:
+                            handler = plan.collector_prop
+                            child_cls = None
+                            mode = None
                         else:
                             yield from enforce_unknown_child_policy(
                                 cls.UNKNOWN_CHILD_POLICY,
                                 ev_args,
                                 obj.xso_error_handler)
                             continue
+
+                    if child_cls is not None:
+                        dest = child_cls.parse_events(ev_args, ctx)
+                    else:
+                        dest = handler.from_events(obj, ev_args, ctx)
+
                     try:
-                        yield from guard(
-                            handler.from_events(obj, ev_args, ctx),
-                            ev_args
-                        )
+                        # this is guard() inlined, which saves one level of
+                        # generator delegation per element
+                        next(dest)
+                        depth = 1
+                        error = None
+                        while True:
+                            ev = yield
+                            if ev[0] == "start":
+                                depth += 1
+                            elif ev[0] == "end":
+                                depth -= 1
+                            try:
+                                dest.send(ev)
+                            except StopIteration as exc:
+                                child_obj = exc.value
+                                break
+                            except Exception as exc:
+                                error = exc
+                                break
+
+                        if error is not None:
+                            while depth > 0:
+                                ev = yield
+                                if ev[0] == "end":
+                                    depth -= 1
+                            raise error
+
+                        if mode == _ParsePlan.CHILD_SET:
+                            handler.__set__(obj, child_obj)
+                        elif mode == _ParsePlan.CHILD_APPEND:
+                            handler.__get__(obj, cls).append(child_obj)
                     except:
                         logger.debug("while parsing XSO", exc_info=True)
                         # true means suppress
@@ -1839,7 +1967,7 @@ class XMLStreamClass(xso_query.Class, abc.ABCMeta):
             if collected_text:
                 collected_text = "".join(collected_text)
                 try:
-                    cls.TEXT_PROPERTY.xq_descriptor.from_value(
+                    text_prop.from_value(
                         obj,
                         collected_text
                     )
@@ -1847,7 +1975,7 @@ class XMLStreamClass(xso_query.Class, abc.ABCMeta):
                     logger.debug("while parsing XSO", exc_info=True)
                     # true means suppress
                     if not obj.xso_error_handler(
-                            cls.TEXT_PROPERTY.xq_descriptor,
+                            text_prop,
                             collected_text,
                             sys.exc_info()):
                         raise
@@ -1903,6 +2031,7 @@ class XMLStreamClass(xso_query.Class, abc.ABCMeta):
 
         prop.xq_descriptor._register(child_cls)
         cls.CHILD_MAP[child_cls.TAG] = prop.xq_descriptor
+        cls._invalidate_parse_plan()
 
 
 # I know it makes only partially sense to have a separate metasubclass for
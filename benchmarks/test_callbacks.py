@@ -0,0 +1,109 @@
+########################################################################
+# File name: test_callbacks.py
+# This file is part of: aioxmpp
+#
+# LICENSE
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+########################################################################
+import random
+import unittest
+
+import aioxmpp.callbacks as callbacks
+
+from aioxmpp.benchtest import times, timed, record
+
+
+def _passthrough(obj):
+    return obj
+
+
+class TestFilter(unittest.TestCase):
+    KEY = "aioxmpp.callbacks", "Filter"
+
+    COUNT = 100000
+
+    def _filter_many(self, f, key):
+        filter_ = f.filter
+        obj = object()
+        with timed() as t:
+            for i in range(self.COUNT):
+                filter_(obj)
+        record(self.KEY + ("filter", key, "rate"),
+               self.COUNT / t.elapsed, "calls/s")
+
+    @times(10)
+    def test_filter_empty_chain(self):
+        self._filter_many(callbacks.Filter(), "empty")
+
+    @times(10)
+    def test_filter_chain_of_four(self):
+        f = callbacks.Filter()
+        for i in range(4):
+            f.register(_passthrough, i)
+        self._filter_many(f, "four")
+
+    @times(10)
+    def test_filter_chain_of_four_with_timing(self):
+        f = callbacks.Filter()
+        for i in range(4):
+            f.register(_passthrough, i)
+        f.enable_timing()
+        self._filter_many(f, "four_timed")
+
+    @times(10)
+    def test_register_many(self):
+        rng = random.Random(1)
+        orders = [rng.randint(-100, 100) for i in range(2000)]
+        f = callbacks.Filter()
+        with timed() as t:
+            for order in orders:
+                f.register(_passthrough, order)
+        record(self.KEY + ("register", "rate"),
+               len(orders) / t.elapsed, "calls/s")
+
+
+def _listener(*args):
+    pass
+
+
+class TestAdHocSignal(unittest.TestCase):
+    KEY = "aioxmpp.callbacks", "AdHocSignal"
+
+    COUNT = 100000
+
+    def _fire_many(self, key):
+        signal = callbacks.AdHocSignal()
+        for i in range(4):
+            signal.connect(_listener)
+        fire = signal.fire
+        with timed() as t:
+            for i in range(self.COUNT):
+                fire(i)
+        record(self.KEY + ("fire", key, "rate"),
+               self.COUNT / t.elapsed, "calls/s")
+
+    @times(10)
+    def test_fire(self):
+        self._fire_many("plain")
+
+    @times(10)
+    def test_fire_instrumented(self):
+        callbacks.enable_instrumentation()
+        try:
+            self._fire_many("instrumented")
+        finally:
+            callbacks.disable_instrumentation()
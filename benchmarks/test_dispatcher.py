@@ -0,0 +1,100 @@
+########################################################################
+# File name: test_dispatcher.py
+# This file is part of: aioxmpp
+#
+# LICENSE
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+########################################################################
+import collections
+import random
+import unittest
+
+import aioxmpp.dispatcher as dispatcher
+import aioxmpp.structs as structs
+
+from aioxmpp.benchtest import times, timed, record
+
+
+FakeStanza = collections.namedtuple("FakeStanza", ["from_", "type_"])
+
+
+class Dispatcher(dispatcher.SimpleStanzaDispatcher):
+    @property
+    def local_jid(self):
+        return structs.JID.fromstr("romeo@montague.example")
+
+
+class TestSimpleStanzaDispatcher(unittest.TestCase):
+    KEY = "aioxmpp.dispatcher", "SimpleStanzaDispatcher", "_feed"
+
+    NCALLBACKS = 5000
+
+    @classmethod
+    def setUpClass(cls):
+        rng = random.Random(1)
+        cls.contacts = [
+            structs.JID.fromstr("user{}@capulet.example".format(i))
+            for i in range(cls.NCALLBACKS)
+        ]
+        types = [
+            structs.PresenceType.AVAILABLE,
+            structs.PresenceType.UNAVAILABLE,
+        ]
+        cls.stanzas = [
+            FakeStanza(
+                rng.choice(cls.contacts).replace(
+                    resource=rng.choice(["balcony", "orchard"])
+                ),
+                rng.choice(types),
+            )
+            for i in range(10000)
+        ]
+
+    def _make_dispatcher(self):
+        d = Dispatcher()
+        d.register_callback(None, None, lambda stanza: None)
+        return d
+
+    def _feed_all(self, d, key):
+        feed = d._feed
+        with timed() as t:
+            for stanza in self.stanzas:
+                feed(stanza)
+        record(key + ("rate",), len(self.stanzas) / t.elapsed, "stanzas/s")
+
+    @times(10)
+    def test_wildcard_only(self):
+        d = self._make_dispatcher()
+        self._feed_all(d, self.KEY + ("wildcard_only",))
+
+    @times(10)
+    def test_many_bare_jid_callbacks(self):
+        d = self._make_dispatcher()
+        for jid in self.contacts:
+            d.register_callback(None, jid, lambda stanza: None)
+        self._feed_all(d, self.KEY + ("bare_jid_callbacks",))
+
+    @times(10)
+    def test_many_full_jid_callbacks(self):
+        d = self._make_dispatcher()
+        for stanza in self.stanzas:
+            try:
+                d.register_callback(stanza.type_, stanza.from_,
+                                    lambda stanza: None)
+            except ValueError:
+                pass
+        self._feed_all(d, self.KEY + ("full_jid_callbacks",))
@@ -0,0 +1,115 @@
+########################################################################
+# File name: test_entitycaps.py
+# This file is part of: aioxmpp
+#
+# LICENSE
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+########################################################################
+import gc
+import io
+import random
+import tracemalloc
+import unittest
+
+import aioxmpp.disco as disco
+import aioxmpp.xml
+
+import aioxmpp.entitycaps.service as entitycaps_service
+
+from aioxmpp.benchtest import times, timed, record
+
+
+COMMON_FEATURES = [
+    "urn:xmpp:features:common:{}".format(i)
+    for i in range(60)
+]
+
+
+def generate_entries(count, seed=1):
+    """
+    Generate `count` parsed info queries which share 90% of their features,
+    as is common for clients of the same software.
+    """
+    rng = random.Random(seed)
+    result = []
+    for i in range(count):
+        features = COMMON_FEATURES + [
+            "urn:xmpp:features:unique:{}:{}".format(i, rng.randint(0, 2**32))
+            for j in range(6)
+        ]
+        rng.shuffle(features)
+        buf = io.BytesIO()
+        buf.write(
+            b"<query xmlns='http://jabber.org/protocol/disco#info'>"
+            b"<identity category='client' type='pc' name='Client'/>"
+        )
+        for feature in features:
+            buf.write("<feature var='{}'/>".format(feature).encode("utf-8"))
+        buf.write(b"</query>")
+        buf.seek(0)
+        result.append(aioxmpp.xml.read_single_xso(buf, disco.xso.InfoQuery))
+    return result
+
+
+def traced_size(f):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        result = f()
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, after - before
+
+
+class TestCompactEntry(unittest.TestCase):
+    KEY = "aioxmpp.entitycaps", "Cache"
+
+    COUNT = 1000
+
+    @times(3)
+    def test_memory_per_entry(self):
+        parsed, parsed_size = traced_size(
+            lambda: generate_entries(self.COUNT)
+        )
+
+        def compact():
+            return [
+                entitycaps_service._CompactEntry.from_info_query(entry)
+                for entry in generate_entries(self.COUNT)
+            ]
+
+        compacted, compact_size = traced_size(compact)
+
+        record(self.KEY + ("memory", "info_query"),
+               parsed_size / self.COUNT, "B/entry")
+        record(self.KEY + ("memory", "compact"),
+               compact_size / self.COUNT, "B/entry")
+
+    @times(3)
+    def test_materialise(self):
+        entries = [
+            entitycaps_service._CompactEntry.from_info_query(entry)
+            for entry in generate_entries(self.COUNT)
+        ]
+        with timed() as t:
+            for entry in entries:
+                entry.to_info_query("http://foo/#bar")
+        record(self.KEY + ("materialise", "rate"),
+               self.COUNT / t.elapsed, "entries/s")
@@ -0,0 +1,151 @@
+########################################################################
+# File name: test_stream.py
+# This file is part of: aioxmpp
+#
+# LICENSE
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+########################################################################
+import asyncio
+import unittest
+import unittest.mock
+
+import aioxmpp.callbacks as callbacks
+import aioxmpp.stanza as stanza
+import aioxmpp.stream as stream
+import aioxmpp.structs as structs
+
+from aioxmpp.benchtest import times, timed, record
+from aioxmpp.testutils import run_coroutine
+
+
+TEST_FROM = structs.JID.fromstr("foo@bar.example/baz")
+TEST_TO = structs.JID.fromstr("bar.example")
+
+
+class TestStanzaStream(unittest.TestCase):
+    KEY = "aioxmpp.stream", "StanzaStream"
+
+    N = 5000
+
+    def setUp(self):
+        self.loop = asyncio.get_event_loop()
+        self.nsent = 0
+        self.sent_all = asyncio.Future(loop=self.loop)
+
+        self.xmlstream = unittest.mock.Mock()
+        self.xmlstream.send_xso = self._send_xso
+        self.xmlstream.on_closing = callbacks.AdHocSignal()
+
+        self.stream = stream.StanzaStream(TEST_FROM.bare(), loop=self.loop)
+        self.stream.start(self.xmlstream)
+
+    def tearDown(self):
+        run_coroutine(self.stream.wait_stop())
+
+    def _send_xso(self, obj):
+        self.nsent += 1
+        if self.nsent == self.N:
+            self.sent_all.set_result(None)
+
+    def _make_messages(self):
+        return [
+            stanza.Message(type_=structs.MessageType.CHAT,
+                           from_=TEST_TO,
+                           to=TEST_FROM)
+            for i in range(self.N)
+        ]
+
+    def _make_presences(self):
+        return [
+            stanza.Presence(type_=structs.PresenceType.AVAILABLE,
+                            from_=TEST_TO,
+                            to=TEST_FROM)
+            for i in range(self.N)
+        ]
+
+    def _received_all(self, signal):
+        nreceived = 0
+        fut = asyncio.Future(loop=self.loop)
+
+        def handler(stanza):
+            nonlocal nreceived
+            nreceived += 1
+            if nreceived == self.N:
+                fut.set_result(None)
+
+        signal.connect(handler)
+        return fut
+
+    @times(10)
+    def test_outgoing_burst(self):
+        key = self.KEY + ("outgoing", "burst")
+        msgs = self._make_messages()
+
+        with timed() as t:
+            for msg in msgs:
+                self.stream.enqueue(msg)
+            run_coroutine(self.sent_all)
+
+        record(key+("rate",), self.N / t.elapsed, "stanzas/s")
+
+    @times(10)
+    def test_outgoing_trickle(self):
+        key = self.KEY + ("outgoing", "trickle")
+        msgs = self._make_messages()
+
+        @asyncio.coroutine
+        def pump():
+            for msg in msgs:
+                self.stream.enqueue(msg)
+                yield from asyncio.sleep(0)
+            yield from self.sent_all
+
+        with timed() as t:
+            run_coroutine(pump())
+
+        record(key+("rate",), self.N / t.elapsed, "stanzas/s")
+
+    @times(10)
+    def test_incoming_burst(self):
+        key = self.KEY + ("incoming", "burst")
+        presences = self._make_presences()
+        received_all = self._received_all(self.stream.on_presence_received)
+
+        with timed() as t:
+            for pres in presences:
+                self.stream.recv_stanza(pres)
+            run_coroutine(received_all)
+
+        record(key+("rate",), self.N / t.elapsed, "stanzas/s")
+
+    @times(10)
+    def test_incoming_trickle(self):
+        key = self.KEY + ("incoming", "trickle")
+        presences = self._make_presences()
+        received_all = self._received_all(self.stream.on_presence_received)
+
+        @asyncio.coroutine
+        def pump():
+            for pres in presences:
+                self.stream.recv_stanza(pres)
+                yield from asyncio.sleep(0)
+            yield from received_all
+
+        with timed() as t:
+            run_coroutine(pump())
+
+        record(key+("rate",), self.N / t.elapsed, "stanzas/s")
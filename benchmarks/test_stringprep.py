@@ -0,0 +1,119 @@
+########################################################################
+# File name: test_stringprep.py
+# This file is part of: aioxmpp
+#
+# LICENSE
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+########################################################################
+import random
+import unittest
+
+import aioxmpp.stringprep as stringprep
+
+from aioxmpp.benchtest import times, timed, record
+
+from tests.test_stringprep import (
+    nodeprep_reference,
+    resourceprep_reference,
+    nameprep_reference,
+)
+
+
+def make_corpus(rng, alphabet, n, length):
+    return [
+        "".join(rng.choice(alphabet) for i in range(rng.randint(*length)))
+        for j in range(n)
+    ]
+
+
+ASCII_ALPHABET = (
+    "abcdefghijklmnopqrstuvwxyz"
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    "0123456789._-"
+)
+LATIN_ALPHABET = ASCII_ALPHABET + "äöüßéèêàçñøåæÄÖÜÉÈÇÑØÅÆ"
+RTL_ALPHABET = (
+    "אבגדהוזחטי"
+    "ابتثجحخدذر"
+)
+
+
+class TestProfiles(unittest.TestCase):
+    KEY = "aioxmpp.stringprep",
+
+    ENGINES = {
+        "nodeprep": (nodeprep_reference,
+                     stringprep._nodeprep_tables),
+        "resourceprep": (resourceprep_reference,
+                         stringprep._resourceprep_tables),
+        "nameprep": (nameprep_reference,
+                     stringprep._nameprep_tables),
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        rng = random.Random(1)
+        cls.corpora = {
+            "ascii": make_corpus(rng, ASCII_ALPHABET, 1000, (3, 20)),
+            "latin": make_corpus(rng, LATIN_ALPHABET, 1000, (3, 20)),
+            "rtl": make_corpus(rng, RTL_ALPHABET, 1000, (3, 20)),
+        }
+
+    def _run(self, profile, corpus_name, engine_index, engine_name):
+        func = self.ENGINES[profile][engine_index]
+        corpus = self.corpora[corpus_name]
+        key = self.KEY + (profile, corpus_name, engine_name)
+        with timed() as t:
+            for s in corpus:
+                func(s, False)
+        record(key+("rate",), len(corpus) / t.elapsed, "strings/s")
+
+    def _run_both(self, profile, corpus_name):
+        self._run(profile, corpus_name, 0, "reference")
+        self._run(profile, corpus_name, 1, "tables")
+
+    @times(10)
+    def test_nodeprep_ascii(self):
+        self._run_both("nodeprep", "ascii")
+
+    @times(10)
+    def test_nodeprep_latin(self):
+        self._run_both("nodeprep", "latin")
+
+    @times(10)
+    def test_nodeprep_rtl(self):
+        self._run_both("nodeprep", "rtl")
+
+    @times(10)
+    def test_resourceprep_ascii(self):
+        self._run_both("resourceprep", "ascii")
+
+    @times(10)
+    def test_resourceprep_latin(self):
+        self._run_both("resourceprep", "latin")
+
+    @times(10)
+    def test_resourceprep_rtl(self):
+        self._run_both("resourceprep", "rtl")
+
+    @times(10)
+    def test_nameprep_ascii(self):
+        self._run_both("nameprep", "ascii")
+
+    @times(10)
+    def test_nameprep_latin(self):
+        self._run_both("nameprep", "latin")
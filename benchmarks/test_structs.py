@@ -0,0 +1,107 @@
+########################################################################
+# File name: test_structs.py
+# This file is part of: aioxmpp
+#
+# LICENSE
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+########################################################################
+import contextlib
+import random
+import unittest
+
+import aioxmpp.stringprep
+import aioxmpp.structs as structs
+
+from aioxmpp.benchtest import times, timed, record
+
+
+@contextlib.contextmanager
+def caches_disabled():
+    structs.JID.set_cache_size(0)
+    aioxmpp.stringprep.set_cache_size(0)
+    try:
+        yield
+    finally:
+        structs.JID.set_cache_size(4096)
+        aioxmpp.stringprep.set_cache_size(
+            aioxmpp.stringprep.DEFAULT_CACHE_SIZE
+        )
+
+
+class TestJID(unittest.TestCase):
+    KEY = "aioxmpp.structs", "JID", "fromstr"
+
+    @classmethod
+    def setUpClass(cls):
+        rng = random.Random(1)
+        contacts = [
+            "user{}@{}/{}".format(
+                i,
+                rng.choice(["capulet.example", "montague.example",
+                            "verona.example"]),
+                rng.choice(["balcony", "orchard", "Mobile Phone"])
+            )
+            for i in range(1000)
+        ] + [
+            "jürgen{}@münchen.example/Büro".format(i)
+            for i in range(100)
+        ]
+        cls.samples = [rng.choice(contacts) for i in range(10000)]
+
+    def _parse_all(self, key):
+        with timed() as t:
+            for s in self.samples:
+                structs.JID.fromstr(s)
+        record(key+("rate",), len(self.samples) / t.elapsed, "JIDs/s")
+
+    @times(10)
+    def test_uncached(self):
+        with caches_disabled():
+            self._parse_all(self.KEY + ("uncached",))
+
+    @times(10)
+    def test_cached(self):
+        self._parse_all(self.KEY + ("cached",))
+
+
+class TestJIDDerivedForms(unittest.TestCase):
+    KEY = "aioxmpp.structs", "JID"
+
+    @classmethod
+    def setUpClass(cls):
+        cls.jids = [
+            structs.JID.fromstr("user{}@capulet.example/balcony".format(i))
+            for i in range(1000)
+        ]
+
+    @times(10)
+    def test_bare(self):
+        with timed() as t:
+            for i in range(10):
+                for jid in self.jids:
+                    jid.bare()
+        record(self.KEY + ("bare", "rate"),
+               10 * len(self.jids) / t.elapsed, "calls/s")
+
+    @times(10)
+    def test_str(self):
+        with timed() as t:
+            for i in range(10):
+                for jid in self.jids:
+                    str(jid)
+        record(self.KEY + ("__str__", "rate"),
+               10 * len(self.jids) / t.elapsed, "calls/s")
@@ -0,0 +1,189 @@
+########################################################################
+# File name: test_tls.py
+# This file is part of: aioxmpp
+#
+# LICENSE
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+########################################################################
+import asyncio
+import os
+import ssl
+import tempfile
+import unittest
+
+import OpenSSL.SSL
+
+import aioxmpp.ssl_transport as ssl_transport
+import aioxmpp._stdlib_ssl_transport as stdlib_ssl_transport
+
+from aioxmpp.benchtest import times, timed, record
+from aioxmpp.testutils import run_coroutine, make_self_signed_certificate
+
+
+TOTAL = 16*1024*1024
+CHUNK = 64*1024
+
+
+class SinkProtocol(asyncio.Protocol):
+    """
+    Server side: count the bytes received and acknowledge once :data:`TOTAL`
+    bytes have arrived. Upon receiving ``b"send"``, send :data:`TOTAL`
+    bytes instead.
+    """
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.nreceived = 0
+
+    def data_received(self, data):
+        if data == b"send":
+            for _ in range(TOTAL // CHUNK):
+                self.transport.write(bytes(CHUNK))
+            return
+        self.nreceived += len(data)
+        if self.nreceived >= TOTAL:
+            self.transport.write(b"k")
+
+
+class CountingProtocol(asyncio.Protocol):
+    def __init__(self, loop):
+        super().__init__()
+        self.nreceived = 0
+        self.done = asyncio.Future(loop=loop)
+        self.expected = 1
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        self.nreceived += len(data)
+        if self.nreceived >= self.expected and not self.done.done():
+            self.done.set_result(None)
+
+    def connection_lost(self, exc):
+        if not self.done.done():
+            self.done.set_exception(ConnectionError("connection lost"))
+
+
+class TestTLSThroughput(unittest.TestCase):
+    KEY = "aioxmpp.connector", "tls"
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cert_pem, key_pem = make_self_signed_certificate("localhost")
+        cls.certfile = os.path.join(cls.tmpdir.name, "cert.pem")
+        cls.keyfile = os.path.join(cls.tmpdir.name, "key.pem")
+        with open(cls.certfile, "wb") as f:
+            f.write(cert_pem)
+        with open(cls.keyfile, "wb") as f:
+            f.write(key_pem)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def setUp(self):
+        self.loop = asyncio.get_event_loop()
+        server_context = ssl.SSLContext(ssl.PROTOCOL_SSLv23)
+        server_context.load_cert_chain(self.certfile, self.keyfile)
+        self.server = run_coroutine(self.loop.create_server(
+            SinkProtocol,
+            host="127.0.0.1",
+            port=0,
+            ssl=server_context,
+        ))
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    def tearDown(self):
+        self.server.close()
+        run_coroutine(self.server.wait_closed())
+
+    def _connect_pyopenssl(self, protocol):
+        def context_factory(transport):
+            ctx = OpenSSL.SSL.Context(OpenSSL.SSL.SSLv23_METHOD)
+            ctx.set_verify(OpenSSL.SSL.VERIFY_NONE, lambda *args: True)
+            return ctx
+
+        transport, _ = run_coroutine(ssl_transport.create_starttls_connection(
+            self.loop,
+            lambda: protocol,
+            host="127.0.0.1",
+            port=self.port,
+            peer_hostname="127.0.0.1",
+            server_hostname="localhost",
+            ssl_context_factory=context_factory,
+            use_starttls=False,
+        ))
+        return transport
+
+    def _connect_stdlib(self, protocol):
+        ctx = ssl.create_default_context(cafile=self.certfile)
+        transport, _ = run_coroutine(
+            stdlib_ssl_transport.create_tls_connection(
+                self.loop,
+                lambda: protocol,
+                "127.0.0.1",
+                self.port,
+                server_hostname="localhost",
+                ssl_context=ctx,
+            )
+        )
+        return transport
+
+    def _outgoing(self, backend, connect):
+        protocol = CountingProtocol(self.loop)
+        transport = connect(protocol)
+
+        data = bytes(CHUNK)
+        with timed() as t:
+            for _ in range(TOTAL // CHUNK):
+                transport.write(data)
+            run_coroutine(protocol.done, timeout=60)
+
+        transport.close()
+        record(self.KEY + (backend, "outgoing", "rate"),
+               TOTAL / t.elapsed / 1024 / 1024, "MiB/s")
+
+    def _incoming(self, backend, connect):
+        protocol = CountingProtocol(self.loop)
+        protocol.expected = TOTAL
+        transport = connect(protocol)
+
+        with timed() as t:
+            transport.write(b"send")
+            run_coroutine(protocol.done, timeout=60)
+
+        transport.close()
+        record(self.KEY + (backend, "incoming", "rate"),
+               TOTAL / t.elapsed / 1024 / 1024, "MiB/s")
+
+    @times(3)
+    def test_pyopenssl_outgoing(self):
+        self._outgoing("pyopenssl", self._connect_pyopenssl)
+
+    @times(3)
+    def test_stdlib_outgoing(self):
+        self._outgoing("stdlib", self._connect_stdlib)
+
+    @times(3)
+    def test_pyopenssl_incoming(self):
+        self._incoming("pyopenssl", self._connect_pyopenssl)
+
+    @times(3)
+    def test_stdlib_incoming(self):
+        self._incoming("stdlib", self._connect_stdlib)
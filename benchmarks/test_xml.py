@@ -23,6 +23,9 @@ import io
 import unittest
 import random
 
+import aioxmpp.muc.xso  # NOQA
+import aioxmpp.roster.xso  # NOQA
+import aioxmpp.stanza
 import aioxmpp.xso as xso
 import aioxmpp.xml
 
@@ -138,3 +141,138 @@ class Testwrite_single_xso(unittest.TestCase):
             aioxmpp.xml.write_single_xso(item, self.buf)
         record(key+("sz",), self.buf.tell(), "B")
         record(key+("rate",), self.buf.tell() / t.elapsed, "B/s")
+
+    def _unparse_with_generator(self, key, item, use_tag_cache):
+        self._reset_buffer()
+        gen = aioxmpp.xml.XMPPXMLGenerator(
+            self.buf,
+            short_empty_elements=True,
+            sorted_attributes=True,
+            use_tag_cache=use_tag_cache)
+        with timed() as t:
+            item.unparse_to_sax(gen)
+            gen.flush()
+        record(key+("sz",), self.buf.tell(), "B")
+        record(key+("rate",), self.buf.tell() / t.elapsed, "B/s")
+
+    @times(1000, pass_iteration=True)
+    def test_deep_without_tag_cache(self, iteration=None):
+        self._unparse_with_generator(
+            self.KEY + ("deep", "without-tag-cache"),
+            self.deep_samples[iteration % len(self.deep_samples)],
+            False,
+        )
+
+    @times(1000, pass_iteration=True)
+    def test_deep_with_tag_cache(self, iteration=None):
+        self._unparse_with_generator(
+            self.KEY + ("deep", "with-tag-cache"),
+            self.deep_samples[iteration % len(self.deep_samples)],
+            True,
+        )
+
+    @times(1000)
+    def test_shallow_and_large_without_tag_cache(self):
+        self._unparse_with_generator(
+            self.KEY + ("shallow+large", "without-tag-cache"),
+            ShallowRoot(scale=100),
+            False,
+        )
+
+    @times(1000)
+    def test_shallow_and_large_with_tag_cache(self):
+        self._unparse_with_generator(
+            self.KEY + ("shallow+large", "with-tag-cache"),
+            ShallowRoot(scale=100),
+            True,
+        )
+
+
+STREAM_HEADER = (
+    b"<stream:stream xmlns='jabber:client'"
+    b" xmlns:stream='http://etherx.jabber.org/streams'"
+    b" version='1.0' from='capulet.example' id='benchmark'>"
+)
+
+
+def make_roster_push(nitems):
+    return b"".join([
+        b"<iq type='set' id='push'><query xmlns='jabber:iq:roster'>",
+        b"".join(
+            "<item jid='contact{0}@montague.example' name='Contact {0}'"
+            " subscription='both'><group>Group {1}</group></item>".format(
+                i, i % 10
+            ).encode("utf-8")
+            for i in range(nitems)
+        ),
+        b"</query></iq>",
+    ])
+
+
+def make_muc_presence_flood(npresences):
+    return b"".join(
+        "<presence from='room@muc.capulet.example/nick{0}'"
+        " to='juliet@capulet.example/balcony' id='p{0}'>"
+        "<x xmlns='http://jabber.org/protocol/muc#user'>"
+        "<item affiliation='member' role='participant'"
+        " jid='user{0}@capulet.example/res'/>"
+        "</x>"
+        "</presence>".format(i).encode("utf-8")
+        for i in range(npresences)
+    )
+
+
+class TestXMPPXMLProcessor(unittest.TestCase):
+    KEY = "aioxmpp.xml", "XMPPXMLProcessor"
+
+    CHUNK_SIZE = 4096
+
+    @classmethod
+    def setUpClass(cls):
+        cls.samples = {
+            "roster-push": make_roster_push(1000),
+            "muc-presence-flood": make_muc_presence_flood(500),
+        }
+
+    def _make_stanza_parser(self):
+        stanza_parser = xso.XSOParser()
+        stanza_parser.add_class(aioxmpp.stanza.IQ, self.results.append)
+        stanza_parser.add_class(aioxmpp.stanza.Presence, self.results.append)
+        return stanza_parser
+
+    def setUp(self):
+        self.results = []
+
+    def _make_sax(self):
+        proc = aioxmpp.xml.XMPPXMLProcessor()
+        proc.stanza_parser = self._make_stanza_parser()
+        parser = aioxmpp.xml.make_parser()
+        parser.setContentHandler(proc)
+        return parser
+
+    def _make_expat(self):
+        proc = aioxmpp.xml.XMPPXMLExpatProcessor()
+        proc.stanza_parser = self._make_stanza_parser()
+        return proc
+
+    def _feed(self, key, parser, data):
+        parser.feed(STREAM_HEADER)
+        with timed() as t:
+            for i in range(0, len(data), self.CHUNK_SIZE):
+                parser.feed(data[i:i+self.CHUNK_SIZE])
+        self.assertTrue(self.results)
+        self.results.clear()
+        record(key+("rate",), len(data) / t.elapsed, "B/s")
+
+    def _run(self, name):
+        data = self.samples[name]
+        self._feed(self.KEY + (name, "sax"), self._make_sax(), data)
+        self._feed(self.KEY + (name, "expat"), self._make_expat(), data)
+
+    @times(20)
+    def test_roster_push(self):
+        self._run("roster-push")
+
+    @times(20)
+    def test_muc_presence_flood(self):
+        self._run("muc-presence-flood")
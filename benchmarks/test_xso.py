@@ -0,0 +1,153 @@
+########################################################################
+# File name: test_xso.py
+# This file is part of: aioxmpp
+#
+# LICENSE
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+########################################################################
+import contextlib
+import unittest
+import unittest.mock
+import xml.sax
+import xml.sax.handler
+
+import aioxmpp.entitycaps.xso  # NOQA
+import aioxmpp.roster.xso  # NOQA
+import aioxmpp.stanza
+import aioxmpp.xso as xso
+import aioxmpp.xso.model as xso_model
+
+from aioxmpp.benchtest import times, timed, record
+
+from tests.xso.test_model import parse_events_reference
+
+
+MESSAGE = (
+    "<message xmlns='jabber:client' from='romeo@montague.example/orchard'"
+    " to='juliet@capulet.example/balcony' type='chat' id='ktx72v49'"
+    " xml:lang='en'>"
+    "<body>Art thou not Romeo, and a Montague?</body>"
+    "<thread>e0ffe42b28561960c6b12b944a092794b9683a38</thread>"
+    "</message>"
+)
+
+PRESENCE = (
+    "<presence xmlns='jabber:client' from='romeo@montague.example/orchard'"
+    " to='juliet@capulet.example' id='pres1'>"
+    "<show>away</show>"
+    "<status>I shall return!</status>"
+    "<priority>1</priority>"
+    "<c xmlns='http://jabber.org/protocol/caps' hash='sha-1'"
+    " node='http://code.google.com/p/exodus'"
+    " ver='QgayPKawpkPSDYmwT/WM94uAlu0='/>"
+    "</presence>"
+)
+
+IQ = (
+    "<iq xmlns='jabber:client' to='juliet@capulet.example/balcony'"
+    " type='set' id='a78b4q6ha463'>"
+    "<query xmlns='jabber:iq:roster' ver='ver14'>" +
+    "".join(
+        "<item jid='nurse{}@capulet.example' name='Nurse {}'"
+        " subscription='both'><group>Servants</group></item>".format(i, i)
+        for i in range(10)
+    ) +
+    "</query>"
+    "</iq>"
+)
+
+
+class _EventCollector(xml.sax.handler.ContentHandler):
+    def __init__(self):
+        super().__init__()
+        self.events = []
+
+    def startElementNS(self, name, qname, attributes):
+        self.events.append(("start",) + tuple(name) + (dict(attributes),))
+
+    def characters(self, data):
+        self.events.append(("text", data))
+
+    def endElementNS(self, name, qname):
+        self.events.append(("end",))
+
+
+def to_events(data):
+    parser = xml.sax.make_parser()
+    parser.setFeature(xml.sax.handler.feature_namespaces, True)
+    collector = _EventCollector()
+    parser.setContentHandler(collector)
+    parser.feed(data.encode("utf-8"))
+    return collector.events
+
+
+@contextlib.contextmanager
+def generic_parsing():
+    with unittest.mock.patch.object(
+            xso_model.XMLStreamClass,
+            "parse_events",
+            parse_events_reference):
+        yield
+
+
+class Testparse_events(unittest.TestCase):
+    KEY = "aioxmpp.xso", "parse_events"
+
+    @classmethod
+    def setUpClass(cls):
+        cls.samples = {
+            "message": to_events(MESSAGE),
+            "presence": to_events(PRESENCE),
+            "iq": to_events(IQ),
+        }
+
+    def setUp(self):
+        self.results = []
+        self.parser = xso.XSOParser()
+        self.parser.add_class(aioxmpp.stanza.Message, self.results.append)
+        self.parser.add_class(aioxmpp.stanza.Presence, self.results.append)
+        self.parser.add_class(aioxmpp.stanza.IQ, self.results.append)
+
+    def _parse(self, key, events):
+        gen = self.parser()
+        next(gen)
+        with timed() as t:
+            for ev in events:
+                gen.send(ev)
+        gen.close()
+        self.assertEqual(len(self.results), 1)
+        self.results.clear()
+        record(key+("time",), t.elapsed, "s")
+        record(key+("rate",), 1 / t.elapsed, "stanza/s")
+
+    def _run(self, name):
+        events = self.samples[name]
+        self._parse(self.KEY + (name, "compiled"), events)
+        with generic_parsing():
+            self._parse(self.KEY + (name, "generic"), events)
+
+    @times(1000)
+    def test_message(self):
+        self._run("message")
+
+    @times(1000)
+    def test_presence(self):
+        self._run("presence")
+
+    @times(1000)
+    def test_iq_roster_push(self):
+        self._run("iq")
@@ -23,6 +23,9 @@ import asyncio
 import unittest
 import sys
 
+from datetime import timedelta
+
+import aioxmpp.cache
 import aioxmpp.service as service
 import aioxmpp.disco.service as disco_service
 import aioxmpp.disco.xso as disco_xso
@@ -1035,6 +1038,181 @@ class TestDiscoClient(unittest.TestCase):
             len(send_and_decode.mock_calls)
         )
 
+    def test_default_cache_configuration(self):
+        self.assertIsInstance(self.s.info_cache, aioxmpp.cache.ExpiringLRUDict)
+        self.assertIsInstance(self.s.items_cache,
+                              aioxmpp.cache.ExpiringLRUDict)
+        self.assertEqual(self.s.cache_size, 4096)
+        self.assertEqual(self.s.info_cache.maxsize, 4096)
+        self.assertEqual(self.s.items_cache.maxsize, 4096)
+        self.assertIsNone(self.s.cache_ttl)
+        self.assertIsNone(self.s.error_cache_ttl)
+
+    def test_cache_size_applies_to_caches(self):
+        self.s.cache_size = 10
+        self.assertEqual(self.s.cache_size, 10)
+        self.assertEqual(self.s.info_cache.maxsize, 10)
+        self.assertEqual(self.s.items_cache.maxsize, 10)
+
+    def test_query_info_evicts_least_recently_used(self):
+        self.s.cache_size = 1
+        to1 = structs.JID.fromstr("user@foo.example/res1")
+        to2 = structs.JID.fromstr("user@foo.example/res2")
+
+        with unittest.mock.patch.object(
+                self.s,
+                "send_and_decode_info_query",
+                new=CoroutineMock()) as send_and_decode:
+            send_and_decode.return_value = {}
+
+            run_coroutine(self.s.query_info(to1))
+            run_coroutine(self.s.query_info(to2))
+            run_coroutine(self.s.query_info(to1))
+
+        self.assertSequenceEqual(
+            send_and_decode.mock_calls,
+            [
+                unittest.mock.call(to1, None),
+                unittest.mock.call(to2, None),
+                unittest.mock.call(to1, None),
+            ]
+        )
+        info = self.s.info_cache.cache_info()
+        self.assertEqual(info.evictions, 2)
+        self.assertEqual(info.misses, 3)
+
+    def test_query_info_result_expires_after_cache_ttl(self):
+        to = structs.JID.fromstr("user@foo.example/res1")
+        clock = unittest.mock.Mock()
+        clock.return_value = 100
+        self.s.info_cache = aioxmpp.cache.ExpiringLRUDict(10, clock=clock)
+        self.s.cache_ttl = timedelta(seconds=60)
+
+        with unittest.mock.patch.object(
+                self.s,
+                "send_and_decode_info_query",
+                new=CoroutineMock()) as send_and_decode:
+            response1 = {}
+            send_and_decode.return_value = response1
+            self.assertIs(run_coroutine(self.s.query_info(to)), response1)
+
+            clock.return_value = 159
+            self.assertIs(run_coroutine(self.s.query_info(to)), response1)
+
+            response2 = {}
+            send_and_decode.return_value = response2
+            clock.return_value = 160
+            self.assertIs(run_coroutine(self.s.query_info(to)), response2)
+
+        self.assertEqual(len(send_and_decode.mock_calls), 2)
+        info = self.s.info_cache.cache_info()
+        self.assertEqual(info.hits, 1)
+        self.assertEqual(info.misses, 2)
+        self.assertEqual(info.expirations, 1)
+
+    def test_query_info_caches_errors_with_error_cache_ttl(self):
+        to = structs.JID.fromstr("user@foo.example/res1")
+        clock = unittest.mock.Mock()
+        clock.return_value = 100
+        self.s.info_cache = aioxmpp.cache.ExpiringLRUDict(10, clock=clock)
+        self.s.cache_ttl = timedelta(seconds=60)
+        self.s.error_cache_ttl = timedelta(seconds=10)
+
+        with unittest.mock.patch.object(
+                self.s,
+                "send_and_decode_info_query",
+                new=CoroutineMock()) as send_and_decode:
+            send_and_decode.side_effect = errors.XMPPCancelError(
+                condition=(namespaces.stanzas, "item-not-found"),
+            )
+
+            with self.assertRaises(errors.XMPPCancelError):
+                run_coroutine(self.s.query_info(to))
+
+            send_and_decode.side_effect = None
+            send_and_decode.return_value = {}
+
+            clock.return_value = 109
+            with self.assertRaises(errors.XMPPCancelError):
+                run_coroutine(self.s.query_info(to))
+
+            clock.return_value = 110
+            self.assertEqual(run_coroutine(self.s.query_info(to)), {})
+
+        self.assertEqual(len(send_and_decode.mock_calls), 2)
+
+    def test_query_info_does_not_cache_other_errors_with_error_cache_ttl(
+            self):
+        to = structs.JID.fromstr("user@foo.example/res1")
+        self.s.error_cache_ttl = timedelta(seconds=10)
+
+        with unittest.mock.patch.object(
+                self.s,
+                "send_and_decode_info_query",
+                new=CoroutineMock()) as send_and_decode:
+            send_and_decode.side_effect = ConnectionError()
+
+            with self.assertRaises(ConnectionError):
+                run_coroutine(self.s.query_info(to))
+
+            send_and_decode.side_effect = None
+            send_and_decode.return_value = {}
+
+            self.assertEqual(run_coroutine(self.s.query_info(to)), {})
+
+        self.assertEqual(len(send_and_decode.mock_calls), 2)
+
+    def test_clear_cache_keeps_statistics(self):
+        to = structs.JID.fromstr("user@foo.example/res1")
+
+        with unittest.mock.patch.object(
+                self.s,
+                "send_and_decode_info_query",
+                new=CoroutineMock()) as send_and_decode:
+            send_and_decode.return_value = {}
+            run_coroutine(self.s.query_info(to))
+            run_coroutine(self.s.query_info(to))
+
+        self.cc.on_stream_destroyed()
+
+        info = self.s.info_cache.cache_info()
+        self.assertEqual(info.currsize, 0)
+        self.assertEqual(info.hits, 1)
+        self.assertEqual(info.misses, 1)
+
+    def test_set_info_cache_expires_after_cache_ttl(self):
+        to = structs.JID.fromstr("user@foo.example/res1")
+        clock = unittest.mock.Mock()
+        clock.return_value = 100
+        self.s.info_cache = aioxmpp.cache.ExpiringLRUDict(10, clock=clock)
+        self.s.cache_ttl = timedelta(seconds=60)
+
+        self.s.set_info_cache(to, None, unittest.mock.sentinel.info)
+        run_coroutine(asyncio.sleep(0))
+
+        clock.return_value = 159
+        self.assertIn((to, None), self.s.info_cache)
+        clock.return_value = 160
+        self.assertNotIn((to, None), self.s.info_cache)
+
+    def test_query_items_result_expires_after_cache_ttl(self):
+        to = structs.JID.fromstr("user@foo.example/res1")
+        clock = unittest.mock.Mock()
+        clock.return_value = 100
+        self.s.items_cache = aioxmpp.cache.ExpiringLRUDict(10, clock=clock)
+        self.s.cache_ttl = timedelta(seconds=60)
+
+        response = disco_xso.ItemsQuery()
+        self.cc.stream.send.return_value = response
+
+        run_coroutine(self.s.query_items(to, node="foobar"))
+        clock.return_value = 159
+        run_coroutine(self.s.query_items(to, node="foobar"))
+        clock.return_value = 160
+        run_coroutine(self.s.query_items(to, node="foobar"))
+
+        self.assertEqual(len(self.cc.stream.send.mock_calls), 2)
+
     def test_query_info_timeout(self):
         to = structs.JID.fromstr("user@foo.example/res1")
         with unittest.mock.patch.object(
@@ -1460,6 +1638,236 @@ class TestDiscoClient(unittest.TestCase):
         self.assertIs(ctx.exception, exc)
 
 
+class TestSharedCache(unittest.TestCase):
+    def setUp(self):
+        self.shared = disco_service.SharedCache(10)
+        self.account1 = structs.JID.fromstr("romeo@montague.example")
+        self.account2 = structs.JID.fromstr("juliet@capulet.example")
+        self.view1 = self.shared.info_view(self.account1)
+        self.view2 = self.shared.info_view(self.account2)
+
+    def tearDown(self):
+        del self.shared
+
+    def test_default_maxsize(self):
+        shared = disco_service.SharedCache()
+        self.assertEqual(shared.info_store.maxsize, 65536)
+        self.assertEqual(shared.items_store.maxsize, 65536)
+
+    def test_server_jids_are_shared(self):
+        server = structs.JID.fromstr("verona.example")
+        self.view1[server, None] = unittest.mock.sentinel.v
+        self.assertIs(self.view2.lookup((server, None)),
+                      unittest.mock.sentinel.v)
+        self.assertIn((None, server, None), self.shared.info_store)
+
+    def test_other_jids_are_private(self):
+        for jid in ["juliet@capulet.example",
+                    "juliet@capulet.example/balcony",
+                    "capulet.example/foo"]:
+            jid = structs.JID.fromstr(jid)
+            self.view1[jid, "node"] = unittest.mock.sentinel.v
+            self.assertIs(self.view1[jid, "node"], unittest.mock.sentinel.v)
+            self.assertNotIn((jid, "node"), self.view2)
+            self.assertIsNone(self.view2.lookup((jid, "node")))
+            self.assertIn((self.account1, jid, "node"),
+                          self.shared.info_store)
+
+    def test_own_server_is_private(self):
+        server = structs.JID.fromstr("capulet.example")
+        self.view2[server, None] = unittest.mock.sentinel.v2
+        self.assertIsNone(self.view1.lookup((server, None)))
+        self.assertIn((self.account2, server, None), self.shared.info_store)
+
+        self.view1[server, None] = unittest.mock.sentinel.v1
+        self.assertIs(self.view2.lookup((server, None)),
+                      unittest.mock.sentinel.v2)
+
+    def test_custom_is_shared(self):
+        is_shared = unittest.mock.Mock()
+        is_shared.return_value = True
+        shared = disco_service.SharedCache(is_shared=is_shared)
+        jid = structs.JID.fromstr("juliet@capulet.example")
+
+        shared.info_view(self.account1)[jid, "node"] = \
+            unittest.mock.sentinel.v
+
+        is_shared.assert_called_once_with(jid, "node")
+        self.assertIs(shared.info_view(self.account2)[jid, "node"],
+                      unittest.mock.sentinel.v)
+
+    def test_items_and_clear_cover_private_entries_only(self):
+        server = structs.JID.fromstr("verona.example")
+        jid = structs.JID.fromstr("juliet@capulet.example")
+        self.view1[server, None] = unittest.mock.sentinel.v1
+        self.view1[jid, None] = unittest.mock.sentinel.v2
+        self.view2[jid, None] = unittest.mock.sentinel.v3
+
+        self.assertSequenceEqual(
+            self.view1.items(),
+            [((jid, None), unittest.mock.sentinel.v2)],
+        )
+        self.assertEqual(len(self.view1), 1)
+
+        self.view1.clear()
+
+        self.assertNotIn((jid, None), self.view1)
+        self.assertIn((server, None), self.view1)
+        self.assertIn((jid, None), self.view2)
+
+    def test_set_ttl(self):
+        jid = structs.JID.fromstr("juliet@capulet.example")
+        self.view1[jid, None] = unittest.mock.sentinel.v
+        with unittest.mock.patch.object(self.shared.info_store,
+                                        "set_ttl") as set_ttl:
+            self.view1.set_ttl((jid, None), 10)
+        set_ttl.assert_called_once_with((self.account1, jid, None), 10)
+
+    def test_maxsize_is_shared(self):
+        self.view1.maxsize = 5
+        self.assertEqual(self.shared.info_store.maxsize, 5)
+        self.assertEqual(self.view2.maxsize, 5)
+
+    def test_use_shared_cache(self):
+        cc1 = make_connected_client()
+        cc1.local_jid = structs.JID.fromstr("romeo@montague.example/a")
+        cc2 = make_connected_client()
+        cc2.local_jid = structs.JID.fromstr("juliet@capulet.example/b")
+        s1 = disco_service.DiscoClient(cc1)
+        s2 = disco_service.DiscoClient(cc2)
+        s1.use_shared_cache(self.shared)
+        s2.use_shared_cache(self.shared)
+
+        server = structs.JID.fromstr("verona.example")
+        response = disco_xso.InfoQuery()
+
+        with unittest.mock.patch.object(
+                s1,
+                "send_and_decode_info_query",
+                new=CoroutineMock()) as send1, \
+                unittest.mock.patch.object(
+                    s2,
+                    "send_and_decode_info_query",
+                    new=CoroutineMock()) as send2:
+            send1.return_value = response
+
+            task1 = asyncio.async(s1.query_info(server))
+            task2 = asyncio.async(s2.query_info(server))
+
+            self.assertIs(run_coroutine(task1), response)
+            self.assertIs(run_coroutine(task2), response)
+
+        send1.assert_called_once_with(server, None)
+        self.assertFalse(send2.mock_calls)
+
+    def test_disconnect_cancels_own_shared_requests_only(self):
+        cc1 = make_connected_client()
+        cc1.local_jid = structs.JID.fromstr("romeo@montague.example/a")
+        cc2 = make_connected_client()
+        cc2.local_jid = structs.JID.fromstr("juliet@capulet.example/b")
+        s1 = disco_service.DiscoClient(cc1)
+        s2 = disco_service.DiscoClient(cc2)
+        s1.use_shared_cache(self.shared)
+        s2.use_shared_cache(self.shared)
+
+        server = structs.JID.fromstr("verona.example")
+        response = disco_xso.InfoQuery()
+
+        with unittest.mock.patch.object(
+                s1,
+                "send_and_decode_info_query",
+                new=CoroutineMock()) as send1, \
+                unittest.mock.patch.object(
+                    s2,
+                    "send_and_decode_info_query",
+                    new=CoroutineMock()) as send2:
+            send1.delay = 1
+            send2.return_value = response
+
+            task1 = asyncio.async(s1.query_info(server))
+            run_coroutine(asyncio.sleep(0))
+            task2 = asyncio.async(s2.query_info(server))
+            run_coroutine(asyncio.sleep(0))
+
+            cc1.on_stream_destroyed()
+
+            with self.assertRaises(asyncio.CancelledError):
+                run_coroutine(task1)
+            self.assertIs(run_coroutine(task2), response)
+
+        send2.assert_called_once_with(server, None)
+        self.assertIs(
+            run_coroutine(s1.query_info(server)),
+            response,
+        )
+
+    def test_cancelling_aliased_query_does_not_cancel_request(self):
+        cc1 = make_connected_client()
+        cc1.local_jid = structs.JID.fromstr("romeo@montague.example/a")
+        cc2 = make_connected_client()
+        cc2.local_jid = structs.JID.fromstr("juliet@capulet.example/b")
+        s1 = disco_service.DiscoClient(cc1)
+        s2 = disco_service.DiscoClient(cc2)
+        s1.use_shared_cache(self.shared)
+        s2.use_shared_cache(self.shared)
+
+        server = structs.JID.fromstr("verona.example")
+        response = disco_xso.InfoQuery()
+
+        with unittest.mock.patch.object(
+                s1,
+                "send_and_decode_info_query",
+                new=CoroutineMock()) as send1, \
+                unittest.mock.patch.object(
+                    s2,
+                    "send_and_decode_info_query",
+                    new=CoroutineMock()) as send2:
+            send1.delay = 0.01
+            send1.return_value = response
+
+            task1 = asyncio.async(s1.query_info(server))
+            run_coroutine(asyncio.sleep(0))
+            task2 = asyncio.async(s2.query_info(server))
+            run_coroutine(asyncio.sleep(0))
+
+            task2.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                run_coroutine(task2)
+
+            self.assertIs(run_coroutine(task1), response)
+
+        send1.assert_called_once_with(server, None)
+        self.assertFalse(send2.mock_calls)
+
+    def test_cancelling_aliased_items_query_does_not_cancel_request(self):
+        cc1 = make_connected_client()
+        cc1.local_jid = structs.JID.fromstr("romeo@montague.example/a")
+        cc2 = make_connected_client()
+        cc2.local_jid = structs.JID.fromstr("juliet@capulet.example/b")
+        s1 = disco_service.DiscoClient(cc1)
+        s2 = disco_service.DiscoClient(cc2)
+        s1.use_shared_cache(self.shared)
+        s2.use_shared_cache(self.shared)
+
+        server = structs.JID.fromstr("verona.example")
+        response = disco_xso.ItemsQuery()
+        cc1.stream.send.delay = 0.01
+        cc1.stream.send.return_value = response
+
+        task1 = asyncio.async(s1.query_items(server))
+        run_coroutine(asyncio.sleep(0))
+        task2 = asyncio.async(s2.query_items(server))
+        run_coroutine(asyncio.sleep(0))
+
+        task2.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            run_coroutine(task2)
+
+        self.assertIs(run_coroutine(task1), response)
+        self.assertEqual(len(cc1.stream.send.mock_calls), 1)
+        self.assertFalse(cc2.stream.send.mock_calls)
+
+
 class Testmount_as_node(unittest.TestCase):
     def setUp(self):
         self.pn = disco_service.mount_as_node(
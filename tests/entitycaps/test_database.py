@@ -0,0 +1,148 @@
+########################################################################
+# File name: test_database.py
+# This file is part of: aioxmpp
+#
+# LICENSE
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+########################################################################
+import io
+import pathlib
+import sqlite3
+import tempfile
+import unittest
+import unittest.mock
+
+import aioxmpp.disco as disco
+import aioxmpp.xml
+
+import aioxmpp.entitycaps.database as entitycaps_database
+import aioxmpp.entitycaps.service as entitycaps_service
+
+
+TEST_HASH = "sha-1"
+TEST_NODE = "http://tkabber.jabber.ru/#+0mnUAF1ozCEc37cmdPPsYbsfhg="
+TEST_ENTRY_DATA = b"""\
+<query xmlns="http://jabber.org/protocol/disco#info"><identity category="clie\
+nt" type="pc" name="Tkabber"/><feature var="jabber:iq:version"/><feature var=\
+"urn:xmpp:ping"/></query>"""
+
+
+def parse_entry(data=TEST_ENTRY_DATA):
+    return aioxmpp.xml.read_single_xso(io.BytesIO(data),
+                                       disco.xso.InfoQuery)
+
+
+class Testserialise_events(unittest.TestCase):
+    def test_roundtrip(self):
+        entry = parse_entry()
+        data = entitycaps_database.serialise_events(entry.captured_events)
+        self.assertIsInstance(data, bytes)
+        self.assertEqual(
+            parse_entry(data).features,
+            entry.features,
+        )
+
+
+class TestSQLiteDatabase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self.tmpdir.name) / "caps.sqlite"
+        self.db = entitycaps_database.SQLiteDatabase(self.path)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def test_creates_file(self):
+        self.assertTrue(self.path.exists())
+        self.assertEqual(len(self.db), 0)
+
+    def test_lookup_raises_KeyError_for_missing_entry(self):
+        with self.assertRaises(KeyError):
+            self.db.lookup(TEST_HASH, TEST_NODE)
+
+    def test_store_and_lookup(self):
+        entry = parse_entry()
+        self.db.store(TEST_HASH, TEST_NODE, entry.captured_events)
+
+        result = self.db.lookup(TEST_HASH, TEST_NODE)
+        self.assertIsInstance(result, disco.xso.InfoQuery)
+        self.assertSetEqual(
+            set(result.features),
+            {"jabber:iq:version", "urn:xmpp:ping"},
+        )
+        self.assertEqual(len(result.identities), 1)
+        self.assertEqual(len(self.db), 1)
+
+        with self.assertRaises(KeyError):
+            self.db.lookup("sha-256", TEST_NODE)
+
+    def test_store_replaces_entry(self):
+        entry = parse_entry()
+        self.db.store(TEST_HASH, TEST_NODE, entry.captured_events)
+        other = parse_entry(
+            b'<query xmlns="http://jabber.org/protocol/disco#info">'
+            b'<feature var="foo"/></query>'
+        )
+        self.db.store(TEST_HASH, TEST_NODE, other.captured_events)
+
+        self.assertEqual(len(self.db), 1)
+        self.assertSequenceEqual(
+            list(self.db.lookup(TEST_HASH, TEST_NODE).features),
+            ["foo"],
+        )
+
+    def test_persists_across_connections(self):
+        self.db.store(TEST_HASH, TEST_NODE, parse_entry().captured_events)
+        self.db.close()
+
+        self.db = entitycaps_database.SQLiteDatabase(self.path,
+                                                     read_only=True)
+        self.assertEqual(
+            len(self.db.lookup(TEST_HASH, TEST_NODE).features),
+            2,
+        )
+
+    def test_read_only_rejects_writes(self):
+        self.db.close()
+        self.db = entitycaps_database.SQLiteDatabase(self.path,
+                                                     read_only=True)
+        with self.assertRaises(sqlite3.OperationalError):
+            self.db.store(TEST_HASH, TEST_NODE,
+                          parse_entry().captured_events)
+
+    def test_import_directory(self):
+        dirpath = pathlib.Path(self.tmpdir.name) / "db"
+        dirpath.mkdir()
+        entitycaps_service.writeback(dirpath, TEST_HASH, TEST_NODE,
+                                     parse_entry().captured_events)
+        entitycaps_service.writeback(dirpath, "sha-256", "http://foo/#bar",
+                                     parse_entry().captured_events)
+        (dirpath / "README").write_text("not an entry")
+        (dirpath / "foo.xml").write_text("not an entry either")
+
+        self.assertEqual(self.db.import_directory(dirpath), 2)
+
+        self.assertEqual(len(self.db), 2)
+        self.assertEqual(
+            len(self.db.lookup(TEST_HASH, TEST_NODE).features),
+            2,
+        )
+        self.assertEqual(
+            len(self.db.lookup("sha-256", "http://foo/#bar").features),
+            2,
+        )
@@ -616,6 +616,76 @@ TEST_DB_ENTRY_HASH = "sha-1"
 TEST_DB_ENTRY_NODE_BARE = "http://tkabber.jabber.ru/"
 
 
+class Test_CompactEntry(unittest.TestCase):
+    def test_materialised_entry_hashes_to_same_ver(self):
+        entry = entitycaps_service._CompactEntry.from_info_query(
+            TEST_DB_ENTRY
+        )
+        result = entry.to_info_query(
+            TEST_DB_ENTRY_NODE_BARE + "#" + TEST_DB_ENTRY_VER
+        )
+
+        self.assertIsInstance(result, disco.xso.InfoQuery)
+        self.assertEqual(
+            result.node,
+            TEST_DB_ENTRY_NODE_BARE + "#" + TEST_DB_ENTRY_VER
+        )
+        self.assertEqual(
+            entitycaps_service.hash_query(result, "sha1"),
+            TEST_DB_ENTRY_VER,
+        )
+
+    def test_features_are_sorted_tuple(self):
+        entry = entitycaps_service._CompactEntry.from_info_query(
+            disco.xso.InfoQuery(features={"c", "a", "b"})
+        )
+        self.assertEqual(entry.features, ("a", "b", "c"))
+
+    def test_identities_are_tuples(self):
+        entry = entitycaps_service._CompactEntry.from_info_query(
+            disco.xso.InfoQuery(identities=[
+                disco.xso.Identity(category="client", type_="pc"),
+                disco.xso.Identity(category="client", type_="pc",
+                                   name="foo",
+                                   lang=structs.LanguageTag.fromstr("de")),
+            ])
+        )
+        self.assertSequenceEqual(
+            entry.identities,
+            [
+                ("client", "pc", None, None),
+                ("client", "pc", structs.LanguageTag.fromstr("de"), "foo"),
+            ]
+        )
+
+    def test_strings_are_shared_between_entries(self):
+        # build the strings at runtime, so that they are distinct objects
+        features1 = {"".join(["urn:", "foo"]), "".join(["urn:", "bar"])}
+        features2 = {"".join(["urn:", "foo"]), "".join(["urn:", "baz"])}
+
+        entry1 = entitycaps_service._CompactEntry.from_info_query(
+            disco.xso.InfoQuery(features=features1)
+        )
+        entry2 = entitycaps_service._CompactEntry.from_info_query(
+            disco.xso.InfoQuery(features=features2)
+        )
+
+        self.assertIs(entry1.features[1], entry2.features[1])
+
+    def test_materialisation_returns_fresh_objects(self):
+        entry = entitycaps_service._CompactEntry.from_info_query(
+            TEST_DB_ENTRY
+        )
+        result1 = entry.to_info_query("foo")
+        result2 = entry.to_info_query("foo")
+
+        self.assertIsNot(result1, result2)
+        result1.features.add("bar")
+        self.assertNotIn("bar", result2.features)
+        self.assertNotIn("bar", entry.features)
+        self.assertEqual(len(result2.exts), 1)
+
+
 class TestCache(unittest.TestCase):
     def setUp(self):
         self.c = entitycaps_service.Cache()
@@ -933,17 +1003,16 @@ class TestCache(unittest.TestCase):
                 run_coroutine(task)
 
     def test_add_cache_entry_is_immediately_visible_in_lookup_and_defers_writeback(self):
-        q = disco.xso.InfoQuery()
+        q = disco.xso.InfoQuery(
+            identities=[disco.xso.Identity(category="client", type_="pc")],
+            features={"foo", "bar"},
+        )
         p = unittest.mock.Mock()
-        hash_ = object()
-        node = object()
+        hash_ = "sha-1"
+        node = "http://foo/#bar"
         self.c.set_user_db_path(p)
 
         with contextlib.ExitStack() as stack:
-            copy = stack.enter_context(unittest.mock.patch(
-                "copy.copy"
-            ))
-
             run_in_executor = stack.enter_context(unittest.mock.patch.object(
                 asyncio.get_event_loop(),
                 "run_in_executor"
@@ -959,7 +1028,6 @@ class TestCache(unittest.TestCase):
                 q,
             )
 
-        copy.assert_called_with(q)
         run_in_executor.assert_called_with(
             None,
             entitycaps_service.writeback,
@@ -971,20 +1039,76 @@ class TestCache(unittest.TestCase):
         async.assert_called_with(run_in_executor())
 
         result = self.c.lookup_in_database(hash_, node)
-        self.assertEqual(result, copy())
+        self.assertIsInstance(result, disco.xso.InfoQuery)
+        self.assertIsNot(result, q)
         self.assertEqual(result.node, node)
+        self.assertSetEqual(result.features, q.features)
+        self.assertEqual(result.to_dict(), q.to_dict())
 
-    def test_add_cache_entry_does_not_perform_writeback_if_no_userdb_is_set(self):
+    def test_system_db_used_in_lookup(self):
+        db = unittest.mock.Mock()
+        self.c.set_system_db(db)
+
+        result = self.c.lookup_in_database("sha-1", "http://foo/#bar")
+
+        db.lookup.assert_called_once_with("sha-1", "http://foo/#bar")
+        self.assertEqual(result, db.lookup())
+
+    def test_user_db_used_in_lookup_as_fallback(self):
+        system_db = unittest.mock.Mock()
+        system_db.lookup.side_effect = KeyError()
+        user_db = unittest.mock.Mock()
+        self.c.set_system_db(system_db)
+        self.c.set_user_db(user_db)
+
+        result = self.c.lookup_in_database("sha-1", "http://foo/#bar")
+
+        system_db.lookup.assert_called_once_with("sha-1", "http://foo/#bar")
+        user_db.lookup.assert_called_once_with("sha-1", "http://foo/#bar")
+        self.assertEqual(result, user_db.lookup())
+
+    def test_lookup_key_errors_if_not_in_dbs(self):
+        db = unittest.mock.Mock()
+        db.lookup.side_effect = KeyError()
+        self.c.set_system_db(db)
+        self.c.set_user_db(db)
+
+        with self.assertRaises(KeyError):
+            self.c.lookup_in_database("sha-1", "http://foo/#bar")
+
+    def test_add_cache_entry_writes_to_user_db_in_executor(self):
         q = disco.xso.InfoQuery()
-        p = unittest.mock.Mock()
-        hash_ = object()
-        node = object()
+        db = unittest.mock.Mock()
+        self.c.set_user_db(db)
 
         with contextlib.ExitStack() as stack:
-            copy = stack.enter_context(unittest.mock.patch(
-                "copy.copy"
+            run_in_executor = stack.enter_context(unittest.mock.patch.object(
+                asyncio.get_event_loop(),
+                "run_in_executor"
             ))
 
+            async = stack.enter_context(unittest.mock.patch(
+                "asyncio.async"
+            ))
+
+            self.c.add_cache_entry("sha-1", "http://foo/#bar", q)
+
+        run_in_executor.assert_called_once_with(
+            None,
+            db.store,
+            "sha-1",
+            "http://foo/#bar",
+            q.captured_events,
+        )
+        async.assert_called_once_with(run_in_executor())
+        self.assertFalse(db.store.mock_calls)
+
+    def test_add_cache_entry_does_not_perform_writeback_if_no_userdb_is_set(self):
+        q = disco.xso.InfoQuery(features={"foo"})
+        hash_ = "sha-1"
+        node = "http://foo/#bar"
+
+        with contextlib.ExitStack() as stack:
             run_in_executor = stack.enter_context(unittest.mock.patch.object(
                 asyncio.get_event_loop(),
                 "run_in_executor"
@@ -1000,13 +1124,220 @@ class TestCache(unittest.TestCase):
                 q,
             )
 
-        copy.assert_called_with(q)
         self.assertFalse(run_in_executor.mock_calls)
         self.assertFalse(async.mock_calls)
 
         result = self.c.lookup_in_database(hash_, node)
-        self.assertEqual(result, copy())
         self.assertEqual(result.node, node)
+        self.assertSetEqual(result.features, {"foo"})
+
+    def test_lookup_runs_database_lookup_in_executor(self):
+        self.c.set_system_db(unittest.mock.Mock())
+        q = disco.xso.InfoQuery()
+        fut = asyncio.Future()
+        fut.set_result(q)
+
+        with unittest.mock.patch.object(
+                asyncio.get_event_loop(),
+                "run_in_executor") as run_in_executor:
+            run_in_executor.return_value = fut
+
+            result = run_coroutine(self.c.lookup("sha-1", "http://foo/#bar"))
+
+        run_in_executor.assert_called_once_with(
+            None,
+            self.c._lookup_in_databases,
+            "sha-1",
+            "http://foo/#bar",
+        )
+        self.assertIs(result, q)
+
+    def test_lookup_returns_result_from_db(self):
+        q = disco.xso.InfoQuery(features={"foo"})
+        db = unittest.mock.Mock()
+        db.lookup.return_value = q
+        self.c.set_system_db(db)
+
+        result = run_coroutine(self.c.lookup("sha-1", "http://foo/#bar"))
+
+        db.lookup.assert_called_once_with("sha-1", "http://foo/#bar")
+        self.assertIs(result, q)
+
+    def test_lookup_keeps_database_hits_in_memory(self):
+        q = disco.xso.InfoQuery(
+            identities=[disco.xso.Identity(category="client", type_="pc",
+                                           name="foo")],
+            features={"foo", "bar"},
+        )
+        db = unittest.mock.Mock()
+        db.lookup.return_value = q
+        self.c.set_system_db(db)
+
+        run_coroutine(self.c.lookup("sha-1", "http://foo/#bar"))
+        result = run_coroutine(self.c.lookup("sha-1", "http://foo/#bar"))
+
+        db.lookup.assert_called_once_with("sha-1", "http://foo/#bar")
+        self.assertIsNot(result, q)
+        self.assertEqual(result.node, "http://foo/#bar")
+        self.assertEqual(result.to_dict(), q.to_dict())
+
+    def test_memory_cache_size(self):
+        self.assertEqual(self.c.memory_cache_size, 4096)
+        self.c.memory_cache_size = 2
+
+        for node in ["a", "b", "c"]:
+            self.c.add_cache_entry("sha-1", node, disco.xso.InfoQuery())
+
+        self.assertEqual(self.c.memory_cache_size, 2)
+        with self.assertRaises(KeyError):
+            self.c.lookup_in_database("sha-1", "a")
+        self.c.lookup_in_database("sha-1", "b")
+        self.c.lookup_in_database("sha-1", "c")
+
+    def test_lookup_does_not_use_executor_for_added_entries(self):
+        self.c.set_system_db(unittest.mock.Mock())
+        q = disco.xso.InfoQuery()
+        self.c.add_cache_entry("sha-1", "http://foo/#bar", q)
+
+        with unittest.mock.patch.object(
+                asyncio.get_event_loop(),
+                "run_in_executor") as run_in_executor:
+            result = run_coroutine(self.c.lookup("sha-1", "http://foo/#bar"))
+
+        self.assertFalse(run_in_executor.mock_calls)
+        self.assertEqual(result.node, "http://foo/#bar")
+
+    def test_concurrent_lookups_share_database_lookup(self):
+        self.c.set_system_db(unittest.mock.Mock())
+        q = disco.xso.InfoQuery()
+        fut = asyncio.Future()
+
+        with unittest.mock.patch.object(
+                asyncio.get_event_loop(),
+                "run_in_executor") as run_in_executor:
+            run_in_executor.return_value = fut
+
+            task1 = asyncio.async(self.c.lookup("sha-1", "http://foo/#bar"))
+            task2 = asyncio.async(self.c.lookup("sha-1", "http://foo/#bar"))
+            run_coroutine(asyncio.sleep(0))
+
+            run_in_executor.assert_called_once_with(
+                None,
+                self.c._lookup_in_databases,
+                "sha-1",
+                "http://foo/#bar",
+            )
+
+            fut.set_result(q)
+            run_coroutine(asyncio.sleep(0))
+
+        self.assertIs(task1.result(), q)
+        self.assertIs(task2.result(), q)
+
+    def test_cancelled_lookup_does_not_cancel_shared_database_lookup(self):
+        self.c.set_system_db(unittest.mock.Mock())
+        q = disco.xso.InfoQuery()
+        fut = asyncio.Future()
+
+        with unittest.mock.patch.object(
+                asyncio.get_event_loop(),
+                "run_in_executor") as run_in_executor:
+            run_in_executor.return_value = fut
+
+            task1 = asyncio.async(self.c.lookup("sha-1", "http://foo/#bar"))
+            task2 = asyncio.async(self.c.lookup("sha-1", "http://foo/#bar"))
+            run_coroutine(asyncio.sleep(0))
+
+            task1.cancel()
+            run_coroutine(asyncio.sleep(0))
+            self.assertFalse(fut.cancelled())
+
+            fut.set_result(q)
+            run_coroutine(asyncio.sleep(0))
+
+        self.assertTrue(task1.cancelled())
+        self.assertIs(task2.result(), q)
+
+    def test_database_miss_is_remembered(self):
+        db = unittest.mock.Mock()
+        db.lookup.side_effect = KeyError()
+        self.c.set_system_db(db)
+
+        with self.assertRaises(KeyError):
+            run_coroutine(self.c.lookup("sha-1", "http://foo/#bar"))
+
+        with self.assertRaises(KeyError):
+            run_coroutine(self.c.lookup("sha-1", "http://foo/#bar"))
+
+        db.lookup.assert_called_once_with("sha-1", "http://foo/#bar")
+
+    def test_remembered_miss_does_not_hide_pending_query(self):
+        db = unittest.mock.Mock()
+        db.lookup.side_effect = KeyError()
+        self.c.set_system_db(db)
+
+        with self.assertRaises(KeyError):
+            run_coroutine(self.c.lookup("sha-1", "http://foo/#bar"))
+
+        fut = self.c.create_query_future("sha-1", "http://foo/#bar")
+        task = asyncio.async(self.c.lookup("sha-1", "http://foo/#bar"))
+        run_coroutine(asyncio.sleep(0))
+        self.assertFalse(task.done())
+
+        fut.set_result(unittest.mock.sentinel.result)
+        run_coroutine(asyncio.sleep(0))
+
+        self.assertEqual(task.result(), unittest.mock.sentinel.result)
+
+    def test_changing_db_forgets_remembered_misses(self):
+        for setter in [self.c.set_system_db, self.c.set_user_db,
+                       self.c.set_system_db_path, self.c.set_user_db_path]:
+            db = unittest.mock.Mock()
+            db.lookup.side_effect = KeyError()
+            self.c.set_system_db(db)
+
+            with self.assertRaises(KeyError):
+                run_coroutine(self.c.lookup("sha-1", "http://foo/#bar"))
+
+            setter(None)
+            self.c.set_system_db(db)
+
+            with self.assertRaises(KeyError):
+                run_coroutine(self.c.lookup("sha-1", "http://foo/#bar"))
+
+            self.assertEqual(len(db.lookup.mock_calls), 2, setter)
+
+    def test_add_cache_entry_forgets_remembered_miss(self):
+        db = unittest.mock.Mock()
+        db.lookup.side_effect = KeyError()
+        self.c.set_system_db(db)
+
+        with self.assertRaises(KeyError):
+            run_coroutine(self.c.lookup("sha-1", "http://foo/#bar"))
+
+        self.c.add_cache_entry("sha-1", "http://foo/#bar",
+                               disco.xso.InfoQuery())
+
+        self.assertNotIn(("sha-1", "http://foo/#bar"),
+                         self.c._negative_cache)
+
+    def test_negative_cache_size(self):
+        self.assertEqual(self.c.negative_cache_size, 1024)
+        self.c.negative_cache_size = 2
+        self.assertEqual(self.c.negative_cache_size, 2)
+
+        db = unittest.mock.Mock()
+        db.lookup.side_effect = KeyError()
+        self.c.set_system_db(db)
+
+        for node in ["a", "b", "c", "a"]:
+            with self.assertRaises(KeyError):
+                run_coroutine(self.c.lookup("sha-1", node))
+
+        self.assertSequenceEqual(
+            [call[1][1] for call in db.lookup.mock_calls],
+            ["a", "b", "c", "a"],
+        )
 
     def tearDown(self):
         del self.c
@@ -1406,6 +1737,48 @@ class TestService(unittest.TestCase):
 
         self.assertEqual(result, response)
 
+    def test_query_and_cache_releases_future_on_query_error(self):
+        ver = TEST_DB_ENTRY_VER
+        exc = ConnectionError()
+
+        base = unittest.mock.Mock()
+        base.disco = self.disco_client
+        base.disco.query_info.side_effect = exc
+
+        with self.assertRaises(ConnectionError):
+            run_coroutine(self.s.query_and_cache(
+                TEST_FROM,
+                "foobar",
+                ver,
+                "sha-1",
+                base.fut,
+            ))
+
+        _, (released_exc, ), _ = base.fut.set_exception.mock_calls[0]
+        self.assertIsInstance(released_exc, ValueError)
+
+    def test_query_error_makes_concurrent_lookup_fall_back(self):
+        ver = TEST_DB_ENTRY_VER
+        node = "foobar#" + ver
+
+        fut = self.s.cache.create_query_future("sha-1", node)
+        lookup = asyncio.async(self.s.cache.lookup("sha-1", node))
+        run_coroutine(asyncio.sleep(0))
+        self.assertFalse(lookup.done())
+
+        self.disco_client.query_info.side_effect = ConnectionError()
+        with self.assertRaises(ConnectionError):
+            run_coroutine(self.s.query_and_cache(
+                TEST_FROM,
+                "foobar",
+                ver,
+                "sha-1",
+                fut,
+            ))
+
+        with self.assertRaises(KeyError):
+            run_coroutine(lookup)
+
     def test_lookup_info_asks_cache_first_and_returns_value(self):
         base = unittest.mock.Mock()
         base.disco = self.disco_client
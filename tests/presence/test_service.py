@@ -231,6 +231,206 @@ class TestPresenceClient(unittest.TestCase):
     def test_get_most_available_stanza_returns_None_for_unavailable_JID(self):
         self.assertIsNone(self.s.get_most_available_stanza(TEST_PEER_JID1))
 
+    def _available(self, jid, show=structs.PresenceShow.NONE):
+        st = stanza.Presence(type_=structs.PresenceType.AVAILABLE,
+                             show=show,
+                             from_=jid)
+        self.s.handle_presence(st)
+        return st
+
+    def _unavailable(self, jid):
+        st = stanza.Presence(type_=structs.PresenceType.UNAVAILABLE,
+                             from_=jid)
+        self.s.handle_presence(st)
+        return st
+
+    def test_get_most_available_stanza_does_not_inspect_resources(self):
+        st = self._available(TEST_PEER_JID1.replace(resource="foo"))
+        self._available(TEST_PEER_JID1.replace(resource="bar"),
+                        structs.PresenceShow.AWAY)
+
+        with unittest.mock.patch.object(
+                structs.PresenceState,
+                "from_stanza") as from_stanza:
+            self.assertIs(
+                self.s.get_most_available_stanza(TEST_PEER_JID1),
+                st
+            )
+
+        self.assertFalse(from_stanza.mock_calls)
+
+    def test_get_most_available_stanza_after_downgrade(self):
+        self._available(TEST_PEER_JID1.replace(resource="foo"),
+                        structs.PresenceShow.AWAY)
+        stbar = self._available(TEST_PEER_JID1.replace(resource="bar"))
+        self._available(TEST_PEER_JID1.replace(resource="baz"),
+                        structs.PresenceShow.DND)
+
+        self._available(TEST_PEER_JID1.replace(resource="baz"),
+                        structs.PresenceShow.XA)
+
+        self.assertIs(
+            self.s.get_most_available_stanza(TEST_PEER_JID1),
+            stbar
+        )
+
+        self._available(TEST_PEER_JID1.replace(resource="bar"),
+                        structs.PresenceShow.XA)
+        stfoo = self.s.get_stanza(TEST_PEER_JID1.replace(resource="foo"))
+
+        self.assertIs(
+            self.s.get_most_available_stanza(TEST_PEER_JID1),
+            stfoo
+        )
+
+    def test_get_most_available_stanza_after_unavailable(self):
+        stfoo = self._available(TEST_PEER_JID1.replace(resource="foo"),
+                                structs.PresenceShow.AWAY)
+        self._available(TEST_PEER_JID1.replace(resource="bar"),
+                        structs.PresenceShow.CHAT)
+
+        self._unavailable(TEST_PEER_JID1.replace(resource="bar"))
+
+        self.assertIs(
+            self.s.get_most_available_stanza(TEST_PEER_JID1),
+            stfoo
+        )
+
+        self._unavailable(TEST_PEER_JID1.replace(resource="foo"))
+
+        self.assertIsNone(self.s.get_most_available_stanza(TEST_PEER_JID1))
+
+    def test_get_most_available_stanza_prefers_latest_on_tie(self):
+        self._available(TEST_PEER_JID1.replace(resource="foo"))
+        st = self._available(TEST_PEER_JID1.replace(resource="bar"))
+
+        self.assertIs(
+            self.s.get_most_available_stanza(TEST_PEER_JID1),
+            st
+        )
+
+        st = self._available(TEST_PEER_JID1.replace(resource="foo"))
+
+        self.assertIs(
+            self.s.get_most_available_stanza(TEST_PEER_JID1),
+            st
+        )
+
+    def test_get_most_available_stanza_prefers_latest_on_tie_after_rescan(
+            self):
+        self._available(TEST_PEER_JID1.replace(resource="b"),
+                        structs.PresenceShow.CHAT)
+        self._available(TEST_PEER_JID1.replace(resource="a"),
+                        structs.PresenceShow.CHAT)
+        stb = self._available(TEST_PEER_JID1.replace(resource="b"),
+                              structs.PresenceShow.CHAT)
+
+        self._available(TEST_PEER_JID1.replace(resource="c"),
+                        structs.PresenceShow.DND)
+        self._unavailable(TEST_PEER_JID1.replace(resource="c"))
+
+        self.assertIs(
+            self.s.get_most_available_stanza(TEST_PEER_JID1),
+            stb
+        )
+
+        self._available(TEST_PEER_JID1.replace(resource="c"),
+                        structs.PresenceShow.DND)
+        self._available(TEST_PEER_JID1.replace(resource="c"),
+                        structs.PresenceShow.XA)
+
+        self.assertIs(
+            self.s.get_most_available_stanza(TEST_PEER_JID1),
+            stb
+        )
+
+    def test_get_most_available_stanza_returns_None_after_error(self):
+        self._available(TEST_PEER_JID1.replace(resource="foo"))
+        self.s.handle_presence(
+            stanza.Presence(type_=structs.PresenceType.ERROR,
+                            from_=TEST_PEER_JID1)
+        )
+
+        self.assertIsNone(self.s.get_most_available_stanza(TEST_PEER_JID1))
+
+        st = self._available(TEST_PEER_JID1.replace(resource="foo"))
+
+        self.assertIs(
+            self.s.get_most_available_stanza(TEST_PEER_JID1),
+            st
+        )
+
+    def test_get_most_available_stanza_ignores_bare_jid_presence(self):
+        self._available(TEST_PEER_JID1)
+
+        self.assertIsNone(self.s.get_most_available_stanza(TEST_PEER_JID1))
+        self.assertSetEqual(set(self.s.get_available_peers()), set())
+
+    def test_get_available_peers(self):
+        self.assertSetEqual(set(self.s.get_available_peers()), set())
+
+        self._available(TEST_PEER_JID1.replace(resource="foo"))
+        self._available(TEST_PEER_JID1.replace(resource="bar"))
+        self._available(TEST_PEER_JID2.replace(resource="foo"))
+
+        peers = self.s.get_available_peers()
+        self.assertSetEqual(set(peers), {TEST_PEER_JID1, TEST_PEER_JID2})
+
+        self._unavailable(TEST_PEER_JID1.replace(resource="foo"))
+        self.assertSetEqual(set(peers), {TEST_PEER_JID1, TEST_PEER_JID2})
+
+        self._unavailable(TEST_PEER_JID1.replace(resource="bar"))
+        self.assertSetEqual(set(peers), {TEST_PEER_JID2})
+
+        self.s.handle_presence(
+            stanza.Presence(type_=structs.PresenceType.ERROR,
+                            from_=TEST_PEER_JID2)
+        )
+        self.assertSetEqual(set(peers), set())
+
+    def test_get_show_counts(self):
+        self.assertDictEqual(self.s.get_show_counts(), {})
+
+        self._available(TEST_PEER_JID1.replace(resource="foo"),
+                        structs.PresenceShow.AWAY)
+        self._available(TEST_PEER_JID2.replace(resource="foo"),
+                        structs.PresenceShow.AWAY)
+
+        self.assertDictEqual(
+            self.s.get_show_counts(),
+            {structs.PresenceShow.AWAY: 2}
+        )
+
+        self._available(TEST_PEER_JID1.replace(resource="bar"),
+                        structs.PresenceShow.CHAT)
+
+        self.assertDictEqual(
+            self.s.get_show_counts(),
+            {
+                structs.PresenceShow.AWAY: 1,
+                structs.PresenceShow.CHAT: 1,
+            }
+        )
+
+        self._unavailable(TEST_PEER_JID1.replace(resource="bar"))
+        self._available(TEST_PEER_JID2.replace(resource="foo"))
+
+        self.assertDictEqual(
+            self.s.get_show_counts(),
+            {
+                structs.PresenceShow.AWAY: 1,
+                structs.PresenceShow.NONE: 1,
+            }
+        )
+
+        self._unavailable(TEST_PEER_JID1.replace(resource="foo"))
+        self.s.handle_presence(
+            stanza.Presence(type_=structs.PresenceType.ERROR,
+                            from_=TEST_PEER_JID2)
+        )
+
+        self.assertDictEqual(self.s.get_show_counts(), {})
+
     def test_handle_presence_emits_available_signals(self):
         base = unittest.mock.Mock()
         base.bare.return_value = False
@@ -0,0 +1,262 @@
+########################################################################
+# File name: test_cache.py
+# This file is part of: aioxmpp
+#
+# LICENSE
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+########################################################################
+import unittest
+import unittest.mock
+
+import aioxmpp.cache as cache
+
+
+class TestLRUDict(unittest.TestCase):
+    def setUp(self):
+        self.d = cache.LRUDict()
+
+    def tearDown(self):
+        del self.d
+
+    def test_default_maxsize(self):
+        self.assertEqual(1, self.d.maxsize)
+
+    def test_maxsize_from_argument(self):
+        self.assertEqual(10, cache.LRUDict(10).maxsize)
+
+    def test_reject_negative_maxsize(self):
+        with self.assertRaises(ValueError):
+            self.d.maxsize = -1
+
+    def test_store_and_retrieve(self):
+        self.d.maxsize = 2
+        self.d[1] = unittest.mock.sentinel.v1
+        self.d[2] = unittest.mock.sentinel.v2
+
+        self.assertEqual(2, len(self.d))
+        self.assertIn(1, self.d)
+        self.assertIs(self.d[1], unittest.mock.sentinel.v1)
+        self.assertIs(self.d[2], unittest.mock.sentinel.v2)
+
+    def test_expire_least_recently_used(self):
+        self.d.maxsize = 2
+        self.d[1] = unittest.mock.sentinel.v1
+        self.d[2] = unittest.mock.sentinel.v2
+        self.d[1]
+        self.d[3] = unittest.mock.sentinel.v3
+
+        self.assertIn(1, self.d)
+        self.assertNotIn(2, self.d)
+        self.assertIn(3, self.d)
+
+    def test_lookup_marks_entry_as_used(self):
+        self.d.maxsize = 2
+        self.d[1] = unittest.mock.sentinel.v1
+        self.d[2] = unittest.mock.sentinel.v2
+        self.d.lookup(1)
+        self.d[3] = unittest.mock.sentinel.v3
+
+        self.assertIn(1, self.d)
+        self.assertNotIn(2, self.d)
+
+    def test_reducing_maxsize_expires_entries(self):
+        self.d.maxsize = 3
+        for i in range(3):
+            self.d[i] = i
+        self.d.maxsize = 1
+
+        self.assertEqual(1, len(self.d))
+        self.assertIn(2, self.d)
+
+    def test_zero_maxsize_stores_nothing(self):
+        self.d.maxsize = 0
+        self.d[1] = unittest.mock.sentinel.v1
+        self.assertEqual(0, len(self.d))
+        self.assertIsNone(self.d.lookup(1))
+
+    def test_getitem_raises_KeyError(self):
+        with self.assertRaises(KeyError):
+            self.d[1]
+
+    def test_delitem(self):
+        self.d[1] = unittest.mock.sentinel.v1
+        del self.d[1]
+        self.assertNotIn(1, self.d)
+
+    def test_lookup_counts_hits_and_misses(self):
+        self.d.maxsize = 2
+        self.d[1] = unittest.mock.sentinel.v1
+
+        self.assertIs(self.d.lookup(1), unittest.mock.sentinel.v1)
+        self.assertIs(
+            self.d.lookup(2, unittest.mock.sentinel.default),
+            unittest.mock.sentinel.default,
+        )
+        self.assertIsNone(self.d.lookup(2))
+        self.d[1]
+
+        self.assertEqual(
+            cache.CacheInfo(hits=1, misses=2, maxsize=2, currsize=1),
+            self.d.cache_info(),
+        )
+
+    def test_clear_removes_entries_and_resets_statistics(self):
+        self.d[1] = unittest.mock.sentinel.v1
+        self.d.lookup(1)
+        self.d.lookup(2)
+        self.d.clear()
+
+        self.assertEqual(0, len(self.d))
+        self.assertEqual(
+            cache.CacheInfo(hits=0, misses=0, maxsize=1, currsize=0),
+            self.d.cache_info(),
+        )
+
+
+class TestExpiringLRUDict(unittest.TestCase):
+    def setUp(self):
+        self.clock = unittest.mock.Mock()
+        self.clock.return_value = 100
+        self.d = cache.ExpiringLRUDict(2, clock=self.clock)
+
+    def tearDown(self):
+        del self.d
+
+    def test_default_maxsize(self):
+        self.assertEqual(1, cache.ExpiringLRUDict().maxsize)
+
+    def test_reject_negative_maxsize(self):
+        with self.assertRaises(ValueError):
+            self.d.maxsize = -1
+
+    def test_store_and_retrieve(self):
+        self.d[1] = unittest.mock.sentinel.v1
+        self.d.set(2, unittest.mock.sentinel.v2, ttl=10)
+
+        self.assertEqual(2, len(self.d))
+        self.assertIs(self.d[1], unittest.mock.sentinel.v1)
+        self.assertIs(self.d[2], unittest.mock.sentinel.v2)
+
+    def test_entries_expire(self):
+        self.d[1] = unittest.mock.sentinel.v1
+        self.d.set(2, unittest.mock.sentinel.v2, ttl=10)
+
+        self.clock.return_value = 109.5
+        self.assertIn(2, self.d)
+
+        self.clock.return_value = 110
+        self.assertIn(1, self.d)
+        self.assertNotIn(2, self.d)
+        with self.assertRaises(KeyError):
+            self.d[2]
+        self.assertIsNone(self.d.lookup(2))
+
+        info = self.d.cache_info()
+        self.assertEqual(info.expirations, 1)
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.currsize, 1)
+
+    def test_set_ttl(self):
+        self.d.set(1, unittest.mock.sentinel.v1, ttl=10)
+        self.clock.return_value = 105
+        self.d.set_ttl(1, 10)
+
+        self.clock.return_value = 114
+        self.assertIn(1, self.d)
+        self.clock.return_value = 115
+        self.assertNotIn(1, self.d)
+
+    def test_set_ttl_none_disables_expiry(self):
+        self.d.set(1, unittest.mock.sentinel.v1, ttl=10)
+        self.d.set_ttl(1, None)
+        self.clock.return_value = 1000
+        self.assertIn(1, self.d)
+
+    def test_set_ttl_raises_KeyError_for_missing_entry(self):
+        with self.assertRaises(KeyError):
+            self.d.set_ttl(1, 10)
+
+    def test_evict_least_recently_used(self):
+        self.d[1] = unittest.mock.sentinel.v1
+        self.d[2] = unittest.mock.sentinel.v2
+        self.d.lookup(1)
+        self.d[3] = unittest.mock.sentinel.v3
+
+        self.assertIn(1, self.d)
+        self.assertNotIn(2, self.d)
+        self.assertIn(3, self.d)
+        self.assertEqual(1, self.d.cache_info().evictions)
+
+    def test_evicting_expired_entry_counts_as_expiration(self):
+        self.d.set(1, unittest.mock.sentinel.v1, ttl=10)
+        self.d[2] = unittest.mock.sentinel.v2
+        self.clock.return_value = 110
+        self.d[3] = unittest.mock.sentinel.v3
+
+        info = self.d.cache_info()
+        self.assertEqual(0, info.evictions)
+        self.assertEqual(1, info.expirations)
+
+    def test_zero_maxsize_stores_nothing(self):
+        self.d.maxsize = 0
+        self.d[1] = unittest.mock.sentinel.v1
+        self.assertEqual(0, len(self.d))
+
+    def test_items_skips_expired_entries(self):
+        self.d.set(1, unittest.mock.sentinel.v1, ttl=10)
+        self.d[2] = unittest.mock.sentinel.v2
+        self.clock.return_value = 110
+
+        self.assertSequenceEqual(
+            self.d.items(),
+            [(2, unittest.mock.sentinel.v2)],
+        )
+
+    def test_purge_expired(self):
+        self.d.set(1, unittest.mock.sentinel.v1, ttl=10)
+        self.d[2] = unittest.mock.sentinel.v2
+        self.clock.return_value = 110
+        self.d.purge_expired()
+
+        self.assertEqual(1, len(self.d))
+        self.assertEqual(1, self.d.cache_info().expirations)
+
+    def test_lookup_counts_hits_and_misses(self):
+        self.d[1] = unittest.mock.sentinel.v1
+
+        self.assertIs(self.d.lookup(1), unittest.mock.sentinel.v1)
+        self.assertIs(
+            self.d.lookup(2, unittest.mock.sentinel.default),
+            unittest.mock.sentinel.default,
+        )
+
+        self.assertEqual(
+            cache.ExpiringCacheInfo(hits=1, misses=1, evictions=0,
+                                    expirations=0, maxsize=2, currsize=1),
+            self.d.cache_info(),
+        )
+
+    def test_clear_removes_entries_and_resets_statistics(self):
+        self.d[1] = unittest.mock.sentinel.v1
+        self.d.lookup(1)
+        self.d.clear()
+
+        self.assertEqual(
+            cache.ExpiringCacheInfo(hits=0, misses=0, evictions=0,
+                                    expirations=0, maxsize=2, currsize=0),
+            self.d.cache_info(),
+        )
@@ -37,6 +37,11 @@ from aioxmpp.callbacks import (
     SyncAdHocSignal,
     SyncSignal,
     Filter,
+    CallStatistics,
+    Instrumentation,
+    enable_instrumentation,
+    disable_instrumentation,
+    get_instrumentation,
 )
 
 from aioxmpp.testutils import run_coroutine, CoroutineMock
@@ -1152,6 +1157,35 @@ class TestSignal(unittest.TestCase):
         self.assertIsInstance(instance1.s, AdHocSignal)
         self.assertIsInstance(instance2.s, AdHocSignal)
 
+    def test_name(self):
+        class Foo:
+            s = Signal()
+
+        class Bar(Foo):
+            pass
+
+        self.assertEqual(
+            Foo().s.name,
+            "{}.{}.s".format(__name__, Foo.__qualname__),
+        )
+        self.assertEqual(
+            Bar().s.name,
+            "{}.{}.s".format(__name__, Foo.__qualname__),
+        )
+
+    def test_name_without_set_name(self):
+        s = Signal()
+
+        class Foo:
+            pass
+
+        Foo.s = s
+
+        self.assertEqual(
+            Foo().s.name,
+            "{}.{}.s".format(__name__, Foo.__qualname__),
+        )
+
     def test_reject_set(self):
         class Foo:
             s = Signal()
@@ -1389,6 +1423,107 @@ class TestFilter(unittest.TestCase):
             calls
         )
 
+    def test_register_keeps_order_of_addition_for_equal_order(self):
+        mock = unittest.mock.Mock()
+
+        self.f.register(mock.func1, 0)
+        self.f.register(mock.func2, 1)
+        self.f.register(mock.func3, 0)
+        self.f.register(mock.func4, -1)
+        self.f.register(mock.func5, 0)
+
+        self.f.filter(mock.stanza)
+
+        self.assertSequenceEqual(
+            [name for name, *_ in mock.mock_calls],
+            ["func4", "func1", "func3", "func5", "func2"],
+        )
+
+    def test_unregister_keeps_order(self):
+        mock = unittest.mock.Mock()
+
+        self.f.register(mock.func1, 0)
+        token = self.f.register(mock.func2, 1)
+        self.f.register(mock.func3, 2)
+        self.f.unregister(token)
+        self.f.register(mock.func4, 1)
+
+        self.f.filter(mock.stanza)
+
+        self.assertSequenceEqual(
+            [name for name, *_ in mock.mock_calls],
+            ["func1", "func4", "func3"],
+        )
+
+    def test_empty_chain_returns_object(self):
+        self.assertIs(
+            self.f.filter(unittest.mock.sentinel.obj),
+            unittest.mock.sentinel.obj,
+        )
+
+    def test_timing_disabled_by_default(self):
+        self.assertIsNone(self.f.timings)
+
+    def test_timing_records_calls(self):
+        mock = unittest.mock.Mock()
+        mock.func2.return_value = None
+
+        self.f.register(mock.func1, 0)
+        self.f.register(mock.func2, 1)
+        self.f.register(mock.func3, 2)
+
+        self.f.enable_timing()
+        self.assertEqual(self.f.timings, {})
+
+        self.assertIsNone(self.f.filter(mock.stanza, 1, x=2))
+        self.assertIsNone(self.f.filter(mock.stanza, 1, x=2))
+
+        self.assertSequenceEqual(
+            mock.mock_calls,
+            [
+                unittest.mock.call.func1(mock.stanza, 1, x=2),
+                unittest.mock.call.func2(mock.func1.return_value, 1, x=2),
+            ] * 2
+        )
+
+        timings = self.f.timings
+        self.assertCountEqual(timings.keys(), [mock.func1, mock.func2])
+        for stats in timings.values():
+            self.assertIsInstance(stats, CallStatistics)
+            self.assertEqual(stats.calls, 2)
+            self.assertGreaterEqual(stats.total_time, stats.max_time)
+            self.assertGreaterEqual(stats.max_time, 0)
+
+    def test_timing_records_raising_calls(self):
+        func = unittest.mock.Mock()
+        func.side_effect = ValueError()
+
+        self.f.register(func, 0)
+        self.f.enable_timing()
+
+        with self.assertRaises(ValueError):
+            self.f.filter(unittest.mock.sentinel.obj)
+
+        self.assertEqual(self.f.timings[func].calls, 1)
+
+    def test_enable_timing_is_idempotent(self):
+        func = unittest.mock.Mock()
+        self.f.register(func, 0)
+        self.f.enable_timing()
+        self.f.filter(unittest.mock.sentinel.obj)
+        self.f.enable_timing()
+        self.assertEqual(self.f.timings[func].calls, 1)
+
+    def test_disable_timing_discards_statistics(self):
+        func = unittest.mock.Mock()
+        self.f.register(func, 0)
+        self.f.enable_timing()
+        self.f.filter(unittest.mock.sentinel.obj)
+        self.f.disable_timing()
+        self.assertIsNone(self.f.timings)
+        self.f.filter(unittest.mock.sentinel.obj)
+        self.assertIsNone(self.f.timings)
+
     def test_context_register_is_context_manager(self):
         cm = self.f.context_register(
             unittest.mock.sentinel.func,
@@ -1505,3 +1640,291 @@ class TestFilter(unittest.TestCase):
         unregister.assert_called_once_with(
             unittest.mock.sentinel.token
         )
+
+
+class TestCallStatistics(unittest.TestCase):
+    def test_init(self):
+        stats = CallStatistics()
+        self.assertEqual(stats.calls, 0)
+        self.assertEqual(stats.total_time, 0)
+        self.assertEqual(stats.max_time, 0)
+
+    def test_record(self):
+        stats = CallStatistics()
+        stats.record(0.5)
+        stats.record(2)
+        stats.record(1)
+        self.assertEqual(stats.calls, 3)
+        self.assertEqual(stats.total_time, 3.5)
+        self.assertEqual(stats.max_time, 2)
+
+    def test_percentile_without_samples(self):
+        stats = CallStatistics()
+        stats.record(1)
+        self.assertIsNone(stats.percentile(50))
+
+    def test_percentile(self):
+        stats = CallStatistics(sample_size=100)
+        for i in range(1, 101):
+            stats.record(i)
+        self.assertEqual(stats.percentile(0), 1)
+        self.assertEqual(stats.percentile(50), 50)
+        self.assertEqual(stats.percentile(90), 90)
+        self.assertEqual(stats.percentile(99), 99)
+        self.assertEqual(stats.percentile(100), 100)
+
+    def test_percentile_uses_recent_samples(self):
+        stats = CallStatistics(sample_size=2)
+        stats.record(10)
+        stats.record(1)
+        stats.record(2)
+        self.assertEqual(stats.percentile(100), 2)
+        self.assertEqual(stats.max_time, 10)
+
+    def test_percentile_rejects_out_of_range(self):
+        stats = CallStatistics(sample_size=2)
+        with self.assertRaises(ValueError):
+            stats.percentile(-1)
+        with self.assertRaises(ValueError):
+            stats.percentile(101)
+
+    def test_snapshot(self):
+        stats = CallStatistics(sample_size=10)
+        stats.record(1)
+        stats.record(3)
+        self.assertDictEqual(
+            stats.snapshot(percentiles=(50, 100)),
+            {
+                "calls": 2,
+                "total_time": 4,
+                "max_time": 3,
+                "mean_time": 2,
+                "percentiles": {50: 1, 100: 3},
+            }
+        )
+
+    def test_snapshot_without_calls(self):
+        stats = CallStatistics()
+        snapshot = stats.snapshot()
+        self.assertEqual(snapshot["mean_time"], 0)
+        self.assertDictEqual(
+            snapshot["percentiles"],
+            {50: None, 90: None, 99: None},
+        )
+
+
+def listener_function(*args):
+    pass
+
+
+def passthrough_function(obj):
+    return obj
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.instr = Instrumentation(sample_size=10)
+
+    def tearDown(self):
+        disable_instrumentation()
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(get_instrumentation())
+
+    def test_enable_instrumentation_creates_instrumentation(self):
+        instr = enable_instrumentation()
+        self.assertIsInstance(instr, Instrumentation)
+        self.assertIs(get_instrumentation(), instr)
+
+    def test_enable_instrumentation_installs_given_instrumentation(self):
+        self.assertIs(enable_instrumentation(self.instr), self.instr)
+        self.assertIs(get_instrumentation(), self.instr)
+
+    def test_disable_instrumentation(self):
+        enable_instrumentation(self.instr)
+        disable_instrumentation()
+        self.assertIsNone(get_instrumentation())
+
+    def test_record_and_snapshot(self):
+        self.instr.record("sig", None, 2)
+        self.instr.record("sig", "func", 1)
+        self.instr.record("sig", "func", 3)
+        self.instr.record("other", "func", 4)
+
+        snapshot = self.instr.snapshot(percentiles=(100,))
+        self.assertDictEqual(
+            snapshot,
+            {
+                "emitters": {
+                    "sig": {
+                        "calls": 1,
+                        "total_time": 2,
+                        "max_time": 2,
+                        "mean_time": 2,
+                        "percentiles": {100: 2},
+                    },
+                },
+                "callables": {
+                    "sig": {
+                        "func": {
+                            "calls": 2,
+                            "total_time": 4,
+                            "max_time": 3,
+                            "mean_time": 2,
+                            "percentiles": {100: 3},
+                        },
+                    },
+                    "other": {
+                        "func": {
+                            "calls": 1,
+                            "total_time": 4,
+                            "max_time": 4,
+                            "mean_time": 4,
+                            "percentiles": {100: 4},
+                        },
+                    },
+                },
+            }
+        )
+
+    def test_reset(self):
+        self.instr.record("sig", None, 2)
+        self.instr.record("sig", "func", 1)
+        self.instr.reset()
+        self.assertDictEqual(
+            self.instr.snapshot(),
+            {"emitters": {}, "callables": {}},
+        )
+
+    def test_adhoc_signal(self):
+        class Foo:
+            s = Signal()
+
+        class Listener:
+            def method(self, *args):
+                pass
+
+        listener = Listener()
+        fut = asyncio.Future()
+
+        foo = Foo()
+        foo.s.connect(listener_function)
+        foo.s.connect(listener.method, AdHocSignal.WEAK)
+        foo.s.connect(fut, AdHocSignal.AUTO_FUTURE)
+
+        enable_instrumentation(self.instr)
+        foo.s()
+        foo.s()
+
+        snapshot = self.instr.snapshot()
+        self.assertEqual(snapshot["emitters"][foo.s.name]["calls"], 2)
+
+        callables = snapshot["callables"][foo.s.name]
+        self.assertEqual(
+            callables[__name__ + ".listener_function"]["calls"],
+            2
+        )
+        self.assertEqual(
+            callables[__name__ + "." + Listener.method.__qualname__]["calls"],
+            2
+        )
+        self.assertEqual(
+            callables[type(fut).__module__ + "." + type(fut).__qualname__][
+                "calls"
+            ],
+            1
+        )
+
+    def test_adhoc_signal_records_raising_listener(self):
+        signal = AdHocSignal()
+        signal.logger = unittest.mock.Mock()
+        signal.connect(unittest.mock.Mock(side_effect=ValueError()))
+
+        enable_instrumentation(self.instr)
+        signal()
+
+        snapshot = self.instr.snapshot()
+        self.assertEqual(snapshot["emitters"]["AdHocSignal"]["calls"], 1)
+        self.assertEqual(
+            snapshot["callables"]["AdHocSignal"]["unittest.mock.Mock"][
+                "calls"
+            ],
+            1
+        )
+        self.assertFalse(signal._connections)
+
+    def test_adhoc_signal_not_recorded_when_disabled(self):
+        signal = AdHocSignal()
+        signal.connect(listener_function)
+
+        enable_instrumentation(self.instr)
+        disable_instrumentation()
+        signal()
+
+        self.assertDictEqual(
+            self.instr.snapshot(),
+            {"emitters": {}, "callables": {}},
+        )
+
+    def test_sync_adhoc_signal(self):
+        signal = SyncAdHocSignal()
+        signal.name = "sig"
+        coro = CoroutineMock()
+        coro.return_value = True
+        signal.connect(coro)
+
+        enable_instrumentation(self.instr)
+        run_coroutine(signal(1))
+
+        coro.assert_called_once_with(1)
+        snapshot = self.instr.snapshot()
+        self.assertEqual(snapshot["emitters"]["sig"]["calls"], 1)
+        self.assertEqual(
+            snapshot["callables"]["sig"][
+                type(coro).__module__ + "." + type(coro).__qualname__
+            ]["calls"],
+            1
+        )
+
+    def test_filter(self):
+        f = Filter(name="filter")
+        f.register(passthrough_function, 0)
+        f.register(lambda obj: None, 1)
+
+        enable_instrumentation(self.instr)
+        self.assertIsNone(f.filter(unittest.mock.sentinel.obj))
+
+        snapshot = self.instr.snapshot()
+        self.assertEqual(snapshot["emitters"]["filter"]["calls"], 1)
+        self.assertCountEqual(
+            snapshot["callables"]["filter"].keys(),
+            [
+                __name__ + ".passthrough_function",
+                __name__ + "." + self.test_filter.__qualname__ +
+                ".<locals>.<lambda>",
+            ]
+        )
+        self.assertIsNone(f.timings)
+
+    def test_tag_dispatcher(self):
+        d = TagDispatcher(name="dispatcher")
+        fut = asyncio.Future()
+        d.add_future("tag", fut)
+        d.add_callback("other", listener_function)
+
+        enable_instrumentation(self.instr)
+        d.unicast("tag", unittest.mock.sentinel.data)
+        d.unicast("other", unittest.mock.sentinel.data)
+
+        self.assertIs(fut.result(), unittest.mock.sentinel.data)
+        self.assertNotIn("tag", d._listeners)
+
+        snapshot = self.instr.snapshot()
+        self.assertEqual(snapshot["emitters"]["dispatcher"]["calls"], 2)
+        self.assertCountEqual(
+            snapshot["callables"]["dispatcher"].keys(),
+            [
+                __name__ + ".listener_function",
+                type(fut).__module__ + "." + type(fut).__qualname__,
+            ]
+        )
@@ -21,6 +21,10 @@
 ########################################################################
 import asyncio
 import contextlib
+import logging
+import os
+import ssl
+import tempfile
 import unittest
 import unittest.mock
 
@@ -28,11 +32,13 @@ import aioxmpp.connector as connector
 import aioxmpp.errors as errors
 import aioxmpp.nonza as nonza
 import aioxmpp.security_layer as security_layer
+import aioxmpp.stanza as stanza
 
 from aioxmpp.utils import namespaces
 
 from aioxmpp.testutils import (
     run_coroutine,
+    make_self_signed_certificate,
     CoroutineMock,
 )
 
@@ -66,6 +72,7 @@ class TestSTARTTLSConnector(unittest.TestCase):
         )
 
         base = unittest.mock.Mock()
+        base.metadata.tls_session_cache = None
         base.protocol.starttls = CoroutineMock()
         base.create_starttls_connection = CoroutineMock()
         base.create_starttls_connection.return_value = (
@@ -100,7 +107,7 @@ class TestSTARTTLSConnector(unittest.TestCase):
 
             stack.enter_context(
                 unittest.mock.patch(
-                    "aioxmpp.ssl_transport.create_starttls_connection",
+                    "aioxmpp._ssl_transport.create_starttls_connection",
                     new=base.create_starttls_connection,
                 )
             )
@@ -221,6 +228,7 @@ class TestSTARTTLSConnector(unittest.TestCase):
         )
 
         base = unittest.mock.Mock()
+        base.metadata.tls_session_cache = None
         base.create_starttls_connection = CoroutineMock()
         base.create_starttls_connection.side_effect = Exception()
         base.XMLStream.return_value = base.protocol
@@ -237,7 +245,7 @@ class TestSTARTTLSConnector(unittest.TestCase):
 
             stack.enter_context(
                 unittest.mock.patch(
-                    "aioxmpp.ssl_transport.create_starttls_connection",
+                    "aioxmpp._ssl_transport.create_starttls_connection",
                     new=base.create_starttls_connection,
                 )
             )
@@ -315,6 +323,7 @@ class TestSTARTTLSConnector(unittest.TestCase):
         )
 
         base = unittest.mock.Mock()
+        base.metadata.tls_session_cache = None
         base.protocol.starttls = CoroutineMock()
         base.create_starttls_connection = CoroutineMock()
         base.create_starttls_connection.return_value = (
@@ -340,7 +349,7 @@ class TestSTARTTLSConnector(unittest.TestCase):
 
             stack.enter_context(
                 unittest.mock.patch(
-                    "aioxmpp.ssl_transport.create_starttls_connection",
+                    "aioxmpp._ssl_transport.create_starttls_connection",
                     new=base.create_starttls_connection,
                 )
             )
@@ -413,6 +422,7 @@ class TestSTARTTLSConnector(unittest.TestCase):
         )
 
         base = unittest.mock.Mock()
+        base.metadata.tls_session_cache = None
         base.protocol.starttls = CoroutineMock()
         base.create_starttls_connection = CoroutineMock()
         base.create_starttls_connection.return_value = (
@@ -434,7 +444,7 @@ class TestSTARTTLSConnector(unittest.TestCase):
 
             stack.enter_context(
                 unittest.mock.patch(
-                    "aioxmpp.ssl_transport.create_starttls_connection",
+                    "aioxmpp._ssl_transport.create_starttls_connection",
                     new=base.create_starttls_connection,
                 )
             )
@@ -511,6 +521,7 @@ class TestSTARTTLSConnector(unittest.TestCase):
         )
 
         base = unittest.mock.Mock()
+        base.metadata.tls_session_cache = None
         base.protocol.starttls = CoroutineMock()
         base.create_starttls_connection = CoroutineMock()
         base.create_starttls_connection.return_value = (
@@ -540,7 +551,7 @@ class TestSTARTTLSConnector(unittest.TestCase):
 
             stack.enter_context(
                 unittest.mock.patch(
-                    "aioxmpp.ssl_transport.create_starttls_connection",
+                    "aioxmpp._ssl_transport.create_starttls_connection",
                     new=base.create_starttls_connection,
                 )
             )
@@ -644,6 +655,7 @@ class TestSTARTTLSConnector(unittest.TestCase):
         )
 
         base = unittest.mock.Mock()
+        base.metadata.tls_session_cache = None
         base.protocol.starttls = CoroutineMock()
         base.create_starttls_connection = CoroutineMock()
         base.create_starttls_connection.return_value = (
@@ -669,7 +681,7 @@ class TestSTARTTLSConnector(unittest.TestCase):
 
             stack.enter_context(
                 unittest.mock.patch(
-                    "aioxmpp.ssl_transport.create_starttls_connection",
+                    "aioxmpp._ssl_transport.create_starttls_connection",
                     new=base.create_starttls_connection,
                 )
             )
@@ -759,6 +771,245 @@ class TestSTARTTLSConnector(unittest.TestCase):
             )
         )
 
+    def test_stdlib_backend_is_rejected(self):
+        base = unittest.mock.Mock()
+        base.metadata.tls_backend = security_layer.TLSBackend.STDLIB
+
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(
+                unittest.mock.patch(
+                    "aioxmpp._stdlib_ssl_transport.create_tls_connection",
+                    new=base.create_tls_connection,
+                )
+            )
+
+            stack.enter_context(
+                unittest.mock.patch(
+                    "aioxmpp._ssl_transport.create_starttls_connection",
+                    new=base.create_starttls_connection,
+                )
+            )
+
+            stack.enter_context(
+                unittest.mock.patch(
+                    "aioxmpp.protocol.XMLStream",
+                    new=base.XMLStream,
+                )
+            )
+
+            with self.assertRaisesRegex(errors.TLSUnavailable,
+                                        "stdlib TLS backend"):
+                run_coroutine(self.c.connect(
+                    unittest.mock.sentinel.loop,
+                    base.metadata,
+                    unittest.mock.sentinel.domain,
+                    unittest.mock.sentinel.host,
+                    unittest.mock.sentinel.port,
+                    unittest.mock.sentinel.timeout,
+                ))
+
+        base.XMLStream.assert_not_called()
+        base.create_tls_connection.assert_not_called()
+        base.create_starttls_connection.assert_not_called()
+        base.metadata.certificate_verifier_factory.assert_not_called()
+
+    def _prepare_session_cache_test(self):
+        features = nonza.StreamFeatures()
+        features[...] = nonza.StartTLSFeature()
+
+        features_future = asyncio.Future()
+        features_future.set_result(features)
+
+        base = unittest.mock.Mock()
+        base.metadata.tls_backend = security_layer.TLSBackend.PYOPENSSL
+        base.metadata.tls_session_cache = base.session_cache
+        base.session_cache.lookup.return_value = \
+            unittest.mock.sentinel.session
+        base.protocol.starttls = CoroutineMock()
+        base.create_starttls_connection = CoroutineMock()
+        base.create_starttls_connection.return_value = (
+            unittest.mock.sentinel.transport,
+            base.protocol,
+        )
+        base.metadata.tls_required = True
+        base.XMLStream.return_value = base.protocol
+        base.Future.return_value = features_future
+        base.send_and_wait_for = CoroutineMock()
+        base.send_and_wait_for.return_value = unittest.mock.Mock(
+            spec=nonza.StartTLSProceed,
+        )
+        base.certificate_verifier.pre_handshake = CoroutineMock()
+        base.certificate_verifier.supports_session_resumption = True
+        base.certificate_verifier.session_resumption_policy.return_value = \
+            unittest.mock.sentinel.policy
+        base.metadata.certificate_verifier_factory.return_value = \
+            base.certificate_verifier
+        base.metadata.ssl_context_factory.return_value = \
+            unittest.mock.sentinel.ssl_context
+        base.reset_stream_and_get_features = CoroutineMock()
+        base.reset_stream_and_get_features.return_value = \
+            unittest.mock.sentinel.reset
+
+        return base
+
+    def _connect_with_session_cache(self, base):
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(
+                unittest.mock.patch(
+                    "asyncio.Future",
+                    new=base.Future,
+                )
+            )
+
+            stack.enter_context(
+                unittest.mock.patch(
+                    "aioxmpp._ssl_transport.create_starttls_connection",
+                    new=base.create_starttls_connection,
+                )
+            )
+
+            stack.enter_context(
+                unittest.mock.patch(
+                    "aioxmpp.protocol.XMLStream",
+                    new=base.XMLStream,
+                )
+            )
+
+            stack.enter_context(
+                unittest.mock.patch(
+                    "aioxmpp.nonza.StartTLS",
+                )
+            )
+
+            stack.enter_context(
+                unittest.mock.patch(
+                    "aioxmpp.protocol.send_and_wait_for",
+                    new=base.send_and_wait_for,
+                )
+            )
+
+            stack.enter_context(
+                unittest.mock.patch(
+                    "aioxmpp.protocol.reset_stream_and_get_features",
+                    new=base.reset_stream_and_get_features,
+                )
+            )
+
+            return run_coroutine(self.c.connect(
+                unittest.mock.sentinel.loop,
+                base.metadata,
+                unittest.mock.sentinel.domain,
+                unittest.mock.sentinel.host,
+                unittest.mock.sentinel.port,
+                unittest.mock.sentinel.timeout,
+            ))
+
+    def test_connect_with_session_cache(self):
+        base = self._prepare_session_cache_test()
+
+        result = self._connect_with_session_cache(base)
+
+        base.create_starttls_connection.assert_called_once_with(
+            unittest.mock.sentinel.loop,
+            unittest.mock.ANY,
+            host=unittest.mock.sentinel.host,
+            port=unittest.mock.sentinel.port,
+            peer_hostname=unittest.mock.sentinel.host,
+            server_hostname=unittest.mock.sentinel.domain,
+            use_starttls=True,
+        )
+
+        calls = [
+            call for call in base.mock_calls
+            if call[0].startswith(("session_cache.", "protocol.starttls",
+                                   "reset_stream_and_get_features"))
+        ]
+
+        self.assertSequenceEqual(
+            calls,
+            [
+                unittest.mock.call.session_cache.lookup(
+                    unittest.mock.sentinel.host,
+                    unittest.mock.sentinel.port,
+                    unittest.mock.sentinel.domain,
+                    unittest.mock.sentinel.policy,
+                ),
+                unittest.mock.call.protocol.starttls(
+                    ssl_context=unittest.mock.sentinel.ssl_context,
+                    post_handshake_callback=base.certificate_verifier.post_handshake,
+                    session=unittest.mock.sentinel.session,
+                ),
+                unittest.mock.call.reset_stream_and_get_features(
+                    base.protocol,
+                    timeout=unittest.mock.sentinel.timeout,
+                ),
+                unittest.mock.call.session_cache.record_handshake(
+                    unittest.mock.sentinel.host,
+                    unittest.mock.sentinel.port,
+                    unittest.mock.sentinel.domain,
+                    unittest.mock.sentinel.policy,
+                    unittest.mock.sentinel.transport,
+                ),
+            ]
+        )
+
+        self.assertEqual(
+            result,
+            (
+                unittest.mock.sentinel.transport,
+                base.protocol,
+                unittest.mock.sentinel.reset,
+            )
+        )
+
+    def test_session_cache_miss_does_not_pass_session(self):
+        base = self._prepare_session_cache_test()
+        base.session_cache.lookup.return_value = None
+
+        self._connect_with_session_cache(base)
+
+        base.protocol.starttls.assert_called_once_with(
+            ssl_context=unittest.mock.sentinel.ssl_context,
+            post_handshake_callback=base.certificate_verifier.post_handshake,
+        )
+        base.session_cache.record_handshake.assert_called_once_with(
+            unittest.mock.sentinel.host,
+            unittest.mock.sentinel.port,
+            unittest.mock.sentinel.domain,
+            unittest.mock.sentinel.policy,
+            unittest.mock.sentinel.transport,
+        )
+
+    def test_session_cache_unused_if_verifier_cannot_resume(self):
+        base = self._prepare_session_cache_test()
+        base.certificate_verifier.supports_session_resumption = False
+
+        self._connect_with_session_cache(base)
+
+        base.protocol.starttls.assert_called_once_with(
+            ssl_context=unittest.mock.sentinel.ssl_context,
+            post_handshake_callback=base.certificate_verifier.post_handshake,
+        )
+        base.session_cache.lookup.assert_not_called()
+        base.session_cache.record_handshake.assert_not_called()
+
+    def test_session_cache_entry_discarded_if_starttls_fails(self):
+        base = self._prepare_session_cache_test()
+        exc = ConnectionError()
+        base.protocol.starttls.side_effect = exc
+
+        with self.assertRaises(ConnectionError) as ctx:
+            self._connect_with_session_cache(base)
+
+        self.assertIs(ctx.exception, exc)
+        base.session_cache.discard.assert_called_once_with(
+            unittest.mock.sentinel.host,
+            unittest.mock.sentinel.port,
+            unittest.mock.sentinel.domain,
+            unittest.mock.sentinel.policy,
+        )
+        base.session_cache.record_handshake.assert_not_called()
+
 
 class TestXMPPOverTLSConnector(unittest.TestCase):
     def setUp(self):
@@ -786,6 +1037,7 @@ class TestXMPPOverTLSConnector(unittest.TestCase):
         )
 
         base = unittest.mock.Mock()
+        base.metadata.tls_session_cache = None
         base.protocol.starttls = CoroutineMock()
         base.create_starttls_connection = CoroutineMock()
         base.create_starttls_connection.return_value = (
@@ -812,7 +1064,7 @@ class TestXMPPOverTLSConnector(unittest.TestCase):
 
             stack.enter_context(
                 unittest.mock.patch(
-                    "aioxmpp.ssl_transport.create_starttls_connection",
+                    "aioxmpp._ssl_transport.create_starttls_connection",
                     new=base.create_starttls_connection,
                 )
             )
@@ -913,6 +1165,7 @@ class TestXMPPOverTLSConnector(unittest.TestCase):
         )
 
         base = unittest.mock.Mock()
+        base.metadata.tls_session_cache = None
         base.protocol.starttls = CoroutineMock()
         base.create_starttls_connection = CoroutineMock()
         base.create_starttls_connection.side_effect = Exception()
@@ -936,7 +1189,7 @@ class TestXMPPOverTLSConnector(unittest.TestCase):
 
             stack.enter_context(
                 unittest.mock.patch(
-                    "aioxmpp.ssl_transport.create_starttls_connection",
+                    "aioxmpp._ssl_transport.create_starttls_connection",
                     new=base.create_starttls_connection,
                 )
             )
@@ -991,3 +1244,371 @@ class TestXMPPOverTLSConnector(unittest.TestCase):
                 unittest.mock.call.protocol.abort()
             ]
         )
+
+    def test_connect_with_tls_stdlib_backend(self):
+        features_future = asyncio.Future()
+        features_future.set_result(
+            unittest.mock.sentinel.features
+        )
+
+        base = unittest.mock.Mock()
+        base.metadata.tls_session_cache = None
+        base.create_tls_connection = CoroutineMock()
+        base.create_tls_connection.return_value = (
+            unittest.mock.sentinel.transport,
+            base.protocol,
+        )
+        base.metadata.tls_required = True
+        base.metadata.tls_backend = security_layer.TLSBackend.STDLIB
+        base.XMLStream.return_value = base.protocol
+        base.Future.return_value = features_future
+        base.certificate_verifier.pre_handshake = CoroutineMock()
+        base.metadata.certificate_verifier_factory.return_value = \
+            base.certificate_verifier
+        base.metadata.ssl_context_factory.return_value = \
+            unittest.mock.sentinel.ssl_context
+
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(
+                unittest.mock.patch(
+                    "asyncio.Future",
+                    new=base.Future,
+                )
+            )
+
+            stack.enter_context(
+                unittest.mock.patch(
+                    "aioxmpp._stdlib_ssl_transport.create_tls_connection",
+                    new=base.create_tls_connection,
+                )
+            )
+
+            stack.enter_context(
+                unittest.mock.patch(
+                    "aioxmpp._ssl_transport.create_starttls_connection",
+                    new=base.pyopenssl_create_starttls_connection,
+                )
+            )
+
+            stack.enter_context(
+                unittest.mock.patch(
+                    "aioxmpp.protocol.XMLStream",
+                    new=base.XMLStream,
+                )
+            )
+
+            result = run_coroutine(self.c.connect(
+                unittest.mock.sentinel.loop,
+                base.metadata,
+                unittest.mock.sentinel.domain,
+                unittest.mock.sentinel.host,
+                unittest.mock.sentinel.port,
+                unittest.mock.sentinel.timeout,
+                base_logger=unittest.mock.sentinel.base_logger,
+            ))
+
+        self.assertSequenceEqual(
+            base.mock_calls,
+            [
+                unittest.mock.call.Future(
+                    loop=unittest.mock.sentinel.loop,
+                ),
+                unittest.mock.call.XMLStream(
+                    to=unittest.mock.sentinel.domain,
+                    features_future=features_future,
+                    base_logger=unittest.mock.sentinel.base_logger,
+                ),
+                unittest.mock.call.metadata.certificate_verifier_factory(),
+                unittest.mock.call.certificate_verifier.pre_handshake(
+                    unittest.mock.sentinel.domain,
+                    unittest.mock.sentinel.host,
+                    unittest.mock.sentinel.port,
+                    base.metadata,
+                ),
+                unittest.mock.call.metadata.ssl_context_factory(),
+                unittest.mock.call.certificate_verifier.setup_stdlib_context(
+                    unittest.mock.sentinel.ssl_context,
+                ),
+                unittest.mock.call.create_tls_connection(
+                    unittest.mock.sentinel.loop,
+                    unittest.mock.ANY,
+                    host=unittest.mock.sentinel.host,
+                    port=unittest.mock.sentinel.port,
+                    server_hostname=unittest.mock.sentinel.domain,
+                    ssl_context=unittest.mock.sentinel.ssl_context,
+                    post_handshake_callback=
+                    base.certificate_verifier.post_handshake,
+                ),
+            ]
+        )
+
+        self.assertEqual(
+            result,
+            (
+                unittest.mock.sentinel.transport,
+                base.protocol,
+                unittest.mock.sentinel.features,
+            )
+        )
+
+    def _prepare_session_cache_test(self):
+        features_future = asyncio.Future()
+        features_future.set_result(unittest.mock.sentinel.features)
+
+        base = unittest.mock.Mock()
+        base.metadata.tls_backend = security_layer.TLSBackend.PYOPENSSL
+        base.metadata.tls_session_cache = base.session_cache
+        base.session_cache.lookup.return_value = \
+            unittest.mock.sentinel.session
+        base.create_starttls_connection = CoroutineMock()
+        base.create_starttls_connection.return_value = (
+            unittest.mock.sentinel.transport,
+            base.protocol,
+        )
+        base.XMLStream.return_value = base.protocol
+        base.Future.return_value = features_future
+        base.certificate_verifier.pre_handshake = CoroutineMock()
+        base.certificate_verifier.supports_session_resumption = True
+        base.certificate_verifier.session_resumption_policy.return_value = \
+            unittest.mock.sentinel.policy
+        base.metadata.certificate_verifier_factory.return_value = \
+            base.certificate_verifier
+
+        return base
+
+    def _connect_with_session_cache(self, base):
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(
+                unittest.mock.patch(
+                    "asyncio.Future",
+                    new=base.Future,
+                )
+            )
+
+            stack.enter_context(
+                unittest.mock.patch(
+                    "aioxmpp._ssl_transport.create_starttls_connection",
+                    new=base.create_starttls_connection,
+                )
+            )
+
+            stack.enter_context(
+                unittest.mock.patch(
+                    "aioxmpp.protocol.XMLStream",
+                    new=base.XMLStream,
+                )
+            )
+
+            return run_coroutine(self.c.connect(
+                unittest.mock.sentinel.loop,
+                base.metadata,
+                unittest.mock.sentinel.domain,
+                unittest.mock.sentinel.host,
+                unittest.mock.sentinel.port,
+                unittest.mock.sentinel.timeout,
+            ))
+
+    def test_connect_with_session_cache(self):
+        base = self._prepare_session_cache_test()
+
+        result = self._connect_with_session_cache(base)
+
+        calls = [
+            call for call in base.mock_calls
+            if call[0].startswith(("session_cache.",
+                                   "create_starttls_connection"))
+        ]
+
+        self.assertSequenceEqual(
+            calls,
+            [
+                unittest.mock.call.session_cache.lookup(
+                    unittest.mock.sentinel.host,
+                    unittest.mock.sentinel.port,
+                    unittest.mock.sentinel.domain,
+                    unittest.mock.sentinel.policy,
+                ),
+                unittest.mock.call.create_starttls_connection(
+                    unittest.mock.sentinel.loop,
+                    unittest.mock.ANY,
+                    host=unittest.mock.sentinel.host,
+                    port=unittest.mock.sentinel.port,
+                    peer_hostname=unittest.mock.sentinel.host,
+                    server_hostname=unittest.mock.sentinel.domain,
+                    post_handshake_callback=
+                    base.certificate_verifier.post_handshake,
+                    ssl_context_factory=unittest.mock.ANY,
+                    use_starttls=False,
+                    session=unittest.mock.sentinel.session,
+                ),
+                unittest.mock.call.session_cache.record_handshake(
+                    unittest.mock.sentinel.host,
+                    unittest.mock.sentinel.port,
+                    unittest.mock.sentinel.domain,
+                    unittest.mock.sentinel.policy,
+                    unittest.mock.sentinel.transport,
+                ),
+            ]
+        )
+
+        self.assertEqual(
+            result,
+            (
+                unittest.mock.sentinel.transport,
+                base.protocol,
+                unittest.mock.sentinel.features,
+            )
+        )
+
+    def test_session_cache_unused_if_verifier_cannot_resume(self):
+        base = self._prepare_session_cache_test()
+        base.certificate_verifier.supports_session_resumption = False
+
+        self._connect_with_session_cache(base)
+
+        _, _, kwargs = base.create_starttls_connection.mock_calls[0]
+        self.assertNotIn("session", kwargs)
+        base.session_cache.lookup.assert_not_called()
+        base.session_cache.record_handshake.assert_not_called()
+
+    def test_session_cache_entry_discarded_if_connect_fails(self):
+        base = self._prepare_session_cache_test()
+        exc = ConnectionError()
+        base.create_starttls_connection.side_effect = exc
+
+        with self.assertRaises(ConnectionError) as ctx:
+            self._connect_with_session_cache(base)
+
+        self.assertIs(ctx.exception, exc)
+        base.session_cache.discard.assert_called_once_with(
+            unittest.mock.sentinel.host,
+            unittest.mock.sentinel.port,
+            unittest.mock.sentinel.domain,
+            unittest.mock.sentinel.policy,
+        )
+        base.protocol.abort.assert_called_once_with()
+        base.session_cache.record_handshake.assert_not_called()
+
+    def test_no_verify_session_is_not_resumed_by_verifying_client(self):
+        session_cache = security_layer.TLSSessionCache()
+
+        ssl_object = unittest.mock.Mock(["get_session"])
+        ssl_object.get_session.return_value = unittest.mock.sentinel.session
+        transport = unittest.mock.Mock(["get_extra_info"])
+        transport.get_extra_info.side_effect = {
+            "ssl_object": ssl_object,
+            "session_reused": False,
+        }.get
+
+        def connect(no_verify):
+            base = self._prepare_session_cache_test()
+            base.metadata = security_layer.make(
+                "password",
+                no_verify=no_verify,
+                tls_session_cache=session_cache,
+            )
+            base.create_starttls_connection.return_value = (
+                transport,
+                base.protocol,
+            )
+            self._connect_with_session_cache(base)
+            _, _, kwargs = base.create_starttls_connection.mock_calls[0]
+            return kwargs["session"]
+
+        self.assertIsNone(connect(no_verify=True))
+        self.assertEqual(len(session_cache), 1)
+
+        self.assertIsNone(connect(no_verify=False))
+        self.assertEqual(len(session_cache), 2)
+
+        self.assertIs(connect(no_verify=False),
+                      unittest.mock.sentinel.session)
+        self.assertIs(connect(no_verify=True),
+                      unittest.mock.sentinel.session)
+
+
+class StalledServerProtocol(asyncio.Protocol):
+    def connection_made(self, transport):
+        self.transport = transport
+        transport.write(
+            b"<?xml version='1.0'?>"
+            b"<stream:stream xmlns='jabber:client'"
+            b" xmlns:stream='http://etherx.jabber.org/streams'"
+            b" version='1.0' from='localhost' id='stream1'>"
+            b"<stream:features/>"
+        )
+        # never read, so that the write buffer of the client fills up
+        transport.pause_reading()
+
+
+class TestXMPPOverTLSConnectorFlowControl(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cert_pem, key_pem = make_self_signed_certificate("localhost")
+        cls.certfile = os.path.join(cls.tmpdir.name, "cert.pem")
+        cls.keyfile = os.path.join(cls.tmpdir.name, "key.pem")
+        with open(cls.certfile, "wb") as f:
+            f.write(cert_pem)
+        with open(cls.keyfile, "wb") as f:
+            f.write(key_pem)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def setUp(self):
+        self.loop = asyncio.get_event_loop()
+        server_context = ssl.SSLContext(ssl.PROTOCOL_SSLv23)
+        server_context.load_cert_chain(self.certfile, self.keyfile)
+        # the server does not keep its connections alive once they stop
+        # reading, so we hold on to them here
+        self.server_protocols = []
+
+        def protocol_factory():
+            protocol = StalledServerProtocol()
+            self.server_protocols.append(protocol)
+            return protocol
+
+        self.server = run_coroutine(self.loop.create_server(
+            protocol_factory,
+            host="127.0.0.1",
+            port=0,
+            ssl=server_context,
+        ))
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    def tearDown(self):
+        for protocol in self.server_protocols:
+            protocol.transport.abort()
+        self.server.close()
+        run_coroutine(self.server.wait_closed())
+
+    def test_writing_is_paused_when_peer_does_not_read(self):
+        metadata = security_layer.make("password", no_verify=True)
+        transport, xmlstream, _ = run_coroutine(
+            connector.XMPPOverTLSConnector().connect(
+                self.loop,
+                metadata,
+                "localhost",
+                "127.0.0.1",
+                self.port,
+                10,
+                base_logger=logging.getLogger("aioxmpp"),
+            )
+        )
+
+        transport.set_write_buffer_limits(high=16384)
+        msg = stanza.Message(type_="chat")
+        msg.body[None] = "x" * 65536
+
+        for _ in range(1000):
+            xmlstream.send_xso(msg)
+            if xmlstream.writing_paused:
+                break
+            run_coroutine(asyncio.sleep(0))
+
+        self.assertTrue(xmlstream.writing_paused)
+        self.assertGreaterEqual(transport.get_write_buffer_size(), 16384)
+
+        transport.abort()
@@ -175,6 +175,32 @@ class TestAsyncDeque(unittest.TestCase):
         with self.assertRaises(asyncio.QueueEmpty):
             self.q.get_nowait()
 
+    def test_put_sets_wakeup_event(self):
+        wakeup = asyncio.Event(loop=self.loop)
+        q = custom_queue.AsyncDeque(loop=self.loop, wakeup=wakeup)
+
+        q.put_nowait(1)
+        self.assertTrue(wakeup.is_set())
+
+        wakeup.clear()
+        q.putleft_nowait(2)
+        self.assertTrue(wakeup.is_set())
+
+    def test_get_does_not_touch_wakeup_event(self):
+        wakeup = asyncio.Event(loop=self.loop)
+        q = custom_queue.AsyncDeque(loop=self.loop, wakeup=wakeup)
+
+        q.put_nowait(1)
+        q.put_nowait(2)
+        q.get_nowait()
+        q.getright_nowait()
+        self.assertTrue(wakeup.is_set())
+
+        wakeup.clear()
+        q.put_nowait(3)
+        q.clear()
+        self.assertTrue(wakeup.is_set())
+
     def tearDown(self):
         del self.q
         del self.loop
@@ -260,6 +260,55 @@ class TestSimpleStanzaDispatcher(unittest.TestCase):
             wildcard_resource=True,
         )
 
+    def test_unregister_removes_entries_from_dispatch_index(self):
+        d = FooDispatcher()
+        d.register_callback(
+            unittest.mock.sentinel.type_,
+            TEST_JID,
+            unittest.mock.sentinel.cb1,
+        )
+        d.register_callback(
+            unittest.mock.sentinel.type_,
+            TEST_JID.bare(),
+            unittest.mock.sentinel.cb2,
+        )
+        d.register_callback(
+            unittest.mock.sentinel.type_,
+            None,
+            unittest.mock.sentinel.cb3,
+        )
+
+        d.unregister_callback(unittest.mock.sentinel.type_, TEST_JID)
+        d.unregister_callback(unittest.mock.sentinel.type_, TEST_JID.bare())
+        d.unregister_callback(unittest.mock.sentinel.type_, None)
+
+        self.assertFalse(d._map)
+        self.assertFalse(d._by_jid)
+        self.assertFalse(d._by_bare_jid)
+        self.assertFalse(d._by_type)
+
+    def test_dispatch_after_reregistration(self):
+        self.d.unregister_callback(
+            unittest.mock.sentinel.type_,
+            TEST_JID,
+            wildcard_resource=False
+        )
+        self.d.register_callback(
+            unittest.mock.sentinel.type_,
+            TEST_JID,
+            self.handlers.new,
+            wildcard_resource=False,
+        )
+
+        stanza = FooStanza(TEST_JID, unittest.mock.sentinel.type_)
+        self.d._feed(stanza)
+        self.assertCountEqual(
+            self.handlers.mock_calls,
+            [
+                unittest.mock.call.new(stanza),
+            ]
+        )
+
     def test_unregister_raises_KeyError_if_unregistered(self):
         d = FooDispatcher()
         d.register_callback(
@@ -2710,11 +2710,6 @@ class TestClient(xmltestutils.XMLTestCase):
     def test_signals_fire_correctly_on_fail_after_established_connection(self):
         self.client.start()
 
-        run_coroutine(self.xmlstream.run_test([]))
-
-        exc = aiosasl.AuthenticationFailure("not-authorized")
-        self.connect_xmlstream_rec.side_effect = exc
-
         run_coroutine(self.xmlstream.run_test([
             XMLStreamMock.Send(
                 stanza.IQ(
@@ -2736,6 +2731,9 @@ class TestClient(xmltestutils.XMLTestCase):
             )
         ]))
 
+        exc = aiosasl.AuthenticationFailure("not-authorized")
+        self.connect_xmlstream_rec.side_effect = exc
+
         run_coroutine(self.xmlstream.run_test(
             [
             ],
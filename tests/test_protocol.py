@@ -29,12 +29,14 @@ import aioxmpp.structs as structs
 import aioxmpp.xso as xso
 import aioxmpp.nonza as nonza
 import aioxmpp.errors as errors
+import aioxmpp.xml as xml
 
 from aioxmpp.testutils import (
     TransportMock,
     run_coroutine,
     XMLStreamMock,
-    run_coroutine_with_peer
+    run_coroutine_with_peer,
+    CoroutineMock,
 )
 from aioxmpp import xmltestutils
 
@@ -577,7 +579,7 @@ class TestXMLStream(unittest.TestCase):
                 partial=True
             )
         )
-        p.send_xso(st)
+        nbytes = p.send_xso(st)
         run_coroutine(
             t.run_test(
                 [
@@ -590,6 +592,13 @@ class TestXMLStream(unittest.TestCase):
                 partial=True
             )
         )
+        self.assertEqual(
+            len(b'<iq from="u1@foo.example/test" id="id"'
+                b' to="u2@foo.example/test" type="get">'
+                b'<payload xmlns="uri:foo" a="foo"/>'
+                b'</iq>'),
+            nbytes
+        )
 
     def test_send_xso_reraises_error_from_writer(self):
         st = FakeIQ(structs.IQType.GET)
@@ -691,6 +700,42 @@ class TestXMLStream(unittest.TestCase):
         self.assertIsNone(p._processor.remote_to)
         self.assertIsNone(p._processor.remote_id)
 
+    def test_starttls_forwards_session(self):
+        t, p = self._make_stream(to=TEST_PEER, with_starttls=True)
+        run_coroutine(
+            t.run_test(
+                [
+                    TransportMock.Write(
+                        STREAM_HEADER,
+                        response=[
+                            TransportMock.Receive(self._make_peer_header()),
+                        ]),
+                ],
+                partial=True
+            )
+        )
+
+        ssl_context = unittest.mock.MagicMock()
+        with contextlib.ExitStack() as stack:
+            starttls = stack.enter_context(unittest.mock.patch.object(
+                t, "starttls",
+                new=CoroutineMock(),
+            ))
+            stack.enter_context(unittest.mock.patch.object(
+                p, "_reset_state",
+            ))
+
+            run_coroutine(p.starttls(
+                ssl_context,
+                session=unittest.mock.sentinel.session,
+            ))
+
+        starttls.assert_called_once_with(
+            ssl_context,
+            None,
+            session=unittest.mock.sentinel.session,
+        )
+
     def test_features_future(self):
         fut = asyncio.Future()
         t, p = self._make_stream(to=TEST_PEER, features_future=fut)
@@ -999,6 +1044,55 @@ class TestXMLStream(unittest.TestCase):
         args = fun.call_args
         self.assertIs(exc, args[0][0])
 
+    def test_writing_paused_is_false_initially(self):
+        t, p = self._make_stream(to=TEST_PEER)
+        self.assertFalse(p.writing_paused)
+
+    def test_pause_writing_fires_on_writing_paused(self):
+        fun = unittest.mock.Mock()
+        fun.return_value = None
+
+        t, p = self._make_stream(to=TEST_PEER)
+        p.on_writing_paused.connect(fun)
+
+        p.pause_writing()
+        self.assertTrue(p.writing_paused)
+        fun.assert_called_once_with()
+
+        p.pause_writing()
+        fun.assert_called_once_with()
+
+    def test_resume_writing_fires_on_writing_resumed(self):
+        fun = unittest.mock.Mock()
+        fun.return_value = None
+
+        t, p = self._make_stream(to=TEST_PEER)
+        p.on_writing_resumed.connect(fun)
+
+        p.resume_writing()
+        self.assertFalse(fun.mock_calls)
+
+        p.pause_writing()
+        p.resume_writing()
+        self.assertFalse(p.writing_paused)
+        fun.assert_called_once_with()
+
+    def test_connection_lost_clears_writing_paused(self):
+        t, p = self._make_stream(to=TEST_PEER)
+        run_coroutine(
+            t.run_test(
+                [
+                    TransportMock.Write(STREAM_HEADER),
+                ],
+                partial=True
+            )
+        )
+
+        p.pause_writing()
+        p.connection_lost(None)
+
+        self.assertFalse(p.writing_paused)
+
     def test_on_closing_fires_on_stream_error(self):
         fun = unittest.mock.MagicMock()
         fun.return_value = True
@@ -1593,6 +1687,30 @@ class TestXMLStream(unittest.TestCase):
         )
 
 
+class TestXMLStreamDirectExpat(TestXMLStream):
+    def _make_stream(self, *args, **kwargs):
+        t, p = super()._make_stream(*args, **kwargs)
+        p.direct_expat = True
+        return t, p
+
+    def test_uses_expat_processor(self):
+        t, p = self._make_stream(to=TEST_PEER)
+        run_coroutine(
+            t.run_test(
+                [
+                    TransportMock.Write(
+                        STREAM_HEADER,
+                        response=[
+                            TransportMock.Receive(self._make_peer_header()),
+                        ]),
+                ],
+                partial=True
+            )
+        )
+        self.assertIsInstance(p._processor, xml.XMPPXMLExpatProcessor)
+        self.assertIs(p._parser, p._processor)
+
+
 class Testsend_and_wait_for(xmltestutils.XMLTestCase):
     def setUp(self):
         self.loop = asyncio.get_event_loop()
@@ -554,8 +554,72 @@ class TestPKIXCertificateVerifier(unittest.TestCase):
 
         self.assertTrue(result)
 
+    def test_supports_session_resumption(self):
+        self.assertTrue(
+            security_layer.PKIXCertificateVerifier.supports_session_resumption
+        )
+
+    def test_session_resumption_policy(self):
+        metadata = unittest.mock.Mock()
+        policy = security_layer.PKIXCertificateVerifier().\
+            session_resumption_policy(metadata)
+
+        self.assertEqual(
+            policy,
+            security_layer.PKIXCertificateVerifier().
+            session_resumption_policy(metadata),
+        )
+        hash(policy)
+
+        other_metadata = unittest.mock.Mock()
+        self.assertNotEqual(
+            policy,
+            security_layer.PKIXCertificateVerifier().
+            session_resumption_policy(other_metadata),
+        )
+
+    def test_setup_stdlib_context_requires_verification(self):
+        ctx = unittest.mock.Mock(spec=ssl.SSLContext)
+        verifier = security_layer.PKIXCertificateVerifier()
+        verifier.setup_stdlib_context(ctx)
+
+        self.assertEqual(ctx.verify_mode, ssl.CERT_REQUIRED)
+        self.assertTrue(ctx.check_hostname)
+        ctx.load_default_certs.assert_called_once_with()
+
+
+class TestNullVerifier(unittest.TestCase):
+    def test_supports_session_resumption(self):
+        self.assertTrue(
+            security_layer._NullVerifier.supports_session_resumption
+        )
+
+    def test_session_resumption_policy_differs_from_pkix(self):
+        metadata = unittest.mock.Mock()
+        null_policy = security_layer._NullVerifier().\
+            session_resumption_policy(metadata)
+        pkix_policy = security_layer.PKIXCertificateVerifier().\
+            session_resumption_policy(metadata)
+
+        self.assertNotEqual(null_policy, pkix_policy)
+        hash(null_policy)
+
+    def test_setup_stdlib_context_disables_verification(self):
+        ctx = security_layer.default_stdlib_ssl_context()
+        verifier = security_layer._NullVerifier()
+        verifier.setup_stdlib_context(ctx)
+
+        self.assertEqual(ctx.verify_mode, ssl.CERT_NONE)
+        self.assertFalse(ctx.check_hostname)
+
 
 class TestHookablePKIXCertificateVerifier(unittest.TestCase):
+    def test_does_not_support_session_resumption(self):
+        self.assertFalse(
+            security_layer.HookablePKIXCertificateVerifier.
+            supports_session_resumption
+        )
+
     def setUp(self):
         self.transport = unittest.mock.Mock()
         self.quick_check = unittest.mock.Mock()
@@ -2172,6 +2236,272 @@ class TestSTARTTLSProvider(unittest.TestCase):
         )
 
 
+class TestSecurityLayer(unittest.TestCase):
+    def test_tls_backend_defaults_to_pyopenssl(self):
+        layer = security_layer.SecurityLayer(
+            unittest.mock.sentinel.ssl_context_factory,
+            unittest.mock.sentinel.certificate_verifier_factory,
+            True,
+            (),
+        )
+        self.assertEqual(
+            layer.tls_backend,
+            security_layer.TLSBackend.PYOPENSSL,
+        )
+
+    def test_tls_backend(self):
+        layer = security_layer.SecurityLayer(
+            unittest.mock.sentinel.ssl_context_factory,
+            unittest.mock.sentinel.certificate_verifier_factory,
+            True,
+            (),
+            security_layer.TLSBackend.STDLIB,
+        )
+        self.assertEqual(
+            layer.tls_backend,
+            security_layer.TLSBackend.STDLIB,
+        )
+        self.assertEqual(
+            layer._replace(tls_required=False).tls_backend,
+            security_layer.TLSBackend.STDLIB,
+        )
+
+    def test_tls_session_cache_defaults_to_None(self):
+        layer = security_layer.SecurityLayer(
+            unittest.mock.sentinel.ssl_context_factory,
+            unittest.mock.sentinel.certificate_verifier_factory,
+            True,
+            (),
+        )
+        self.assertIsNone(layer.tls_session_cache)
+
+    def test_tls_session_cache(self):
+        layer = security_layer.SecurityLayer(
+            unittest.mock.sentinel.ssl_context_factory,
+            unittest.mock.sentinel.certificate_verifier_factory,
+            True,
+            (),
+            tls_session_cache=unittest.mock.sentinel.cache,
+        )
+        self.assertIs(layer.tls_session_cache, unittest.mock.sentinel.cache)
+
+
+class TestTLSSessionCache(unittest.TestCase):
+    KEY = ("host.example", 5222, "domain.example",
+           unittest.mock.sentinel.policy)
+
+    def setUp(self):
+        self.now = 1000.
+        self.c = security_layer.TLSSessionCache(
+            maxsize=2,
+            max_age=60.,
+            clock=lambda: self.now,
+        )
+
+    def tearDown(self):
+        del self.c
+
+    def _make_transport(self, session, reused=False):
+        ssl_object = unittest.mock.Mock(["get_session"])
+        ssl_object.get_session.return_value = session
+        transport = unittest.mock.Mock(["get_extra_info"])
+        transport.get_extra_info.side_effect = {
+            "ssl_object": ssl_object,
+            "session_reused": reused,
+        }.get
+        return transport
+
+    def test_defaults(self):
+        c = security_layer.TLSSessionCache()
+        self.assertEqual(c.maxsize, 256)
+        self.assertEqual(c.max_age, 3600.)
+        self.assertEqual(c.resumed_handshakes, 0)
+        self.assertEqual(c.full_handshakes, 0)
+        self.assertEqual(len(c), 0)
+
+    def test_lookup_miss(self):
+        self.assertIsNone(self.c.lookup(*self.KEY))
+
+    def test_record_full_handshake_stores_session(self):
+        self.c.record_handshake(
+            *self.KEY,
+            self._make_transport(unittest.mock.sentinel.session)
+        )
+
+        self.assertEqual(self.c.full_handshakes, 1)
+        self.assertEqual(self.c.resumed_handshakes, 0)
+        self.assertIs(
+            self.c.lookup(*self.KEY),
+            unittest.mock.sentinel.session,
+        )
+        self.assertIsNone(self.c.lookup("other.example", 5222,
+                                        "domain.example",
+                                        unittest.mock.sentinel.policy))
+
+    def test_sessions_are_bound_to_policy(self):
+        self.c.record_handshake(
+            *self.KEY,
+            self._make_transport(unittest.mock.sentinel.session)
+        )
+
+        self.assertIsNone(self.c.lookup(
+            "host.example", 5222, "domain.example",
+            unittest.mock.sentinel.other_policy,
+        ))
+
+        self.c.discard("host.example", 5222, "domain.example",
+                       unittest.mock.sentinel.other_policy)
+        self.assertIs(
+            self.c.lookup(*self.KEY),
+            unittest.mock.sentinel.session,
+        )
+
+    def test_record_resumed_handshake(self):
+        self.c.record_handshake(
+            *self.KEY,
+            self._make_transport(unittest.mock.sentinel.session, reused=True)
+        )
+
+        self.assertEqual(self.c.full_handshakes, 0)
+        self.assertEqual(self.c.resumed_handshakes, 1)
+        self.assertIs(
+            self.c.lookup(*self.KEY),
+            unittest.mock.sentinel.session,
+        )
+
+    def test_record_without_session_discards(self):
+        self.c.record_handshake(
+            *self.KEY,
+            self._make_transport(unittest.mock.sentinel.session)
+        )
+        self.c.record_handshake(
+            *self.KEY,
+            self._make_transport(None)
+        )
+
+        self.assertEqual(self.c.full_handshakes, 2)
+        self.assertIsNone(self.c.lookup(*self.KEY))
+        self.assertEqual(len(self.c), 0)
+
+    def test_sessions_expire(self):
+        self.c.record_handshake(
+            *self.KEY,
+            self._make_transport(unittest.mock.sentinel.session)
+        )
+
+        self.now += 59
+        self.assertIs(
+            self.c.lookup(*self.KEY),
+            unittest.mock.sentinel.session,
+        )
+
+        self.now += 1
+        self.assertIsNone(self.c.lookup(*self.KEY))
+
+    def test_record_handshake_refreshes_age(self):
+        self.c.record_handshake(
+            *self.KEY,
+            self._make_transport(unittest.mock.sentinel.session1)
+        )
+        self.now += 50
+        self.c.record_handshake(
+            *self.KEY,
+            self._make_transport(unittest.mock.sentinel.session2, reused=True)
+        )
+        self.now += 50
+
+        self.assertIs(
+            self.c.lookup(*self.KEY),
+            unittest.mock.sentinel.session2,
+        )
+
+    def test_size_is_bounded(self):
+        for i in range(3):
+            self.c.record_handshake(
+                "host{}.example".format(i), 5222, "domain.example",
+                unittest.mock.sentinel.policy,
+                self._make_transport(getattr(unittest.mock.sentinel, str(i)))
+            )
+
+        self.assertEqual(len(self.c), 2)
+        self.assertIsNone(self.c.lookup("host0.example", 5222,
+                                        "domain.example",
+                                        unittest.mock.sentinel.policy))
+        self.assertIs(
+            self.c.lookup("host2.example", 5222, "domain.example",
+                          unittest.mock.sentinel.policy),
+            getattr(unittest.mock.sentinel, "2"),
+        )
+
+    def test_reduce_maxsize(self):
+        for i in range(2):
+            self.c.record_handshake(
+                "host{}.example".format(i), 5222, "domain.example",
+                unittest.mock.sentinel.policy,
+                self._make_transport(getattr(unittest.mock.sentinel, str(i)))
+            )
+
+        self.c.maxsize = 1
+
+        self.assertEqual(self.c.maxsize, 1)
+        self.assertEqual(len(self.c), 1)
+        self.assertIsNone(self.c.lookup("host0.example", 5222,
+                                        "domain.example",
+                                        unittest.mock.sentinel.policy))
+
+    def test_discard(self):
+        self.c.record_handshake(
+            *self.KEY,
+            self._make_transport(unittest.mock.sentinel.session)
+        )
+
+        self.c.discard(*self.KEY)
+        self.c.discard(*self.KEY)
+
+        self.assertIsNone(self.c.lookup(*self.KEY))
+
+    def test_clear(self):
+        self.c.record_handshake(
+            *self.KEY,
+            self._make_transport(unittest.mock.sentinel.session, reused=True)
+        )
+        self.c.record_handshake(
+            *self.KEY,
+            self._make_transport(unittest.mock.sentinel.session)
+        )
+
+        self.c.clear()
+
+        self.assertEqual(len(self.c), 0)
+        self.assertEqual(self.c.resumed_handshakes, 0)
+        self.assertEqual(self.c.full_handshakes, 0)
+
+
+class Testdefault_stdlib_ssl_context(unittest.TestCase):
+    def test_returns_verifying_stdlib_context(self):
+        ctx = security_layer.default_stdlib_ssl_context()
+        self.assertIsInstance(ctx, ssl.SSLContext)
+        self.assertEqual(ctx.verify_mode, ssl.CERT_REQUIRED)
+        self.assertTrue(ctx.check_hostname)
+        self.assertTrue(ctx.options & ssl.OP_NO_SSLv3)
+
+
+class TestCertificateVerifier(unittest.TestCase):
+    def test_setup_stdlib_context_not_supported_by_default(self):
+        class Verifier(security_layer.CertificateVerifier):
+            def verify_callback(self, *args):
+                pass
+
+            @asyncio.coroutine
+            def post_handshake(self, transport):
+                pass
+
+        with self.assertRaises(NotImplementedError):
+            Verifier().setup_stdlib_context(
+                security_layer.default_stdlib_ssl_context()
+            )
+
+
 class Testsecurity_layer(unittest.TestCase):
     def test_sanity_checks_on_providers(self):
         with self.assertRaises(AttributeError):
@@ -2282,7 +2612,9 @@ class Testmake(unittest.TestCase):
             default_ssl_context,
             PKIXCertificateVerifier,
             True,
-            (PasswordSASLProvider(),)
+            (PasswordSASLProvider(),),
+            tls_backend=security_layer.TLSBackend.PYOPENSSL,
+            tls_session_cache=None,
         )
 
         self.assertEqual(
@@ -2330,7 +2662,9 @@ class Testmake(unittest.TestCase):
             default_ssl_context,
             PKIXCertificateVerifier,
             True,
-            (PasswordSASLProvider(),)
+            (PasswordSASLProvider(),),
+            tls_backend=security_layer.TLSBackend.PYOPENSSL,
+            tls_session_cache=None,
         )
 
         self.assertEqual(
@@ -2390,7 +2724,9 @@ class Testmake(unittest.TestCase):
             default_ssl_context,
             unittest.mock.ANY,
             True,
-            (PasswordSASLProvider(),)
+            (PasswordSASLProvider(),),
+            tls_backend=security_layer.TLSBackend.PYOPENSSL,
+            tls_session_cache=None,
         )
 
         _, (_, factory, *_), _ = SecurityLayer.mock_calls[0]
@@ -2479,7 +2815,9 @@ class Testmake(unittest.TestCase):
             default_ssl_context,
             unittest.mock.ANY,
             True,
-            (PasswordSASLProvider(),)
+            (PasswordSASLProvider(),),
+            tls_backend=security_layer.TLSBackend.PYOPENSSL,
+            tls_session_cache=None,
         )
 
         _, (_, callable, _, _), _ = SecurityLayer.mock_calls[0]
@@ -2567,7 +2905,9 @@ class Testmake(unittest.TestCase):
             default_ssl_context,
             unittest.mock.ANY,
             True,
-            (PasswordSASLProvider(),)
+            (PasswordSASLProvider(),),
+            tls_backend=security_layer.TLSBackend.PYOPENSSL,
+            tls_session_cache=None,
         )
 
         _, (_, callable, _, _), _ = SecurityLayer.mock_calls[0]
@@ -2640,7 +2980,9 @@ class Testmake(unittest.TestCase):
             default_ssl_context,
             unittest.mock.ANY,
             True,
-            (PasswordSASLProvider(),)
+            (PasswordSASLProvider(),),
+            tls_backend=security_layer.TLSBackend.PYOPENSSL,
+            tls_session_cache=None,
         )
 
         _, (_, callable, _, _), _ = SecurityLayer.mock_calls[0]
@@ -2708,7 +3050,9 @@ class Testmake(unittest.TestCase):
             default_ssl_context,
             _NullVerifier,
             True,
-            (PasswordSASLProvider(),)
+            (PasswordSASLProvider(),),
+            tls_backend=security_layer.TLSBackend.PYOPENSSL,
+            tls_session_cache=None,
         )
 
         self.assertEqual(
@@ -2768,7 +3112,9 @@ class Testmake(unittest.TestCase):
             (
                 AnonymousSASLProvider(),
                 PasswordSASLProvider(),
-            )
+            ),
+            tls_backend=security_layer.TLSBackend.PYOPENSSL,
+            tls_session_cache=None,
         )
 
         self.assertEqual(
@@ -2825,7 +3171,9 @@ class Testmake(unittest.TestCase):
             True,
             (
                 AnonymousSASLProvider(),
-            )
+            ),
+            tls_backend=security_layer.TLSBackend.PYOPENSSL,
+            tls_session_cache=None,
         )
 
         self.assertEqual(
@@ -2882,7 +3230,9 @@ class Testmake(unittest.TestCase):
             True,
             (
                 AnonymousSASLProvider(),
-            )
+            ),
+            tls_backend=security_layer.TLSBackend.PYOPENSSL,
+            tls_session_cache=None,
         )
 
         self.assertEqual(
@@ -2930,3 +3280,99 @@ class Testmake(unittest.TestCase):
                     None,
                     anonymous="",
                 )
+
+    def test_stdlib_backend(self):
+        with contextlib.ExitStack() as stack:
+            SecurityLayer = stack.enter_context(
+                unittest.mock.patch(
+                    "aioxmpp.security_layer.SecurityLayer"
+                )
+            )
+
+            PasswordSASLProvider = stack.enter_context(
+                unittest.mock.patch(
+                    "aioxmpp.security_layer.PasswordSASLProvider"
+                )
+            )
+
+            PKIXCertificateVerifier = stack.enter_context(
+                unittest.mock.patch(
+                    "aioxmpp.security_layer.PKIXCertificateVerifier"
+                )
+            )
+
+            default_stdlib_ssl_context = stack.enter_context(
+                unittest.mock.patch(
+                    "aioxmpp.security_layer.default_stdlib_ssl_context"
+                )
+            )
+
+            result = security_layer.make(
+                unittest.mock.sentinel.password_provider,
+                tls_backend=security_layer.TLSBackend.STDLIB,
+            )
+
+        SecurityLayer.assert_called_with(
+            default_stdlib_ssl_context,
+            PKIXCertificateVerifier,
+            True,
+            (PasswordSASLProvider(),),
+            tls_backend=security_layer.TLSBackend.STDLIB,
+            tls_session_cache=None,
+        )
+
+        self.assertEqual(
+            result,
+            SecurityLayer(),
+        )
+
+    def test_stdlib_backend_rejects_pin_store(self):
+        with self.assertRaisesRegex(
+                ValueError,
+                r"certificate pinning is not supported with the stdlib TLS "
+                r"backend"):
+            security_layer.make(
+                unittest.mock.sentinel.password_provider,
+                pin_store={},
+                tls_backend=security_layer.TLSBackend.STDLIB,
+            )
+
+    def test_tls_session_cache(self):
+        with contextlib.ExitStack() as stack:
+            SecurityLayer = stack.enter_context(
+                unittest.mock.patch(
+                    "aioxmpp.security_layer.SecurityLayer"
+                )
+            )
+
+            PasswordSASLProvider = stack.enter_context(
+                unittest.mock.patch(
+                    "aioxmpp.security_layer.PasswordSASLProvider"
+                )
+            )
+
+            PKIXCertificateVerifier = stack.enter_context(
+                unittest.mock.patch(
+                    "aioxmpp.security_layer.PKIXCertificateVerifier"
+                )
+            )
+
+            default_ssl_context = stack.enter_context(
+                unittest.mock.patch(
+                    "aioxmpp.security_layer.default_ssl_context"
+                )
+            )
+
+            security_layer.make(
+                unittest.mock.sentinel.password_provider,
+                tls_session_cache=unittest.mock.sentinel.cache,
+            )
+
+        SecurityLayer.assert_called_with(
+            default_ssl_context,
+            PKIXCertificateVerifier,
+            True,
+            (PasswordSASLProvider(),),
+            tls_backend=security_layer.TLSBackend.PYOPENSSL,
+            tls_session_cache=unittest.mock.sentinel.cache,
+        )
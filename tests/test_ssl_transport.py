@@ -0,0 +1,390 @@
+########################################################################
+# File name: test_ssl_transport.py
+# This file is part of: aioxmpp
+#
+# LICENSE
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+########################################################################
+import asyncio
+import os
+import socket
+import ssl
+import tempfile
+import unittest
+import unittest.mock
+
+import OpenSSL.SSL
+
+import aioxmpp._ssl_transport as ssl_transport
+
+from aioxmpp.testutils import (
+    run_coroutine,
+    make_self_signed_certificate,
+)
+
+
+class TestSTARTTLSTransportFlowControl(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.get_event_loop()
+        self.sock, self.peer = socket.socketpair()
+        self.sock.setblocking(False)
+        self.peer.setblocking(False)
+        self.protocol = unittest.mock.Mock(spec=asyncio.Protocol)
+        self.t = ssl_transport.STARTTLSTransport(
+            self.loop,
+            self.sock,
+            self.protocol,
+            None,
+            use_starttls=True,
+        )
+        run_coroutine(asyncio.sleep(0))
+
+    def tearDown(self):
+        self.loop.remove_reader(self.sock.fileno())
+        self.loop.remove_writer(self.sock.fileno())
+        self.sock.close()
+        self.peer.close()
+
+    def _drain_peer(self):
+        data = bytearray()
+        while True:
+            try:
+                chunk = self.peer.recv(1024 * 1024)
+            except BlockingIOError:
+                break
+            if not chunk:
+                break
+            data.extend(chunk)
+        return data
+
+    def _fill_socket(self):
+        # fill the socket buffers so that the transport has to buffer
+        while True:
+            try:
+                self.sock.send(b"x" * 65536)
+            except BlockingIOError:
+                break
+
+    def test_default_write_buffer_limits(self):
+        self.assertEqual(self.t.get_write_buffer_limits(),
+                         (16 * 1024, 64 * 1024))
+
+    def test_set_write_buffer_limits(self):
+        self.t.set_write_buffer_limits(high=1000)
+        self.assertEqual(self.t.get_write_buffer_limits(), (250, 1000))
+
+        self.t.set_write_buffer_limits(low=100)
+        self.assertEqual(self.t.get_write_buffer_limits(), (100, 400))
+
+        self.t.set_write_buffer_limits(high=100, low=10)
+        self.assertEqual(self.t.get_write_buffer_limits(), (10, 100))
+
+    def test_set_write_buffer_limits_rejects_invalid_limits(self):
+        with self.assertRaises(ValueError):
+            self.t.set_write_buffer_limits(high=10, low=100)
+
+        with self.assertRaises(ValueError):
+            self.t.set_write_buffer_limits(high=-1, low=-1)
+
+    def test_get_write_buffer_size(self):
+        self.assertEqual(self.t.get_write_buffer_size(), 0)
+        self.t.write(b"foo")
+        self.assertEqual(self.t.get_write_buffer_size(), 3)
+
+    def test_pauses_and_resumes_protocol(self):
+        self._fill_socket()
+        self.t.set_write_buffer_limits(high=1000, low=100)
+
+        self.t.write(b"x" * 1000)
+        self.assertFalse(self.protocol.pause_writing.mock_calls)
+
+        self.t.write(b"x")
+        self.protocol.pause_writing.assert_called_once_with()
+
+        self.t.write(b"x" * 1000)
+        self.protocol.pause_writing.assert_called_once_with()
+        self.assertFalse(self.protocol.resume_writing.mock_calls)
+
+        while self.t.get_write_buffer_size():
+            self._drain_peer()
+            run_coroutine(asyncio.sleep(0.01))
+
+        self.protocol.pause_writing.assert_called_once_with()
+        self.protocol.resume_writing.assert_called_once_with()
+
+    def test_lowering_limits_pauses_protocol(self):
+        self._fill_socket()
+        self.t.write(b"x" * 1000)
+        self.assertFalse(self.protocol.pause_writing.mock_calls)
+
+        self.t.set_write_buffer_limits(high=100)
+        self.protocol.pause_writing.assert_called_once_with()
+
+    def test_sends_data_in_bounded_chunks_without_copying(self):
+        sent = []
+
+        def send(buf):
+            self.assertIsInstance(buf, memoryview)
+            sent.append(len(buf))
+            return 0
+
+        self.t.write(b"x" * (ssl_transport.STARTTLSTransport.MAX_WRITE_SIZE
+                             + 1))
+
+        with unittest.mock.patch.object(self.t, "_sock") as sock:
+            sock.send.side_effect = send
+            self.t._write_ready()
+
+        self.assertSequenceEqual(
+            sent,
+            [ssl_transport.STARTTLSTransport.MAX_WRITE_SIZE],
+        )
+
+    def test_transmits_large_writes_completely(self):
+        data = bytes(range(256)) * (4 * 4096 + 3)
+        self.t.write(data)
+
+        received = bytearray()
+        while len(received) < len(data):
+            run_coroutine(asyncio.sleep(0.001))
+            received.extend(self._drain_peer())
+
+        self.assertEqual(received, data)
+        self.assertEqual(self.t.get_write_buffer_size(), 0)
+
+
+class TestSTARTTLSTransportReading(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.get_event_loop()
+        self.sock, self.peer = socket.socketpair()
+        self.sock.setblocking(False)
+        self.peer.setblocking(False)
+        self.protocol = unittest.mock.Mock(spec=asyncio.Protocol)
+        self.t = ssl_transport.STARTTLSTransport(
+            self.loop,
+            self.sock,
+            self.protocol,
+            None,
+            use_starttls=True,
+        )
+        run_coroutine(asyncio.sleep(0))
+
+    def tearDown(self):
+        self.loop.remove_reader(self.sock.fileno())
+        self.loop.remove_writer(self.sock.fileno())
+        self.sock.close()
+        self.peer.close()
+
+    def _fake_tls(self, recv, pending=0):
+        self.t._state = ssl_transport._State.TLS_OPEN
+        self.t._tls_conn = unittest.mock.Mock()
+        self.t._tls_conn.pending.return_value = pending
+        self.t._sock = unittest.mock.Mock()
+        self.t._sock.recv.side_effect = recv
+
+    def test_records_raw_reads(self):
+        self.peer.send(b"foo")
+        run_coroutine(asyncio.sleep(0.01))
+
+        self.protocol.data_received.assert_called_once_with(b"foo")
+        stats = self.t.read_statistics
+        self.assertEqual(stats.feeds, 1)
+        self.assertEqual(stats.reads, 1)
+        self.assertEqual(stats.bytes, 3)
+        self.assertEqual(stats.max_feed_size, 3)
+        self.assertEqual(stats.bytes_per_feed, 3.)
+
+    def test_read_statistics_are_zero_initially(self):
+        stats = self.t.read_statistics
+        self.assertEqual(stats.feeds, 0)
+        self.assertEqual(stats.bytes_per_feed, 0.)
+        self.assertEqual(stats.reads_per_feed, 0.)
+
+    def test_coalesces_available_tls_records(self):
+        self._fake_tls([b"foo", b"bar", b"baz",
+                        OpenSSL.SSL.WantReadError()])
+
+        self.t._read_ready()
+
+        self.protocol.data_received.assert_called_once_with(b"foobarbaz")
+        stats = self.t.read_statistics
+        self.assertEqual(stats.feeds, 1)
+        self.assertEqual(stats.reads, 3)
+        self.assertEqual(stats.bytes, 9)
+        self.assertEqual(stats.reads_per_feed, 3.)
+
+    def test_sizes_reads_by_pending_data(self):
+        self._fake_tls([b"foo", b"bar", OpenSSL.SSL.WantReadError()])
+        self.t._tls_conn.pending.side_effect = [3, 0]
+
+        self.t._read_ready()
+
+        self.assertSequenceEqual(
+            self.t._sock.recv.mock_calls,
+            [
+                unittest.mock.call(self.t.MAX_SIZE),
+                unittest.mock.call(3),
+                unittest.mock.call(self.t.MAX_SIZE - 6),
+            ]
+        )
+
+    def test_stops_at_read_budget(self):
+        self.t.read_budget = 5
+        self._fake_tls([b"foo", b"ba", b"z"])
+
+        self.t._read_ready()
+
+        self.assertSequenceEqual(
+            self.t._sock.recv.mock_calls,
+            [
+                unittest.mock.call(5),
+                unittest.mock.call(2),
+            ]
+        )
+        self.protocol.data_received.assert_called_once_with(b"fooba")
+
+    def test_delivers_data_before_eof(self):
+        self._fake_tls([b"foo", b""])
+        self.protocol.eof_received.return_value = True
+
+        with unittest.mock.patch.object(self.t, "_eof_received") as eof:
+            self.t._read_ready()
+
+        self.assertSequenceEqual(
+            self.protocol.mock_calls[1:],
+            [
+                unittest.mock.call.data_received(b"foo"),
+                unittest.mock.call.eof_received(),
+            ]
+        )
+        eof.assert_called_once_with(True)
+
+    def test_delivers_data_before_error(self):
+        exc = OpenSSL.SSL.Error()
+        self._fake_tls([b"foo", exc])
+
+        with unittest.mock.patch.object(self.t, "_fatal_error") as fatal:
+            self.t._read_ready()
+
+        self.protocol.data_received.assert_called_once_with(b"foo")
+        fatal.assert_called_once_with(exc, unittest.mock.ANY)
+
+    def test_delivers_data_and_swaps_if_read_wants_write(self):
+        self._fake_tls([b"foo", OpenSSL.SSL.WantWriteError()])
+
+        self.t._read_ready()
+
+        self.protocol.data_received.assert_called_once_with(b"foo")
+        self.assertTrue(self.t._tls_read_wants_write)
+
+
+class GreetingServerProtocol(asyncio.Protocol):
+    def connection_made(self, transport):
+        # with TLS 1.3, the session ticket is sent after the handshake;
+        # receiving the greeting ensures that the client has processed it
+        transport.write(b"hello")
+
+
+class GreetingClientProtocol(asyncio.Protocol):
+    def __init__(self):
+        super().__init__()
+        self.greeted = asyncio.Future()
+
+    def data_received(self, data):
+        if not self.greeted.done():
+            self.greeted.set_result(data)
+
+
+class TestSTARTTLSTransportSessionResumption(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cert_pem, key_pem = make_self_signed_certificate("localhost")
+        cls.certfile = os.path.join(cls.tmpdir.name, "cert.pem")
+        cls.keyfile = os.path.join(cls.tmpdir.name, "key.pem")
+        with open(cls.certfile, "wb") as f:
+            f.write(cert_pem)
+        with open(cls.keyfile, "wb") as f:
+            f.write(key_pem)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def setUp(self):
+        self.loop = asyncio.get_event_loop()
+        server_context = ssl.SSLContext(ssl.PROTOCOL_SSLv23)
+        server_context.load_cert_chain(self.certfile, self.keyfile)
+        self.server = run_coroutine(self.loop.create_server(
+            GreetingServerProtocol,
+            host="127.0.0.1",
+            port=0,
+            ssl=server_context,
+        ))
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    def tearDown(self):
+        self.server.close()
+        run_coroutine(self.server.wait_closed())
+
+    def _connect(self, session=None):
+        def context_factory(transport):
+            ctx = OpenSSL.SSL.Context(OpenSSL.SSL.SSLv23_METHOD)
+            ctx.set_verify(OpenSSL.SSL.VERIFY_NONE, lambda *args: True)
+            return ctx
+
+        protocol = GreetingClientProtocol()
+        transport, _ = run_coroutine(ssl_transport.create_starttls_connection(
+            self.loop,
+            lambda: protocol,
+            host="127.0.0.1",
+            port=self.port,
+            server_hostname="localhost",
+            ssl_context_factory=context_factory,
+            session=session,
+        ))
+        run_coroutine(protocol.greeted)
+        return transport
+
+    def test_full_handshake_without_session(self):
+        transport = self._connect()
+        self.assertFalse(transport.get_extra_info("session_reused"))
+        transport.close()
+
+    def test_resumes_session(self):
+        transport = self._connect()
+        session = transport.get_extra_info("ssl_object").get_session()
+        transport.close()
+
+        self.assertIsNotNone(session)
+
+        transport = self._connect(session=session)
+        self.assertTrue(transport.get_extra_info("session_reused"))
+        transport.close()
+
+    def test_session_reused_is_false_without_pyopenssl_internals(self):
+        transport = self._connect()
+        session = transport.get_extra_info("ssl_object").get_session()
+        transport.close()
+
+        for lib in [None, object()]:
+            with unittest.mock.patch(
+                    "aioxmpp._ssl_transport._openssl_lib",
+                    new=lib):
+                transport = self._connect(session=session)
+            self.assertFalse(transport.get_extra_info("session_reused"))
+            transport.close()
@@ -0,0 +1,201 @@
+########################################################################
+# File name: test_stdlib_ssl_transport.py
+# This file is part of: aioxmpp
+#
+# LICENSE
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+########################################################################
+import asyncio
+import os
+import ssl
+import tempfile
+import unittest
+import unittest.mock
+
+import aioxmpp._stdlib_ssl_transport as stdlib_ssl_transport
+
+from aioxmpp.testutils import (
+    run_coroutine,
+    make_protocol_mock,
+    make_self_signed_certificate,
+    CoroutineMock,
+)
+
+
+class EchoServerProtocol(asyncio.Protocol):
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        self.transport.write(data)
+
+
+class TestStdlibTLSTransport(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cert_pem, key_pem = make_self_signed_certificate("localhost")
+        cls.certfile = os.path.join(cls.tmpdir.name, "cert.pem")
+        cls.keyfile = os.path.join(cls.tmpdir.name, "key.pem")
+        with open(cls.certfile, "wb") as f:
+            f.write(cert_pem)
+        with open(cls.keyfile, "wb") as f:
+            f.write(key_pem)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def setUp(self):
+        self.loop = asyncio.get_event_loop()
+        self.server_context = ssl.SSLContext(ssl.PROTOCOL_SSLv23)
+        self.server_context.load_cert_chain(self.certfile, self.keyfile)
+        self.client_context = ssl.create_default_context(
+            cafile=self.certfile
+        )
+
+        self.base = unittest.mock.Mock()
+        self.protocol = make_protocol_mock()
+        self.base.attach_mock(self.protocol, "protocol")
+        self.received = asyncio.Queue()
+        self.protocol.data_received.side_effect = self.received.put_nowait
+
+        self.server = None
+
+    def tearDown(self):
+        if self.server is not None:
+            self.server.close()
+            run_coroutine(self.server.wait_closed())
+
+    def _start_server(self):
+        self.server = run_coroutine(self.loop.create_server(
+            EchoServerProtocol,
+            host="127.0.0.1",
+            port=0,
+            ssl=self.server_context,
+        ))
+        return self.server.sockets[0].getsockname()[1]
+
+    def _connect(self, port, **kwargs):
+        return run_coroutine(stdlib_ssl_transport.create_tls_connection(
+            self.loop,
+            lambda: self.protocol,
+            "127.0.0.1",
+            port,
+            **kwargs
+        ))
+
+    def test_direct_tls(self):
+        port = self._start_server()
+        self.base.post_handshake = CoroutineMock()
+
+        transport, protocol = self._connect(
+            port,
+            server_hostname="localhost",
+            ssl_context=self.client_context,
+            post_handshake_callback=self.base.post_handshake,
+        )
+
+        self.assertIs(protocol, self.protocol)
+        self.assertIsInstance(
+            transport,
+            stdlib_ssl_transport.StdlibTLSTransport,
+        )
+        self.assertSequenceEqual(
+            self.base.mock_calls,
+            [
+                unittest.mock.call.post_handshake(transport),
+                unittest.mock.call.protocol.connection_made(transport),
+            ]
+        )
+        self.assertFalse(hasattr(transport, "can_starttls"))
+        self.assertIs(
+            transport.get_extra_info("sslcontext"),
+            self.client_context,
+        )
+        self.assertEqual(
+            transport.get_extra_info("server_hostname"),
+            "localhost",
+        )
+
+        transport.write(b"foo")
+        self.assertEqual(run_coroutine(self.received.get()), b"foo")
+
+        transport.close()
+
+    def test_requires_ssl_context(self):
+        with self.assertRaises(ValueError):
+            self._connect(
+                1,
+                server_hostname="localhost",
+                ssl_context=None,
+            )
+
+    def test_direct_tls_checks_hostname(self):
+        port = self._start_server()
+
+        with self.assertRaises((ssl.SSLError, ssl.CertificateError)):
+            self._connect(
+                port,
+                server_hostname="other.invalid",
+                ssl_context=self.client_context,
+            )
+
+        self.protocol.connection_made.assert_not_called()
+
+    def test_post_handshake_failure_aborts(self):
+        port = self._start_server()
+        exc = Exception()
+        self.base.post_handshake = CoroutineMock()
+        self.base.post_handshake.side_effect = exc
+
+        with self.assertRaises(Exception) as ctx:
+            self._connect(
+                port,
+                server_hostname="localhost",
+                ssl_context=self.client_context,
+                post_handshake_callback=self.base.post_handshake,
+            )
+
+        self.assertIs(ctx.exception, exc)
+        run_coroutine(asyncio.sleep(0.01))
+        self.protocol.connection_made.assert_not_called()
+        self.protocol.connection_lost.assert_not_called()
+
+    def test_forwards_to_wrapped_transport(self):
+        raw = unittest.mock.Mock()
+        transport = stdlib_ssl_transport.StdlibTLSTransport(
+            raw,
+            server_hostname="localhost",
+        )
+
+        transport.write(unittest.mock.sentinel.data)
+        transport.close()
+        self.assertEqual(
+            transport.get_extra_info("peername"),
+            raw.get_extra_info(),
+        )
+
+        self.assertSequenceEqual(
+            raw.mock_calls,
+            [
+                unittest.mock.call.write(unittest.mock.sentinel.data),
+                unittest.mock.call.close(),
+                unittest.mock.call.get_extra_info("peername", None),
+                unittest.mock.call.get_extra_info(),
+            ]
+        )
@@ -20,6 +20,7 @@
 #
 ########################################################################
 import asyncio
+import collections
 import contextlib
 import functools
 import ipaddress
@@ -37,6 +38,7 @@ import aioxmpp.nonza as nonza
 import aioxmpp.errors as errors
 import aioxmpp.callbacks as callbacks
 import aioxmpp.service as service
+import aioxmpp.tasks as tasks
 import aioxmpp.dispatcher
 
 from datetime import timedelta
@@ -98,6 +100,8 @@ def make_mocked_streams(loop):
     xmlstream = unittest.mock.Mock()
     xmlstream.send_xso = _on_send_xso
     xmlstream.on_closing = callbacks.AdHocSignal()
+    xmlstream.on_writing_paused = callbacks.AdHocSignal()
+    xmlstream.on_writing_resumed = callbacks.AdHocSignal()
     xmlstream.close_and_wait = CoroutineMock()
     stanzastream = stream.StanzaStream(
         TEST_FROM.bare(),
@@ -182,6 +186,14 @@ class TestStanzaStream(StanzaStreamTestBase):
             timedelta(seconds=15),
             self.stream.ping_opportunistic_interval
         )
+        self.assertEqual(
+            64,
+            self.stream.incoming_batch_budget
+        )
+        self.assertEqual(
+            collections.Counter(),
+            self.stream.incoming_batch_sizes
+        )
 
     def test_init_local_jid(self):
         self.assertEqual(
@@ -685,6 +697,304 @@ class TestStanzaStream(StanzaStreamTestBase):
 
         self.stream.stop()
 
+    def test_iq_request_task_pool_defaults_to_None(self):
+        self.assertIsNone(self.stream.iq_request_task_pool)
+
+    def test_run_iq_request_coro_in_task_pool(self):
+        iq = make_test_iq()
+        iq.autoset_id()
+
+        pool = tasks.TaskPool()
+        counts = None
+
+        @asyncio.coroutine
+        def handle_request(stanza):
+            nonlocal counts
+            counts = (
+                pool.get_task_count(()),
+                pool.get_task_count(stream.StanzaStream.IQ_REQUEST_GROUP),
+                pool.get_task_count(
+                    stream.StanzaStream.IQ_REQUEST_GROUP + (FancyTestIQ,)
+                ),
+            )
+            return FancyTestIQ()
+
+        self.stream.iq_request_task_pool = pool
+        self.stream.register_iq_request_coro(
+            structs.IQType.GET,
+            FancyTestIQ,
+            handle_request)
+        self.stream.start(self.xmlstream)
+        self.stream.recv_stanza(iq)
+
+        response_iq = run_coroutine(self.sent_stanzas.get())
+        self.assertEqual(structs.IQType.RESULT, response_iq.type_)
+        self.assertEqual(counts, (1, 1, 1))
+        self.assertEqual(pool.get_task_count(()), 0)
+
+        self.stream.stop()
+
+    def test_iq_request_rejected_if_task_pool_is_exhausted(self):
+        iq = make_test_iq()
+        iq.autoset_id()
+
+        pool = tasks.TaskPool()
+        pool.set_limit(
+            stream.StanzaStream.IQ_REQUEST_GROUP + (FancyTestIQ,),
+            0,
+        )
+
+        handle_request = CoroutineMock()
+
+        self.stream.iq_request_task_pool = pool
+        self.stream.iq_request_backlog_size = 0
+        self.stream.register_iq_request_coro(
+            structs.IQType.GET,
+            FancyTestIQ,
+            handle_request)
+        self.stream.start(self.xmlstream)
+        self.stream.recv_stanza(iq)
+
+        response_got = run_coroutine(self.sent_stanzas.get())
+        self.assertEqual(structs.IQType.ERROR, response_got.type_)
+        self.assertEqual(
+            (namespaces.stanzas, "resource-constraint"),
+            response_got.error.condition
+        )
+        self.assertEqual(structs.ErrorType.WAIT, response_got.error.type_)
+        handle_request.assert_not_called()
+        self.assertEqual(
+            self.stream.iq_request_statistics[FancyTestIQ].rejected,
+            1,
+        )
+
+        self.stream.stop()
+
+    def test_iq_request_backlog_size_default(self):
+        self.assertEqual(self.stream.iq_request_backlog_size, 64)
+        self.assertEqual(self.stream.iq_request_backlog_length, 0)
+        self.assertEqual(self.stream.iq_request_statistics, {})
+
+    def test_set_iq_request_concurrency_limit_creates_pool(self):
+        self.stream.set_iq_request_concurrency_limit(None, 10)
+        pool = self.stream.iq_request_task_pool
+        self.assertIsInstance(pool, tasks.TaskPool)
+        self.assertEqual(
+            pool.get_limit(stream.StanzaStream.IQ_REQUEST_GROUP),
+            10,
+        )
+
+        self.stream.set_iq_request_concurrency_limit(FancyTestIQ, 2)
+        self.assertIs(self.stream.iq_request_task_pool, pool)
+        self.assertEqual(
+            pool.get_limit(
+                stream.StanzaStream.IQ_REQUEST_GROUP + (FancyTestIQ,)
+            ),
+            2,
+        )
+
+        self.stream.set_iq_request_concurrency_limit(FancyTestIQ, None)
+        self.assertIsNone(
+            pool.get_limit(
+                stream.StanzaStream.IQ_REQUEST_GROUP + (FancyTestIQ,)
+            ),
+        )
+
+    def test_iq_requests_beyond_limit_wait_in_backlog(self):
+        release = asyncio.Event()
+        running = []
+
+        @asyncio.coroutine
+        def handle_request(stanza):
+            running.append(stanza)
+            yield from release.wait()
+            return FancyTestIQ()
+
+        self.stream.set_iq_request_concurrency_limit(FancyTestIQ, 1)
+        self.stream.register_iq_request_coro(
+            structs.IQType.GET,
+            FancyTestIQ,
+            handle_request)
+        self.stream.start(self.xmlstream)
+
+        iqs = []
+        for i in range(3):
+            iq = make_test_iq()
+            iq.autoset_id()
+            iqs.append(iq)
+            self.stream.recv_stanza(iq)
+
+        run_coroutine(asyncio.sleep(0.01))
+        self.assertEqual(running, iqs[:1])
+        self.assertEqual(self.stream.iq_request_backlog_length, 2)
+
+        release.set()
+        responses = [
+            run_coroutine(self.sent_stanzas.get())
+            for i in range(3)
+        ]
+
+        self.assertEqual(running, iqs)
+        self.assertEqual(
+            [response.id_ for response in responses],
+            [iq.id_ for iq in iqs],
+        )
+        for response in responses:
+            self.assertEqual(structs.IQType.RESULT, response.type_)
+        self.assertEqual(self.stream.iq_request_backlog_length, 0)
+
+        stats = self.stream.iq_request_statistics[FancyTestIQ]
+        self.assertEqual(stats.handled, 3)
+        self.assertEqual(stats.backlogged, 2)
+        self.assertEqual(stats.rejected, 0)
+        self.assertGreater(stats.queue_wait_max, 0)
+        self.assertGreaterEqual(stats.queue_wait_total, stats.queue_wait_max)
+        self.assertGreater(stats.handler_latency_max, 0)
+        self.assertGreaterEqual(stats.handler_latency_total,
+                                stats.handler_latency_max)
+
+        self.stream.stop()
+
+    def test_new_iq_requests_do_not_overtake_backlog(self):
+        started = []
+
+        @asyncio.coroutine
+        def handle_request(stanza):
+            started.append(stanza)
+            yield from asyncio.Event().wait()
+
+        self.stream.set_iq_request_concurrency_limit(None, 1)
+        iqs = [make_test_iq() for i in range(3)]
+
+        self.stream._spawn_iq_request_handler(handle_request, iqs[0])
+        self.stream._spawn_iq_request_handler(handle_request, iqs[1])
+        # capacity becomes available before the backlogged request had a
+        # chance to claim it
+        self.stream.set_iq_request_concurrency_limit(None, 2)
+        self.stream._spawn_iq_request_handler(handle_request, iqs[2])
+
+        run_coroutine(asyncio.sleep(0.01))
+
+        self.assertEqual(started, iqs[:2])
+        self.assertEqual(self.stream.iq_request_backlog_length, 1)
+
+        stats = self.stream.iq_request_statistics[FancyTestIQ]
+        self.assertEqual(stats.backlogged, 2)
+
+        self.stream.iq_request_task_pool.cancel_group(())
+        for waiter in list(self.stream._iq_request_backlog):
+            waiter.cancel()
+        run_coroutine(asyncio.sleep(0))
+
+    def test_backlogged_iq_request_gets_error_if_handler_cannot_start(self):
+        release = asyncio.Event()
+
+        @asyncio.coroutine
+        def handle_request(stanza):
+            yield from release.wait()
+            return FancyTestIQ()
+
+        coro_fun = unittest.mock.Mock()
+        coro_fun.side_effect = [
+            handle_request(None),
+            ValueError(),
+        ]
+
+        self.stream.set_iq_request_concurrency_limit(None, 1)
+        self.stream.register_iq_request_coro(
+            structs.IQType.GET,
+            FancyTestIQ,
+            coro_fun)
+        self.stream.start(self.xmlstream)
+
+        iqs = [make_test_iq() for i in range(2)]
+        for iq in iqs:
+            self.stream.recv_stanza(iq)
+
+        run_coroutine(asyncio.sleep(0.01))
+        self.assertEqual(self.stream.iq_request_backlog_length, 1)
+
+        with self.assertLogs("aioxmpp.StanzaStream", "ERROR"):
+            release.set()
+            responses = [
+                run_coroutine(self.sent_stanzas.get())
+                for i in range(2)
+            ]
+
+        responses = {response.id_: response for response in responses}
+        self.assertEqual(structs.IQType.RESULT, responses[iqs[0].id_].type_)
+        self.assertEqual(structs.IQType.ERROR, responses[iqs[1].id_].type_)
+        self.assertEqual(
+            (namespaces.stanzas, "internal-server-error"),
+            responses[iqs[1].id_].error.condition
+        )
+        self.assertEqual(self.stream.iq_request_backlog_length, 0)
+
+        self.stream.stop()
+
+    def test_iq_request_rejected_if_backlog_is_full(self):
+        handle_request = CoroutineMock()
+        handle_request.delay = 1000
+
+        self.stream.set_iq_request_concurrency_limit(None, 1)
+        self.stream.iq_request_backlog_size = 1
+        self.stream.register_iq_request_coro(
+            structs.IQType.GET,
+            FancyTestIQ,
+            handle_request)
+        self.stream.start(self.xmlstream)
+
+        iqs = []
+        for i in range(3):
+            iq = make_test_iq()
+            iq.autoset_id()
+            iqs.append(iq)
+            self.stream.recv_stanza(iq)
+
+        response_got = run_coroutine(self.sent_stanzas.get())
+        self.assertEqual(iqs[2].id_, response_got.id_)
+        self.assertEqual(structs.IQType.ERROR, response_got.type_)
+        self.assertEqual(
+            (namespaces.stanzas, "resource-constraint"),
+            response_got.error.condition
+        )
+        self.assertEqual(self.stream.iq_request_backlog_length, 1)
+
+        stats = self.stream.iq_request_statistics[FancyTestIQ]
+        self.assertEqual(stats.backlogged, 1)
+        self.assertEqual(stats.rejected, 1)
+
+        self.stream.stop()
+
+    def test_stop_cancels_iq_request_backlog(self):
+        handle_request = CoroutineMock()
+        handle_request.delay = 1000
+
+        self.stream.set_iq_request_concurrency_limit(None, 1)
+        self.stream.register_iq_request_coro(
+            structs.IQType.GET,
+            FancyTestIQ,
+            handle_request)
+        self.stream.start(self.xmlstream)
+
+        for i in range(2):
+            iq = make_test_iq()
+            iq.autoset_id()
+            self.stream.recv_stanza(iq)
+
+        run_coroutine(asyncio.sleep(0.01))
+        self.assertEqual(self.stream.iq_request_backlog_length, 1)
+
+        run_coroutine(self.stream.close())
+        run_coroutine(asyncio.sleep(0))
+
+        self.assertEqual(self.stream.iq_request_backlog_length, 0)
+        self.assertEqual(len(handle_request.mock_calls), 1)
+        self.assertEqual(
+            self.stream.iq_request_task_pool.get_task_count(()),
+            0,
+        )
+
     def test_unregister_iq_request_coro_raises_if_none_was_registered(self):
         with self.assertRaises(KeyError):
             self.stream.unregister_iq_request_coro(
@@ -1456,14 +1766,14 @@ class TestStanzaStream(StanzaStreamTestBase):
         self.assertIsInstance(exc, asyncio.CancelledError)
 
     def test_close_sets_active_stanza_tokens_to_aborted(self):
-        get_mock = CoroutineMock()
-        get_mock.delay = 1000
+        wait_mock = CoroutineMock()
+        wait_mock.delay = 1000
         # let’s mess with the processor a bit ...
         # otherwise, the stanza is sent before the close can happen
         with unittest.mock.patch.object(
-                self.stream._active_queue,
-                "get",
-                new=get_mock):
+                self.stream._broker_wakeup,
+                "wait",
+                new=wait_mock):
 
             self.stream.start(self.xmlstream)
             run_coroutine(asyncio.sleep(0))
@@ -1478,14 +1788,14 @@ class TestStanzaStream(StanzaStreamTestBase):
         self.assertEqual(token.state, stream.StanzaState.DISCONNECTED)
 
     def test_close_sets_active_stanza_tokens_to_aborted_on_stopped_stream(self):
-        get_mock = CoroutineMock()
-        get_mock.delay = 1000
+        wait_mock = CoroutineMock()
+        wait_mock.delay = 1000
         # let’s mess with the processor a bit ...
         # otherwise, the stanza is sent before the close can happen
         with unittest.mock.patch.object(
-                self.stream._active_queue,
-                "get",
-                new=get_mock):
+                self.stream._broker_wakeup,
+                "wait",
+                new=wait_mock):
 
             token = self.stream.enqueue(make_test_message())
 
@@ -1551,6 +1861,160 @@ class TestStanzaStream(StanzaStreamTestBase):
             state_change_handler.mock_calls
         )
 
+    def test_send_bulk_stops_when_writing_is_paused(self):
+        iqs = [make_test_iq() for i in range(3)]
+
+        def send_handler(stanza_obj):
+            self.sent_stanzas.put_nowait(stanza_obj)
+            if stanza_obj is iqs[1]:
+                self.xmlstream.on_writing_paused()
+
+        self.xmlstream.send_xso = send_handler
+
+        for iq in iqs:
+            self.stream.enqueue(iq)
+
+        self.stream.start(self.xmlstream)
+
+        self.assertIs(iqs[0], run_coroutine(self.sent_stanzas.get()))
+        self.assertIs(iqs[1], run_coroutine(self.sent_stanzas.get()))
+        run_coroutine(asyncio.sleep(0.01))
+        self.assertTrue(self.sent_stanzas.empty())
+        self.assertTrue(self.stream.writing_paused)
+
+        self.xmlstream.on_writing_resumed()
+
+        self.assertIs(iqs[2], run_coroutine(self.sent_stanzas.get()))
+        self.assertFalse(self.stream.writing_paused)
+
+    def test_outbound_queue_is_held_back_while_writing_is_paused(self):
+        iq = make_test_iq()
+
+        self.stream.start(self.xmlstream)
+        self.xmlstream.on_writing_paused()
+
+        token = self.stream.enqueue(iq)
+        run_coroutine(asyncio.sleep(0.01))
+
+        self.assertTrue(self.sent_stanzas.empty())
+        self.assertEqual(token.state, stream.StanzaState.ACTIVE)
+
+        self.xmlstream.on_writing_resumed()
+
+        self.assertIs(iq, run_coroutine(self.sent_stanzas.get()))
+
+    def test_incoming_stanzas_are_processed_while_writing_is_paused(self):
+        msg = make_test_message()
+        cb = unittest.mock.Mock()
+        cb.return_value = None
+        self.message_dispatcher.register_callback(
+            msg.type_,
+            None,
+            cb,
+        )
+
+        self.stream.start(self.xmlstream)
+        self.xmlstream.on_writing_paused()
+
+        self.stream.recv_stanza(msg)
+        run_coroutine(asyncio.sleep(0))
+
+        cb.assert_called_once_with(msg)
+
+    def test_writing_paused_statistics(self):
+        self.assertFalse(self.stream.writing_paused)
+        self.assertEqual(self.stream.writing_paused_count, 0)
+        self.assertEqual(self.stream.writing_paused_time, 0)
+
+        self.stream.start(self.xmlstream)
+
+        with unittest.mock.patch.object(self.loop, "time") as time:
+            time.return_value = 10
+            self.xmlstream.on_writing_paused()
+            self.xmlstream.on_writing_paused()
+
+            time.return_value = 12
+            self.assertTrue(self.stream.writing_paused)
+            self.assertEqual(self.stream.writing_paused_time, 2)
+
+            time.return_value = 13
+            self.xmlstream.on_writing_resumed()
+
+            time.return_value = 20
+            self.xmlstream.on_writing_paused()
+
+            time.return_value = 21
+            self.xmlstream.on_writing_resumed()
+
+            self.assertFalse(self.stream.writing_paused)
+            self.assertEqual(self.stream.writing_paused_count, 2)
+            self.assertEqual(self.stream.writing_paused_time, 4)
+
+    def test_stop_ends_pause(self):
+        self.stream.start(self.xmlstream)
+        run_coroutine(asyncio.sleep(0))
+        self.xmlstream.on_writing_paused()
+        self.assertTrue(self.stream.writing_paused)
+
+        self.stream.stop()
+        run_coroutine(asyncio.sleep(0))
+
+        self.assertFalse(self.stream.writing_paused)
+        self.assertEqual(self.stream.writing_paused_count, 1)
+
+        # signals of the old stream are not tracked anymore
+        self.xmlstream.on_writing_paused()
+        self.assertFalse(self.stream.writing_paused)
+
+    def test_drain_returns_immediately_if_nothing_is_queued(self):
+        self.stream.start(self.xmlstream)
+        run_coroutine(self.stream.drain())
+
+    def test_drain_waits_for_queue_to_be_sent(self):
+        iqs = [make_test_iq() for i in range(3)]
+        for iq in iqs:
+            self.stream.enqueue(iq)
+
+        task = asyncio.async(self.stream.drain())
+        run_coroutine(asyncio.sleep(0))
+        self.assertFalse(task.done())
+
+        self.stream.start(self.xmlstream)
+        run_coroutine(task)
+
+        self.assertEqual(self.sent_stanzas.qsize(), 3)
+
+    def test_drain_waits_while_writing_is_paused(self):
+        self.stream.start(self.xmlstream)
+        self.xmlstream.on_writing_paused()
+
+        iq = make_test_iq()
+        self.stream.enqueue(iq)
+
+        task = asyncio.async(self.stream.drain())
+        run_coroutine(asyncio.sleep(0.01))
+        self.assertFalse(task.done())
+
+        self.xmlstream.on_writing_resumed()
+        run_coroutine(task)
+
+        self.assertIs(iq, run_coroutine(self.sent_stanzas.get()))
+
+    def test_drain_returns_when_stream_state_is_destroyed(self):
+        self.stream.start(self.xmlstream)
+        self.xmlstream.on_writing_paused()
+
+        token = self.stream.enqueue(make_test_iq())
+
+        task = asyncio.async(self.stream.drain())
+        run_coroutine(asyncio.sleep(0))
+        self.assertFalse(task.done())
+
+        self.stream.stop()
+        run_coroutine(task)
+
+        self.assertEqual(token.state, stream.StanzaState.DISCONNECTED)
+
     def test_running(self):
         self.assertFalse(self.stream.running)
         self.stream.start(self.xmlstream)
@@ -1810,6 +2274,110 @@ class TestStanzaStream(StanzaStreamTestBase):
             self.assertTrue(fut.done())
             self.assertIs(iq, fut.result())
 
+    def test_process_incoming_in_batches_limited_by_budget(self):
+        msgs = [make_test_message() for i in range(7)]
+        received = []
+
+        self.stream.register_message_callback(
+            structs.MessageType.CHAT,
+            None,
+            received.append)
+
+        self.stream.incoming_batch_budget = 3
+        for msg in msgs:
+            self.stream.recv_stanza(msg)
+
+        self.stream.start(self.xmlstream)
+        run_coroutine(asyncio.sleep(0.01))
+
+        self.assertSequenceEqual(msgs, received)
+        self.assertEqual(
+            collections.Counter({3: 2, 1: 1}),
+            self.stream.incoming_batch_sizes
+        )
+
+    def test_other_tasks_run_between_incoming_batches(self):
+        msgs = [make_test_message() for i in range(9)]
+        log = []
+
+        self.stream.register_message_callback(
+            structs.MessageType.CHAT,
+            None,
+            lambda msg: log.append("stanza"))
+
+        @asyncio.coroutine
+        def competitor():
+            for i in range(3):
+                log.append("competitor")
+                yield from asyncio.sleep(0)
+
+        self.stream.incoming_batch_budget = 3
+        for msg in msgs:
+            self.stream.recv_stanza(msg)
+
+        self.stream.start(self.xmlstream)
+        task = asyncio.async(competitor())
+        run_coroutine(asyncio.sleep(0.01))
+
+        self.assertTrue(task.done())
+        self.assertEqual(log.count("stanza"), 9)
+        # the competitor gets a turn after each batch, not only after the
+        # whole burst has been processed
+        self.assertLess(log.index("competitor", 1), log.index("stanza", 6))
+
+    def test_incoming_batch_leaves_remaining_stanzas_queued(self):
+        msgs = [make_test_message() for i in range(3)]
+        for msg in msgs[1:]:
+            self.stream.recv_stanza(msg)
+
+        self.stream.incoming_batch_budget = 2
+        with unittest.mock.patch.object(
+                self.stream,
+                "_process_incoming") as process_incoming:
+            self.stream._process_incoming_batch(
+                self.xmlstream,
+                (msgs[0], None)
+            )
+
+        self.assertSequenceEqual(
+            [
+                unittest.mock.call(self.xmlstream, (msgs[0], None)),
+                unittest.mock.call(self.xmlstream, (msgs[1], None)),
+            ],
+            process_incoming.mock_calls
+        )
+        self.assertEqual(1, len(self.stream._incoming_queue))
+        self.assertEqual(
+            collections.Counter({2: 1}),
+            self.stream.incoming_batch_sizes
+        )
+
+    def test_queued_stanzas_stay_in_queue_while_broker_is_busy(self):
+        msg = make_test_message()
+        received = []
+
+        self.stream.register_message_callback(
+            structs.MessageType.CHAT,
+            None,
+            received.append)
+
+        self.stream.start(self.xmlstream)
+        run_coroutine(asyncio.sleep(0))
+
+        run_coroutine(self.stream._broker_lock.acquire())
+        try:
+            self.stream.recv_stanza(msg)
+            run_coroutine(asyncio.sleep(0))
+            run_coroutine(asyncio.sleep(0))
+            self.assertIn((msg, None), self.stream._incoming_queue)
+            self.assertSequenceEqual([], received)
+        finally:
+            self.stream._broker_lock.release()
+
+        run_coroutine(asyncio.sleep(0.01))
+        self.assertSequenceEqual([msg], received)
+        self.assertEqual(0, len(self.stream._incoming_queue))
+
     def test_fail_when_xmlstream_fails(self):
         exc = ConnectionError()
         caught_exc = None
@@ -3722,11 +4290,12 @@ class TestStanzaStreamSM(StanzaStreamTestBase):
             self.stream.sm_inbound_ctr
         )
 
+        # the second and third IQ are processed in one batch, so their
+        # replies are sent in one go, too
         run_coroutine(self.xmlstream.run_test([
             XMLStreamMock.Send(error_iqs.pop()),
             XMLStreamMock.Send(nonza.SMRequest()),
             XMLStreamMock.Send(error_iqs.pop()),
-            XMLStreamMock.Send(nonza.SMRequest()),
             XMLStreamMock.Send(error_iqs.pop()),
             XMLStreamMock.Send(nonza.SMRequest()),
         ]))
@@ -3767,11 +4336,12 @@ class TestStanzaStreamSM(StanzaStreamTestBase):
             self.stream.sm_inbound_ctr
         )
 
+        # the second and third IQ are processed in one batch, so their
+        # replies are sent in one go, too
         run_coroutine(self.xmlstream.run_test([
             XMLStreamMock.Send(error_iqs.pop()),
             XMLStreamMock.Send(nonza.SMRequest()),
             XMLStreamMock.Send(error_iqs.pop()),
-            XMLStreamMock.Send(nonza.SMRequest()),
             XMLStreamMock.Send(error_iqs.pop()),
             XMLStreamMock.Send(nonza.SMRequest()),
         ]))
@@ -4256,6 +4826,45 @@ class TestStanzaStreamSM(StanzaStreamTestBase):
         l1.append("foo")
         self.assertFalse(self.stream.sm_unacked_list)
 
+    def test_sm_unacked_count_and_bytes(self):
+        self.stream.start(self.xmlstream)
+        run_coroutine_with_peer(
+            self.stream.start_sm(),
+            self.xmlstream.run_test(self.successful_sm)
+        )
+
+        self.assertEqual(0, self.stream.sm_unacked_count)
+        self.assertEqual(0, self.stream.sm_unacked_bytes)
+
+        xmlstream = unittest.mock.Mock()
+        xmlstream.send_xso.side_effect = [10, 20, 30]
+        tokens = [
+            stream.StanzaToken(make_test_iq())
+            for i in range(3)
+        ]
+        for token in tokens:
+            self.stream._send_stanza(xmlstream, token)
+
+        self.assertEqual(3, self.stream.sm_unacked_count)
+        self.assertEqual(60, self.stream.sm_unacked_bytes)
+
+        self.stream.sm_ack(2)
+        self.assertEqual(1, self.stream.sm_unacked_count)
+        self.assertEqual(30, self.stream.sm_unacked_bytes)
+        self.assertSequenceEqual(tokens[2:], self.stream.sm_unacked_list)
+
+        self.stream.sm_ack(3)
+        self.assertEqual(0, self.stream.sm_unacked_count)
+        self.assertEqual(0, self.stream.sm_unacked_bytes)
+
+    def test_sm_unacked_count_and_bytes_require_sm(self):
+        with self.assertRaisesRegex(RuntimeError,
+                                    "Stream Management not enabled"):
+            self.stream.sm_unacked_count
+        with self.assertRaisesRegex(RuntimeError,
+                                    "Stream Management not enabled"):
+            self.stream.sm_unacked_bytes
+
     def test_cleanup_iq_response_listeners_on_sm_stop(self):
         fun = unittest.mock.MagicMock()
 
@@ -4577,16 +5186,14 @@ class TestStanzaStreamSM(StanzaStreamTestBase):
         run_coroutine_with_peer(
             self.stream.close(),
             self.xmlstream.run_test([
+                # the broker task wakes up as soon as the stanza is enqueued
+                # and sends it before close() gets to run
+                XMLStreamMock.Send(pres),
+                XMLStreamMock.Send(nonza.SMRequest()),
                 XMLStreamMock.Send(
                     nonza.SMAcknowledgement()
                 ),
                 XMLStreamMock.Close(),
-                # this is a race-condition of the test suite
-                # in a real stream, the Send would not happen as the stream
-                # changes state immediately and raises an exception from
-                # send_xso
-                XMLStreamMock.Send(pres),
-                XMLStreamMock.Send(nonza.SMRequest()),
             ]),
         )
 
@@ -19,14 +19,138 @@
 # <http://www.gnu.org/licenses/>.
 #
 ########################################################################
+import stringprep
 import unittest
 
+import aioxmpp.stringprep as stringprep_mod
+
 from aioxmpp.stringprep import (
     nodeprep, resourceprep, nameprep,
     check_bidi
 )
 
 
+# straightforward implementations of the profiles, which check each character
+# against each of the stringprep tables; the optimised implementations in
+# aioxmpp.stringprep are tested against these
+
+def _nodeprep_do_mapping(chars):
+    i = 0
+    while i < len(chars):
+        c = chars[i]
+        if stringprep.in_table_b1(c):
+            del chars[i]
+        else:
+            replacement = stringprep.map_table_b2(c)
+            if replacement != c:
+                chars[i:(i + 1)] = list(replacement)
+            i += len(replacement)
+
+
+def nodeprep_reference(string, allow_unassigned):
+    chars = list(string)
+    _nodeprep_do_mapping(chars)
+    stringprep_mod.do_normalization(chars)
+    stringprep_mod.check_prohibited_output(
+        chars,
+        (
+            stringprep.in_table_c11,
+            stringprep.in_table_c12,
+            stringprep.in_table_c21,
+            stringprep.in_table_c22,
+            stringprep.in_table_c3,
+            stringprep.in_table_c4,
+            stringprep.in_table_c5,
+            stringprep.in_table_c6,
+            stringprep.in_table_c7,
+            stringprep.in_table_c8,
+            stringprep.in_table_c9,
+            lambda x: x in stringprep_mod._nodeprep_prohibited
+        ))
+    stringprep_mod.check_bidi(chars)
+
+    if not allow_unassigned:
+        stringprep_mod.check_unassigned(
+            chars,
+            (
+                stringprep.in_table_a1,
+            )
+        )
+
+    return "".join(chars)
+
+
+def _resourceprep_do_mapping(chars):
+    i = 0
+    while i < len(chars):
+        c = chars[i]
+        if stringprep.in_table_b1(c):
+            del chars[i]
+            continue
+        i += 1
+
+
+def resourceprep_reference(string, allow_unassigned):
+    chars = list(string)
+    _resourceprep_do_mapping(chars)
+    stringprep_mod.do_normalization(chars)
+    stringprep_mod.check_prohibited_output(
+        chars,
+        (
+            stringprep.in_table_c12,
+            stringprep.in_table_c21,
+            stringprep.in_table_c22,
+            stringprep.in_table_c3,
+            stringprep.in_table_c4,
+            stringprep.in_table_c5,
+            stringprep.in_table_c6,
+            stringprep.in_table_c7,
+            stringprep.in_table_c8,
+            stringprep.in_table_c9,
+        ))
+    stringprep_mod.check_bidi(chars)
+
+    if not allow_unassigned:
+        stringprep_mod.check_unassigned(
+            chars,
+            (
+                stringprep.in_table_a1,
+            )
+        )
+
+    return "".join(chars)
+
+
+def nameprep_reference(string, allow_unassigned):
+    chars = list(string)
+    _nodeprep_do_mapping(chars)
+    stringprep_mod.do_normalization(chars)
+    stringprep_mod.check_prohibited_output(
+        chars,
+        (
+            stringprep.in_table_c12,
+            stringprep.in_table_c22,
+            stringprep.in_table_c3,
+            stringprep.in_table_c4,
+            stringprep.in_table_c5,
+            stringprep.in_table_c6,
+            stringprep.in_table_c7,
+            stringprep.in_table_c8,
+            stringprep.in_table_c9,
+        ))
+    stringprep_mod.check_bidi(chars)
+
+    if not allow_unassigned:
+        stringprep_mod.check_unassigned(
+            chars,
+            (
+                stringprep.in_table_a1,
+            )
+        )
+
+    return "".join(chars)
+
+
 class Testcheck_bidi(unittest.TestCase):
     # some test cases which are not covered by the other tests
     def test_empty_string(self):
@@ -223,3 +347,181 @@ class TestResourceprep(unittest.TestCase):
         self.assertEqual(
             "\u0221",
             resourceprep("\u0221", allow_unassigned=True))
+
+
+class TestASCIIFastPath(unittest.TestCase):
+    PROFILES = [
+        (nodeprep, nodeprep_reference),
+        (resourceprep, resourceprep_reference),
+        (nameprep, nameprep_reference),
+    ]
+
+    def test_equivalent_to_full_profiles_for_all_ascii_characters(self):
+        for cached, uncached in self.PROFILES:
+            for i in range(0x80):
+                c = chr(i)
+                for s in [c, "a" + c + "B"]:
+                    try:
+                        expected = uncached(s, False)
+                    except ValueError:
+                        with self.assertRaises(ValueError, msg=repr(s)):
+                            cached(s)
+                    else:
+                        self.assertEqual(expected, cached(s), repr(s))
+
+    def test_ascii_strings_bypass_the_cache(self):
+        stringprep_mod._nodeprep_cache.clear()
+        self.assertEqual("romeo", nodeprep("Romeo"))
+        self.assertEqual(
+            (0, 0),
+            stringprep_mod.cache_info()["nodeprep"][:2]
+        )
+
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        stringprep_mod._nodeprep_cache.clear()
+        stringprep_mod._resourceprep_cache.clear()
+        stringprep_mod._nameprep_cache.clear()
+
+    def tearDown(self):
+        stringprep_mod.set_cache_size(stringprep_mod.DEFAULT_CACHE_SIZE)
+
+    def test_cache_info(self):
+        nodeprep("ßA")
+        nodeprep("ßA")
+        resourceprep("\u2168")
+        nameprep("ßA.test")
+        nameprep("ßA.test", allow_unassigned=True)
+
+        info = stringprep_mod.cache_info()
+        self.assertEqual(
+            (1, 1, stringprep_mod.DEFAULT_CACHE_SIZE, 1),
+            tuple(info["nodeprep"])
+        )
+        self.assertEqual(
+            (0, 1, stringprep_mod.DEFAULT_CACHE_SIZE, 1),
+            tuple(info["resourceprep"])
+        )
+        self.assertEqual(
+            (0, 2, stringprep_mod.DEFAULT_CACHE_SIZE, 2),
+            tuple(info["nameprep"])
+        )
+
+    def test_errors_are_not_cached(self):
+        for i in range(2):
+            with self.assertRaises(ValueError):
+                nodeprep("\u0221")
+
+        self.assertEqual(
+            (0, 2, stringprep_mod.DEFAULT_CACHE_SIZE, 0),
+            tuple(stringprep_mod.cache_info()["nodeprep"])
+        )
+
+    def test_set_cache_size(self):
+        stringprep_mod.set_cache_size(1)
+        nodeprep("ßA")
+        nodeprep("ßB")
+        nodeprep("ßA")
+
+        self.assertEqual(
+            (0, 3, 1, 1),
+            tuple(stringprep_mod.cache_info()["nodeprep"])
+        )
+        self.assertEqual(
+            1,
+            stringprep_mod.cache_info()["resourceprep"].maxsize
+        )
+        self.assertEqual(
+            1,
+            stringprep_mod.cache_info()["nameprep"].maxsize
+        )
+
+    def test_set_cache_size_zero_disables_cache(self):
+        stringprep_mod.set_cache_size(0)
+        self.assertEqual("ssa", nodeprep("ßA"))
+        self.assertEqual("ssa", nodeprep("ßA"))
+        self.assertEqual(
+            (0, 2, 0, 0),
+            tuple(stringprep_mod.cache_info()["nodeprep"])
+        )
+
+
+class TestTableEngine(unittest.TestCase):
+    ENGINES = [
+        (nodeprep_reference,
+         stringprep_mod._nodeprep_tables),
+        (resourceprep_reference,
+         stringprep_mod._resourceprep_tables),
+        (nameprep_reference,
+         stringprep_mod._nameprep_tables),
+    ]
+
+    def _assert_equivalent(self, reference, tables, s, allow_unassigned):
+        try:
+            expected = reference(s, allow_unassigned)
+        except ValueError as exc:
+            with self.assertRaises(ValueError, msg=repr(s)) as ctx:
+                tables(s, allow_unassigned)
+            self.assertEqual(str(exc), str(ctx.exception), repr(s))
+        else:
+            self.assertEqual(expected, tables(s, allow_unassigned), repr(s))
+
+    def test_equivalent_to_reference_for_all_bmp_characters(self):
+        for reference, tables in self.ENGINES:
+            for i in range(0x10000):
+                self._assert_equivalent(reference, tables, chr(i), False)
+
+    def test_equivalent_to_reference_for_astral_characters(self):
+        codepoints = (
+            list(range(0x10000, 0x10000 + 0x2000)) +
+            list(range(0x1d400, 0x1d800)) +
+            list(range(0x1fff0, 0x20010)) +
+            list(range(0xe0000, 0xe0100)) +
+            [0xf0000, 0xffffd, 0xffffe, 0xfffff, 0x10fffe, 0x10ffff]
+        )
+        for reference, tables in self.ENGINES:
+            for i in codepoints:
+                for allow_unassigned in [False, True]:
+                    self._assert_equivalent(
+                        reference, tables,
+                        chr(i),
+                        allow_unassigned)
+
+    def test_equivalent_to_reference_in_bidi_context(self):
+        for reference, tables in self.ENGINES:
+            for i in range(0, 0x10000, 7):
+                c = chr(i)
+                for s in ["a" + c, c + "\u05d0", "\u05d0" + c + "\u05d0"]:
+                    for allow_unassigned in [False, True]:
+                        self._assert_equivalent(
+                            reference, tables,
+                            s,
+                            allow_unassigned)
+
+    def test_tables_are_bounded(self):
+        chars = "".join(
+            chr(i)
+            for i in range(0x4e00,
+                           0x4e00 + 2 * stringprep_mod._TABLE_MAXSIZE)
+        )
+        for i in range(0, len(chars), 64):
+            stringprep_mod._nodeprep_tables(chars[i:i+64], False)
+            stringprep_mod._resourceprep_tables(chars[i:i+64], False)
+
+        for table in [stringprep_mod._case_folding_map,
+                      stringprep_mod._no_case_folding_map,
+                      stringprep_mod._classification]:
+            self.assertGreater(len(table), 0)
+            self.assertLessEqual(len(table), stringprep_mod._TABLE_MAXSIZE)
+
+        self.assertEqual(
+            "\u4e00\u4e01",
+            stringprep_mod._nodeprep_tables("\u4e00\u4e01", False)
+        )
+
+    def test_error_precedence(self):
+        for s in ["\u0221\u0007", "\u05d0a\u0221", "\u0221\u05d0a",
+                  "\u05d0\u0221"]:
+            for reference, tables in self.ENGINES:
+                self._assert_equivalent(reference, tables, s, False)
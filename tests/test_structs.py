@@ -20,8 +20,12 @@
 #
 ########################################################################
 import collections.abc
+import contextlib
+import copy
 import enum
+import pickle
 import unittest
+import unittest.mock
 import warnings
 
 import aioxmpp
@@ -481,6 +485,92 @@ class TestJID(unittest.TestCase):
             structs.JID("foo", "example.test", None),
             j.bare())
 
+    def test_bare_of_bare_jid_is_identity(self):
+        j = structs.JID("foo", "example.test", None)
+        self.assertIs(j.bare(), j)
+
+    def test_bare_does_not_prepare_parts_again(self):
+        j = structs.JID("foo", "example.test", "bar")
+        with contextlib.ExitStack() as stack:
+            nodeprep = stack.enter_context(
+                unittest.mock.patch("aioxmpp.structs.nodeprep")
+            )
+            nameprep = stack.enter_context(
+                unittest.mock.patch("aioxmpp.structs.nameprep")
+            )
+
+            bare = j.bare()
+
+        nodeprep.assert_not_called()
+        nameprep.assert_not_called()
+        self.assertIsInstance(bare, structs.JID)
+        self.assertEqual(bare, structs.JID("foo", "example.test", None))
+
+    def test_bare_is_memoised(self):
+        j = structs.JID("foo", "example.test", "bar")
+        self.assertIs(j.bare(), j.bare())
+
+    def test_replace_resource_with_None_uses_memoised_bare(self):
+        j = structs.JID("foo", "example.test", "bar")
+        self.assertIs(j.replace(resource=None), j.bare())
+
+    def test_str_is_memoised(self):
+        j = structs.JID("foo", "example.test", "bar")
+        self.assertIs(str(j), str(j))
+
+    def test_immutable_fields(self):
+        j = structs.JID("foo", "example.test", "bar")
+        with self.assertRaises(AttributeError):
+            j.localpart = "fnord"
+        with self.assertRaises(AttributeError):
+            del j.localpart
+        with self.assertRaises(AttributeError):
+            j._str = "fnord"
+        self.assertEqual(str(j), "foo@example.test/bar")
+
+    def test_memoised_values_are_not_copied_or_pickled(self):
+        j = structs.JID("foo", "example.test", "bar")
+        str(j)
+        j.bare()
+
+        for j2 in [copy.copy(j), copy.deepcopy(j),
+                   pickle.loads(pickle.dumps(j))]:
+            self.assertEqual(j2, j)
+            self.assertIsInstance(j2, structs.JID)
+            self.assertFalse(vars(j2))
+            self.assertEqual(str(j2), "foo@example.test/bar")
+            self.assertEqual(j2.bare(), j.bare())
+
+    def test_from_prepared(self):
+        with contextlib.ExitStack() as stack:
+            nodeprep = stack.enter_context(
+                unittest.mock.patch("aioxmpp.structs.nodeprep")
+            )
+            nameprep = stack.enter_context(
+                unittest.mock.patch("aioxmpp.structs.nameprep")
+            )
+            resourceprep = stack.enter_context(
+                unittest.mock.patch("aioxmpp.structs.resourceprep")
+            )
+
+            j = structs.JID.from_prepared("foo", "example.test", "bar")
+
+        nodeprep.assert_not_called()
+        nameprep.assert_not_called()
+        resourceprep.assert_not_called()
+
+        self.assertIsInstance(j, structs.JID)
+        self.assertEqual(j, structs.JID("foo", "example.test", "bar"))
+        self.assertEqual(hash(j),
+                         hash(structs.JID("foo", "example.test", "bar")))
+
+    def test_from_prepared_keeps_subclass(self):
+        class JIDSubclass(structs.JID):
+            pass
+
+        j = JIDSubclass.from_prepared(None, "example.test", None)
+        self.assertIsInstance(j, JIDSubclass)
+
     def test_is_bare(self):
         self.assertFalse(structs.JID("foo", "example.test", "bar").is_bare)
         self.assertTrue(structs.JID("foo", "example.test", None).is_bare)
@@ -533,6 +623,62 @@ class TestJID(unittest.TestCase):
                                 strict=False)
         )
 
+    def test_fromstr_caches_results(self):
+        structs._jid_cache.clear()
+        try:
+            j1 = structs.JID.fromstr("foo@example.test/bar")
+            j2 = structs.JID.fromstr("foo@example.test/bar")
+            j3 = structs.JID.fromstr("foo@example.test/bar", strict=False)
+        finally:
+            info = structs.JID.cache_info()
+            structs._jid_cache.clear()
+
+        self.assertIs(j1, j2)
+        self.assertEqual(j1, j3)
+        self.assertEqual((1, 2, 4096, 2), tuple(info))
+
+    def test_fromstr_does_not_cache_errors(self):
+        structs._jid_cache.clear()
+        try:
+            for i in range(2):
+                with self.assertRaises(ValueError):
+                    structs.JID.fromstr("@example.test")
+            info = structs.JID.cache_info()
+        finally:
+            structs._jid_cache.clear()
+
+        self.assertEqual((0, 2, 4096, 0), tuple(info))
+
+    def test_fromstr_does_not_use_cache_for_subclasses(self):
+        class JIDSubclass(structs.JID):
+            pass
+
+        structs._jid_cache.clear()
+        try:
+            structs.JID.fromstr("foo@example.test/bar")
+            j = JIDSubclass.fromstr("foo@example.test/bar")
+            info = structs.JID.cache_info()
+        finally:
+            structs._jid_cache.clear()
+
+        self.assertIsInstance(j, JIDSubclass)
+        self.assertEqual((0, 1, 4096, 1), tuple(info))
+
+    def test_set_cache_size(self):
+        structs._jid_cache.clear()
+        try:
+            structs.JID.set_cache_size(1)
+            j1 = structs.JID.fromstr("foo@example.test")
+            structs.JID.fromstr("bar@example.test")
+            j2 = structs.JID.fromstr("foo@example.test")
+            info = structs.JID.cache_info()
+        finally:
+            structs.JID.set_cache_size(4096)
+            structs._jid_cache.clear()
+
+        self.assertIsNot(j1, j2)
+        self.assertEqual((0, 3, 1, 1), tuple(info))
+
     def test_reject_empty_localpart(self):
         with self.assertRaises(ValueError):
             structs.JID("", "bar.baz", None)
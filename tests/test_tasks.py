@@ -26,7 +26,7 @@ import unittest.mock
 
 import aioxmpp.tasks as tasks
 
-from aioxmpp.testutils import CoroutineMock
+from aioxmpp.testutils import run_coroutine
 
 
 @asyncio.coroutine
@@ -145,3 +145,344 @@ class TestTaskPool(unittest.TestCase):
             result,
             async_()
         )
+
+    def test_spawn_counts_tasks_in_groups(self):
+        t1 = self.p.spawn({"a"}, _infinite_loop)
+        t2 = self.p.spawn({"a", "b"}, _infinite_loop)
+
+        self.assertEqual(self.p.get_task_count(()), 2)
+        self.assertEqual(self.p.get_task_count("a"), 2)
+        self.assertEqual(self.p.get_task_count("b"), 1)
+
+        t2.cancel()
+        run_coroutine(asyncio.sleep(0))
+
+        self.assertEqual(self.p.get_task_count(()), 1)
+        self.assertEqual(self.p.get_task_count("a"), 1)
+        self.assertEqual(self.p.get_task_count("b"), 0)
+
+        t1.cancel()
+        run_coroutine(asyncio.sleep(0))
+
+        self.assertEqual(self.p.get_task_count(()), 0)
+        self.assertEqual(self.p.get_task_count("a"), 0)
+
+    def test_tasks_are_removed_when_they_finish(self):
+        @asyncio.coroutine
+        def coro():
+            return 1
+
+        task = self.p.spawn({"a"}, coro)
+        self.assertEqual(run_coroutine(task), 1)
+        run_coroutine(asyncio.sleep(0))
+
+        self.assertEqual(self.p.get_task_count("a"), 0)
+        self.assertEqual(self.p.get_task_count(()), 0)
+
+    def test_spawn_raises_if_group_limit_is_exhausted(self):
+        coro_fun = unittest.mock.Mock()
+        coro_fun.side_effect = _infinite_loop
+
+        self.p.set_limit("a", 1)
+        task = self.p.spawn({"a"}, coro_fun)
+        coro_fun.reset_mock()
+
+        with self.assertRaisesRegex(RuntimeError, "'a'"):
+            self.p.spawn({"a", "b"}, coro_fun)
+
+        coro_fun.assert_not_called()
+        self.assertEqual(self.p.get_task_count("b"), 0)
+        self.assertEqual(self.p.get_task_count(()), 1)
+
+        task.cancel()
+        run_coroutine(asyncio.sleep(0))
+
+    def test_spawn_raises_if_total_limit_is_exhausted(self):
+        p = tasks.TaskPool(max_tasks=1)
+        task = p.spawn(set(), _infinite_loop)
+
+        with self.assertRaises(RuntimeError):
+            p.spawn({"a"}, _infinite_loop)
+
+        task.cancel()
+        run_coroutine(asyncio.sleep(0))
+
+    def test_default_limit_applies_to_groups_without_limit(self):
+        self.p.default_limit = 1
+        self.p.set_limit("b", 2)
+
+        tasks_ = [
+            self.p.spawn({"a"}, _infinite_loop),
+            self.p.spawn({"b"}, _infinite_loop),
+            self.p.spawn({"b"}, _infinite_loop),
+        ]
+
+        self.assertFalse(self.p.has_capacity({"a"}))
+        self.assertFalse(self.p.has_capacity({"b"}))
+        self.assertTrue(self.p.has_capacity({"c"}))
+        # the implicit group is not subject to the default limit
+        self.assertTrue(self.p.has_capacity(set()))
+
+        with self.assertRaises(RuntimeError):
+            self.p.spawn({"a"}, _infinite_loop)
+
+        for task in tasks_:
+            task.cancel()
+        run_coroutine(asyncio.sleep(0))
+
+    def test_zero_limit_inhibits_spawning(self):
+        self.p.set_limit("a", 0)
+        with self.assertRaises(RuntimeError):
+            self.p.spawn({"a"}, _infinite_loop)
+
+    def test_add_accounts_and_enforces_limits(self):
+        self.p.set_limit("a", 1)
+        coro = _infinite_loop()
+        task = self.p.add({"a"}, coro)
+
+        self.assertIsInstance(task, asyncio.Task)
+        self.assertEqual(self.p.get_task_count("a"), 1)
+
+        other = _infinite_loop()
+        with self.assertRaises(RuntimeError):
+            self.p.add({"a"}, other)
+        other.close()
+
+        task.cancel()
+        run_coroutine(asyncio.sleep(0))
+        self.assertEqual(self.p.get_task_count("a"), 0)
+
+    def test_wait_and_spawn_spawns_immediately_if_capacity_available(self):
+        task = run_coroutine(self.p.wait_and_spawn({"a"}, _infinite_loop))
+        self.assertIsInstance(task, asyncio.Task)
+        self.assertEqual(self.p.get_task_count("a"), 1)
+        task.cancel()
+        run_coroutine(asyncio.sleep(0))
+
+    def test_wait_and_spawn_waits_for_capacity(self):
+        self.p.set_limit("a", 1)
+        first = self.p.spawn({"a"}, _infinite_loop)
+
+        coro_fun = unittest.mock.Mock()
+        coro_fun.side_effect = lambda *args, **kwargs: _infinite_loop()
+
+        waiter = asyncio.async(
+            self.p.wait_and_spawn({"a"}, coro_fun, 1, x=2)
+        )
+        run_coroutine(asyncio.sleep(0))
+        self.assertFalse(waiter.done())
+        coro_fun.assert_not_called()
+
+        first.cancel()
+        second = run_coroutine(waiter)
+
+        coro_fun.assert_called_once_with(1, x=2)
+        self.assertEqual(self.p.get_task_count("a"), 1)
+
+        second.cancel()
+        run_coroutine(asyncio.sleep(0))
+
+    def test_wait_and_spawn_wakes_up_when_limit_is_raised(self):
+        self.p.set_limit("a", 0)
+
+        waiter = asyncio.async(
+            self.p.wait_and_spawn({"a"}, _infinite_loop)
+        )
+        run_coroutine(asyncio.sleep(0))
+        self.assertFalse(waiter.done())
+
+        self.p.set_limit("a", 1)
+        task = run_coroutine(waiter)
+        task.cancel()
+        run_coroutine(asyncio.sleep(0))
+
+    def test_wait_and_spawn_serves_waiters_in_order(self):
+        self.p.set_limit("a", 1)
+        first = self.p.spawn({"a"}, _infinite_loop)
+
+        started = []
+
+        @asyncio.coroutine
+        def coro(i):
+            started.append(i)
+            yield from _infinite_loop()
+
+        waiters = [
+            asyncio.async(self.p.wait_and_spawn({"a"}, coro, i))
+            for i in range(3)
+        ]
+        run_coroutine(asyncio.sleep(0))
+
+        first.cancel()
+        second = run_coroutine(waiters[0])
+        run_coroutine(asyncio.sleep(0))
+        self.assertEqual(started, [0])
+        self.assertFalse(waiters[1].done())
+        self.assertFalse(waiters[2].done())
+
+        second.cancel()
+        third = run_coroutine(waiters[1])
+        run_coroutine(asyncio.sleep(0))
+        self.assertEqual(started, [0, 1])
+
+        third.cancel()
+        run_coroutine(waiters[2]).cancel()
+        run_coroutine(asyncio.sleep(0))
+
+    def test_freed_slot_is_handed_to_waiter_before_spawn(self):
+        self.p.set_limit("a", 1)
+        first = self.p.spawn({"a"}, _infinite_loop)
+
+        waiter = asyncio.async(self.p.wait_and_spawn({"a"}, _infinite_loop))
+        run_coroutine(asyncio.sleep(0))
+
+        spawn_results = []
+
+        def try_spawn(task):
+            # runs right after the pool has seen the task exit
+            try:
+                spawn_results.append(self.p.spawn({"a"}, _infinite_loop))
+            except RuntimeError as exc:
+                spawn_results.append(exc)
+
+        first.add_done_callback(try_spawn)
+        first.cancel()
+        task = run_coroutine(waiter)
+
+        self.assertEqual(len(spawn_results), 1)
+        self.assertIsInstance(spawn_results[0], RuntimeError)
+        self.assertEqual(self.p.get_task_count("a"), 1)
+
+        task.cancel()
+        run_coroutine(asyncio.sleep(0))
+
+    def test_only_as_many_waiters_as_free_slots_are_started(self):
+        self.p.set_limit("a", 2)
+        running = [self.p.spawn({"a"}, _infinite_loop) for i in range(2)]
+
+        coro_fun = unittest.mock.Mock()
+        coro_fun.side_effect = lambda *args: _infinite_loop()
+        waiters = [
+            asyncio.async(self.p.wait_and_spawn({"a"}, coro_fun, i))
+            for i in range(10)
+        ]
+        run_coroutine(asyncio.sleep(0))
+
+        running[0].cancel()
+        run_coroutine(asyncio.sleep(0))
+
+        coro_fun.assert_called_once_with(0)
+        self.assertEqual(
+            [waiter.done() for waiter in waiters],
+            [True] + [False] * 9,
+        )
+
+        self.p.set_limit("a", 4)
+        run_coroutine(asyncio.sleep(0))
+
+        self.assertSequenceEqual(
+            coro_fun.mock_calls,
+            [unittest.mock.call(i) for i in range(3)],
+        )
+
+        self.assertEqual(self.p.cancel_group(()), 4)
+        run_coroutine(asyncio.sleep(0))
+        self.assertSequenceEqual(
+            coro_fun.mock_calls,
+            [unittest.mock.call(i) for i in range(7)],
+        )
+        self.p.cancel_group(())
+        for waiter in waiters[7:]:
+            waiter.cancel()
+        run_coroutine(asyncio.sleep(0))
+
+    def test_waiter_blocked_by_full_group_does_not_block_others(self):
+        self.p.set_limit("a", 1)
+        self.p.set_limit((), 2)
+        blocker_a = self.p.spawn({"a"}, _infinite_loop)
+        other = self.p.spawn({"b"}, _infinite_loop)
+
+        waiter_a = asyncio.async(self.p.wait_and_spawn({"a"}, _infinite_loop))
+        waiter_b = asyncio.async(self.p.wait_and_spawn({"b"}, _infinite_loop))
+        run_coroutine(asyncio.sleep(0))
+
+        other.cancel()
+        run_coroutine(asyncio.sleep(0))
+
+        self.assertFalse(waiter_a.done())
+        self.assertTrue(waiter_b.done())
+
+        blocker_a.cancel()
+        run_coroutine(asyncio.sleep(0))
+        self.assertTrue(waiter_a.done())
+
+        self.p.cancel_group(())
+        run_coroutine(asyncio.sleep(0))
+
+    def test_wait_and_spawn_reraises_exception_from_coro_fun(self):
+        self.p.set_limit("a", 0)
+        exc = ValueError()
+        coro_fun = unittest.mock.Mock()
+        coro_fun.side_effect = exc
+
+        waiter = asyncio.async(self.p.wait_and_spawn({"a"}, coro_fun))
+        run_coroutine(asyncio.sleep(0))
+        self.p.set_limit("a", 1)
+
+        with self.assertRaises(ValueError) as ctx:
+            run_coroutine(waiter)
+
+        self.assertIs(ctx.exception, exc)
+        self.assertEqual(self.p.get_task_count("a"), 0)
+
+    def test_task_is_cancelled_if_waiter_is_cancelled_after_start(self):
+        self.p.set_limit("a", 0)
+
+        waiter = asyncio.async(self.p.wait_and_spawn({"a"}, _infinite_loop))
+        run_coroutine(asyncio.sleep(0))
+
+        self.p.set_limit("a", 1)
+        waiter.cancel()
+
+        with self.assertRaises(asyncio.CancelledError):
+            run_coroutine(waiter)
+        run_coroutine(asyncio.sleep(0))
+
+        self.assertEqual(self.p.get_task_count("a"), 0)
+
+    def test_cancelled_wait_and_spawn_does_not_start_coroutine(self):
+        self.p.set_limit("a", 0)
+        coro_fun = unittest.mock.Mock()
+
+        waiter = asyncio.async(self.p.wait_and_spawn({"a"}, coro_fun))
+        run_coroutine(asyncio.sleep(0))
+        waiter.cancel()
+
+        with self.assertRaises(asyncio.CancelledError):
+            run_coroutine(waiter)
+
+        self.p.set_limit("a", 1)
+        run_coroutine(asyncio.sleep(0))
+        coro_fun.assert_not_called()
+
+    def test_cancel_group(self):
+        t1 = self.p.spawn({"a"}, _infinite_loop)
+        t2 = self.p.spawn({"a", "b"}, _infinite_loop)
+        t3 = self.p.spawn({"b"}, _infinite_loop)
+
+        self.assertEqual(self.p.cancel_group("a"), 2)
+        run_coroutine(asyncio.sleep(0))
+
+        self.assertTrue(t1.cancelled())
+        self.assertTrue(t2.cancelled())
+        self.assertFalse(t3.done())
+        self.assertEqual(self.p.get_task_count("a"), 0)
+        self.assertEqual(self.p.get_task_count("b"), 1)
+
+        self.assertEqual(self.p.cancel_group(()), 1)
+        run_coroutine(asyncio.sleep(0))
+        self.assertTrue(t3.cancelled())
+        self.assertEqual(self.p.get_task_count(()), 0)
+
+    def test_cancel_group_of_unknown_group(self):
+        self.assertEqual(self.p.cancel_group("x"), 0)
@@ -1165,6 +1165,94 @@ class TestXMPPXMLGenerator(XMLTestCase):
             buf.getvalue(),
         )
 
+    def _generate_with_and_without_tag_cache(self, events):
+        results = []
+        for use_tag_cache in [True, False]:
+            buf = io.BytesIO()
+            gen = xml.XMPPXMLGenerator(buf,
+                                       sorted_attributes=True,
+                                       use_tag_cache=use_tag_cache)
+            gen.startDocument()
+            for method, *args in events:
+                getattr(gen, method)(*args)
+            gen.endDocument()
+            gen.flush()
+            results.append(buf.getvalue())
+        return results
+
+    def test_tag_cache_produces_identical_output(self):
+        with_cache, without_cache = self._generate_with_and_without_tag_cache([
+            ("startPrefixMapping", None, "uri:foo"),
+            ("startElementNS", ("uri:foo", "foo"), None, {
+                (None, "b"): "<&>",
+                (None, "a"): "'\"",
+                (namespaces.xml, "lang"): "de",
+            }),
+            ("startPrefixMapping", None, "uri:foo"),
+            ("startElementNS", ("uri:foo", "child"), None, {}),
+            ("characters", "text"),
+            ("endElementNS", ("uri:foo", "child"), None),
+            ("endPrefixMapping", None),
+            ("startPrefixMapping", None, "uri:bar"),
+            ("startElementNS", ("uri:bar", "other"), None, {
+                ("uri:baz", "a"): "namespaced",
+            }),
+            ("startPrefixMapping", None, "uri:foo"),
+            ("startElementNS", ("uri:foo", "child"), None, None),
+            ("endElementNS", ("uri:foo", "child"), None),
+            ("endPrefixMapping", None),
+            ("endElementNS", ("uri:bar", "other"), None),
+            ("endPrefixMapping", None),
+            ("endElementNS", ("uri:foo", "foo"), None),
+            ("endPrefixMapping", None),
+        ])
+
+        self.assertEqual(without_cache, with_cache)
+        self.assertEqual(
+            b'<?xml version="1.0"?>'
+            b'<foo xmlns="uri:foo" a="\'&quot;" b="&lt;&amp;&gt;"'
+            b' xml:lang="de">'
+            b'<child>text</child>'
+            b'<other xmlns="uri:bar" xmlns:ns0="uri:baz" ns0:a="namespaced">'
+            b'<child xmlns="uri:foo"/>'
+            b'</other>'
+            b'</foo>',
+            with_cache
+        )
+
+    def test_tag_cache_rejects_invalid_names(self):
+        gen = xml.XMPPXMLGenerator(self.buf)
+        gen.startDocument()
+        gen.startPrefixMapping(None, "uri:foo")
+        with self.assertRaises(ValueError):
+            gen.startElementNS(("uri:foo", "foo>"), None)
+
+        gen = xml.XMPPXMLGenerator(self.buf)
+        gen.startDocument()
+        gen.startPrefixMapping(None, "uri:foo")
+        with self.assertRaises(ValueError):
+            gen.startElementNS(("uri:foo", "foo"), None,
+                               {(None, "xmlns"): "bar"})
+
+        gen = xml.XMPPXMLGenerator(self.buf)
+        gen.startDocument()
+        gen.startPrefixMapping(None, "uri:foo")
+        with self.assertRaises(ValueError):
+            gen.startElementNS(("uri:foo", "foo"), None,
+                               {(None, "a>"): "bar"})
+
+    def test_tag_cache_enforces_closing_of_prefixes(self):
+        gen = xml.XMPPXMLGenerator(self.buf)
+        gen.startDocument()
+        gen.startPrefixMapping(None, "uri:foo")
+        gen.startElementNS(("uri:foo", "foo"), None)
+        gen.startPrefixMapping(None, "uri:foo")
+        gen.startElementNS(("uri:foo", "bar"), None)
+        gen.endElementNS(("uri:foo", "bar"), None)
+        gen.startPrefixMapping(None, "uri:foo")
+        with self.assertRaises(RuntimeError):
+            gen.startElementNS(("uri:foo", "bar"), None)
+
 
 class TestXMLStreamWriter(unittest.TestCase):
     TEST_TO = structs.JID.fromstr("example.test")
@@ -1255,6 +1343,15 @@ class TestXMLStreamWriter(unittest.TestCase):
             b'</stream:stream>',
             self.buf.getvalue())
 
+    def test_send_returns_number_of_bytes(self):
+        gen = self._make_gen()
+        gen.start()
+        self.assertEqual(
+            len(b'<ns0:bar xmlns:ns0="uri:foo"/>'),
+            gen.send(Cls())
+        )
+        gen.close()
+
     def test_send_object_inherits_namespaces(self):
         obj = Cls()
         gen = self._make_gen(nsmap={"jc": "uri:foo"})
@@ -1918,6 +2015,140 @@ class TestXMPPXMLProcessor(unittest.TestCase):
         del self.parser
 
 
+class TestXMPPXMLExpatProcessor(unittest.TestCase):
+    VALID_STREAM_HEADER = TestXMPPXMLProcessor.VALID_STREAM_HEADER.encode(
+        "utf-8"
+    )
+
+    class Foo(xso.XSO):
+        TAG = ("uri:foo", "foo")
+
+        attr = xso.Attr("attr", default=None)
+        num = xso.Attr("num", type_=xso.Integer(), default=None)
+        lang = xso.LangAttr()
+        text = xso.Text(default=None)
+
+    def setUp(self):
+        self.results = []
+        self.proc = xml.XMPPXMLExpatProcessor()
+        self.proc.stanza_parser = xso.XSOParser()
+        self.proc.stanza_parser.add_class(self.Foo, self.results.append)
+
+    def test_is_processor(self):
+        self.assertIsInstance(self.proc, xml.XMPPXMLProcessor)
+
+    def test_capture_stream_header(self):
+        on_stream_header = unittest.mock.Mock()
+        self.proc.on_stream_header = on_stream_header
+
+        self.proc.feed(self.VALID_STREAM_HEADER)
+
+        on_stream_header.assert_called_once_with()
+        self.assertEqual((1, 0), self.proc.remote_version)
+        self.assertEqual(
+            structs.JID.fromstr("example.test"),
+            self.proc.remote_from
+        )
+        self.assertEqual(
+            structs.JID.fromstr("foo@example.test"),
+            self.proc.remote_to
+        )
+        self.assertEqual("foobarbaz", self.proc.remote_id)
+
+    def test_require_stream_header(self):
+        with self.assertRaises(errors.StreamError) as cm:
+            self.proc.feed(b"<foo xmlns='uri:foo'>")
+        self.assertEqual(
+            (namespaces.streams, "invalid-namespace"),
+            cm.exception.condition
+        )
+
+    def test_parse_xsos(self):
+        self.proc.feed(self.VALID_STREAM_HEADER)
+        self.proc.feed(b"<foo xmlns='uri:foo' attr='bar' xml:lang='de'>"
+                       b"fnord &amp; ")
+        self.proc.feed(b"baz</foo>\n<foo xmlns='uri:foo'/>")
+
+        self.assertEqual(2, len(self.results))
+        first, second = self.results
+        self.assertEqual("bar", first.attr)
+        self.assertEqual(structs.LanguageTag.fromstr("de"), first.lang)
+        self.assertEqual("fnord & baz", first.text)
+        self.assertIsNone(second.attr)
+        self.assertIsNone(second.text)
+
+    def test_stream_footer_and_close(self):
+        on_stream_footer = unittest.mock.Mock()
+        self.proc.on_stream_footer = on_stream_footer
+
+        self.proc.feed(self.VALID_STREAM_HEADER)
+        self.proc.feed(b"</stream:stream>")
+        on_stream_footer.assert_called_once_with()
+
+        self.proc.close()
+        # a new document can be started afterwards
+        self.proc.feed(self.VALID_STREAM_HEADER)
+
+    def test_exception_recovery_and_reporting(self):
+        on_exception = unittest.mock.Mock()
+        self.proc.on_exception = on_exception
+
+        self.proc.feed(self.VALID_STREAM_HEADER)
+        self.proc.feed(b"<foo xmlns='uri:foo' num='x'><bar/></foo>")
+
+        self.assertEqual(1, len(on_exception.mock_calls))
+        self.assertFalse(self.results)
+
+        self.proc.feed(b"<foo xmlns='uri:foo'/>")
+        self.assertEqual(1, len(self.results))
+
+    def test_exception_reraise_without_handler(self):
+        self.proc.feed(self.VALID_STREAM_HEADER)
+        with self.assertRaises(ValueError):
+            self.proc.feed(b"<foo xmlns='uri:foo' num='x'><bar/></foo>")
+
+    def test_reject_processing_instruction(self):
+        self.proc.feed(self.VALID_STREAM_HEADER)
+        with self.assertRaises(errors.StreamError) as cm:
+            self.proc.feed(b"<?foo bar?>")
+        self.assertEqual(
+            (namespaces.streams, "restricted-xml"),
+            cm.exception.condition
+        )
+
+    def test_reject_comments(self):
+        self.proc.feed(self.VALID_STREAM_HEADER)
+        with self.assertRaises(errors.StreamError) as cm:
+            self.proc.feed(b"<!-- foo -->")
+        self.assertEqual(
+            (namespaces.streams, "restricted-xml"),
+            cm.exception.condition
+        )
+
+    def test_reject_dtd(self):
+        with self.assertRaises(errors.StreamError) as cm:
+            self.proc.feed(b"<!DOCTYPE foo [<!ENTITY bar 'baz'>]>")
+        self.assertEqual(
+            (namespaces.streams, "restricted-xml"),
+            cm.exception.condition
+        )
+
+    def test_undefined_entity_raises_sax_parse_exception(self):
+        self.proc.feed(self.VALID_STREAM_HEADER)
+        with self.assertRaises(xml_sax.SAXParseException) as cm:
+            self.proc.feed(b"&foo;")
+        self.assertTrue(
+            cm.exception.getException().args[0].startswith(
+                "undefined entity"
+            )
+        )
+
+    def test_malformed_xml_raises_sax_parse_exception(self):
+        self.proc.feed(self.VALID_STREAM_HEADER)
+        with self.assertRaises(xml_sax.SAXParseException):
+            self.proc.feed(b"<</>")
+
+
 class Testmake_parser(unittest.TestCase):
     def setUp(self):
         self.p = xml.make_parser()
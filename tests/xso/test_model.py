@@ -25,6 +25,7 @@ import collections.abc
 import contextlib
 import copy
 import functools
+import sys
 import unittest
 import unittest.mock
 
@@ -66,6 +67,125 @@ def make_instance_mock(mapping={}):
     return instance
 
 
+def parse_events_reference(cls, ev_args, parent_ctx):
+    # the generic implementation of XMLStreamClass.parse_events which was used
+    # before the parse plans were introduced; kept to check the compiled
+    # parser against it
+    with parent_ctx as ctx:
+        obj = cls.__new__(cls)
+        attrs = ev_args[2]
+        attr_map = cls.ATTR_MAP.copy()
+        for key, value in attrs.items():
+            try:
+                prop = attr_map.pop(key)
+            except KeyError:
+                if cls.UNKNOWN_ATTR_POLICY == xso_model.UnknownAttrPolicy.DROP:
+                    continue
+                else:
+                    raise ValueError(
+                        "unexpected attribute {!r} on {}".format(
+                            key,
+                            xso_model.tag_to_str((ev_args[0], ev_args[1]))
+                        )) from None
+            try:
+                prop.from_value(obj, value)
+            except:
+                prop.mark_incomplete(obj)
+                xso_model._mark_attributes_incomplete(attr_map.values(), obj)
+                xso_model.logger.debug("while parsing XSO", exc_info=True)
+                # true means suppress
+                if not obj.xso_error_handler(
+                        prop,
+                        value,
+                        sys.exc_info()):
+                    raise
+
+        for key, prop in attr_map.items():
+            try:
+                prop.handle_missing(obj, ctx)
+            except:
+                xso_model.logger.debug("while parsing XSO", exc_info=True)
+                # true means suppress
+                if not obj.xso_error_handler(
+                        prop,
+                        None,
+                        sys.exc_info()):
+                    raise
+
+        try:
+            prop = cls.ATTR_MAP[namespaces.xml, "lang"]
+        except KeyError:
+            pass
+        else:
+            lang = prop.__get__(obj, cls)
+            if lang is not None:
+                ctx.lang = lang
+
+        collected_text = []
+        while True:
+            ev_type, *ev_args = yield
+            if ev_type == "end":
+                break
+            elif ev_type == "text":
+                if not cls.TEXT_PROPERTY:
+                    if ev_args[0].strip():
+                        # true means suppress
+                        if not obj.xso_error_handler(
+                                None,
+                                ev_args[0],
+                                None):
+                            raise ValueError("unexpected text")
+                else:
+                    collected_text.append(ev_args[0])
+            elif ev_type == "start":
+                try:
+                    handler = cls.CHILD_MAP[ev_args[0], ev_args[1]]
+                except KeyError:
+                    if cls.COLLECTOR_PROPERTY:
+                        handler = cls.COLLECTOR_PROPERTY.xq_descriptor
+                    else:
+                        yield from xso_model.enforce_unknown_child_policy(
+                            cls.UNKNOWN_CHILD_POLICY,
+                            ev_args,
+                            obj.xso_error_handler)
+                        continue
+                try:
+                    yield from xso_model.guard(
+                        handler.from_events(obj, ev_args, ctx),
+                        ev_args
+                    )
+                except:
+                    xso_model.logger.debug("while parsing XSO", exc_info=True)
+                    # true means suppress
+                    if not obj.xso_error_handler(
+                            handler,
+                            ev_args,
+                            sys.exc_info()):
+                        raise
+
+        if collected_text:
+            collected_text = "".join(collected_text)
+            try:
+                cls.TEXT_PROPERTY.xq_descriptor.from_value(
+                    obj,
+                    collected_text
+                )
+            except:
+                xso_model.logger.debug("while parsing XSO", exc_info=True)
+                # true means suppress
+                if not obj.xso_error_handler(
+                        cls.TEXT_PROPERTY.xq_descriptor,
+                        collected_text,
+                        sys.exc_info()):
+                    raise
+
+    obj.validate()
+
+    obj.xso_after_load()
+
+    return obj
+
+
 class TestXMLStreamClass(unittest.TestCase):
     def setUp(self):
         self.ctx = xso_model.Context()
@@ -1781,6 +1901,122 @@ class TestXMLStreamClass(unittest.TestCase):
         self.assertIs(ClsA.DECLARE_NS, d)
         self.assertIs(ClsB.DECLARE_NS, d)
 
+    def test_parse_plan_is_cached(self):
+        class Cls(metaclass=xso_model.XMLStreamClass):
+            TAG = "foo"
+
+            attr = xso.Attr("a")
+
+        plan = Cls._get_parse_plan()
+        self.assertIs(plan, Cls._get_parse_plan())
+
+    def test_parse_plan_is_not_inherited(self):
+        class ClsA(metaclass=xso_model.XMLStreamClass):
+            TAG = "foo"
+
+            attr = xso.Attr("a")
+
+        plan = ClsA._get_parse_plan()
+
+        class ClsB(ClsA):
+            TAG = "bar"
+
+        self.assertIsNot(plan, ClsB._get_parse_plan())
+
+    def test_register_child_invalidates_parse_plan(self):
+        class Cls(xso.XSO):
+            TAG = "foo"
+
+            child = xso.Child([])
+
+        class ClsA(xso.XSO):
+            TAG = "bar"
+
+        Cls._get_parse_plan()
+        Cls.register_child(Cls.child, ClsA)
+
+        gen = Cls.parse_events((None, "foo", {}), self.ctx)
+        next(gen)
+        gen.send(("start", None, "bar", {}))
+        gen.send(("end", ))
+        with self.assertRaises(StopIteration) as ctx:
+            gen.send(("end", ))
+
+        self.assertIsInstance(ctx.exception.value.child, ClsA)
+
+    def test_adding_descriptor_invalidates_parse_plan(self):
+        class Cls(xso.XSO):
+            TAG = "foo"
+
+        Cls._get_parse_plan()
+        Cls.attr = xso.Attr("a")
+
+        gen = Cls.parse_events((None, "foo", {(None, "a"): "x"}), self.ctx)
+        next(gen)
+        with self.assertRaises(StopIteration) as ctx:
+            gen.send(("end", ))
+
+        self.assertEqual(ctx.exception.value.attr, "x")
+
+    def test_deleting_attribute_invalidates_parse_plan(self):
+        class Cls(xso.XSO):
+            TAG = "foo"
+
+        Cls.foo = "bar"
+        plan = Cls._get_parse_plan()
+        del Cls.foo
+
+        self.assertIsNot(plan, Cls._get_parse_plan())
+
+    def test_compiled_and_generic_parsing_agree(self):
+        class Leaf(xso.XSO):
+            TAG = "leaf"
+
+            text = xso.Text()
+
+        class Leaf2(xso.XSO):
+            TAG = "leaf2"
+
+        class Cls(xso.XSO):
+            TAG = "foo"
+
+            attr = xso.Attr("a")
+            other = xso.Attr("b", default="default")
+            child = xso.Child([Leaf])
+            children = xso.ChildList([Leaf2])
+            flag = xso.ChildFlag("flag")
+
+        events = [
+            ("start", None, "leaf", {}),
+            ("text", "foo"),
+            ("text", "bar"),
+            ("end", ),
+            ("start", None, "leaf2", {}),
+            ("end", ),
+            ("start", None, "flag", {}),
+            ("end", ),
+            ("start", None, "leaf2", {}),
+            ("end", ),
+            ("end", ),
+        ]
+
+        results = []
+        for method in [xso_model.XMLStreamClass.parse_events,
+                       parse_events_reference]:
+            gen = method(Cls, (None, "foo", {(None, "a"): "x"}), self.ctx)
+            next(gen)
+            with self.assertRaises(StopIteration) as ctx:
+                for ev in events:
+                    gen.send(ev)
+            results.append(ctx.exception.value)
+
+        for obj in results:
+            self.assertEqual(obj.attr, "x")
+            self.assertEqual(obj.other, "default")
+            self.assertEqual(obj.child.text, "foobar")
+            self.assertEqual(len(obj.children), 2)
+            self.assertTrue(obj.flag)
+
 
 class TestCapturingXMLStreamClass(unittest.TestCase):
     def test_parse_events_uses_capture(self):